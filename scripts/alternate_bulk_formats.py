@@ -1,98 +1,123 @@
 import csv
 import json
 import glob
+import hashlib
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 import utils
 
+# Optional dependency for the parquet output
+try:
+	import pyarrow
+	import pyarrow.parquet
+except ImportError:
+	pyarrow = None
+
+
+LEGISLATOR_YAMLS = ["legislators-current.yaml", "legislators-historical.yaml"]
+SOCIAL_YAML = "legislators-social-media.yaml"
+DISTRICT_OFFICES_YAML = "legislators-district-offices.yaml"
+
+DEFAULT_FORMATS = ("json", "csv")
+ALL_FORMATS = ("json", "csv", "ndjson", "parquet")
+
+# Source and exporter hashes of the last export, so unchanged datasets can be skipped.
+# It sits next to the outputs so the gh-pages publish step commits it too.
+EXPORT_MANIFEST = "../bulk_export_manifest.json"
+
+# The exporter's own code. Its hash is part of every dataset's manifest
+# entry, so a change to the output format re-exports everything.
+EXPORTER_SOURCES = ("alternate_bulk_formats.py", "utils.py")
+
+#list of yaml field name, csv column name tuples. Split into categories which do not reflect yaml structure (structured for logical csv column ordering)
+BIO_FIELDS = [
+("last", "last_name"),
+("first", "first_name"),
+("middle", "middle_name"),
+("suffix", "suffix"),
+("nickname", "nickname"),
+("official_full", "full_name"),
+("birthday", "birthday"),
+("gender", "gender")
+]
+
+#ID crosswalks, omit FEC id's, which may contain (arbitrary?) number of values
+CROSSWALK_FIELDS = [
+("bioguide", "bioguide_id"),
+("thomas", "thomas_id"),
+("opensecrets", "opensecrets_id"),
+("lis","lis_id"),
+("fec","fec_ids"),
+("cspan", "cspan_id"),
+("govtrack", "govtrack_id"),
+("votesmart", "votesmart_id"),
+("ballotpedia", "ballotpedia_id"),
+("washington_post", "washington_post_id"),
+("icpsr", "icpsr_id"),
+("wikipedia", "wikipedia_id")
+]
+
+#separate list for children of "terms", csv only captures data for most recent term
+#currently excluding start/end dates - earliest start to latest end is deceptive (excludes gaps) as is start/end for most recent term
+TERM_FIELDS = [
+("type", "type"),
+("state", "state"),
+("district", "district"),
+("class", "senate_class"),
+("party", "party"),
+("url", "url"),
+("address", "address"),
+("phone", "phone"),
+("contact_form", "contact_form"),
+("rss_url", "rss_url"),
+]
+
+#pulled from legislators-social-media.yaml
+SOCIAL_MEDIA_FIELDS = [
+("twitter", "twitter"),
+("twitter_id", "twitter_id"),
+("facebook", "facebook"),
+("youtube", "youtube"),
+("youtube_id", "youtube_id"),
+("mastodon", "mastodon")
+]
+
+
+def output_path(filename, extension):
+	return "../" + filename.replace(".yaml", "." + extension)
+
 
 def generate_csv():
+	print("Loading %s..." %SOCIAL_YAML)
+	social = utils.IdIndex(utils.load_data(SOCIAL_YAML))
 
-	#yaml filenames
-	yamls = ["legislators-current.yaml","legislators-historical.yaml"]
-	yaml_social = "legislators-social-media.yaml"
-
-
-
-	#list of yaml field name, csv column name tuples. Split into categories which do not reflect yaml structure (structured for logical csv column ordering)
-	bio_fields = [
-	("last", "last_name"),
-	("first", "first_name"),
-	("middle", "middle_name"),
-	("suffix", "suffix"),
-	("nickname", "nickname"),
-	("official_full", "full_name"),
-	("birthday", "birthday"),
-	("gender", "gender")
-	]
-
-	#ID crosswalks, omit FEC id's, which may contain (arbitrary?) number of values
-	crosswalk_fields = [
-	("bioguide", "bioguide_id"),
-	("thomas", "thomas_id"),
-	("opensecrets", "opensecrets_id"),
-	("lis","lis_id"),
-	("fec","fec_ids"),
-	("cspan", "cspan_id"),
-	("govtrack", "govtrack_id"),
-	("votesmart", "votesmart_id"),
-	("ballotpedia", "ballotpedia_id"),
-	("washington_post", "washington_post_id"),
-	("icpsr", "icpsr_id"),
-	("wikipedia", "wikipedia_id")
-	]
-
-	#separate list for children of "terms", csv only captures data for most recent term
-	#currently excluding start/end dates - earliest start to latest end is deceptive (excludes gaps) as is start/end for most recent term
-	term_fields = [
-	("type", "type"),
-	("state", "state"),
-	("district", "district"),
-	("class", "senate_class"),
-	("party", "party"),
-	("url", "url"),
-	("address", "address"),
-	("phone", "phone"),
-	("contact_form", "contact_form"),
-	("rss_url", "rss_url"),
-	]
-
-	#pulled from legislators-social-media.yaml
-	social_media_fields = [
-	("twitter", "twitter"),
-	("twitter_id", "twitter_id"),
-	("facebook", "facebook"),
-	("youtube", "youtube"),
-	("youtube_id", "youtube_id"),
-	("mastodon", "mastodon")
-	]
-
-
-	print("Loading %s..." %yaml_social)
-	social = utils.load_data(yaml_social)
-
-	for filename in yamls:
+	for filename in LEGISLATOR_YAMLS:
 		print("Converting %s to CSV..." % filename)
+		write_legislators_csv(utils.load_data(filename), filename, social)
+
+	generate_district_office_csv()
 
-		legislators = utils.load_data(filename)
 
-		#convert yaml to csv
-		csv_output = csv.writer(open("../" + filename.replace(".yaml", ".csv"),"w"))
+def write_legislators_csv(legislators, filename, social):
+	#convert yaml to csv
+	with open(output_path(filename, "csv"), "w") as f:
+		csv_output = csv.writer(f)
 
 		head = []
-		for pair in bio_fields:
+		for pair in BIO_FIELDS:
 			head.append(pair[1])
-		for pair in term_fields:
+		for pair in TERM_FIELDS:
 			head.append(pair[1])
-		for pair in social_media_fields:
+		for pair in SOCIAL_MEDIA_FIELDS:
 			head.append(pair[1])
-		for pair in crosswalk_fields:
+		for pair in CROSSWALK_FIELDS:
 			head.append(pair[1])
 		csv_output.writerow(head)
 
 		for legislator in legislators:
 			legislator_row = []
-			for pair in bio_fields:
+			for pair in BIO_FIELDS:
 				if 'name' in legislator and pair[0] in legislator['name']:
 					legislator_row.append(legislator['name'][pair[0]])
 				elif 'bio' in legislator and pair[0] in legislator['bio']:
@@ -100,25 +125,15 @@ def generate_csv():
 				else:
 					legislator_row.append(None)
 
-			for pair in term_fields:
+			for pair in TERM_FIELDS:
 				latest_term = legislator['terms'][len(legislator['terms'])-1]
 				if pair[0] in latest_term:
 					legislator_row.append(latest_term[pair[0]])
 				else:
 					legislator_row.append(None)
 
-			social_match = None
-			for social_legislator in social:
-				if 'bioguide' in legislator['id'] and 'bioguide' in social_legislator['id'] and legislator['id']['bioguide'] == social_legislator['id']['bioguide']:
-					social_match = social_legislator
-					break
-				elif 'thomas' in legislator['id'] and 'thomas' in social_legislator['id'] and legislator['id']['thomas'] == social_legislator['id']['thomas']:
-					social_match = social_legislator
-					break
-				elif 'govtrack' in legislator['id'] and 'govtrack' in social_legislator['id'] and legislator['id']['govtrack'] == social_legislator['id']['govtrack']:
-					social_match = social_legislator
-					break
-			for pair in social_media_fields:
+			social_match = social.find(legislator['id'], ("bioguide", "thomas", "govtrack"))
+			for pair in SOCIAL_MEDIA_FIELDS:
 				if social_match != None:
 					if pair[0] in social_match['social']:
 						legislator_row.append(social_match['social'][pair[0]])
@@ -127,7 +142,7 @@ def generate_csv():
 				else:
 					legislator_row.append(None)
 
-			for pair in crosswalk_fields:
+			for pair in CROSSWALK_FIELDS:
 				if pair[0] in legislator['id']:
 					value = legislator['id'][pair[0]]
 					if isinstance(value, list):
@@ -139,52 +154,220 @@ def generate_csv():
 
 			csv_output.writerow(legislator_row)
 
-	generate_district_office_csv()
-
 
 def generate_district_office_csv():
-	filename = "legislators-district-offices.yaml"
-	print("Converting %s to CSV..." % filename)
-	legislators_offices = utils.load_data(filename)
+	print("Converting %s to CSV..." % DISTRICT_OFFICES_YAML)
+	write_district_office_csv(utils.load_data(DISTRICT_OFFICES_YAML))
+
+
+def write_district_office_csv(legislators_offices):
+	# fill in thomas/govtrack IDs the offices file doesn't carry
+	legislators = utils.legislator_id_index(("legislators-current.yaml",))
 	fields = [
 		"bioguide", "thomas", "govtrack", "id", "address", "building",
 		"city", "fax", "hours", "phone", "state", "suite", "zip",
 		"latitude", "longitude"]
 
-	f = open("../" + filename.replace(".yaml", ".csv"), "w")
-	csv_output = csv.DictWriter(f, fieldnames=fields)
-	csv_output.writeheader()
-
-	for legislator_offices in legislators_offices:
-		legislator_ids = legislator_offices['id']
-		for office in legislator_offices['offices']:
-			office.update(legislator_ids)
-			csv_output.writerow(office)
+	with open(output_path(DISTRICT_OFFICES_YAML, "csv"), "w") as f:
+		csv_output = csv.DictWriter(f, fieldnames=fields)
+		csv_output.writeheader()
+
+		for legislator_offices in legislators_offices:
+			legislator_ids = dict(legislator_offices['id'])
+			legislator = legislators.find(legislator_ids, ("bioguide", "thomas", "govtrack"))
+			if legislator:
+				for scheme in ("bioguide", "thomas", "govtrack"):
+					if scheme not in legislator_ids and scheme in legislator['id']:
+						legislator_ids[scheme] = legislator['id'][scheme]
+			for office in legislator_offices['offices']:
+				# copy so the loaded data can still be exported to other formats
+				row = dict(office)
+				row.update(legislator_ids)
+				csv_output.writerow(row)
+
+
+def stringify_twitter_ids(filename, data):
+	'''handle edge case of incorrect coercion for twitter ids in social media data
+		json/js can only handle maximum of 53-bit integers, so 64-bit integer twitter ids *must* be stringified
+		to consistently preserve value in json. otherwise they may be rounded and malformed
+	'''
+	if 'legislators-social-media' in filename:
+		for social_legislator in data:
+			if 'twitter_id' in social_legislator['social']:
+				social_legislator['social']['twitter_id'] = str(social_legislator['social']['twitter_id'])
+
+
+def write_json(data, filename):
+	# stream the encoder's chunks rather than building one big string;
+	# the output is identical to json.dumps(..., indent=2)
+	encoder = json.JSONEncoder(default=utils.format_datetime, indent=2)
+	with open(output_path(filename, "json"), "w") as f:
+		for chunk in encoder.iterencode(data):
+			f.write(chunk)
+
+
+def write_ndjson(data, filename):
+	with open(output_path(filename, "ndjson"), "w") as f:
+		for record in data:
+			f.write(json.dumps(record, default=utils.format_datetime))
+			f.write("\n")
+
+
+def parquet_table(records):
+	# One column per key found in any record (Table.from_pylist only uses the
+	# first record's keys). pyarrow infers each column's type from all of its
+	# values; a column whose values don't share a type, e.g. a string in some
+	# records and a list in others, is stored as JSON text instead.
+	keys = { }
+	for record in records:
+		keys.update(dict.fromkeys(record))
+	columns = { }
+	for key in keys:
+		values = [record.get(key) for record in records]
+		try:
+			columns[key] = pyarrow.array(values)
+		except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+			columns[key] = pyarrow.array([None if v is None else json.dumps(v) for v in values], type=pyarrow.string())
+	return pyarrow.table(columns)
+
+
+def write_parquet(data, filename):
+	# round-trip through JSON so dates become strings, as in the JSON output
+	records = json.loads(json.dumps(data, default=utils.format_datetime))
+	pyarrow.parquet.write_table(parquet_table(records), output_path(filename, "parquet"))
 
 
 def generate_json():
+	for filename in yaml_datasets():
+		print("Converting %s to JSON..." % filename)
+		data = utils.load_data(filename)
+		stringify_twitter_ids(filename, data)
+		write_json(data, filename)
 
+
+def yaml_datasets():
 	#yaml filenames
-    yamls = list(map(os.path.basename, glob.glob("../*.yaml")))
-
-    for filename in yamls:
-        print("Converting %s to JSON..." % filename)
-        data = utils.load_data(filename)
-        '''handle edge case of incorrect coercion for twitter ids in social media data
-    		json/js can only handle maximum of 53-bit integers, so 64-bit integer twitter ids *must* be stringified
-    		to consistently preserve value in json. otherwise they may be rounded and malformed
-    	'''
-        if 'legislators-social-media' in filename:
-        	for social_legislator in data:
-        		if 'twitter_id' in social_legislator['social']:
-        			social_legislator['social']['twitter_id'] = str(social_legislator['social']['twitter_id'])
-
-		#convert yaml to json
-        utils.write(
-            json.dumps(data, default=utils.format_datetime, indent=2),
-            "../" + filename.replace(".yaml", ".json"))
+	return sorted(map(os.path.basename, glob.glob("../*.yaml")))
+
+
+def dataset_sources(filename, formats):
+	# the YAML files an export of this dataset reads
+	sources = [filename]
+	if "csv" in formats:
+		if filename in LEGISLATOR_YAMLS:
+			sources.append(SOCIAL_YAML)
+		elif filename == DISTRICT_OFFICES_YAML:
+			sources.append("legislators-current.yaml")
+	return sources
+
+
+def dataset_outputs(filename, formats):
+	outputs = []
+	for fmt in formats:
+		if fmt == "csv" and filename not in LEGISLATOR_YAMLS + [DISTRICT_OFFICES_YAML]:
+			continue
+		outputs.append(output_path(filename, fmt))
+	return outputs
+
+
+def file_hash(path):
+	h = hashlib.sha1()
+	with open(path, "rb") as f:
+		for block in iter(lambda: f.read(1 << 20), b""):
+			h.update(block)
+	return h.hexdigest()
+
+
+def exporter_hash():
+	h = hashlib.sha1()
+	script_dir = os.path.dirname(os.path.abspath(__file__))
+	for name in EXPORTER_SOURCES:
+		h.update(file_hash(os.path.join(script_dir, name)).encode("ascii"))
+	return h.hexdigest()
+
+
+def export_dataset(filename, formats):
+	# Load one dataset once and write every requested format from it.
+	# Runs in a worker process.
+	print("Exporting %s (%s)..." % (filename, ", ".join(formats)))
+	data = utils.load_data(filename)
+
+	# CSV first: the JSON-family writers stringify twitter IDs in place
+	if "csv" in formats:
+		if filename in LEGISLATOR_YAMLS:
+			write_legislators_csv(data, filename, utils.IdIndex(utils.load_data(SOCIAL_YAML)))
+		elif filename == DISTRICT_OFFICES_YAML:
+			write_district_office_csv(data)
+
+	stringify_twitter_ids(filename, data)
+	if "json" in formats:
+		write_json(data, filename)
+	if "ndjson" in formats:
+		write_ndjson(data, filename)
+	if "parquet" in formats:
+		write_parquet(data, filename)
+
+	return filename
+
+
+def load_manifest():
+	if not os.path.exists(EXPORT_MANIFEST):
+		return { }
+	with open(EXPORT_MANIFEST) as f:
+		return json.load(f)
+
+
+def export_all(formats=DEFAULT_FORMATS, workers=None, force=False):
+	if "parquet" in formats and pyarrow is None:
+		print("pyarrow is not installed, skipping parquet output.")
+		formats = tuple(fmt for fmt in formats if fmt != "parquet")
+
+	manifest = load_manifest()
+	exporter = exporter_hash()
+	hashes = { }
+	todo = []
+	for filename in yaml_datasets():
+		sources = dataset_sources(filename, formats)
+		for source in sources:
+			if source not in hashes:
+				hashes[source] = file_hash("../" + source)
+		key = { source: hashes[source] for source in sources }
+		previous = manifest.get(filename, { })
+		up_to_date = (
+			previous.get("sources") == key
+			and previous.get("exporter") == exporter
+			and set(formats) <= set(previous.get("formats", []))
+			and all(os.path.exists(path) for path in dataset_outputs(filename, formats)))
+		if force or not up_to_date:
+			todo.append((filename, key))
+		else:
+			print("%s unchanged, skipping." % filename)
+
+	# Record every dataset that exported before raising the first failure, so
+	# the next run doesn't redo them
+	errors = []
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		futures = [(filename, key, executor.submit(export_dataset, filename, formats)) for filename, key in todo]
+		for filename, key, future in futures:
+			try:
+				future.result()
+			except Exception as e:
+				print("Exporting %s failed: %s" % (filename, e))
+				errors.append(e)
+				continue
+			manifest[filename] = { "sources": key, "exporter": exporter, "formats": sorted(formats) }
+
+	utils.write(json.dumps(manifest, indent=2, sort_keys=True), EXPORT_MANIFEST)
+	if errors:
+		raise errors[0]
 
-if __name__ == '__main__':
-	generate_csv()
-	generate_json()
 
+if __name__ == '__main__':
+	# usage: python alternate_bulk_formats.py [--formats=json,csv,ndjson,parquet] [--workers=N] [--force]
+	flags = utils.flags()
+	formats = tuple(flags.get("formats", ",".join(DEFAULT_FORMATS)).split(","))
+	unknown = set(formats) - set(ALL_FORMATS)
+	if unknown:
+		raise SystemExit("Unknown format(s): %s" % ", ".join(sorted(unknown)))
+	workers = int(flags["workers"]) if "workers" in flags else None
+	export_all(formats, workers=workers, force=flags.get("force", False))
@@ -8,14 +8,62 @@ This script acts as a simple entry point for requests from Electron.
 It takes a single JSON string as a command-line argument, passes it 
 to the data mining coordinator script, captures the JSON response from
 the coordinator's stdout, and prints it back to the caller (Electron).
+
+Electron itself keeps one `coordinator.py --stdio` process running and
+sends JSON requests straight to it (see src/main/main.js); this bridge
+serves other callers. If a persistent coordinator is running
+(`coordinator.py --serve`, POSIX only), the request is sent over its Unix
+socket instead, which avoids paying the interpreter and module start-up
+cost on every call. When no server is listening the bridge falls back to
+spawning the coordinator per request.
 """
 
 import sys
 import os
+import socket
 import subprocess
 import json
 from datetime import datetime
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOCKET_PATH = os.environ.get(
+    'MAGA_COORDINATOR_SOCKET',
+    os.path.join(os.path.dirname(SCRIPT_DIR), 'data', 'coordinator.sock')
+)
+SOCKET_TIMEOUT = 300 # Seconds; generation/evaluation requests can be slow
+
+def send_to_coordinator_server(json_request_string, socket_path=DEFAULT_SOCKET_PATH):
+    """Sends the request to a running coordinator server.
+
+    Returns the raw response line, or None if no server is reachable so the
+    caller can fall back to spawning the coordinator script.
+    """
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(SOCKET_TIMEOUT)
+            client.connect(socket_path)
+            # The protocol is one JSON object per line, so drop embedded newlines
+            payload = json.dumps(json.loads(json_request_string)) + "\n"
+            client.sendall(payload.encode('utf-8'))
+
+            chunks = []
+            while True:
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if chunk.endswith(b"\n"):
+                    break
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Stale socket file without a listening server
+        return None
+
+    response = b"".join(chunks).decode('utf-8').strip()
+    return response or None
+
 def main():
     # Expecting one argument: the JSON request string
     if len(sys.argv) != 2:
@@ -41,8 +89,27 @@ def main():
         print(error_response)
         sys.exit(1)
 
+    # Prefer a warm coordinator server if one is running
+    try:
+        server_response = send_to_coordinator_server(json_request_string)
+    except socket.timeout:
+        # The server accepted the request; re-running it in a subprocess could duplicate work
+        print(json.dumps({
+            "success": False,
+            "error": f"Coordinator server did not respond within {SOCKET_TIMEOUT} seconds.",
+            "timestamp": datetime.now().isoformat()
+        }))
+        sys.exit(1)
+    except OSError as e:
+        print(f"Coordinator server request failed, falling back to subprocess: {e}", file=sys.stderr)
+        server_response = None
+
+    if server_response is not None:
+        print(server_response)
+        return
+
     # Determine the path to the coordinator script relative to this script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    script_dir = SCRIPT_DIR
     coordinator_path = os.path.join(script_dir, "data-mining", "coordinator.py")
 
     if not os.path.exists(coordinator_path):
@@ -10,98 +10,33 @@
 #  --historical: do *only* historical legislators (default: false)
 #  --bioguide: do *only* a single legislator
 #  --relationships: Get familial relationships to other members of congress past and present, when applicable
+#  --pipeline: prefetch pages concurrently and parse them in a process pool (default: true unless --bioguide)
+#  --workers: number of parser processes in pipelined mode (default: CPU count)
+#  --fetchers: number of concurrent downloads in pipelined mode (default: 4)
+#  --resume: pick up an interrupted pipelined run from its checkpoint (default: true)
 
 import lxml.html, io
 import datetime
+import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import utils
 from utils import download, load_data, save_data
 
-def run():
-
-  def update_birthday(bioguide, person, main):
+# Pipelined mode downloads uncached pages on a few threads, which the shared
+# fetch layer paces to bioguide.congress.gov's rate limit, and parses pages
+# across a process pool.
+FETCH_WORKERS = 4
 
-    birthday = birthday_for(main)
-    if not birthday:
-      print("[%s] NO BIRTHDAY :(\n\n%s" % (bioguide, main))
-      warnings.append(bioguide)
-      return
-    if birthday == "UNKNOWN":
-      return
-
-    try:
-      birthday = datetime.datetime.strptime(birthday.replace(",", ""), "%B %d %Y")
-    except ValueError:
-      print("[%s] BAD BIRTHDAY :(\n\n%s" % (bioguide, main))
-      warnings.append(bioguide)
-      return
-
-    birthday = "%04d-%02d-%02d" % (birthday.year, birthday.month, birthday.day)
-    person.setdefault("bio", {})["birthday"] = birthday
-
-
-  def birthday_for(string):
-    # exceptions for not-nicely-placed semicolons
-    string = string.replace("born in Cresskill, Bergen County, N. J.; April", "born April")
-    string = string.replace("FOSTER, A. Lawrence, a Representative from New York; September 17, 1802;", "born September 17, 1802")
-    string = string.replace("CAO, Anh (Joseph), a Representative from Louisiana; born in Ho Chi Minh City, Vietnam; March 13, 1967", "born March 13, 1967")
-    string = string.replace("CRITZ, Mark S., a Representative from Pennsylvania; born in Irwin, Westmoreland County, Pa.; January 5, 1962;", "born January 5, 1962")
-    string = string.replace("SCHIFF, Steven Harvey, a Representative from New Mexico; born in Chicago, Ill.; March 18, 1947", "born March 18, 1947")
-    string = string.replace('KRATOVIL, Frank, M. Jr., a Representative from Maryland; born in Lanham, Prince George\u2019s County, Md.; May 29, 1968', "born May 29, 1968")
-
-    # look for a date
-    pattern = r"born [^;]*?((?:January|February|March|April|May|June|July|August|September|October|November|December),? \d{1,2},? \d{4})"
-    match = re.search(pattern, string, re.I)
-    if not match or not match.group(1):
-      # specifically detect cases that we can't handle to avoid unnecessary warnings
-      if re.search("birth dates? unknown|date of birth is unknown", string, re.I): return "UNKNOWN"
-      if re.search("born [^;]*?(?:in|about|before )?(?:(?:January|February|March|April|May|June|July|August|September|October|November|December) )?\d{4}", string, re.I): return "UNKNOWN"
-      return None
-    return match.group(1).strip()
-
-  def relationships_of(string):
-    # relationship data is stored in a parenthetical immediately after the end of the </font> tag in the bio
-    # e.g. "(son of Joseph Patrick Kennedy, II, and great-nephew of Edward Moore Kennedy and John Fitzgerald Kennedy)"
-    pattern = "^\((.*?)\)"
-    match = re.search(pattern, string, re.I)
-
-    relationships = []
-
-    if match and len(match.groups()) > 0:
-      relationship_text = match.group(1).encode("ascii", "replace")
-
-      # since some relationships refer to multiple people--great-nephew of Edward Moore Kennedy AND John Fitzgerald Kennedy--we need a special grammar
-      from nltk import tree, pos_tag, RegexpParser
-      tokens = re.split("[ ,;]+|-(?![0-9])", relationship_text)
-      pos = pos_tag(tokens)
-
-      grammar = r"""
-        NAME: {<NNP>+}
-        NAMES: { <IN><NAME>(?:<CC><NAME>)* }
-        RELATIONSHIP: { <JJ|NN|RB|VB|VBD|VBN|IN|PRP\$>+ }
-        MATCH: { <RELATIONSHIP><NAMES> }
-        """
-      cp = RegexpParser(grammar)
-      chunks = cp.parse(pos)
-
-      # iterate through the Relationship/Names pairs
-      for n in chunks:
-        if isinstance(n, tree.Tree) and n.node == "MATCH":
-          people = []
-          relationship = None
-          for piece in n:
-            if piece.node == "RELATIONSHIP":
-              relationship = " ".join([x[0] for x in piece])
-            elif piece.node == "NAMES":
-              for name in [x for x in piece if isinstance(x, tree.Tree)]:
-                people.append(" ".join([x[0] for x in name]))
-          for person in people:
-            relationships.append({ "relation": relationship, "name": person})
-    return relationships
+# Flush the resume checkpoint after this many parsed members.
+CHECKPOINT_EVERY = 100
 
+def run():
   # default to caching
   cache = utils.flags().get('cache', True)
   force = not cache
+  relationships = utils.flags().get("relationships", False)
 
   # pick either current or historical
   # order is important here, since current defaults to true
@@ -132,50 +67,78 @@ def run():
   else:
     bioguides = list(by_bioguide.keys())
 
+  pipeline = utils.flags().get('pipeline', len(bioguides) > 1)
+
   warnings = []
   missing = []
   count = 0
   families = 0
 
-  for bioguide in bioguides:
-    # Download & parse the HTML of the bioguide page.
-    try:
-    	dom = fetch_bioguide_page(bioguide, force)
-    except Exception as e:
-    	print(e)
-    	missing.append(bioguide)
-    	continue
-
-    # Extract the member's name and the biography paragraph (main).
-
-    try:
-      name = dom.cssselect("p font")[0]
-      main = dom.cssselect("p")[0]
-    except IndexError:
-      print("[%s] Missing name or content!" % bioguide)
-      exit(0)
-
-    name = name.text_content().strip()
-    main = main.text_content().strip().replace("\n", " ").replace("\r", " ")
-    main = re.sub("\s+", " ", main)
-
-    # Extract the member's birthday.
-
-    update_birthday(bioguide, by_bioguide[bioguide], main)
-
-    # Extract relationships with other Members of Congress.
-
-    if utils.flags().get("relationships", False):
-      #relationship information, if present, is in a parenthetical immediately after the name.
-      #should always be present if we passed the IndexError catch above
-      after_name = dom.cssselect("p font")[0].tail.strip()
-      relationships = relationships_of(after_name)
-      if len(relationships):
-        families = families + 1
-        by_bioguide[bioguide]["family"] = relationships
-
+  # Members parsed by an earlier, interrupted run of the same dataset.
+  checkpoint = None
+  done = { }
+  if pipeline and not bioguide:
+    checkpoint = checkpoint_path(filename)
+    if utils.flags().get('resume', True):
+      done = load_checkpoint(checkpoint, relationships)
+      done = dict((b, r) for b, r in done.items() if b in by_bioguide)
+      if done:
+        print("Resuming from checkpoint: %d members already parsed." % len(done))
+
+  if pipeline:
+    workers = int(utils.flags().get('workers', os.cpu_count() or 1))
+    fetchers = int(utils.flags().get('fetchers', FETCH_WORKERS))
+    todo = [b for b in bioguides if b not in done]
+    results = iter_pipelined(todo, force, relationships, fetchers, workers)
+  else:
+    results = (parse_member(b, fetch_member_page(b, force), relationships) for b in bioguides)
+
+  def merge(result):
+    # Fold one member's parse result back into their legislator record.
+    person = by_bioguide[result["bioguide"]]
+    if result["birthday"]:
+      person.setdefault("bio", {})["birthday"] = result["birthday"]
+    if result["warning"]:
+      warnings.append(result["bioguide"])
+    if result["family"]:
+      person["family"] = result["family"]
+      return 1
+    return 0
+
+  for result in done.values():
+    families = families + merge(result)
     count = count + 1
 
+  unsaved = 0
+  try:
+    for result in results:
+      for message in result["messages"]:
+        print(message)
+
+      if result["missing"]:
+        missing.append(result["bioguide"])
+        continue
+      if result["fatal"]:
+        if checkpoint: save_checkpoint(checkpoint, relationships, done)
+        exit(0)
+
+      families = families + merge(result)
+      count = count + 1
+
+      if checkpoint:
+        done[result["bioguide"]] = result
+        unsaved = unsaved + 1
+        if unsaved >= CHECKPOINT_EVERY:
+          save_checkpoint(checkpoint, relationships, done)
+          unsaved = 0
+  except KeyboardInterrupt:
+    # Keep everything parsed so far for the next run.
+    if checkpoint: save_checkpoint(checkpoint, relationships, done)
+    raise
+  finally:
+    # Stop the pipeline's queued downloads and parses when we stop early.
+    results.close()
+
 
   print()
   if warnings:
@@ -189,9 +152,12 @@ def run():
 
   print("Saved %d legislators to %s" % (count, filename))
 
-  if utils.flags().get("relationships", False):
+  if relationships:
     print("Found family members for %d of those legislators" % families)
 
+  if checkpoint and os.path.exists(checkpoint):
+    os.remove(checkpoint)
+
   # Some testing code to help isolate and fix issued:
   # f
   # none = "PEARSON, Joseph, a Representative from North Carolina; born in Rowan County, N.C., in 1776; completed preparatory studies; studied law; was admitted to the bar and commenced practice in Salisbury, N.C.; member of the State house of commons; elected as a Federalist to the Eleventh, Twelfth, and Thirteenth Congresses (March 4, 1809-March 3, 1815); while in Congress fought a duel with John George Jackson, of Virginia, and on the second fire wounded his opponent in the hip; died in Salisbury, N.C., October 27, 1834."
@@ -206,12 +172,209 @@ def run():
   # control = "PEARSON, Richmond, a Representative from North Carolina; born at Richmond Hill, Yadkin County, N.C., January 26, 1852; attended Horner's School, Oxford, N.C., and was graduated from Princeton College in 1872; studied law; was admitted to the bar in 1874; in the same year was appointed United States consul to Verviers and Liege, Belgium; resigned in 1877; member of the State house of representatives 1884-1886; elected as a Republican to the Fifty-fourth and Fifty-fifth Congresses (March 4, 1895-March 3, 1899); successfully contested the election of William T. Crawford to the Fifty-sixth Congress and served from May 10, 1900, to March 3, 1901; appointed by President Theodore Roosevelt as United States consul to Genoa, Italy, December 11, 1901, as Envoy Extraordinary and Minister Plenipotentiary to Persia in 1902, and as Minister to Greece and Montenegro in 1907; resigned from the diplomatic service in 1909; died at Richmond Hill, Asheville, N.C., September 12, 1923; interment in Riverside Cemetery."
   # print "\nControl (January 26, 1852): %s" % birthday_for(control)
 
-def fetch_bioguide_page(bioguide, force):
-  url = "http://bioguide.congress.gov/scripts/biodisplay.pl?index=%s" % bioguide
-  cache = "legislators/bioguide/%s.html" % bioguide
+
+def birthday_for(string):
+  # exceptions for not-nicely-placed semicolons
+  string = string.replace("born in Cresskill, Bergen County, N. J.; April", "born April")
+  string = string.replace("FOSTER, A. Lawrence, a Representative from New York; September 17, 1802;", "born September 17, 1802")
+  string = string.replace("CAO, Anh (Joseph), a Representative from Louisiana; born in Ho Chi Minh City, Vietnam; March 13, 1967", "born March 13, 1967")
+  string = string.replace("CRITZ, Mark S., a Representative from Pennsylvania; born in Irwin, Westmoreland County, Pa.; January 5, 1962;", "born January 5, 1962")
+  string = string.replace("SCHIFF, Steven Harvey, a Representative from New Mexico; born in Chicago, Ill.; March 18, 1947", "born March 18, 1947")
+  string = string.replace('KRATOVIL, Frank, M. Jr., a Representative from Maryland; born in Lanham, Prince George\u2019s County, Md.; May 29, 1968', "born May 29, 1968")
+
+  # look for a date
+  pattern = r"born [^;]*?((?:January|February|March|April|May|June|July|August|September|October|November|December),? \d{1,2},? \d{4})"
+  match = re.search(pattern, string, re.I)
+  if not match or not match.group(1):
+    # specifically detect cases that we can't handle to avoid unnecessary warnings
+    if re.search("birth dates? unknown|date of birth is unknown", string, re.I): return "UNKNOWN"
+    if re.search("born [^;]*?(?:in|about|before )?(?:(?:January|February|March|April|May|June|July|August|September|October|November|December) )?\d{4}", string, re.I): return "UNKNOWN"
+    return None
+  return match.group(1).strip()
+
+def relationships_of(string):
+  # relationship data is stored in a parenthetical immediately after the end of the </font> tag in the bio
+  # e.g. "(son of Joseph Patrick Kennedy, II, and great-nephew of Edward Moore Kennedy and John Fitzgerald Kennedy)"
+  pattern = "^\((.*?)\)"
+  match = re.search(pattern, string, re.I)
+
+  relationships = []
+
+  if match and len(match.groups()) > 0:
+    relationship_text = match.group(1).encode("ascii", "replace")
+
+    # since some relationships refer to multiple people--great-nephew of Edward Moore Kennedy AND John Fitzgerald Kennedy--we need a special grammar
+    from nltk import tree, pos_tag, RegexpParser
+    tokens = re.split("[ ,;]+|-(?![0-9])", relationship_text)
+    pos = pos_tag(tokens)
+
+    grammar = r"""
+      NAME: {<NNP>+}
+      NAMES: { <IN><NAME>(?:<CC><NAME>)* }
+      RELATIONSHIP: { <JJ|NN|RB|VB|VBD|VBN|IN|PRP\$>+ }
+      MATCH: { <RELATIONSHIP><NAMES> }
+      """
+    cp = RegexpParser(grammar)
+    chunks = cp.parse(pos)
+
+    # iterate through the Relationship/Names pairs
+    for n in chunks:
+      if isinstance(n, tree.Tree) and n.node == "MATCH":
+        people = []
+        relationship = None
+        for piece in n:
+          if piece.node == "RELATIONSHIP":
+            relationship = " ".join([x[0] for x in piece])
+          elif piece.node == "NAMES":
+            for name in [x for x in piece if isinstance(x, tree.Tree)]:
+              people.append(" ".join([x[0] for x in name]))
+        for person in people:
+          relationships.append({ "relation": relationship, "name": person})
+  return relationships
+
+def parse_member(bioguide, body, relationships):
+  # Parse one member's bioguide page into a picklable result, so this can
+  # run in a worker process. `body` is the raw page, or None if it could
+  # not be downloaded.
+  result = { "bioguide": bioguide, "birthday": None, "family": None, "warning": False,
+             "missing": False, "fatal": False, "messages": [] }
+
+  # Parse the HTML of the bioguide page.
+  try:
+    if body is None:
+      raise Exception("Error downloading bioguide page for %s" % bioguide)
+    dom = parse_bioguide_page(bioguide, body)
+  except Exception as e:
+    result["messages"].append(str(e))
+    result["missing"] = True
+    return result
+
+  # Extract the member's name and the biography paragraph (main).
+
   try:
-    body = download(url, cache, force)
+    name = dom.cssselect("p font")[0]
+    main = dom.cssselect("p")[0]
+  except IndexError:
+    result["messages"].append("[%s] Missing name or content!" % bioguide)
+    result["fatal"] = True
+    return result
+
+  name = name.text_content().strip()
+  main = main.text_content().strip().replace("\n", " ").replace("\r", " ")
+  main = re.sub("\s+", " ", main)
+
+  # Extract the member's birthday.
+
+  birthday = birthday_for(main)
+  if not birthday:
+    result["messages"].append("[%s] NO BIRTHDAY :(\n\n%s" % (bioguide, main))
+    result["warning"] = True
+  elif birthday != "UNKNOWN":
+    try:
+      birthday = datetime.datetime.strptime(birthday.replace(",", ""), "%B %d %Y")
+      result["birthday"] = "%04d-%02d-%02d" % (birthday.year, birthday.month, birthday.day)
+    except ValueError:
+      result["messages"].append("[%s] BAD BIRTHDAY :(\n\n%s" % (bioguide, main))
+      result["warning"] = True
+
+  # Extract relationships with other Members of Congress.
+
+  if relationships:
+    #relationship information, if present, is in a parenthetical immediately after the name.
+    #should always be present if we passed the IndexError catch above
+    after_name = dom.cssselect("p font")[0].tail.strip()
+    family = relationships_of(after_name)
+    if len(family):
+      result["family"] = family
+
+  return result
+
+def parse_cached_member(bioguide, relationships):
+  # Process pool entry point: parse a page that is already in the cache.
+  return parse_member(bioguide, fetch_member_page(bioguide, False), relationships)
+
+def iter_pipelined(bioguides, force, relationships, fetchers, workers):
+  # Yield parse results in completion order. Cached pages go straight to the
+  # parser pool; the rest are downloaded first (into the cache) and handed
+  # over to the parsers as they arrive.
+  def prefetch(bioguide):
+    return download(bioguide_url(bioguide), bioguide_cache(bioguide), True) is not None
+
+  parsers = ProcessPoolExecutor(max_workers=workers)
+  downloads = ThreadPoolExecutor(max_workers=fetchers)
+  try:
+    pending = { }
+    for bioguide in bioguides:
+      if not force and os.path.exists(os.path.join(utils.cache_dir(), bioguide_cache(bioguide))):
+        pending[parsers.submit(parse_cached_member, bioguide, relationships)] = ("parse", bioguide)
+      else:
+        pending[downloads.submit(prefetch, bioguide)] = ("fetch", bioguide)
+
+    while pending:
+      finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+      for future in finished:
+        stage, bioguide = pending.pop(future)
+        if stage == "parse":
+          yield future.result()
+          continue
+
+        try:
+          fetched = future.result()
+        except Exception as e:
+          print(e)
+          fetched = False
+        if fetched:
+          pending[parsers.submit(parse_cached_member, bioguide, relationships)] = ("parse", bioguide)
+        else:
+          yield parse_member(bioguide, None, relationships)
+  finally:
+    # When the consumer stops early (a fatal result, Ctrl-C), drop the queued
+    # work instead of running every remaining download and parse first.
+    downloads.shutdown(cancel_futures=True)
+    parsers.shutdown(cancel_futures=True)
+
+def checkpoint_path(filename):
+  return os.path.join(utils.cache_dir(), "legislators/bioguide-%s.checkpoint.json" % filename.replace(".yaml", ""))
+
+def load_checkpoint(path, relationships):
+  # Parse results saved by an interrupted run, keyed by bioguide ID. A
+  # checkpoint taken with a different --relationships setting is ignored.
+  if not os.path.exists(path):
+    return { }
+  try:
+    with open(path) as f:
+      checkpoint = json.load(f)
+  except ValueError:
+    return { }
+  if checkpoint.get("relationships") != bool(relationships):
+    return { }
+  return checkpoint.get("results", { })
+
+def save_checkpoint(path, relationships, done):
+  # Write to a temporary file and rename, so an interruption mid-write
+  # leaves the previous checkpoint intact.
+  utils.write(json.dumps({ "relationships": bool(relationships), "results": done }), path + ".tmp")
+  os.replace(path + ".tmp", path)
+
+def bioguide_url(bioguide):
+  return "http://bioguide.congress.gov/scripts/biodisplay.pl?index=%s" % bioguide
+
+def bioguide_cache(bioguide):
+  return "legislators/bioguide/%s.html" % bioguide
+
+def fetch_member_page(bioguide, force):
+  try:
+    return download(bioguide_url(bioguide), bioguide_cache(bioguide), force)
+  except Exception as e:
+    print(e)
+    return None
+
+def fetch_bioguide_page(bioguide, force):
+  return parse_bioguide_page(bioguide, download(bioguide_url(bioguide), bioguide_cache(bioguide), force))
 
+def parse_bioguide_page(bioguide, body):
+  url = bioguide_url(bioguide)
+  try:
     # Fix a problem?
     body = body.replace("&Aacute;\xc2\x81", "&Aacute;")
 
@@ -7,6 +7,9 @@ import json
 import threading
 import time # For simulating work and timestamps
 import logging # Import logging
+import argparse
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Import the setup function
@@ -34,6 +37,11 @@ project_dir = os.path.dirname(scripts_dir)
 sys.path.insert(0, scripts_dir) # Add scripts dir first for db module
 sys.path.append(project_dir) # To potentially import db utils later
 
+# Default location of the persistent coordinator's Unix socket (see serve_unix_socket)
+DEFAULT_SOCKET_PATH = os.environ.get(
+    'MAGA_COORDINATOR_SOCKET', os.path.join(project_dir, 'data', 'coordinator.sock')
+)
+
 # --- Import Real Database Manager --- #
 try:
     from db.database_manager import DatabaseManager
@@ -43,13 +51,15 @@ except ImportError as e:
     logger.exception("Failed to import DatabaseManager from db.database_manager. Falling back to DummyDB.")
     # Define Dummy DB only if the real one fails to import
     class DummyDB:
-         def search_entities(self, query): # Keep search as fallback if needed?
+         def search_entities(self, query, **kwargs): # Keep search as fallback if needed?
              print(f"DUMMY DB SEARCH: Query '{query}'", file=sys.stderr)
              time.sleep(0.5)
              return [
                  {"id": "pol_dummy_1", "type": "politician", "name": f"Politician matching '{query}'", "category": "Politician", "bio": "Dummy bio for politician."},
                  {"id": "inf_dummy_1", "type": "influencer", "name": f"Influencer matching '{query}'", "category": "Social Media", "bio": "Dummy bio for influencer."}
              ]
+         def get_similar_entities(self, entity_id, limit=10):
+             return []
     database_manager = DummyDB()
 # --- END Database Manager Import --- #
 
@@ -523,7 +533,8 @@ def handle_search_request(request_details):
 
     try:
         # --- Call the real database manager --- #
-        search_results = database_manager.search_entities(query)
+        search_kwargs = {k: request_details[k] for k in ('entity_type', 'category', 'limit') if request_details.get(k)}
+        search_results = database_manager.search_entities(query, **search_kwargs)
         # ---------------------------------------- #
 
         logger.info(f"Search completed for '{query}'. Returning {len(search_results)} results.")
@@ -534,6 +545,19 @@ def handle_search_request(request_details):
         return {"success": False, "error": f"Search failed: {e}", "timestamp": datetime.now().isoformat()}
 # --- END Search Request Handler ---
 
+def handle_similar_entities_request(request_details):
+    """Handles requests for entities similar to one entity (embedding cosine similarity)."""
+    entity_id = request_details.get('entity_id')
+    if entity_id is None:
+        return {"success": False, "error": "entity_id is required.", "timestamp": datetime.now().isoformat()}
+
+    try:
+        results = database_manager.get_similar_entities(entity_id, limit=request_details.get('limit', 10))
+        return {"success": True, "data": results, "source": "vector_store"}
+    except Exception as e:
+        logger.exception(f"Error finding entities similar to {entity_id}")
+        return {"success": False, "error": f"Similarity search failed: {e}", "timestamp": datetime.now().isoformat()}
+
 # --- Main Request Router --- #
 def route_request(request_data):
     """Routes the request to the appropriate handler based on the 'type'."""
@@ -550,6 +574,8 @@ def route_request(request_data):
         return handle_generate_intel_request(request_data)
     elif request_type == 'search': # Add case for search
         return handle_search_request(request_data) # Call the new handler
+    elif request_type == 'similar_entities':
+        return handle_similar_entities_request(request_data)
     else:
         logger.warning(f"Unknown request type: {request_type}") # Use logger
         return {
@@ -558,10 +584,129 @@ def route_request(request_data):
             "timestamp": datetime.now().isoformat()
         }
 
+# --- Persistent Server Mode --- #
+# The coordinator can run as a long-lived process so that source modules, the
+# DatabaseManager and the background processor stay warm between requests.
+# The wire protocol is newline-delimited JSON: one request object per line in,
+# one response object per line out. An optional "request_id" on the request is
+# echoed back on the response so clients can match concurrent replies.
+
+def dispatch_line(line):
+    """Decodes one NDJSON request line, routes it and returns the encoded response line."""
+    request_id = None
+    try:
+        request_data = json.loads(line)
+        if not isinstance(request_data, dict):
+            raise ValueError("Request must be a JSON object")
+        request_id = request_data.get('request_id')
+        if request_data.get('type') == 'ping':
+            result = {"success": True, "data": "pong", "pid": os.getpid()}
+        else:
+            result = route_request(request_data)
+    except (json.JSONDecodeError, ValueError) as e:
+        result = {"success": False, "error": f"Invalid JSON input: {e}"}
+    except Exception as e:
+        logger.exception("Unhandled error while dispatching request")
+        result = {"success": False, "error": f"Coordinator script error: {e}"}
+
+    if request_id is not None and isinstance(result, dict):
+        result = dict(result, request_id=request_id)
+    return json.dumps(result) + "\n"
+
+class CoordinatorRequestHandler(socketserver.StreamRequestHandler):
+    """Serves NDJSON requests on one client connection until it closes."""
+
+    def handle(self):
+        for raw_line in self.rfile:
+            line = raw_line.decode('utf-8').strip()
+            if not line:
+                continue
+            self.wfile.write(dispatch_line(line).encode('utf-8'))
+            self.wfile.flush()
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class CoordinatorUnixServer(socketserver.ThreadingUnixStreamServer):
+        """Threaded Unix socket server; each client connection gets its own thread."""
+        daemon_threads = True
+else:
+    CoordinatorUnixServer = None
+
+def serve_unix_socket(socket_path=DEFAULT_SOCKET_PATH):
+    """Runs the coordinator as a daemon listening on a local Unix socket."""
+    if CoordinatorUnixServer is None:
+        raise RuntimeError("Unix sockets are not supported on this platform; use --stdio instead.")
+
+    socket_dir = os.path.dirname(socket_path)
+    if socket_dir:
+        os.makedirs(socket_dir, exist_ok=True)
+    if os.path.exists(socket_path):
+        # Remove a stale socket left behind by a crashed server
+        os.unlink(socket_path)
+
+    start_background_processor()
+    server = CoordinatorUnixServer(socket_path, CoordinatorRequestHandler)
+    os.chmod(socket_path, 0o600)
+    logger.info(f"Coordinator server listening on {socket_path} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Coordinator server interrupted.")
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        stop_background_processor()
+
+def serve_stdio(max_workers=8):
+    """Runs the coordinator over stdin/stdout, handling requests concurrently.
+
+    Responses may be written out of order; clients should match them using
+    the echoed "request_id".
+    """
+    protocol_out = sys.stdout
+    # Handlers print diagnostics freely; keep them off the protocol stream.
+    sys.stdout = sys.stderr
+    write_lock = threading.Lock()
+
+    def respond(line):
+        response = dispatch_line(line)
+        with write_lock:
+            protocol_out.write(response)
+            protocol_out.flush()
+
+    start_background_processor()
+    logger.info(f"Coordinator server reading requests from stdin (pid {os.getpid()})")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for raw_line in sys.stdin:
+                line = raw_line.strip()
+                if line:
+                    executor.submit(respond, line)
+    finally:
+        sys.stdout = protocol_out
+        stop_background_processor()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MAGA Ops data mining coordinator")
+    parser.add_argument('request', nargs='?', help="Single JSON request to process and exit")
+    parser.add_argument('--serve', action='store_true', help="Run as a persistent server on a Unix socket")
+    parser.add_argument('--stdio', action='store_true', help="Run as a persistent server over stdin/stdout")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help="Unix socket path for --serve")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent requests handled in --stdio mode")
+    return parser.parse_args(argv)
+
 # --- Main Execution Logic (if run directly or called from bridge) ---
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        request_json = sys.argv[1]
+    args = parse_args()
+
+    if args.stdio:
+        serve_stdio(max_workers=args.workers)
+
+    elif args.serve:
+        serve_unix_socket(args.socket)
+
+    elif args.request:
+        request_json = args.request
         try:
             request_data = json.loads(request_json)
             # Ensure background processor is running (might be needed for other tasks)
@@ -574,7 +719,8 @@ if __name__ == "__main__":
              result = {"success": False, "error": f"Coordinator script error: {e}"}
 
         print(json.dumps(result))
-        # Decide on background thread management strategy later
+        # One-shot mode exits right away; run with --serve so queued
+        # background enrichment outlives the request.
 
     else:
         # --- Test Cases --- #
@@ -4,16 +4,27 @@ FEC Contributions Data Mining Script.
 
 This script downloads and processes contribution data from the FEC API.
 It focuses on Schedule A (individual contributions) filtered by committee ID.
+
+Schedule A is paged with FEC's keyset cursors (`last_index` and
+`last_contribution_receipt_date`) rather than page numbers, which FEC does not
+support deep into large committees. Several committees and date ranges can be
+downloaded concurrently under one shared rate limit, streaming records to
+NDJSON files or into the `fec_schedule_a` table. Each (committee, date range)
+task keeps a checkpoint so an interrupted pull resumes where it stopped.
 """
 import os
 import sys
 import json
 import time
+import sqlite3
 import datetime
 import argparse
+import threading
 import requests
-from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 
 # Add project root to path for relative imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -25,16 +36,93 @@ from scripts.utils.logger import get_logger
 # Initialize logger
 logger = get_logger("data_mining.fec_contributions")
 
+# Keyset cursor fields returned in `pagination.last_indexes` for Schedule A
+SCHEDULE_A_CURSOR_FIELDS = ("last_index", "last_contribution_receipt_date")
+
+# Columns kept when streaming Schedule A records into the database
+SCHEDULE_A_COLUMNS = (
+    "sub_id", "committee_id", "contributor_id", "contributor_name",
+    "contributor_first_name", "contributor_last_name", "entity_type",
+    "contributor_employer", "contributor_occupation", "contributor_city",
+    "contributor_state", "contributor_zip", "contribution_receipt_date",
+    "contribution_receipt_amount", "contributor_aggregate_ytd",
+    "receipt_type", "memo_text", "two_year_transaction_period", "pdf_url",
+)
+
+SCHEDULE_A_DDL = """
+CREATE TABLE IF NOT EXISTS fec_schedule_a (
+    sub_id TEXT PRIMARY KEY,
+    committee_id TEXT,
+    contributor_id TEXT,
+    contributor_name TEXT,
+    contributor_first_name TEXT,
+    contributor_last_name TEXT,
+    entity_type TEXT,
+    contributor_employer TEXT,
+    contributor_occupation TEXT,
+    contributor_city TEXT,
+    contributor_state TEXT,
+    contributor_zip TEXT,
+    contribution_receipt_date TEXT,
+    contribution_receipt_amount REAL,
+    contributor_aggregate_ytd REAL,
+    receipt_type TEXT,
+    memo_text TEXT,
+    two_year_transaction_period INTEGER,
+    pdf_url TEXT,
+    downloaded_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_fec_schedule_a_committee
+    ON fec_schedule_a(committee_id, contribution_receipt_date);
+"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all download workers."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate_per_minute (float): Sustained request rate (0 disables limiting)
+            burst (int): Maximum requests that may be made back to back
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be made."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
 class FECContributionDownloader:
     """FEC API client for downloading contribution data."""
     
-    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = None,
+                 rate_limiter: Optional[TokenBucket] = None, pool_size: int = 8):
         """
         Initialize FEC API client.
         
         Args:
             api_key (str, optional): FEC API key
             cache_dir (str, optional): Directory for caching results
+            rate_limiter (TokenBucket, optional): Limiter shared with other clients
+            pool_size (int): Number of pooled HTTP connections to keep open
         """
         # Get API key from config if not provided
         self.api_key = api_key or get("sources.fec.api_key")
@@ -53,7 +141,19 @@ class FECContributionDownloader:
         
         # Set rate limit (requests per minute)
         self.rate_limit = get("sources.fec.rate_limit", 120)
-        self.request_delay = 60 / self.rate_limit if self.rate_limit > 0 else 0
+        self.rate_limiter = rate_limiter or TokenBucket(self.rate_limit)
+        
+        # Reuse connections across requests; retry throttled and failed requests with backoff
+        retry = Retry(
+            total=get("processing.retry_attempts", 3),
+            backoff_factor=get("processing.retry_delay", 5),
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
         # Set cache TTL
         self.cache_ttl = get("sources.fec.cache_ttl", 86400)  # 24 hours in seconds
@@ -71,22 +171,37 @@ class FECContributionDownloader:
         Returns:
             list: List of contributions
         """
+        results = []
+        for page, _ in self.iter_schedule_a(committee_id, **params):
+            results.extend(page)
+        return results
+    
+    def iter_schedule_a(self, committee_id: str, cursor: Optional[Dict[str, Any]] = None,
+                        **params) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """
+        Iterate over Schedule A pages for a committee using keyset pagination.
+        
+        Args:
+            committee_id (str): Committee ID
+            cursor (dict, optional): `last_indexes` to resume after
+            **params: Additional query parameters (e.g. min_date, max_date)
+            
+        Yields:
+            tuple: (page results, cursor for the next page or None after the last page)
+        """
         # Construct endpoint
         endpoint = f"{get('sources.fec.endpoints.schedules.schedule_a', '/schedules/schedule_a')}"
         
-        # Set default parameters
+        # Keyset pagination requires a stable sort on the cursor field
         default_params = {
             "committee_id": committee_id,
             "sort": "-contribution_receipt_date",
             "sort_hide_null": True,
             "per_page": 100,
         }
-        
-        # Merge default parameters with provided parameters
         params = {**default_params, **params}
         
-        # Get all pages
-        return self._get_all_pages(endpoint, params)
+        return self._iter_keyset_pages(endpoint, params, cursor)
     
     def get_committee(self, committee_id: str) -> Dict[str, Any]:
         """
@@ -120,55 +235,44 @@ class FECContributionDownloader:
         # Get candidate details
         return self._make_request(endpoint)
     
-    def _get_all_pages(self, endpoint: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _iter_keyset_pages(self, endpoint: str, params: Dict[str, Any],
+                           cursor: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
         """
-        Get all pages for an endpoint.
+        Follow `pagination.last_indexes` cursors until the results run out.
         
         Args:
             endpoint (str): API endpoint
             params (dict): Query parameters
+            cursor (dict, optional): `last_indexes` to resume after
             
-        Returns:
-            list: All results from all pages
+        Yields:
+            tuple: (page results, cursor for the next page or None after the last page)
         """
-        results = []
-        page = 1
-        has_more = True
-        
-        while has_more:
-            # Update page number
-            params["page"] = page
+        while True:
+            page_params = dict(params)
+            if cursor:
+                page_params.update({k: v for k, v in cursor.items() if k in SCHEDULE_A_CURSOR_FIELDS})
             
-            # Make request
-            response = self._make_request(endpoint, params)
+            # Deep keyset pages are never re-requested, so don't cache them
+            response = self._make_request(endpoint, page_params, use_cache=False)
+            results = response.get("results", [])
+            cursor = (response.get("pagination") or {}).get("last_indexes")
             
-            # Add results
-            if "results" in response:
-                results.extend(response["results"])
+            logger.debug(f"Downloaded {len(results)} results from {endpoint}")
             
-            # Check if there are more pages
-            if "pagination" in response:
-                has_more = response["pagination"].get("hasMore", False)
-                page += 1
-            else:
-                has_more = False
-            
-            # Log progress
-            logger.info(f"Downloaded page {page - 1} with {len(response.get('results', []))} results")
-            
-            # Respect rate limit
-            if has_more and self.request_delay > 0:
-                time.sleep(self.request_delay)
-        
-        return results
+            if not results or not cursor:
+                yield results, None
+                return
+            yield results, cursor
     
-    def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    def _make_request(self, endpoint: str, params: Dict[str, Any] = None, use_cache: bool = True) -> Dict[str, Any]:
         """
         Make a request to the FEC API.
         
         Args:
             endpoint (str): API endpoint
             params (dict, optional): Query parameters
+            use_cache (bool): Read and write the response cache
             
         Returns:
             dict: API response
@@ -183,29 +287,31 @@ class FECContributionDownloader:
         url = f"{self.base_url}{endpoint}"
         
         # Check cache
-        cache_file = self._get_cache_file(endpoint, params)
-        if self._is_cache_valid(cache_file):
+        cache_file = self._get_cache_file(endpoint, params) if use_cache else None
+        if cache_file and self._is_cache_valid(cache_file):
             logger.debug(f"Using cached response for {url}")
             return self._load_from_cache(cache_file)
         
         # Make request
         logger.debug(f"Making request to {url}")
         try:
-            response = requests.get(url, params=params)
+            self.rate_limiter.acquire()
+            response = self.session.get(url, params=params, timeout=60)
             response.raise_for_status()
             
             # Parse response
             data = response.json()
             
             # Cache response
-            self._save_to_cache(cache_file, data)
+            if cache_file:
+                self._save_to_cache(cache_file, data)
             
             return data
         except requests.exceptions.RequestException as e:
             logger.error(f"Error making request to {url}: {e}")
             
             # Try to use cache even if expired
-            if os.path.exists(cache_file):
+            if cache_file and os.path.exists(cache_file):
                 logger.warning(f"Using expired cache for {url}")
                 return self._load_from_cache(cache_file)
             
@@ -281,6 +387,255 @@ class FECContributionDownloader:
             json.dump(data, f, indent=2)
 
 
+class NDJSONSink:
+    """Appends Schedule A records to one NDJSON file per download task."""
+    
+    def __init__(self, output_dir: str):
+        """
+        Initialize the sink.
+        
+        Args:
+            output_dir (str): Directory for the NDJSON files
+        """
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+    
+    def open(self, task_name: str, offset: Optional[int] = None):
+        """
+        Open the file for a task, truncating anything written after the checkpoint.
+        
+        Args:
+            task_name (str): Task name used for the file name
+            offset (int, optional): Byte offset recorded in the task's checkpoint
+            
+        Returns:
+            file: File object positioned for appending
+        """
+        path = os.path.join(self.output_dir, f"{task_name}.ndjson")
+        f = open(path, "a+b")
+        # A crash between writing a page and saving the checkpoint leaves a partial page
+        f.truncate(offset or 0)
+        f.seek(0, os.SEEK_END)
+        return f
+    
+    def write(self, handle, records: List[Dict[str, Any]]) -> int:
+        """
+        Write a page of records and flush it to disk.
+        
+        Returns:
+            int: File offset after the page, to be saved in the checkpoint
+        """
+        handle.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records).encode("utf-8"))
+        handle.flush()
+        os.fsync(handle.fileno())
+        return handle.tell()
+    
+    def close(self, handle) -> None:
+        handle.close()
+
+
+class SQLiteSink:
+    """Upserts Schedule A records into the `fec_schedule_a` table.
+    
+    Records are keyed by FEC's `sub_id`, so a page written again after a crash
+    replaces rather than duplicates its rows. Writes from all workers go
+    through one connection under a lock.
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the sink.
+        
+        Args:
+            db_path (str): Path to the SQLite database
+        """
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEDULE_A_DDL)
+        self.lock = threading.Lock()
+        columns = SCHEDULE_A_COLUMNS + ("downloaded_at",)
+        self.insert_sql = (f"INSERT OR REPLACE INTO fec_schedule_a ({', '.join(columns)}) "
+                           f"VALUES ({', '.join('?' * len(columns))})")
+    
+    def open(self, task_name: str, offset: Optional[int] = None):
+        return None
+    
+    def write(self, handle, records: List[Dict[str, Any]]) -> None:
+        now = datetime.datetime.now().isoformat()
+        rows = [tuple(r.get(c) for c in SCHEDULE_A_COLUMNS) + (now,) for r in records]
+        with self.lock:
+            with self.conn:
+                self.conn.executemany(self.insert_sql, rows)
+        return None
+    
+    def close(self, handle) -> None:
+        pass
+    
+    def close_all(self) -> None:
+        self.conn.close()
+
+
+class Checkpoint:
+    """Resumable progress for one (committee, date range) download task."""
+    
+    def __init__(self, path: str):
+        """
+        Load the checkpoint at path, or start a new one.
+        
+        Args:
+            path (str): Checkpoint file path
+        """
+        self.path = path
+        self.cursor = None
+        self.count = 0
+        self.offset = None
+        self.done = False
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                state = json.load(f)
+            self.cursor = state.get("cursor")
+            self.count = state.get("count", 0)
+            self.offset = state.get("offset")
+            self.done = state.get("done", False)
+    
+    def save(self) -> None:
+        """Atomically write the checkpoint."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "cursor": self.cursor,
+                "count": self.count,
+                "offset": self.offset,
+                "done": self.done,
+                "updated": datetime.datetime.now().isoformat(),
+            }, f)
+        os.replace(tmp, self.path)
+
+
+def split_date_range(start_date: str, end_date: str, parts: int) -> List[Tuple[str, str]]:
+    """
+    Split an inclusive date range into non-overlapping sub-ranges.
+    
+    Args:
+        start_date (str): Start date (YYYY-MM-DD)
+        end_date (str): End date (YYYY-MM-DD)
+        parts (int): Number of sub-ranges
+        
+    Returns:
+        list: (min_date, max_date) pairs covering the range
+    """
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date)
+    days = (end - start).days + 1
+    parts = max(1, min(parts, days))
+    
+    ranges = []
+    for i in range(parts):
+        lo = start + datetime.timedelta(days=days * i // parts)
+        hi = start + datetime.timedelta(days=days * (i + 1) // parts - 1)
+        ranges.append((lo.isoformat(), hi.isoformat()))
+    return ranges
+
+
+def download_task(downloader: FECContributionDownloader, sink, checkpoint_dir: str,
+                  committee_id: str, start_date: Optional[str] = None,
+                  end_date: Optional[str] = None) -> int:
+    """
+    Download one committee's contributions for one date range into a sink.
+    
+    Args:
+        downloader (FECContributionDownloader): API client
+        sink (NDJSONSink or SQLiteSink): Destination for records
+        checkpoint_dir (str): Directory for checkpoint files
+        committee_id (str): Committee ID
+        start_date (str, optional): Start date (YYYY-MM-DD)
+        end_date (str, optional): End date (YYYY-MM-DD)
+        
+    Returns:
+        int: Number of records downloaded by this task in total
+    """
+    task_name = f"{committee_id}_{start_date or 'start'}_{end_date or 'end'}"
+    checkpoint = Checkpoint(os.path.join(checkpoint_dir, f"{task_name}.json"))
+    if checkpoint.done:
+        logger.info(f"{task_name}: already complete ({checkpoint.count} records)")
+        return checkpoint.count
+    if checkpoint.cursor:
+        logger.info(f"{task_name}: resuming after {checkpoint.count} records")
+    
+    params = {}
+    if start_date:
+        params["min_date"] = start_date
+    if end_date:
+        params["max_date"] = end_date
+    
+    handle = sink.open(task_name, checkpoint.offset)
+    try:
+        for results, cursor in downloader.iter_schedule_a(committee_id, cursor=checkpoint.cursor, **params):
+            if results:
+                checkpoint.offset = sink.write(handle, results)
+                checkpoint.count += len(results)
+            checkpoint.cursor = cursor
+            checkpoint.done = cursor is None
+            checkpoint.save()
+            if checkpoint.count and checkpoint.count % 10000 < len(results):
+                logger.info(f"{task_name}: {checkpoint.count} records")
+    finally:
+        sink.close(handle)
+    
+    logger.info(f"{task_name}: finished with {checkpoint.count} records")
+    return checkpoint.count
+
+
+def download_contributions(committee_ids: List[str], output_dir: str,
+                           start_date: Optional[str] = None, end_date: Optional[str] = None,
+                           workers: int = 4, splits: int = 1, db_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Download contributions for several committees concurrently.
+    
+    Each committee's date range is split into `splits` sub-ranges, and the
+    resulting tasks run on `workers` threads that share one rate limit.
+    
+    Args:
+        committee_ids (list): Committee IDs
+        output_dir (str): Directory for NDJSON files and checkpoints
+        start_date (str, optional): Start date (YYYY-MM-DD)
+        end_date (str, optional): End date (YYYY-MM-DD)
+        workers (int): Number of concurrent download tasks
+        splits (int): Date sub-ranges per committee (needs both dates)
+        db_path (str, optional): Write into this database instead of NDJSON
+        
+    Returns:
+        dict: Record count per committee
+    """
+    rate_limiter = TokenBucket(get("sources.fec.rate_limit", 120), burst=workers)
+    downloader = FECContributionDownloader(rate_limiter=rate_limiter, pool_size=workers)
+    sink = SQLiteSink(db_path) if db_path else NDJSONSink(output_dir)
+    checkpoint_dir = os.path.join(output_dir, "checkpoints")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    
+    if start_date and end_date and splits > 1:
+        ranges = split_date_range(start_date, end_date, splits)
+    else:
+        ranges = [(start_date, end_date)]
+    
+    totals = {committee_id: 0 for committee_id in committee_ids}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(download_task, downloader, sink, checkpoint_dir, committee_id, lo, hi): committee_id
+                for committee_id in committee_ids
+                for lo, hi in ranges
+            }
+            for future in as_completed(futures):
+                totals[futures[future]] += future.result()
+    finally:
+        if isinstance(sink, SQLiteSink):
+            sink.close_all()
+    
+    return totals
+
+
 def download_committee_contributions(committee_id: str, output_dir: str, start_date: str = None, end_date: str = None) -> str:
     """
     Download contributions for a committee.
@@ -310,10 +665,6 @@ def download_committee_contributions(committee_id: str, output_dir: str, start_d
     logger.info(f"Getting details for committee {committee_id}")
     committee = downloader.get_committee(committee_id)
     
-    # Get committee contributions
-    logger.info(f"Downloading contributions for committee {committee_id}")
-    contributions = downloader.get_schedule_a(committee_id, **params)
-    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
@@ -331,21 +682,30 @@ def download_committee_contributions(committee_id: str, output_dir: str, start_d
     
     output_file = os.path.join(output_dir, f"{committee_id}_{committee_name}{date_range}.json")
     
-    # Save data
+    # Stream contributions into the file page by page instead of holding them all in memory
+    logger.info(f"Downloading contributions for committee {committee_id}")
+    count = 0
     with open(output_file, "w") as f:
+        f.write('{"committee": ')
+        json.dump(committee.get("results", [{}])[0], f)
+        f.write(', "contributions": [')
+        for results, _ in downloader.iter_schedule_a(committee_id, **params):
+            for record in results:
+                if count:
+                    f.write(", ")
+                json.dump(record, f)
+                count += 1
+        f.write('], "metadata": ')
         json.dump({
-            "committee": committee.get("results", [{}])[0],
-            "contributions": contributions,
-            "metadata": {
-                "committee_id": committee_id,
-                "start_date": start_date,
-                "end_date": end_date,
-                "download_date": datetime.datetime.now().isoformat(),
-                "count": len(contributions)
-            }
-        }, f, indent=2)
+            "committee_id": committee_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "download_date": datetime.datetime.now().isoformat(),
+            "count": count
+        }, f)
+        f.write("}")
     
-    logger.info(f"Downloaded {len(contributions)} contributions for committee {committee_id}")
+    logger.info(f"Downloaded {count} contributions for committee {committee_id}")
     logger.info(f"Results saved to {output_file}")
     
     return output_file
@@ -355,10 +715,14 @@ def main():
     """Main entry point."""
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Download FEC contributions data for committees")
-    parser.add_argument("committee_id", help="Committee ID to download contributions for")
+    parser.add_argument("committee_ids", nargs="+", help="Committee ID(s) to download contributions for")
     parser.add_argument("--output-dir", "-o", default="data/fec", help="Output directory for results")
     parser.add_argument("--start-date", "-s", help="Start date (YYYY-MM-DD)")
     parser.add_argument("--end-date", "-e", help="End date (YYYY-MM-DD)")
+    parser.add_argument("--workers", "-w", type=int, default=4, help="Concurrent download tasks")
+    parser.add_argument("--splits", type=int, default=1, help="Date sub-ranges per committee (needs start and end dates)")
+    parser.add_argument("--db", help="Stream records into this SQLite database instead of NDJSON files")
+    parser.add_argument("--json", action="store_true", help="Write one JSON document per committee (legacy format)")
     parser.add_argument("--config", "-c", help="Path to configuration file")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
     
@@ -375,14 +739,28 @@ def main():
     
     # Download contributions
     try:
-        output_file = download_committee_contributions(
-            args.committee_id,
+        if args.json:
+            for committee_id in args.committee_ids:
+                output_file = download_committee_contributions(
+                    committee_id,
+                    args.output_dir,
+                    args.start_date,
+                    args.end_date
+                )
+                logger.info(f"Results saved to {output_file}")
+            return 0
+        
+        totals = download_contributions(
+            args.committee_ids,
             args.output_dir,
             args.start_date,
-            args.end_date
+            args.end_date,
+            workers=args.workers,
+            splits=args.splits,
+            db_path=args.db
         )
-        
-        logger.info(f"Results saved to {output_file}")
+        for committee_id, count in totals.items():
+            logger.info(f"{committee_id}: {count} contributions")
         return 0
     except Exception as e:
         logger.error(f"Error downloading contributions: {e}")
@@ -392,4 +770,4 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
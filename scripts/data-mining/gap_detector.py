@@ -2,13 +2,28 @@
 """
 Gap Detector Script
 
-Generates a report of missing or stale data based on view_entity_gaps,
-ai_metadata low confidence, and entity_connections evidence.
+Maintains a `data_gaps` table of missing or stale data (entity fields,
+categories, connections and votes; relationship evidence, strength and age;
+low-confidence AI metadata) and streams it out as an NDJSON report.
+
+Every gap class is one set-based INSERT ... SELECT over indexed anti-joins and
+comparisons, so nothing is pulled into Python row by row. Triggers record the
+entities, connections and AI metadata rows touched since the last run in
+`gap_dirty`; an incremental run re-evaluates only those (plus connections
+that aged past the staleness cutoff) and leaves every other gap untouched,
+keeping its original `detected_at`.
+
+The triggers contain BEGIN ... END blocks, so this DDL lives here rather than
+in schema.sql (initialize_db.py splits schema.sql on semicolons).
+
+Usage:
+    python scripts/data-mining/gap_detector.py [--full] [--output gap_report.ndjson]
 """
 import os
 import sys
 import json
 import logging
+import argparse
 from datetime import datetime, timedelta
 
 # Add project root to path to import DatabaseManager
@@ -27,75 +42,287 @@ logger = logging.getLogger(__name__)
 # Default thresholds (can be overridden by env vars)
 AI_CONF_THRESHOLD = float(os.getenv('AI_CONFIDENCE_THRESHOLD', 0.8))
 STALE_REL_DAYS = int(os.getenv('STALE_RELATIONSHIP_DAYS', 180))
+WEAK_REL_STRENGTH = 0.5
 
-OUTPUT_FILE = os.getenv('GAP_REPORT_FILE', 'gap_report.json')
+OUTPUT_FILE = os.getenv('GAP_REPORT_FILE', 'gap_report.ndjson')
 
+GAP_TABLE = 'data_gaps'
 
-def main():
-    logger.info('Starting gap detection run')
-    db = DatabaseManager()
+# Only ISO-8601 timestamps take part in staleness checks (unparseable ones never did)
+_ISO_DATE = "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'"
+
+# Gap predicates per subject; `e`, `c` and `m` alias the subject row
+ENTITY_GAPS = {
+    'missing_bio': "e.bio IS NULL OR e.bio = ''",
+    'missing_twitter': "e.twitter_handle IS NULL",
+    'missing_website': "e.website_url IS NULL",
+    'missing_image': "e.image_url IS NULL",
+    'missing_positions': "e.official_positions IS NULL",
+    'missing_affiliations': "e.known_affiliations IS NULL",
+    'missing_location': "e.location IS NULL",
+    'missing_categories': "NOT EXISTS (SELECT 1 FROM entity_categories ec WHERE ec.entity_id = e.id)",
+    'missing_connections': """NOT EXISTS (SELECT 1 FROM entity_connections c WHERE c.entity1_id = e.id)
+        AND NOT EXISTS (SELECT 1 FROM entity_connections c WHERE c.entity2_id = e.id)""",
+    'missing_votes': """e.entity_type = 'politician'
+        AND NOT EXISTS (SELECT 1 FROM voting_records v WHERE v.politician_id = e.id)""",
+}
+
+RELATIONSHIP_GAPS = {
+    'missing_evidence': "NOT EXISTS (SELECT 1 FROM connection_evidence ce WHERE ce.connection_id = c.id)",
+    'weak_relationships': f"COALESCE(c.strength, 0) < {WEAK_REL_STRENGTH}",
+    'stale_relationships': f"c.last_updated < :stale_cutoff AND c.last_updated GLOB {_ISO_DATE}",
+}
+
+AI_METADATA_GAPS = {
+    'low_confidence_ai_metadata': "m.confidence_score < :ai_threshold OR m.confidence_score IS NULL",
+}
+
+# subject_type -> (table alias, FROM clause, entity id expression, gap predicates)
+SUBJECTS = {
+    'entity': ('e', 'entities e', 'e.id', ENTITY_GAPS),
+    'connection': ('c', 'entity_connections c', 'c.entity1_id', RELATIONSHIP_GAPS),
+    'ai_metadata': ('m', 'ai_metadata m', 'm.entity_id', AI_METADATA_GAPS),
+}
+
+
+def _dirty_trigger(name, event, table, marks):
+    inserts = '\n    '.join(
+        f"INSERT OR IGNORE INTO gap_dirty (subject_type, subject_id) VALUES ('{subject}', {expr});"
+        for subject, expr in marks
+    )
+    return f"CREATE TRIGGER IF NOT EXISTS trg_gap_dirty_{name} AFTER {event} ON {table} BEGIN\n    {inserts}\nEND;"
+
+
+def _connection_marks(row):
+    return [('connection', f'{row}.id'), ('entity', f'{row}.entity1_id'), ('entity', f'{row}.entity2_id')]
+
+
+GAP_DDL = '\n\n'.join([
+    f"""CREATE TABLE IF NOT EXISTS {GAP_TABLE} (
+    gap_type TEXT NOT NULL,
+    subject_type TEXT NOT NULL, -- 'entity', 'connection' or 'ai_metadata'
+    subject_id INTEGER NOT NULL,
+    entity_id INTEGER,
+    detected_at TEXT NOT NULL,
+    PRIMARY KEY (subject_type, subject_id, gap_type)
+) WITHOUT ROWID;""",
+    f"CREATE INDEX IF NOT EXISTS idx_data_gaps_type ON {GAP_TABLE}(gap_type);",
+    f"CREATE INDEX IF NOT EXISTS idx_data_gaps_entity ON {GAP_TABLE}(entity_id);",
+    """CREATE TABLE IF NOT EXISTS gap_dirty (
+    subject_type TEXT NOT NULL,
+    subject_id INTEGER NOT NULL,
+    PRIMARY KEY (subject_type, subject_id)
+) WITHOUT ROWID;""",
+    """CREATE TABLE IF NOT EXISTS gap_detector_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);""",
+    "CREATE INDEX IF NOT EXISTS idx_connections_last_updated ON entity_connections(last_updated);",
+    "CREATE INDEX IF NOT EXISTS idx_ai_metadata_confidence ON ai_metadata(confidence_score);",
+    _dirty_trigger('entity_insert', 'INSERT', 'entities', [('entity', 'NEW.id')]),
+    _dirty_trigger('entity_update',
+                   'UPDATE OF bio, twitter_handle, website_url, image_url, official_positions, '
+                   'known_affiliations, location, entity_type',
+                   'entities', [('entity', 'NEW.id')]),
+    _dirty_trigger('entity_delete', 'DELETE', 'entities', [('entity', 'OLD.id')]),
+    _dirty_trigger('category_insert', 'INSERT', 'entity_categories', [('entity', 'NEW.entity_id')]),
+    _dirty_trigger('category_delete', 'DELETE', 'entity_categories', [('entity', 'OLD.entity_id')]),
+    _dirty_trigger('category_update', 'UPDATE OF entity_id', 'entity_categories',
+                   [('entity', 'OLD.entity_id'), ('entity', 'NEW.entity_id')]),
+    _dirty_trigger('connection_insert', 'INSERT', 'entity_connections', _connection_marks('NEW')),
+    _dirty_trigger('connection_update', 'UPDATE', 'entity_connections',
+                   _connection_marks('OLD') + _connection_marks('NEW')),
+    _dirty_trigger('connection_delete', 'DELETE', 'entity_connections', _connection_marks('OLD')),
+    _dirty_trigger('evidence_insert', 'INSERT', 'connection_evidence',
+                   [('connection', 'NEW.connection_id')]),
+    _dirty_trigger('evidence_delete', 'DELETE', 'connection_evidence',
+                   [('connection', 'OLD.connection_id')]),
+    _dirty_trigger('evidence_update', 'UPDATE OF connection_id', 'connection_evidence',
+                   [('connection', 'OLD.connection_id'), ('connection', 'NEW.connection_id')]),
+    _dirty_trigger('vote_insert', 'INSERT', 'voting_records', [('entity', 'NEW.politician_id')]),
+    _dirty_trigger('vote_delete', 'DELETE', 'voting_records', [('entity', 'OLD.politician_id')]),
+    _dirty_trigger('ai_metadata_insert', 'INSERT', 'ai_metadata', [('ai_metadata', 'NEW.id')]),
+    _dirty_trigger('ai_metadata_update', 'UPDATE', 'ai_metadata',
+                   [('ai_metadata', 'OLD.id'), ('ai_metadata', 'NEW.id')]),
+    _dirty_trigger('ai_metadata_delete', 'DELETE', 'ai_metadata', [('ai_metadata', 'OLD.id')]),
+])
+
+
+def ensure_gap_tables(conn):
+    """Create the gap table, change-tracking triggers and supporting indexes if missing."""
+    conn.executescript(GAP_DDL)
+
+
+def _load_state(conn):
+    return dict(conn.execute("SELECT key, value FROM gap_detector_state").fetchall())
+
+
+def _save_state(conn, state):
+    conn.executemany(
+        "INSERT INTO gap_detector_state (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        [(k, str(v)) for k, v in state.items()]
+    )
+
+
+def _collect_scope(conn, previous_cutoff, stale_cutoff):
+    """Fill temp.gap_scope with the subjects changed (or newly stale) since the last run."""
+    conn.execute("INSERT INTO temp.gap_scope SELECT subject_type, subject_id FROM gap_dirty")
+    # Connections whose age crossed the cutoff since last run; a range scan on the index
+    conn.execute(
+        f"""INSERT OR IGNORE INTO temp.gap_scope
+        SELECT 'connection', id FROM entity_connections
+        WHERE last_updated >= ? AND last_updated < ? AND last_updated GLOB {_ISO_DATE}""",
+        (previous_cutoff, stale_cutoff)
+    )
 
-    report = {
+
+def _find_gaps(conn, full, params):
+    """Evaluate every gap class for the subjects in scope into temp.gap_found."""
+    for subject_type, (alias, source, entity_expr, gaps) in SUBJECTS.items():
+        scope = '' if full else (
+            f"AND {alias}.id IN (SELECT subject_id FROM temp.gap_scope "
+            f"WHERE subject_type = '{subject_type}')"
+        )
+        selects = '\nUNION ALL\n'.join(
+            f"SELECT '{gap_type}', '{subject_type}', {alias}.id, {entity_expr} "
+            f"FROM {source} WHERE ({predicate}) {scope}"
+            for gap_type, predicate in gaps.items()
+        )
+        conn.execute(f"INSERT INTO temp.gap_found {selects}", params)
+
+
+def _merge_gaps(conn, full, detected_at):
+    """Apply temp.gap_found to the gap table; returns (added, resolved)."""
+    in_scope = '' if full else (
+        "AND (subject_type, subject_id) IN (SELECT subject_type, subject_id FROM temp.gap_scope)"
+    )
+    resolved = conn.execute(
+        f"""DELETE FROM {GAP_TABLE}
+        WHERE (subject_type, subject_id, gap_type) NOT IN
+              (SELECT subject_type, subject_id, gap_type FROM temp.gap_found)
+        {in_scope}"""
+    ).rowcount
+    added = conn.execute(
+        f"""INSERT OR IGNORE INTO {GAP_TABLE}
+            (gap_type, subject_type, subject_id, entity_id, detected_at)
+        SELECT gap_type, subject_type, subject_id, entity_id, ? FROM temp.gap_found""",
+        (detected_at,)
+    ).rowcount
+    return added, resolved
+
+
+def update_gaps(conn, full=False, now=None):
+    """Bring the gap table up to date, incrementally unless `full` or thresholds changed.
+
+    Returns:
+        dict: Run summary with the mode, number of gaps added and resolved.
+    """
+    now = now or datetime.utcnow()
+    stale_cutoff = (now - timedelta(days=STALE_REL_DAYS)).isoformat()
+    params = {'stale_cutoff': stale_cutoff, 'ai_threshold': AI_CONF_THRESHOLD}
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        state = _load_state(conn)
+        if (state.get('stale_cutoff') is None
+                or state.get('ai_threshold') != str(AI_CONF_THRESHOLD)
+                or state.get('stale_days') != str(STALE_REL_DAYS)):
+            full = True
+
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS gap_scope "
+                     "(subject_type TEXT, subject_id INTEGER, PRIMARY KEY (subject_type, subject_id))")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS gap_found "
+                     "(gap_type TEXT, subject_type TEXT, subject_id INTEGER, entity_id INTEGER)")
+        conn.execute("DELETE FROM temp.gap_scope")
+        conn.execute("DELETE FROM temp.gap_found")
+
+        if full:
+            conn.execute("INSERT INTO temp.gap_scope SELECT subject_type, subject_id FROM gap_dirty")
+        else:
+            _collect_scope(conn, state['stale_cutoff'], stale_cutoff)
+
+        _find_gaps(conn, full, params)
+        added, resolved = _merge_gaps(conn, full, now.isoformat())
+
+        conn.execute(
+            "DELETE FROM gap_dirty WHERE (subject_type, subject_id) IN "
+            "(SELECT subject_type, subject_id FROM temp.gap_scope)"
+        )
+        scope_size = None if full else conn.execute("SELECT COUNT(*) FROM temp.gap_scope").fetchone()[0]
+        _save_state(conn, {
+            'stale_cutoff': stale_cutoff,
+            'ai_threshold': AI_CONF_THRESHOLD,
+            'stale_days': STALE_REL_DAYS,
+            'last_run': now.isoformat(),
+        })
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    summary = {'full': full, 'added': added, 'resolved': resolved, 'subjects_checked': scope_size}
+    logger.info(f"Gap table updated ({'full' if full else 'incremental'} run): "
+                f"{added} new, {resolved} resolved")
+    return summary
+
+
+def gap_counts(conn):
+    """Number of open gaps per gap type."""
+    return dict(conn.execute(
+        f"SELECT gap_type, COUNT(*) FROM {GAP_TABLE} GROUP BY gap_type ORDER BY gap_type"
+    ).fetchall())
+
+
+def write_report(conn, path, summary):
+    """Stream the gap table to `path` as NDJSON: a run summary line, then one line per gap."""
+    header = {
+        'record': 'run',
         'timestamp': datetime.utcnow().isoformat(),
-        'entity_gaps': {},
-        'relationship_gaps': {
-            'missing_evidence': [],
-            'weak_relationships': [],
-            'stale_relationships': []
-        },
-        'low_confidence_ai_metadata': []
+        'thresholds': {'ai_confidence': AI_CONF_THRESHOLD, 'stale_days': STALE_REL_DAYS},
+        'counts': gap_counts(conn),
+        **summary,
     }
+    cursor = conn.execute(
+        f"""SELECT gap_type, subject_type, subject_id, entity_id, detected_at
+        FROM {GAP_TABLE} ORDER BY gap_type, subject_id"""
+    )
+    written = 0
+    with open(path, 'w') as outf:
+        outf.write(json.dumps(header) + '\n')
+        for gap_type, subject_type, subject_id, entity_id, detected_at in cursor:
+            outf.write(json.dumps({
+                'record': 'gap',
+                'gap_type': gap_type,
+                'subject_type': subject_type,
+                'subject_id': subject_id,
+                'entity_id': entity_id,
+                'detected_at': detected_at,
+            }) + '\n')
+            written += 1
+    return written
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Detect missing or stale data and write an NDJSON gap report")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-evaluate every entity instead of only those changed since the last run")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="NDJSON report path")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logger.info('Starting gap detection run')
+    db = DatabaseManager()
 
-    # 1. Entity gaps from view_entity_gaps
-    rows = db.execute_query('SELECT * FROM view_entity_gaps') or []
-    for r in rows:
-        eid = r['id']
-        # missing fields
-        for field in ['missing_bio', 'missing_twitter', 'missing_website',
-                      'missing_image', 'missing_positions', 'missing_affiliations', 'missing_location']:
-            if r.get(field):
-                report['entity_gaps'].setdefault(field, []).append(eid)
-        # missing categories
-        if r.get('category_count', 0) == 0:
-            report['entity_gaps'].setdefault('missing_categories', []).append(eid)
-        # missing connections
-        if r.get('connection_count', 0) == 0:
-            report['entity_gaps'].setdefault('missing_connections', []).append(eid)
-        # missing votes for politicians
-        if r.get('entity_type') == 'politician' and r.get('vote_count', 0) == 0:
-            report['entity_gaps'].setdefault('missing_votes', []).append(eid)
-
-    # 2. Low-confidence AI metadata
-    metas = db.execute_query('SELECT * FROM ai_metadata') or []
-    for m in metas:
-        if m.get('confidence_score', 0) < AI_CONF_THRESHOLD:
-            report['low_confidence_ai_metadata'].append(m['id'])
-
-    # 3. Relationship gaps
-    # a) missing evidence
-    conns = db.execute_query('SELECT id, last_updated, strength FROM entity_connections') or []
-    now = datetime.utcnow()
-    for conn in conns:
-        cid = conn['id']
-        evidence = db.get_connection_evidence(cid) or []
-        if not evidence:
-            report['relationship_gaps']['missing_evidence'].append(cid)
-        # weak relationship (strength < 0.5)
-        if conn.get('strength', 0) < 0.5:
-            report['relationship_gaps']['weak_relationships'].append(cid)
-        # stale relationship
-        try:
-            lu = datetime.fromisoformat(conn.get('last_updated'))
-            if now - lu > timedelta(days=STALE_REL_DAYS):
-                report['relationship_gaps']['stale_relationships'].append(cid)
-        except Exception:
-            pass
-
-    # Write report
-    with open(OUTPUT_FILE, 'w') as outf:
-        json.dump(report, outf, indent=2)
-    logger.info(f'Gap report written to {OUTPUT_FILE}')
+    with db.connection() as conn:
+        ensure_gap_tables(conn)
+        summary = update_gaps(conn, full=args.full)
+        written = write_report(conn, args.output, summary)
+    logger.info(f'Gap report with {written} gaps written to {args.output}')
 
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
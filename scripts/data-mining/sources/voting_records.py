@@ -3,7 +3,8 @@ import subprocess
 import json
 import logging
 from datetime import datetime, timedelta
-import glob
+import sqlite3
+import threading
 import sys # Needed for sys.executable
 
 logger = logging.getLogger(__name__)
@@ -12,6 +13,10 @@ logger = logging.getLogger(__name__)
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 CONGRESS_DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 CONGRESS_CACHE_DIR = os.path.join(PROJECT_ROOT, 'cache', 'congress') # Specific cache for congress tool
+# SQLite index over the congress tool's vote files, maintained by update_vote_index()
+VOTE_INDEX_PATH = os.path.join(CONGRESS_CACHE_DIR, 'vote_index.db')
+
+_index_lock = threading.Lock()
 
 # Ensure cache directory exists
 os.makedirs(CONGRESS_CACHE_DIR, exist_ok=True)
@@ -59,6 +64,192 @@ def run_congress_tool(force_update=False):
         logger.exception(f"An error occurred while running congress.run votes: {e}")
         return False
 
+def _get_index_connection(index_path=None):
+    """Opens the vote index database, creating its tables on first use."""
+    conn = sqlite3.connect(index_path or VOTE_INDEX_PATH)
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS indexed_vote_files (
+            path TEXT PRIMARY KEY,
+            mtime REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS votes (
+            vote_id TEXT PRIMARY KEY,
+            congress INTEGER,
+            chamber TEXT,
+            session TEXT,
+            roll_number INTEGER,
+            vote_date TEXT,
+            question TEXT,
+            description TEXT,
+            result TEXT,
+            bill_number, -- Untyped so numeric bill numbers round-trip unchanged
+            bill_title TEXT,
+            vote_type TEXT,
+            path TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS member_votes (
+            member_id TEXT NOT NULL,
+            vote_id TEXT NOT NULL,
+            vote_date TEXT,
+            roll_number INTEGER,
+            position TEXT NOT NULL,
+            PRIMARY KEY (member_id, vote_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_member_votes_recent
+            ON member_votes(member_id, vote_date DESC, roll_number DESC);
+        CREATE INDEX IF NOT EXISTS idx_votes_path ON votes(path);
+    """)
+    return conn
+
+def _iter_vote_files(data_dir):
+    """Yields (path, stat) for every data/<congress>/votes/<session>/<vote>/data.json file."""
+    for congress_entry in os.scandir(data_dir):
+        if not (congress_entry.is_dir() and congress_entry.name.isdigit()):
+            continue
+        votes_dir = os.path.join(congress_entry.path, 'votes')
+        if not os.path.isdir(votes_dir):
+            continue
+        for session_entry in os.scandir(votes_dir):
+            if not session_entry.is_dir():
+                continue
+            for vote_entry in os.scandir(session_entry.path):
+                if not vote_entry.is_dir():
+                    continue
+                vote_file = os.path.join(vote_entry.path, 'data.json')
+                try:
+                    yield vote_file, os.stat(vote_file)
+                except FileNotFoundError:
+                    continue
+
+def _index_vote_file(cursor, vote_file):
+    """Parses one vote file and (re)writes its rows in the index."""
+    with open(vote_file, 'r', encoding='utf-8') as f:
+        vote_data = json.load(f)
+
+    vote_id = vote_data.get('vote_id')
+    if not vote_id:
+        raise ValueError("vote file has no vote_id")
+    bill = vote_data.get('bill') or {}
+    vote_date = vote_data.get('date')
+    roll_number = vote_data.get('number')
+
+    cursor.execute("DELETE FROM member_votes WHERE vote_id = ?", (vote_id,))
+    cursor.execute("""
+        INSERT OR REPLACE INTO votes
+        (vote_id, congress, chamber, session, roll_number, vote_date, question,
+         description, result, bill_number, bill_title, vote_type, path)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        vote_id, vote_data.get('congress'), vote_data.get('chamber'), vote_data.get('session'),
+        roll_number, vote_date, vote_data.get('question'), vote_data.get('description'),
+        vote_data.get('result'), bill.get('number'), bill.get('title'), vote_data.get('type'),
+        vote_file
+    ))
+
+    member_rows = []
+    for position, voters in (vote_data.get('votes') or {}).items():
+        for voter in voters:
+            # The Vice President's tie-breaking vote is recorded as a bare string
+            member_id = voter.get('id') if isinstance(voter, dict) else None
+            if member_id:
+                member_rows.append((member_id, vote_id, vote_date, roll_number, position))
+    cursor.executemany("""
+        INSERT OR REPLACE INTO member_votes (member_id, vote_id, vote_date, roll_number, position)
+        VALUES (?, ?, ?, ?, ?)
+    """, member_rows)
+
+def update_vote_index(data_dir=CONGRESS_DATA_DIR, index_path=None):
+    """Brings the on-disk vote index up to date with the congress tool output.
+
+    Only vote files that are new or whose mtime/size changed since the last run
+    are parsed, so after the initial build this is a directory walk plus a
+    handful of inserts.
+
+    Returns:
+        int: Number of vote files (re)indexed.
+    """
+    with _index_lock:
+        conn = _get_index_connection(index_path)
+        try:
+            cursor = conn.cursor()
+            known = {
+                row['path']: (row['mtime'], row['size'])
+                for row in cursor.execute("SELECT path, mtime, size FROM indexed_vote_files")
+            }
+            changed = [
+                (path, st) for path, st in _iter_vote_files(data_dir)
+                if known.get(path) != (st.st_mtime, st.st_size)
+            ]
+            if not changed:
+                return 0
+
+            logger.info(f"Indexing {len(changed)} new or updated vote files.")
+            indexed = 0
+            for vote_file, st in changed:
+                try:
+                    _index_vote_file(cursor, vote_file)
+                except (json.JSONDecodeError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable vote file {vote_file}: {e}")
+                    continue
+                cursor.execute(
+                    "INSERT OR REPLACE INTO indexed_vote_files (path, mtime, size) VALUES (?, ?, ?)",
+                    (vote_file, st.st_mtime, st.st_size)
+                )
+                indexed += 1
+            conn.commit()
+            return indexed
+        finally:
+            conn.close()
+
+def query_member_votes(entity_id, since_date=None, max_votes=20, index_path=None):
+    """Returns a member's most recent indexed votes, newest first.
+
+    Args:
+        entity_id (str): The Bioguide (House) or LIS (Senate) ID of the legislator.
+        since_date (datetime, optional): Only include votes on or after this date.
+        max_votes (int): Maximum number of votes to return.
+    """
+    sql = """
+        SELECT v.vote_id, v.chamber, v.session, v.roll_number, v.vote_date, v.question,
+               v.description, v.result, v.bill_number, v.bill_title, v.vote_type,
+               mv.position
+        FROM member_votes mv
+        JOIN votes v ON v.vote_id = mv.vote_id
+        WHERE mv.member_id = ?
+    """
+    params = [entity_id]
+    if since_date is not None:
+        sql += " AND mv.vote_date >= ?"
+        params.append(since_date.strftime('%Y-%m-%d'))
+    sql += " ORDER BY mv.vote_date DESC, mv.roll_number DESC LIMIT ?"
+    params.append(max_votes)
+
+    conn = _get_index_connection(index_path)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {
+            "vote_id": row['vote_id'],
+            "chamber": row['chamber'],
+            "session": row['session'],
+            "roll_number": row['roll_number'],
+            "date": row['vote_date'],
+            "question": row['question'],
+            "description": row['description'],
+            "result": row['result'],
+            "bill_number": row['bill_number'],
+            "bill_title": row['bill_title'],
+            "member_position": row['position'],
+            "vote_type": row['vote_type']
+        }
+        for row in rows
+    ]
+
 def fetch_recent_votes(entity_id, months_ago=24, max_votes=20):
     """Fetches roll call votes for a specific legislator within the last N months.
 
@@ -76,129 +267,22 @@ def fetch_recent_votes(entity_id, months_ago=24, max_votes=20):
     if not run_congress_tool():
         return {"success": False, "error": "Failed to run congress data tool to update votes."}
 
-    # 2. Determine time window and relevant sessions
+    # 2. Determine time window
     cutoff_date = datetime.now() - timedelta(days=months_ago * 30.5) # Approximate months
-    relevant_vote_files = []
 
     try:
-        # Iterate through congress directories (e.g., data/118, data/117)
-        congress_dirs = sorted([d for d in os.listdir(CONGRESS_DATA_DIR) if d.isdigit()], key=int, reverse=True)
-        if not congress_dirs:
+        if not any(d.isdigit() for d in os.listdir(CONGRESS_DATA_DIR)):
             return {"success": False, "error": f"No Congress data found in {CONGRESS_DATA_DIR}"}
 
-        for congress_num in congress_dirs:
-            congress_votes_dir = os.path.join(CONGRESS_DATA_DIR, congress_num, 'votes')
-            if not os.path.isdir(congress_votes_dir):
-                continue
+        # 3. Index any vote files the congress tool added since the last call
+        newly_indexed = update_vote_index()
+        if newly_indexed:
+            logger.debug(f"Vote index updated with {newly_indexed} files.")
 
-            # Iterate through session directories (e.g., 2023, 2024 or 118)
-            session_dirs = sorted([d for d in os.listdir(congress_votes_dir)], reverse=True)
-            for session_id in session_dirs:
-                session_path = os.path.join(congress_votes_dir, session_id)
-                if not os.path.isdir(session_path):
-                    continue
-                
-                # Basic check: If session ID is a year, check if it's recent enough
-                try:
-                    session_year = int(session_id)
-                    if session_year < cutoff_date.year - 1: # Check if session year is too old
-                        # Optimization: Stop searching older congresses/sessions if this one is too old
-                        # This assumes sessions are primarily year-based
-                        # logger.debug(f"Skipping older session {session_id} (before {cutoff_date.year - 1})\")
-                        # break # Break from session loop for this congress
-                        # Let's process all files first and filter by date later for simplicity now
-                        pass 
-                except ValueError:
-                    # Handle non-year session IDs if necessary (e.g., '118')
-                    pass 
-
-                # Find all json files within this session
-                # Pattern: data/<congress>/votes/<session>/<chamber>/<vote_num>/data.json
-                session_vote_glob = os.path.join(session_path, '\*/*/*.json')
-                session_files = glob.glob(session_vote_glob)
-                relevant_vote_files.extend(session_files)
-        
-        if not relevant_vote_files:
-             return {"success": False, "error": "No vote data files found in any session."}
-             
-        logger.debug(f"Found {len(relevant_vote_files)} total vote files to potentially process.")
-
-        # 3. Sort all found files by date (descending) then parse and filter
-        def get_vote_file_metadata(filepath):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                vote_date_str = data.get('date')
-                vote_date = datetime.fromisoformat(vote_date_str) if vote_date_str else datetime.min
-                vote_num = int(os.path.basename(os.path.dirname(filepath))) # Use vote num as secondary sort key
-                return {'path': filepath, 'date': vote_date, 'vote_num': vote_num}
-            except Exception as e:
-                logger.warning(f"Failed to read metadata from {filepath}: {e}", exc_info=True)
-                return {'path': filepath, 'date': datetime.min, 'vote_num': -1}
-
-        # Get metadata and filter out files that failed to read
-        file_metadata = [get_vote_file_metadata(f) for f in relevant_vote_files]
-        valid_files_metadata = [m for m in file_metadata if m['date'] > datetime.min]
-        
-        # Sort by date (most recent first), then vote number (highest first)
-        valid_files_metadata.sort(key=lambda x: (x['date'], x['vote_num']), reverse=True)
-
-        logger.debug(f"Processing {len(valid_files_metadata)} valid vote files, sorted by date.")
-
-        # 4. Parse files within the time window and extract relevant votes
-        member_votes = []
-        processed_files = 0
-        for meta in valid_files_metadata:
-            # Stop if we have enough votes
-            if len(member_votes) >= max_votes:
-                 break
-            
-            # Stop if the vote date is older than the cutoff
-            if meta['date'] < cutoff_date:
-                continue
+        # 4. Look up this member's votes directly from the index
+        member_votes = query_member_votes(entity_id, since_date=cutoff_date, max_votes=max_votes)
 
-            processed_files += 1
-            vote_file = meta['path']
-            try:
-                # Re-read the file (or pass data from metadata step if memory allows)
-                with open(vote_file, 'r', encoding='utf-8') as f:
-                    vote_data = json.load(f)
-
-                # Check if this member participated in this vote
-                member_vote_position = None
-                if 'votes' in vote_data:
-                     for position, voters in vote_data['votes'].items():
-                          for voter in voters:
-                              if voter.get('id') == entity_id:
-                                   member_vote_position = position
-                                   break 
-                          if member_vote_position:
-                               break 
-
-                if member_vote_position:
-                    # Format the vote information
-                    vote_info = {
-                        "vote_id": vote_data.get('vote_id'),
-                        "chamber": vote_data.get('chamber'),
-                        "session": vote_data.get('session'),
-                        "roll_number": vote_data.get('number'),
-                        "date": vote_data.get('date'),
-                        "question": vote_data.get('question'),
-                        "description": vote_data.get('description'),
-                        "result": vote_data.get('result'),
-                        "bill_number": vote_data.get('bill', {}).get('number') if vote_data.get('bill') else None,
-                        "bill_title": vote_data.get('bill', {}).get('title') if vote_data.get('bill') else None,
-                        "member_position": member_vote_position,
-                        "vote_type": vote_data.get('type')
-                    }
-                    member_votes.append(vote_info)
-
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to decode JSON from vote file: {vote_file}")
-            except Exception as e:
-                logger.exception(f"Error processing vote file {vote_file}: {e}")
-
-        logger.info(f"Found {len(member_votes)} votes within the last {months_ago} months for {entity_id} after processing {processed_files} relevant files.")
+        logger.info(f"Found {len(member_votes)} votes within the last {months_ago} months for {entity_id}.")
         return {"success": True, "data": member_votes}
 
     except Exception as e:
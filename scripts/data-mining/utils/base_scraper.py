@@ -18,7 +18,7 @@ import time
 import random
 import hashlib
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlparse
 import sqlite3
@@ -34,6 +34,11 @@ from utils.config import (
 )
 from utils.source_trust import calculate_trust_score, is_trusted_source
 
+# GET requests go through the shared fetch layer
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(PROJECT_ROOT)
+from scripts.utils.http_fetch import get_fetcher
+
 class BaseScraper:
     """Base class for all scrapers providing common functionality."""
     
@@ -58,7 +63,9 @@ class BaseScraper:
         self.rate_limit = rate_limit or SCRAPE_RATE_LIMIT
         self.user_agent = user_agent or CRAWLER_USER_AGENT
         self.session = self._init_session()
+        self.fetcher = get_fetcher()
         self.last_request_time = 0
+        self._paced_hosts = set()
         
         # Stats
         self.stats = {
@@ -103,82 +110,6 @@ class BaseScraper:
         
         self.last_request_time = time.time()
     
-    def _get_cache_path(self, url, params=None):
-        """
-        Generate a cache path for a URL.
-        
-        Args:
-            url: The URL to cache
-            params: Optional dict of query parameters
-            
-        Returns:
-            Path to the cache file
-        """
-        # Create a hash of the URL and params
-        cache_key = url
-        if params:
-            cache_key += str(sorted(params.items()))
-        
-        hash_key = hashlib.md5(cache_key.encode()).hexdigest()
-        
-        # Get domain for organization
-        domain = urlparse(url).netloc
-        domain = domain.replace('.', '_')
-        
-        # Create cache path
-        return os.path.join(self.cache_dir, f"{domain}_{hash_key}.json")
-    
-    def _load_from_cache(self, url, params=None, max_age_days=7):
-        """
-        Load data from cache if available and not expired.
-        
-        Args:
-            url: The URL to load from cache
-            params: Optional dict of query parameters
-            max_age_days: Maximum age of cache in days
-            
-        Returns:
-            Cached data if available and valid, None otherwise
-        """
-        cache_path = self._get_cache_path(url, params)
-        
-        if not os.path.exists(cache_path):
-            return None
-        
-        # Check cache age
-        file_time = os.path.getmtime(cache_path)
-        file_age = datetime.now() - datetime.fromtimestamp(file_time)
-        
-        if file_age > timedelta(days=max_age_days):
-            self.logger.debug(f"Cache expired for {url}")
-            return None
-        
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.stats['cache_hits'] += 1
-                return data
-        except Exception as e:
-            self.logger.warning(f"Failed to load from cache: {str(e)}")
-            return None
-    
-    def _save_to_cache(self, url, data, params=None):
-        """
-        Save data to cache.
-        
-        Args:
-            url: The URL that was requested
-            data: The data to cache
-            params: Optional dict of query parameters
-        """
-        cache_path = self._get_cache_path(url, params)
-        
-        try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            self.logger.warning(f"Failed to save to cache: {str(e)}")
-    
     def _save_raw_data(self, url, data, data_type='html'):
         """
         Save raw data to the raw data storage.
@@ -290,10 +221,26 @@ class BaseScraper:
             self.logger.error(f"Failed to capture screenshot: {str(e)}")
             return None
     
+    def _pace_host(self, url):
+        """Tighten the shared limit of a URL's host to this scraper's rate limit."""
+        host = (urlparse(url).hostname or '').lower()
+        if host in self._paced_hosts:
+            return
+        self._paced_hosts.add(host)
+        
+        limit = self.fetcher.limit_for(host)
+        if self.rate_limit > 0 and 1.0 / self.rate_limit < limit.rate:
+            self.fetcher.set_host_limit(host, limit._replace(rate=1.0 / self.rate_limit))
+    
     def get(self, url, params=None, headers=None, use_cache=True, max_age_days=7, max_retries=3, save_raw=True):
         """
         Make a GET request with caching, rate limiting, and retries.
         
+        Requests share connections, per-host rate limits and the response
+        cache with every other scraper. A cached JSON response is served
+        for max_age_days before it is revalidated with the server; other
+        cached pages, e.g. HTML, are revalidated on every request.
+        
         Args:
             url: The URL to request
             params: Optional dict of query parameters
@@ -304,74 +251,57 @@ class BaseScraper:
             save_raw: Whether to save the raw response
             
         Returns:
-            Response object or data dict if cached
+            Parsed data for JSON responses, otherwise the Response object
         """
         # Check if URL is from a trusted source
         trust_score = calculate_trust_score(url)
         trusted = is_trusted_source(url)
         self.logger.info(f"Request URL: {url} (Trust score: {trust_score}, Trusted: {trusted})")
         
-        # Check cache if enabled
-        if use_cache:
-            cached_data = self._load_from_cache(url, params, max_age_days)
-            if cached_data:
-                self.logger.debug(f"Using cached data for {url}")
-                return cached_data
-        
-        # Apply rate limiting
-        self._rate_limit()
-        
         # Add custom headers
-        request_headers = {}
+        request_headers = dict(self.session.headers)
         if headers:
             request_headers.update(headers)
         
-        # Make the request with retries
-        retries = 0
-        while retries <= max_retries:
-            try:
-                self.stats['requests'] += 1
-                
-                response = self.session.get(url, params=params, headers=request_headers, timeout=30)
-                
-                # Log response status
-                self.logger.debug(f"Response status: {response.status_code} for {url}")
-                
-                # Check for successful response
-                response.raise_for_status()
-                
-                # Save raw data if enabled
-                if save_raw:
-                    content_type = response.headers.get('Content-Type', '')
-                    data_type = 'json' if 'application/json' in content_type else 'html'
-                    self._save_raw_data(url, response.text, data_type)
-                
-                # Try to parse as JSON if content type is application/json
-                if 'application/json' in response.headers.get('Content-Type', ''):
-                    data = response.json()
-                    
-                    # Cache the response if enabled
-                    if use_cache:
-                        self._save_to_cache(url, data, params)
-                    
-                    return data
-                
-                # Otherwise return the response object
-                return response
+        self._pace_host(url)
+        try:
+            fetch_args = dict(params=params, headers=request_headers, timeout=30,
+                              cache=use_cache, retries=max_retries)
+            response = self.fetcher.fetch(url, max_age=max_age_days * 86400, **fetch_args)
+            if response.from_cache and 'application/json' not in response.headers.get('Content-Type', ''):
+                # Only JSON was ever served from the cache unchecked; ask the
+                # server whether a cached page is still current
+                response = self.fetcher.fetch(url, max_age=0, **fetch_args)
             
-            except requests.RequestException as e:
-                retries += 1
-                self.stats['retries'] += 1
-                
-                if retries > max_retries:
-                    self.logger.error(f"Failed to get {url} after {max_retries} retries: {str(e)}")
-                    self.stats['errors'] += 1
-                    raise
-                
-                # Exponential backoff
-                sleep_time = 2 ** retries
-                self.logger.warning(f"Request failed, retrying in {sleep_time}s: {str(e)}")
-                time.sleep(sleep_time)
+            # Log response status
+            self.logger.debug(f"Response status: {response.status_code} for {url}")
+            
+            # Check for successful response
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self.logger.error(f"Failed to get {url}: {str(e)}")
+            self.stats['errors'] += 1
+            raise
+        
+        if response.from_cache:
+            self.logger.debug(f"Using cached data for {url}")
+            self.stats['cache_hits'] += 1
+        else:
+            self.stats['requests'] += 1
+        
+        content_type = response.headers.get('Content-Type', '')
+        
+        # Save raw data if enabled
+        if save_raw and not response.from_cache:
+            data_type = 'json' if 'application/json' in content_type else 'html'
+            self._save_raw_data(url, response.text, data_type)
+        
+        # Parse as JSON if content type is application/json
+        if 'application/json' in content_type:
+            return response.json()
+        
+        # Otherwise return the response object
+        return response
     
     def post(self, url, data=None, json=None, headers=None, max_retries=3):
         """
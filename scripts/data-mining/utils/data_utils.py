@@ -17,6 +17,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import DB_PATH, CACHE_DIR, CACHE_EXPIRY
 from utils.logger import get_logger
 
+# Project root, for the shared name matching engine
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(PROJECT_ROOT)
+from scripts.utils.name_matching import levenshtein
+
 # Initialize logger
 logger = get_logger("data_utils")
 
@@ -298,23 +303,7 @@ def levenshtein_distance(s1, s2):
     Returns:
         int: Edit distance
     """
-    if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
-    
-    if len(s2) == 0:
-        return len(s1)
-    
-    previous_row = range(len(s2) + 1)
-    for i, c1 in enumerate(s1):
-        current_row = [i + 1]
-        for j, c2 in enumerate(s2):
-            insertions = previous_row[j + 1] + 1
-            deletions = current_row[j] + 1
-            substitutions = previous_row[j] + (c1 != c2)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
-    
-    return previous_row[-1]
+    return levenshtein(s1, s2)
 
 def calculate_name_similarity(name1, name2):
     """
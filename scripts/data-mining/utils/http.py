@@ -6,7 +6,6 @@ Provides functions to make HTTP requests and cache responses.
 import os
 import sys
 import json
-import time
 import requests
 from requests.exceptions import RequestException
 from urllib.parse import urljoin
@@ -17,7 +16,12 @@ from data_mining.utils.logger import get_logger
 from data_mining.utils.cache import (
     generate_cache_key, load_from_cache, save_to_cache, is_cache_valid
 )
-from data_mining.utils.config import CACHE_ENABLED
+from data_mining.utils.config import CACHE_ENABLED, get_cache_expiry
+
+# Requests go through the shared fetch layer
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(PROJECT_ROOT)
+from scripts.utils.http_fetch import get_fetcher
 
 # Initialize logger
 logger = get_logger('http')
@@ -65,11 +69,11 @@ def make_request(url, method='GET', params=None, data=None, headers=None,
         timeout (int, optional): Request timeout in seconds.
         retries (int, optional): Number of retries on failure.
         retry_delay (int, optional): Initial delay between retries in seconds.
-        retry_backoff (int, optional): Backoff factor.
+        retry_backoff (int, optional): Unused; retries back off by a factor of 2.
         cache (bool, optional): Whether to use cache. Defaults to True.
         cache_expiry (datetime.timedelta, optional): Cache expiry time.
         data_type (str, optional): Type of data (for determining cache expiry).
-        cache_dir (str, optional): Directory to store cache files.
+        cache_dir (str, optional): Unused; responses go to the shared response cache.
         stream (bool, optional): Whether to stream the response.
         verify (bool, optional): Whether to verify SSL certificates.
         allow_redirects (bool, optional): Whether to follow redirects.
@@ -100,135 +104,57 @@ def make_request(url, method='GET', params=None, data=None, headers=None,
         'url': url
     }
     
-    # Check cache if enabled and method is GET
-    if CACHE_ENABLED and cache and method.upper() == 'GET':
-        cache_key = generate_cache_key(url, params, _headers, method)
-        cached_data, cached_metadata = load_from_cache(cache_key, cache_dir, cache_expiry, data_type)
-        
-        if cached_data is not None:
-            logger.debug(f"Cache hit for {url}")
-            
-            # Extract data and metadata from cache
-            if isinstance(cached_data, dict) and 'status_code' in cached_data and 'data' in cached_data:
-                # This is a cached response object
-                response_obj.update(cached_data)
-            else:
-                # This is just the data
-                response_obj['data'] = cached_data
-                response_obj['success'] = True
-                
-                # Try to get additional metadata
-                if cached_metadata:
-                    if 'status_code' in cached_metadata:
-                        response_obj['status_code'] = cached_metadata['status_code']
-                    if 'headers' in cached_metadata:
-                        response_obj['headers'] = cached_metadata['headers']
-            
-            response_obj['cached'] = True
-            return response_obj
+    # GET responses are cached in the shared response cache; an entry older
+    # than the expiry is revalidated rather than refetched when it can be
+    if cache_expiry is None and data_type:
+        cache_expiry = get_cache_expiry(data_type)
+    use_cache = CACHE_ENABLED and cache and method.upper() == 'GET'
+    has_body = method.upper() in ['POST', 'PUT', 'PATCH'] and data
+    
+    try:
+        http_response = get_fetcher().fetch(
+            url,
+            method=method,
+            params=params,
+            json=data if has_body and not isinstance(data, str) else None,
+            data=data if has_body and isinstance(data, str) else None,
+            headers=_headers,
+            auth=auth,
+            timeout=timeout,
+            stream=stream,
+            verify=verify,
+            allow_redirects=allow_redirects,
+            cache=use_cache,
+            max_age=cache_expiry.total_seconds() if cache_expiry is not None else None,
+            retries=retries,
+            retry_delay=retry_delay
+        )
+    except RequestException as e:
+        response_obj['error'] = str(e)
+        return response_obj
     
-    # Make the request with retries
-    session = get_session()
-    retry_count = 0
-    delay = retry_delay
+    # Update response object
+    response_obj['status_code'] = http_response.status_code
+    response_obj['headers'] = dict(http_response.headers)
+    response_obj['url'] = http_response.url
+    response_obj['cached'] = http_response.from_cache
     
-    while retry_count <= retries:
+    # Parse response data, including error bodies
+    content_type = http_response.headers.get('Content-Type', '')
+    if 'application/json' in content_type:
         try:
-            logger.debug(f"Making {method} request to {url}" + 
-                        (f" (retry {retry_count}/{retries})" if retry_count > 0 else ""))
-            
-            # Make the request
-            http_response = session.request(
-                method=method,
-                url=url,
-                params=params,
-                json=data if method.upper() in ['POST', 'PUT', 'PATCH'] and data else None,
-                data=data if method.upper() in ['POST', 'PUT', 'PATCH'] and isinstance(data, str) else None,
-                headers=_headers,
-                auth=auth,
-                timeout=timeout,
-                stream=stream,
-                verify=verify,
-                allow_redirects=allow_redirects
-            )
-            
-            # Update response object
-            response_obj['status_code'] = http_response.status_code
-            response_obj['headers'] = dict(http_response.headers)
-            response_obj['url'] = http_response.url
-            
-            # Check if successful
-            http_response.raise_for_status()
-            
-            # Parse response data
-            content_type = http_response.headers.get('Content-Type', '')
-            if 'application/json' in content_type:
-                try:
-                    response_obj['data'] = http_response.json()
-                except json.JSONDecodeError:
-                    response_obj['data'] = http_response.text
-            else:
-                response_obj['data'] = http_response.text
-            
-            response_obj['success'] = True
-            
-            # Cache successful GET responses
-            if CACHE_ENABLED and cache and method.upper() == 'GET':
-                cache_key = generate_cache_key(url, params, _headers, method)
-                
-                metadata = {
-                    'status_code': http_response.status_code,
-                    'headers': dict(http_response.headers),
-                    'url': http_response.url,
-                    'timestamp': time.time()
-                }
-                
-                save_to_cache(response_obj['data'], cache_key, cache_dir, metadata)
-            
-            # Return successful response
-            return response_obj
-            
-        except RequestException as e:
-            # Update response object with error
-            response_obj['error'] = str(e)
-            
-            # Handle the error based on type
-            if hasattr(e, 'response') and e.response is not None:
-                response_obj['status_code'] = e.response.status_code
-                response_obj['headers'] = dict(e.response.headers)
-                
-                # Try to parse error response
-                try:
-                    response_obj['data'] = e.response.json()
-                except:
-                    try:
-                        response_obj['data'] = e.response.text
-                    except:
-                        pass
-            
-            # Check if should retry
-            retry_count += 1
-            if retry_count <= retries:
-                # Log retry
-                logger.warning(f"Request failed: {e}. Retrying in {delay} seconds...")
-                
-                # Wait before retrying
-                time.sleep(delay)
-                
-                # Increase delay with backoff
-                delay *= retry_backoff
-            else:
-                # Log final failure
-                logger.error(f"Request failed after {retries} retries: {e}")
-                return response_obj
-        
-        except Exception as e:
-            # Handle unexpected errors
-            response_obj['error'] = f"Unexpected error: {str(e)}"
-            logger.error(f"Unexpected error during request: {e}")
-            return response_obj
+            response_obj['data'] = http_response.json()
+        except json.JSONDecodeError:
+            response_obj['data'] = http_response.text
+    else:
+        response_obj['data'] = http_response.text
+    
+    if http_response.ok:
+        response_obj['success'] = True
+    else:
+        response_obj['error'] = f"HTTP {http_response.status_code} {http_response.reason} for {url}"
+        logger.error(f"Request failed: {response_obj['error']}")
     
-    # Should never reach here, but just in case
     return response_obj
 
 def get(url, **kwargs):
@@ -5,30 +5,58 @@ HTTP client utility for data mining scripts with caching, rate limiting, and err
 import os
 import sys
 import time
-import json
 import random
-import hashlib
-import sqlite3
 import requests
 from urllib.parse import urlparse
-from datetime import datetime, timedelta
 
 # Add parent directory to path for relative imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from scripts.data_mining.utils.config import (
-    HTTP_TIMEOUT, HTTP_HEADERS, RATE_LIMITS, CACHE_DIR, CACHE_EXPIRY, 
+    HTTP_TIMEOUT, HTTP_HEADERS, RATE_LIMITS, CACHE_EXPIRY, 
     PROXY_ENABLED, PROXY_URL, USER_AGENTS
 )
 from scripts.data_mining.utils.logger import get_logger
 
+# Requests, rate limits and the response cache are shared with every other
+# HTTP caller through the fetch layer
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(PROJECT_ROOT)
+from scripts.utils.http_fetch import DEFAULT_CACHE_MAX_BYTES, HostLimit, ResponseCache, get_fetcher, request_key
+
 logger = get_logger('http_client')
 
+# Response cache namespace of this client's entries, so clearing them
+# leaves other callers' entries in the shared cache alone
+CACHE_NAMESPACE = 'http_client'
+
+def _register_rate_limits(fetcher):
+    """Apply RATE_LIMITS to the shared fetcher: 'default' as its default limit, the rest per domain"""
+    for domain_pattern, rate in RATE_LIMITS.items():
+        if domain_pattern == 'default':
+            if fetcher.default_limit.rate != rate:
+                fetcher.set_default_limit(fetcher.default_limit._replace(rate=rate))
+        elif domain_pattern not in fetcher.host_limits:
+            fetcher.set_host_limit(domain_pattern, HostLimit(rate=rate))
+
+def _cache_expiry(url, source_type='default'):
+    """Seconds a response for a URL stays fresh, from CACHE_EXPIRY"""
+    domain = urlparse(url).netloc
+    
+    # Find most specific expiry time
+    for source, expiry in CACHE_EXPIRY.items():
+        if source in domain or source in source_type:
+            return expiry
+    
+    # Use default if no specific expiry found
+    return CACHE_EXPIRY.get('default', 86400)
+
 class RateLimiter:
     """Rate limiter to control request frequency"""
     
     def __init__(self):
-        self.last_request_time = {}
+        self.fetcher = get_fetcher()
+        _register_rate_limits(self.fetcher)
         
     def wait(self, domain, rate=None):
         """
@@ -38,95 +66,44 @@ class RateLimiter:
             domain (str): Domain to rate limit
             rate (float, optional): Requests per second. If None, uses domain-specific or default rate.
         """
-        now = time.time()
-        domain_key = domain.lower()
+        if rate is not None and self.fetcher.limit_for(domain).rate != rate:
+            self.fetcher.set_host_limit(domain, HostLimit(rate=rate))
         
-        # Determine rate to use
-        if rate is None:
-            # Check for domain-specific rate
-            for domain_pattern, domain_rate in RATE_LIMITS.items():
-                if domain_pattern in domain_key:
-                    rate = domain_rate
-                    break
-            else:
-                # Use default rate
-                rate = RATE_LIMITS.get('default', 1.0)
-        
-        # Calculate wait time
-        if domain_key in self.last_request_time:
-            elapsed = now - self.last_request_time[domain_key]
-            min_interval = 1.0 / rate
-            
-            if elapsed < min_interval:
-                wait_time = min_interval - elapsed
-                logger.debug(f"Rate limiting: waiting {wait_time:.2f}s for {domain}")
-                time.sleep(wait_time)
-        
-        # Update last request time
-        self.last_request_time[domain_key] = time.time()
+        waited = self.fetcher.limiter(domain).bucket.take()
+        if waited:
+            logger.debug(f"Rate limiting: waited {waited:.2f}s for {domain}")
 
 class CacheManager:
     """Manage HTTP response caching"""
     
-    def __init__(self, cache_dir=None):
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_CACHE_MAX_BYTES, policy='lru',
+                 namespace=CACHE_NAMESPACE):
         """
         Initialize cache manager
         
         Args:
-            cache_dir (str, optional): Directory to store cache. If None, uses default.
+            cache_dir (str, optional): Directory to store cache. If None, uses the
+                response cache shared with the fetch layer.
+            max_bytes (int, optional): Size bound of a cache in cache_dir
+            policy (str): Eviction order of a cache in cache_dir, 'lru' or 'lfu'
+            namespace (str): Namespace of the entries this manager reads, writes and clears
         """
-        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, 'http')
-        os.makedirs(self.cache_dir, exist_ok=True)
-        
-        # Initialize SQLite cache database
-        self.db_path = os.path.join(self.cache_dir, 'cache.db')
-        self._init_db()
-    
-    def _init_db(self):
-        """Initialize cache database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create cache table if it doesn't exist
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cache (
-                url_hash TEXT PRIMARY KEY,
-                url TEXT,
-                method TEXT,
-                status_code INTEGER,
-                headers TEXT,
-                content BLOB,
-                timestamp REAL,
-                expiry REAL
-            )
-        ''')
-        
-        # Create index on timestamp for expiration cleanup
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_expiry ON cache (expiry)')
-        
-        conn.commit()
-        conn.close()
+        self.namespace = namespace
+        if cache_dir is None:
+            self.cache = get_fetcher().cache or ResponseCache()
+            self.cache_dir = os.path.dirname(self.cache.path)
+        else:
+            self.cache_dir = cache_dir
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.cache = ResponseCache(os.path.join(self.cache_dir, 'cache.db'), max_bytes, policy)
+        self.db_path = self.cache.path
     
     def _get_cache_key(self, url, method, params=None, data=None):
         """Generate a unique cache key for a request"""
-        # Create a string with all request data
-        key_parts = [url.lower(), method.upper()]
-        
-        if params:
-            # Sort params to ensure consistent keys regardless of order
-            key_parts.append(json.dumps(params, sort_keys=True))
-        
-        if data:
-            if isinstance(data, dict):
-                key_parts.append(json.dumps(data, sort_keys=True))
-            else:
-                key_parts.append(str(data))
-        
-        # Join parts and create hash
-        key_string = '|'.join(key_parts)
-        return hashlib.sha256(key_string.encode('utf-8')).hexdigest()
+        request = requests.Request(method=method.upper(), url=url, params=params, data=data).prepare()
+        return request_key(request, self.namespace)
     
-    def get(self, url, method='GET', params=None, data=None):
+    def get(self, url, method='GET', params=None, data=None, source_type='default'):
         """
         Get cached response if available and not expired
         
@@ -135,46 +112,32 @@ class CacheManager:
             method (str): HTTP method
             params (dict, optional): URL parameters
             data (dict or str, optional): Request body
+            source_type (str): Source type for determining cache expiry
             
         Returns:
             tuple: (is_cached, response_dict) or (False, None) if not cached
         """
-        cache_key = self._get_cache_key(url, method, params, data)
-        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                'SELECT status_code, headers, content, expiry FROM cache WHERE url_hash = ? AND expiry > ?',
-                (cache_key, time.time())
-            )
-            result = cursor.fetchone()
+            entry = self.cache.get(self._get_cache_key(url, method, params, data))
+            if entry is None:
+                return False, None
             
-            if result:
-                status_code, headers_json, content, expiry = result
-                headers = json.loads(headers_json)
-                
-                # Create a response-like dict
-                cached_response = {
-                    'status_code': status_code,
-                    'headers': headers,
-                    'content': content,
-                    'from_cache': True,
-                    'expiry': expiry
-                }
-                
-                logger.debug(f"Cache hit for {url} (expires in {(expiry - time.time()) / 60:.1f} min)")
-                return True, cached_response
+            expiry = entry['fetched'] + _cache_expiry(url, source_type)
+            if expiry <= time.time():
+                return False, None
             
-            return False, None
+            logger.debug(f"Cache hit for {url} (expires in {(expiry - time.time()) / 60:.1f} min)")
+            return True, {
+                'status_code': entry['status_code'],
+                'headers': entry['headers'],
+                'content': entry['content'],
+                'from_cache': True,
+                'expiry': expiry
+            }
             
         except Exception as e:
             logger.warning(f"Cache get error for {url}: {e}")
             return False, None
-        finally:
-            if 'conn' in locals():
-                conn.close()
     
     def set(self, url, method, params, data, response, source_type='default'):
         """
@@ -188,95 +151,41 @@ class CacheManager:
             response (requests.Response): Response to cache
             source_type (str): Source type for determining cache expiry
         """
-        cache_key = self._get_cache_key(url, method, params, data)
-        
         try:
-            # Determine cache expiry
-            domain = urlparse(url).netloc
-            
-            # Find most specific expiry time
-            expiry_time = None
-            for source, expiry in CACHE_EXPIRY.items():
-                if source in domain or source in source_type:
-                    expiry_time = expiry
-                    break
-            
-            # Use default if no specific expiry found
-            if expiry_time is None:
-                expiry_time = CACHE_EXPIRY.get('default', 86400)
-            
-            # Calculate expiry timestamp
-            expiry = time.time() + expiry_time
-            
-            # Save to cache
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                '''
-                INSERT OR REPLACE INTO cache 
-                (url_hash, url, method, status_code, headers, content, timestamp, expiry)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''',
-                (
-                    cache_key,
-                    url,
-                    method,
-                    response.status_code,
-                    json.dumps(dict(response.headers)),
-                    response.content,
-                    time.time(),
-                    expiry
-                )
-            )
-            
-            conn.commit()
-            logger.debug(f"Cached response for {url} (expires in {expiry_time / 3600:.1f} hours)")
-            
+            self.cache.put(self._get_cache_key(url, method, params, data), method, response, self.namespace)
+            logger.debug(f"Cached response for {url} (expires in {_cache_expiry(url, source_type) / 3600:.1f} hours)")
         except Exception as e:
             logger.warning(f"Cache set error for {url}: {e}")
-        finally:
-            if 'conn' in locals():
-                conn.close()
     
     def clear_expired(self):
-        """Remove expired cache entries"""
+        """Evict entries in the cache's eviction order until it is within its size bound
+        
+        Stale entries are otherwise kept: their validators let the next
+        request revalidate them instead of downloading the body again.
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Delete expired entries
-            now = time.time()
-            cursor.execute('DELETE FROM cache WHERE expiry < ?', (now,))
-            deleted_count = cursor.rowcount
-            
-            conn.commit()
-            if deleted_count > 0:
-                logger.info(f"Cleared {deleted_count} expired cache entries")
-            
+            evicted = self.cache.evict()
+            if evicted > 0:
+                logger.info(f"Evicted {evicted} cache entries")
         except Exception as e:
-            logger.warning(f"Error clearing expired cache: {e}")
-        finally:
-            if 'conn' in locals():
-                conn.close()
+            logger.warning(f"Error evicting cache entries: {e}")
+    
+    def stats(self):
+        """
+        Get cache size and hit/miss/byte counters
+        
+        Returns:
+            dict: Counters from ResponseCache.stats()
+        """
+        return self.cache.stats()
     
     def clear_all(self):
-        """Clear all cache entries"""
+        """Clear all of this manager's cache entries"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('DELETE FROM cache')
-            deleted_count = cursor.rowcount
-            
-            conn.commit()
-            logger.info(f"Cleared all {deleted_count} cache entries")
-            
+            deleted_count = self.cache.clear(self.namespace)
+            logger.info(f"Cleared all {deleted_count} {self.namespace} cache entries")
         except Exception as e:
             logger.warning(f"Error clearing cache: {e}")
-        finally:
-            if 'conn' in locals():
-                conn.close()
 
 class HttpClient:
     """HTTP client with caching, rate limiting, and error handling"""
@@ -291,12 +200,13 @@ class HttpClient:
         """
         self.cache = CacheManager() if cache_enabled else None
         self.rate_limiter = RateLimiter() if rate_limit_enabled else None
-        self.session = requests.Session()
+        self.fetcher = get_fetcher()
         self.default_headers = HTTP_HEADERS.copy()
         
         # Configure proxies if enabled
+        self.proxies = None
         if PROXY_ENABLED and PROXY_URL:
-            self.session.proxies = {
+            self.proxies = {
                 'http': PROXY_URL,
                 'https': PROXY_URL
             }
@@ -343,73 +253,26 @@ class HttpClient:
         if timeout is None:
             timeout = HTTP_TIMEOUT
         
-        # Parse domain for rate limiting
-        domain = urlparse(url).netloc
-        
-        # Check cache if enabled
-        if cache and self.cache:
-            is_cached, cached_response = self.cache.get(url, method, params, data)
-            if is_cached:
-                # Create a Response-like object from cached data
-                response = requests.Response()
-                response.status_code = cached_response['status_code']
-                response.headers = cached_response['headers']
-                response._content = cached_response['content']
-                response.url = url
-                response.request = requests.Request(
-                    method=method, url=url, headers=request_headers, 
-                    params=params, data=data
-                ).prepare()
-                
-                # Add cache metadata
-                response.from_cache = True
-                response.cache_expiry = cached_response['expiry']
-                
-                return response
-        
-        # Apply rate limiting if enabled
-        if rate_limit and self.rate_limiter:
-            self.rate_limiter.wait(domain)
-        
-        # Make the request with retries
-        for attempt in range(retries):
-            try:
-                response = self.session.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    data=data,
-                    json=json_data,
-                    headers=request_headers,
-                    timeout=timeout,
-                    verify=verify,
-                    allow_redirects=allow_redirects,
-                    stream=stream
-                )
-                
-                # Add metadata
-                response.from_cache = False
-                
-                # Cache successful responses
-                if cache and self.cache and response.status_code < 400:
-                    self.cache.set(url, method, params, data, response, source_type)
-                
-                return response
-                
-            except (requests.RequestException, requests.ConnectionError, 
-                    requests.Timeout, requests.TooManyRedirects) as e:
-                
-                wait_time = 2 ** attempt  # Exponential backoff
-                
-                if attempt < retries - 1:
-                    logger.warning(
-                        f"Request failed ({e.__class__.__name__}): {url}, "
-                        f"retrying in {wait_time} seconds (attempt {attempt+1}/{retries})"
-                    )
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"Request failed after {retries} attempts: {url} - {str(e)}")
-                    raise
+        # Cached responses younger than the source's expiry are served as-is;
+        # older ones are revalidated
+        return self.fetcher.fetch(
+            url,
+            method=method,
+            params=params,
+            data=data,
+            json=json_data,
+            headers=request_headers,
+            timeout=timeout,
+            verify=verify,
+            allow_redirects=allow_redirects,
+            stream=stream,
+            proxies=self.proxies,
+            cache=cache and self.cache is not None,
+            max_age=_cache_expiry(url, source_type or 'default'),
+            rate_limit=rate_limit and self.rate_limiter is not None,
+            retries=max(0, retries - 1),
+            namespace=CACHE_NAMESPACE
+        )
     
     def get(self, url, **kwargs):
         """
@@ -490,14 +353,18 @@ class HttpClient:
         return self.request('OPTIONS', url, **kwargs)
     
     def clear_cache(self):
-        """Clear all cache entries"""
+        """Clear this client's cache entries"""
         if self.cache:
             self.cache.clear_all()
     
     def clear_expired_cache(self):
-        """Clear expired cache entries"""
+        """Evict cache entries beyond the cache's size bound"""
         if self.cache:
             self.cache.clear_expired()
+    
+    def cache_stats(self):
+        """Get cache size and hit/miss/byte counters, or None without a cache"""
+        return self.cache.stats() if self.cache else None
 
 # Create a singleton instance
 http_client = HttpClient()
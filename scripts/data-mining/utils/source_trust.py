@@ -8,11 +8,17 @@ Evaluates and scores the trustworthiness of data sources based on multiple facto
 - Citation history
 - Expert consensus
 - Transparency
+
+Domain lists are compiled into reversed-label suffix tries (reloaded only when
+their JSON files change), and per-domain history is kept as a running rollup
+in `source_domain_stats`, so scoring a URL costs O(domain labels).
 """
 import os
 import sys
 import json
 import re
+import threading
+from functools import lru_cache
 from urllib.parse import urlparse
 import tldextract
 import sqlite3
@@ -29,6 +35,27 @@ logger = get_logger("source_trust")
 # Path to trusted sources list
 TRUSTED_SOURCES_PATH = os.path.join(PROJECT_ROOT, "data", "trusted_sources.json")
 BLOCKLIST_PATH = os.path.join(PROJECT_ROOT, "data", "blocked_sources.json")
+DB_PATH = os.path.join(PROJECT_ROOT, "maga_ops.db")
+
+# Default scores based on TLD, for domains in no trusted category
+TLD_SCORES = {
+    "gov": 85,
+    "mil": 85,
+    "edu": 75,
+    "org": 60,
+    "com": 50,
+    "net": 50,
+    "io": 45,
+    "co": 45,
+    "info": 30,
+    "biz": 25,
+    "xyz": 20,
+}
+
+SUSPICIOUS_KEYWORDS = ['hack', 'crack', 'free', 'download', 'warez', 'keygen', 'torrent']
+
+# SQLite's default limit on bound parameters is 999
+SQL_PARAM_CHUNK = 900
 
 # Default trusted sources if file doesn't exist
 DEFAULT_TRUSTED_SOURCES = {
@@ -151,108 +178,253 @@ def load_blocklist():
     return DEFAULT_BLOCKED_SOURCES
 
 def is_domain_match(domain, pattern):
-    """Check if a domain matches a pattern, supporting wildcards."""
+    """Check if a domain matches a pattern, supporting wildcards.
+
+    "*.gov" matches any subdomain of gov ("house.gov", "www.house.gov").
+    """
     if pattern.startswith('*.'):
-        return domain.endswith(pattern[2:])
+        return domain.endswith('.' + pattern[2:])
     return domain == pattern
 
+class DomainMatcher:
+    """Suffix trie over reversed domain labels ("www.house.gov" -> gov, house, www).
+
+    Each node may hold an exact-match entry and a wildcard entry that matches
+    any deeper domain. Every entry keeps the position of its pattern in the
+    source lists, and lookups return the earliest matching pattern, so results
+    are the same as scanning the lists in order.
+    """
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: Iterable of (pattern, value) in priority order
+        """
+        self.root = {}
+        for priority, (pattern, value) in enumerate(entries):
+            wildcard = pattern.startswith('*.')
+            labels = (pattern[2:] if wildcard else pattern).lower().split('.')
+            node = self.root
+            for label in reversed(labels):
+                node = node.setdefault(label, {})
+            key = '*' if wildcard else ''
+            if key not in node:
+                node[key] = (priority, value)
+
+    def match(self, domain):
+        """Return the value of the earliest matching pattern, or None."""
+        labels = domain.lower().split('.')
+        node = self.root
+        best = None
+        for depth, label in enumerate(reversed(labels)):
+            node = node.get(label)
+            if node is None:
+                break
+            candidates = [node.get('*')] if depth < len(labels) - 1 else [node.get('')]
+            for candidate in candidates:
+                if candidate and (best is None or candidate[0] < best[0]):
+                    best = candidate
+        return best[1] if best else None
+
+# Compiled matchers keyed by file path: (mtime_ns, size, data, matcher)
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+def _file_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _compiled(path, load, entries):
+    """Return (data, DomainMatcher) for a sources file, rebuilding only when it changes."""
+    key = _file_key(path)
+    with _matchers_lock:
+        cached = _matchers.get(path)
+    if cached and key is not None and cached[0] == key:
+        return cached[1], cached[2]
+    
+    # load() writes the defaults if the file is missing, so stat again afterwards
+    data = load()
+    matcher = DomainMatcher(entries(data))
+    with _matchers_lock:
+        _matchers[path] = (_file_key(path), data, matcher)
+    return data, matcher
+
+def _trusted_matcher():
+    return _compiled(TRUSTED_SOURCES_PATH, load_trusted_sources, lambda data: (
+        (pattern, (category, info["base_score"]))
+        for category, info in data.items() for pattern in info["domains"]
+    ))[1]
+
+def _blocklist_matcher():
+    return _compiled(BLOCKLIST_PATH, load_blocklist, lambda data: (
+        (pattern, category) for category, domains in data.items() for pattern in domains
+    ))[1]
+
 def get_domain_category(domain):
     """Get the category of a domain from trusted sources."""
-    trusted_sources = load_trusted_sources()
-    
-    for category, data in trusted_sources.items():
-        for domain_pattern in data["domains"]:
-            if is_domain_match(domain, domain_pattern):
-                return category, data["base_score"]
-    
-    return None, 0
+    match = _trusted_matcher().match(domain)
+    return match if match else (None, 0)
 
 def is_blocklisted(domain):
     """Check if a domain is on the blocklist."""
-    blocklist = load_blocklist()
-    
-    for category, domains in blocklist.items():
-        for domain_pattern in domains:
-            if is_domain_match(domain, domain_pattern):
-                return True, category
-    
+    category = _blocklist_matcher().match(domain)
+    if category:
+        return True, category
     return False, None
 
+# One connection per thread, reused across calls
+_local = threading.local()
+
+SOURCE_HISTORY_DDL = """
+CREATE TABLE IF NOT EXISTS source_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain TEXT NOT NULL,
+    url TEXT NOT NULL,
+    trust_score INTEGER NOT NULL,
+    success BOOLEAN NOT NULL,
+    accessed_at TIMESTAMP NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_source_history_domain ON source_history(domain);
+"""
+
+SOURCE_STATS_DDL = """
+CREATE TABLE IF NOT EXISTS source_domain_stats (
+    domain TEXT PRIMARY KEY,
+    total_requests INTEGER NOT NULL,
+    success_count INTEGER NOT NULL,
+    trust_score_sum REAL NOT NULL,
+    last_accessed TIMESTAMP
+) WITHOUT ROWID
+"""
+
+SOURCE_STATS_BACKFILL = """
+INSERT INTO source_domain_stats (domain, total_requests, success_count, trust_score_sum, last_accessed)
+SELECT domain, COUNT(*), SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END), SUM(trust_score), MAX(accessed_at)
+FROM source_history
+GROUP BY domain
+"""
+
+def _domain_stats_exist(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'source_domain_stats'"
+    ).fetchone() is not None
+
+def _create_domain_stats(conn):
+    """Create the per-domain rollup and backfill it from existing history, once."""
+    # The write lock makes threads and processes racing on first use take turns;
+    # whoever gets it second finds the table already there
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not _domain_stats_exist(conn):
+            conn.execute(SOURCE_STATS_DDL)
+            conn.execute(SOURCE_STATS_BACKFILL)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+def _get_connection():
+    """Get this thread's connection, creating the history tables on first use."""
+    conn = getattr(_local, "connection", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        try:
+            conn.executescript(SOURCE_HISTORY_DDL)
+            if not _domain_stats_exist(conn):
+                _create_domain_stats(conn)
+        except BaseException:
+            conn.close()
+            raise
+        _local.connection = conn
+    return conn
+
 def update_source_history(url, trust_score, success=True):
     """Update source history in database for future trust calculations."""
     domain = urlparse(url).netloc
+    now = datetime.now().isoformat()
     
     try:
-        # Connect to database
-        db_path = os.path.join(PROJECT_ROOT, "maga_ops.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Create table if not exists
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS source_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            domain TEXT NOT NULL,
-            url TEXT NOT NULL,
-            trust_score INTEGER NOT NULL,
-            success BOOLEAN NOT NULL,
-            accessed_at TIMESTAMP NOT NULL
-        )
-        ''')
-        
-        # Insert record
-        cursor.execute('''
-        INSERT INTO source_history (domain, url, trust_score, success, accessed_at)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (domain, url, trust_score, success, datetime.now().isoformat()))
-        
-        conn.commit()
-        conn.close()
+        conn = _get_connection()
+        with conn:
+            # Insert record
+            conn.execute('''
+            INSERT INTO source_history (domain, url, trust_score, success, accessed_at)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (domain, url, trust_score, success, now))
+            
+            # Keep the per-domain rollup current
+            conn.execute('''
+            INSERT INTO source_domain_stats (domain, total_requests, success_count, trust_score_sum, last_accessed)
+            VALUES (?, 1, ?, ?, ?)
+            ON CONFLICT(domain) DO UPDATE SET
+                total_requests = total_requests + 1,
+                success_count = success_count + excluded.success_count,
+                trust_score_sum = trust_score_sum + excluded.trust_score_sum,
+                last_accessed = excluded.last_accessed
+            ''', (domain, 1 if success else 0, trust_score, now))
         
     except Exception as e:
         logger.error(f"Error updating source history: {str(e)}")
 
+def _history_from_stats(row):
+    if not row or not row[0]:
+        return {"avg_score": 0, "success_rate": 0, "total_requests": 0, "historical_score": 0, "confidence": 0}
+    total_requests, success_count, score_sum = row
+    avg_score = score_sum / total_requests
+    success_rate = success_count * 100.0 / total_requests
+    
+    # Weight by number of requests, up to 10 (more requests = more confidence)
+    request_weight = min(total_requests / 10.0, 1.0)
+    
+    # Return combined historical score
+    return {
+        "avg_score": avg_score,
+        "success_rate": success_rate,
+        "total_requests": total_requests,
+        "historical_score": avg_score * 0.7 + success_rate * 0.3,
+        "confidence": request_weight
+    }
+
 def get_historical_trust(domain):
     """Get historical trust score for a domain from database."""
+    return get_historical_trust_batch([domain])[domain]
+
+def get_historical_trust_batch(domains):
+    """Get historical trust scores for many domains with one query per chunk."""
+    domains = list(set(domains))
+    rows = {}
     try:
-        # Connect to database
-        db_path = os.path.join(PROJECT_ROOT, "maga_ops.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Get average trust score and success rate
-        cursor.execute('''
-        SELECT 
-            AVG(trust_score) as avg_score,
-            SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as success_rate,
-            COUNT(*) as total_requests
-        FROM source_history
-        WHERE domain = ?
-        ''', (domain,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result and result[0] is not None:
-            avg_score, success_rate, total_requests = result
-            
-            # Weight by number of requests, up to 10 (more requests = more confidence)
-            request_weight = min(total_requests / 10.0, 1.0)
-            
-            # Return combined historical score
-            return {
-                "avg_score": avg_score,
-                "success_rate": success_rate,
-                "total_requests": total_requests,
-                "historical_score": avg_score * 0.7 + success_rate * 0.3,
-                "confidence": request_weight
-            }
-        
-        return {"avg_score": 0, "success_rate": 0, "total_requests": 0, "historical_score": 0, "confidence": 0}
-        
+        conn = _get_connection()
+        for start in range(0, len(domains), SQL_PARAM_CHUNK):
+            chunk = domains[start:start + SQL_PARAM_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for domain, total, successes, score_sum in conn.execute(
+                f"SELECT domain, total_requests, success_count, trust_score_sum "
+                f"FROM source_domain_stats WHERE domain IN ({placeholders})", chunk
+            ):
+                rows[domain] = (total, successes, score_sum)
     except Exception as e:
         logger.error(f"Error getting historical trust: {str(e)}")
-        return {"avg_score": 0, "success_rate": 0, "total_requests": 0, "historical_score": 0, "confidence": 0}
+    return {domain: _history_from_stats(rows.get(domain)) for domain in domains}
+
+@lru_cache(maxsize=65536)
+def _split_host(host):
+    """(full_domain, registered_domain, suffix) for a hostname, cached per host."""
+    extracted = tldextract.extract(host)
+    domain = f"{extracted.domain}.{extracted.suffix}"
+    if extracted.subdomain:
+        full_domain = f"{extracted.subdomain}.{domain}"
+    else:
+        full_domain = domain
+    return full_domain, domain, extracted.suffix
+
+def _url_host(url):
+    # tldextract accepts URLs without a scheme; urlparse needs one to find the host
+    host = urlparse(url if '//' in url else '//' + url).hostname
+    return host or url
 
 def calculate_trust_score(url):
     """
@@ -267,22 +439,44 @@ def calculate_trust_score(url):
     Returns:
         Trust score between 0 and 100
     """
-    if not url:
-        return 0
+    return calculate_trust_scores([url])[0]
+
+def calculate_trust_scores(urls):
+    """
+    Calculate trust scores for many URLs at once.
     
-    # Parse domain
-    extracted = tldextract.extract(url)
-    domain = f"{extracted.domain}.{extracted.suffix}"
-    if extracted.subdomain:
-        full_domain = f"{extracted.subdomain}.{domain}"
-    else:
-        full_domain = domain
+    Domains are parsed and matched once each and their history is fetched in
+    bulk, so scraper pipelines can score thousands of URLs per call.
     
+    Returns:
+        List of trust scores (0-100), in the same order as urls
+    """
+    hosts = {url: _split_host(_url_host(url)) for url in urls if url}
+    history = get_historical_trust_batch(full_domain for full_domain, _, _ in hosts.values())
+    
+    domain_scores = {}
+    scores = []
+    for url in urls:
+        if not url:
+            scores.append(0)
+            continue
+        full_domain, domain, suffix = hosts[url]
+        if full_domain not in domain_scores:
+            domain_scores[full_domain] = _domain_score(full_domain, domain, suffix)
+        category, base_score = domain_scores[full_domain]
+        if category is None:
+            scores.append(0)
+            continue
+        scores.append(_url_score(url, category, base_score, history[full_domain]))
+    return scores
+
+def _domain_score(full_domain, domain, suffix):
+    """(category, base score) for a domain; category is None if it is blocklisted."""
     # Check if domain is blocklisted
     is_blocked, block_category = is_blocklisted(full_domain)
     if is_blocked:
         logger.warning(f"Domain {full_domain} is blocklisted in category: {block_category}")
-        return 0
+        return None, 0
     
     # Base score - domain category
     category, base_score = get_domain_category(full_domain)
@@ -291,30 +485,15 @@ def calculate_trust_score(url):
     if not category:
         category, base_score = get_domain_category(domain)
     
-    # If still not found, use default score
+    # If still not found, use default score based on TLD
     if not category:
-        # Default scores based on TLD
-        tld_scores = {
-            "gov": 85,
-            "mil": 85,
-            "edu": 75,
-            "org": 60,
-            "com": 50,
-            "net": 50,
-            "io": 45,
-            "co": 45,
-            "info": 30,
-            "biz": 25,
-            "xyz": 20,
-        }
-        
-        tld = extracted.suffix.split('.')[-1]
-        base_score = tld_scores.get(tld, 40)
+        tld = suffix.split('.')[-1]
+        base_score = TLD_SCORES.get(tld, 40)
         category = "unknown"
     
-    # Historical factors
-    history = get_historical_trust(full_domain)
-    
+    return category, base_score
+
+def _url_score(url, category, base_score, history):
     # Apply weights to different factors
     # - 60% base category score
     # - 30% historical performance (if available)
@@ -340,8 +519,7 @@ def calculate_trust_score(url):
         final_score -= 5
     
     # Adjust for suspicious keywords in URL
-    suspicious_keywords = ['hack', 'crack', 'free', 'download', 'warez', 'keygen', 'torrent']
-    for keyword in suspicious_keywords:
+    for keyword in SUSPICIOUS_KEYWORDS:
         if keyword in url_lower:
             final_score -= 10
             break
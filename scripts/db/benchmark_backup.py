@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Backup Benchmark
+
+Times database backup strategies against database size:
+1. File copy (shutil.copy2, the previous approach)
+2. Online backup API copy
+3. First incremental snapshot into an empty snapshot store
+4. Incremental snapshot after rewriting ~1% of the rows
+5. Restoring the latest snapshot
+
+Each size gets a synthetic database of 1 KB rows in a scratch directory.
+Payloads are random bytes, the worst case for page compression.
+
+Usage:
+    python scripts/db/benchmark_backup.py [--sizes 16,64,256] [--dir /tmp/backup_bench]
+"""
+import os
+import sys
+import time
+import shutil
+import random
+import sqlite3
+import argparse
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.utils.db_backup import SnapshotStore, online_backup
+
+ROW_BYTES = 1024
+
+def build_database(path, size_mb):
+    """Create a WAL-mode database of roughly size_mb megabytes."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE rows (id INTEGER PRIMARY KEY, payload BLOB)")
+    rows = size_mb * 1024 * 1024 // ROW_BYTES
+    conn.executemany("INSERT INTO rows (payload) VALUES (?)", ((os.urandom(ROW_BYTES),) for _ in range(rows)))
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return rows
+
+def touch_rows(path, rows, fraction=0.01):
+    """Rewrite a random fraction of the rows."""
+    conn = sqlite3.connect(path)
+    ids = random.sample(range(1, rows + 1), max(1, int(rows * fraction)))
+    conn.executemany("UPDATE rows SET payload = ? WHERE id = ?", ((os.urandom(ROW_BYTES), i) for i in ids))
+    conn.commit()
+    conn.close()
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+def benchmark(size_mb, work_dir):
+    """Run every strategy against one database size."""
+    db_path = os.path.join(work_dir, f"bench_{size_mb}.db")
+    rows = build_database(db_path, size_mb)
+    store = SnapshotStore(os.path.join(work_dir, f"snapshots_{size_mb}.db"))
+
+    copy_time, _ = timed(shutil.copy2, db_path, os.path.join(work_dir, "copy.db"))
+    online_time, _ = timed(online_backup, db_path, os.path.join(work_dir, "online.db"))
+    first_time, first = timed(store.create, db_path)
+    touch_rows(db_path, rows)
+    incremental_time, incremental = timed(store.create, db_path)
+    restore_path = os.path.join(work_dir, "restored.db")
+    restore_time, _ = timed(store.restore, incremental['id'], restore_path, overwrite=True)
+
+    return [
+        size_mb,
+        f"{copy_time:.3f}",
+        f"{online_time:.3f}",
+        f"{first_time:.3f}",
+        f"{incremental_time:.3f}",
+        f"{incremental['new_pages']}/{incremental['page_count']}",
+        f"{incremental['new_bytes'] / (1024 * 1024):.2f}",
+        f"{restore_time:.3f}",
+        f"{os.path.getsize(store.store_path) / (1024 * 1024):.1f}",
+    ]
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark database backup strategies")
+    parser.add_argument("--sizes", default="16,64,256", help="Comma-separated database sizes in MB")
+    parser.add_argument("--dir", help="Scratch directory (default: a temporary directory)")
+    return parser.parse_args()
+
+def main():
+    """Main function."""
+    args = parse_args()
+    work_dir = args.dir or tempfile.mkdtemp(prefix="backup_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        results = [benchmark(int(size), work_dir) for size in args.sizes.split(",")]
+    finally:
+        if not args.dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    headers = ["DB MB", "File copy s", "Online s", "First snapshot s", "1% snapshot s",
+               "New pages", "New MB", "Restore s", "Store MB"]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *results)]
+    for row in [headers] + results:
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 import sqlite3
 import os
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import json
 
+from .search_index import SEARCH_TABLE, BM25_WEIGHTS, ensure_search_index, build_match_query
+from .entity_profiles import ensure_entity_profiles
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -15,12 +20,135 @@ logger = logging.getLogger(__name__)
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 DB_PATH = os.path.join(PROJECT_ROOT, 'maga_ops.db')
 
+# Seconds a connection waits on a locked database before raising
+BUSY_TIMEOUT = 30
+
+# SQLite's default limit on bound parameters is 999
+SQL_PARAM_CHUNK = 900
+
+# Subtype tables joined onto entities of each type
+ENTITY_SUBTYPE_TABLES = {
+    'politician': 'politicians',
+    'influencer': 'influencers',
+}
+
+# Per-connection tuning applied to every connection we open
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",  # Safe with WAL, avoids an fsync per commit
+    "PRAGMA cache_size = -65536",   # 64 MB page cache
+    "PRAGMA mmap_size = 268435456", # Memory-map up to 256 MB of the file
+    "PRAGMA temp_store = MEMORY",
+)
+
+def configure_connection(conn):
+    """Apply WAL journaling and the standard pragmas to a connection."""
+    conn.row_factory = sqlite3.Row
+    try:
+        # journal_mode is persistent in the database file; setting it again is cheap
+        conn.execute("PRAGMA journal_mode = WAL")
+    except sqlite3.Error as e:
+        logger.debug(f"Could not enable WAL journal mode: {e}")
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections.
+
+    A thread checks a connection out for the duration of its outermost
+    `connection()` block; nested blocks on the same thread reuse it, so a
+    sequence of calls can share one connection (and, via `transaction()`,
+    one transaction). Idle connections are kept for reuse by any thread.
+    """
+
+    def __init__(self, db_path, max_idle=8):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        return configure_connection(conn)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._open()
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            # Mirror close() semantics: uncommitted work is discarded
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Yield this thread's connection, checking one out if needed."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.in_transaction = False
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed calls on one connection inside one transaction.
+
+        Commits on success and rolls back if the block raises. Nested
+        transactions join the outermost one.
+        """
+        with self.connection() as conn:
+            if self._local.in_transaction:
+                yield conn
+                return
+
+            self._local.in_transaction = True
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._local.in_transaction = False
+
+    def in_transaction(self):
+        """Whether the current thread is inside a `transaction()` block."""
+        return bool(getattr(self._local, 'in_transaction', False))
+
+    def close_all(self):
+        """Close all idle connections (checked-out ones close on release)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
 class DatabaseManager:
     """Handles SQLite database interactions for the new normalized schema."""
 
     def __init__(self, db_path=DB_PATH):
         """Initialize the database manager with the path to the SQLite DB."""
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path)
+        self._search_index_ready = None # Checked lazily on first search
+        self._entity_profiles_ready = None # Materialized on first profile query
+        self._vector_store = None # Opened on first similarity query
+        self._vector_store_lock = threading.Lock()
         logger.info(f"DatabaseManager initialized with path: {self.db_path}")
         
         # Basic check on startup
@@ -28,48 +156,158 @@ class DatabaseManager:
             logger.warning(f"Database file not found at {self.db_path}. Queries will fail until created.")
     
     def _get_connection(self):
-        """Create and return a database connection with Row factory."""
+        """Create and return a standalone database connection with Row factory.
+
+        The caller owns the connection and must close it. Prefer
+        `connection()` or `transaction()`, which reuse pooled connections.
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
+            return configure_connection(conn)
         except sqlite3.Error as e:
             logger.error(f"Error connecting to database: {e}")
             raise
     
+    def connection(self):
+        """Context manager yielding a pooled connection shared by nested calls on this thread."""
+        return self.pool.connection()
+    
+    def transaction(self):
+        """Context manager that runs every query inside it in a single transaction.
+
+        Example:
+            with db.transaction():
+                db.update_entity_field('politician', 1, 'bio', bio)
+                db.add_ai_metadata(1, 'bio', bio, 0.9)
+        """
+        return self.pool.transaction()
+    
+    def close(self):
+        """Close idle pooled connections."""
+        self.pool.close_all()
+    
+    def _commit(self, conn):
+        """Commit unless an enclosing transaction() will commit for us."""
+        if not self.pool.in_transaction():
+            conn.commit()
+    
     def execute_query(self, query, params=(), fetch_all=True, commit=False):
         """Execute a SQL query and return results."""
-        conn = None
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            
-            if commit:
-                conn.commit()
-                return cursor.lastrowid if cursor.lastrowid else True
-            
-            if fetch_all:
-                results = cursor.fetchall()
-                return [dict(row) for row in results]
-            else:
-                result = cursor.fetchone()
-                return dict(result) if result else None
+        with self.pool.connection() as conn:
+            # Inside transaction() the commit happens when the block exits
+            defer_commit = self.pool.in_transaction()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
                 
-        except sqlite3.Error as e:
-            logger.error(f"Database error executing query: {e}")
-            if commit and conn:
-                conn.rollback()
-            return None if fetch_all else None
-        finally:
-            if conn:
-                conn.close()
+                if commit:
+                    if not defer_commit:
+                        conn.commit()
+                    return cursor.lastrowid if cursor.lastrowid else True
+                
+                if fetch_all:
+                    results = cursor.fetchall()
+                    return [dict(row) for row in results]
+                else:
+                    result = cursor.fetchone()
+                    return dict(result) if result else None
+                    
+            except sqlite3.Error as e:
+                logger.error(f"Database error executing query: {e}")
+                if defer_commit:
+                    # Let transaction() roll back the whole unit of work
+                    raise
+                if commit:
+                    conn.rollback()
+                return None if fetch_all else None
     
     # ======== Entity Search Methods ========
     
-    def search_entities(self, query, entity_type=None, category=None, limit=50):
+    def _search_index_available(self):
+        """Make sure the FTS5 entity index exists, creating it on first use."""
+        if self._search_index_ready is None:
+            try:
+                with self.pool.connection() as conn:
+                    self._search_index_ready = ensure_search_index(conn)
+            except sqlite3.Error as e:
+                logger.warning(f"Entity search index unavailable, using LIKE search: {e}")
+                self._search_index_ready = False
+        return self._search_index_ready
+    
+    def _entity_profiles_available(self):
+        """Make sure view_entity_profiles reads from the materialized entity_profiles table."""
+        if self._entity_profiles_ready is None:
+            try:
+                with self.pool.connection() as conn:
+                    self._entity_profiles_ready = ensure_entity_profiles(conn)
+            except sqlite3.Error as e:
+                logger.warning(f"Materialized entity profiles unavailable, using the subquery view: {e}")
+                self._entity_profiles_ready = False
+        return self._entity_profiles_ready
+    
+    def search_entities(self, query, entity_type=None, category=None, limit=50, prefix=True):
+        """
+        Search for entities by name, aliases, bio, or categories.
+        
+        Results are ranked with BM25 over the `entity_search` FTS5 index and
+        include a highlighted `name_highlight` and `bio_snippet`.
+        
+        Args:
+            query: The search term
+            entity_type: Optional filter by entity type (politician, influencer)
+            category: Optional filter by category ID or code
+            limit: Maximum results to return
+            prefix: Match words by prefix, for type-ahead search
+            
+        Returns:
+            List of matching entity dictionaries
+        """
+        self._entity_profiles_available()
+        if not self._search_index_available():
+            return self._search_entities_like(query, entity_type, category, limit)
+        
+        match_query = build_match_query(query, prefix=prefix)
+        if not match_query:
+            return []
+        
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        sql = f"""
+        SELECT v.*,
+               highlight({SEARCH_TABLE}, 0, '<mark>', '</mark>') AS name_highlight,
+               snippet({SEARCH_TABLE}, 2, '<mark>', '</mark>', '...', 16) AS bio_snippet,
+               bm25({SEARCH_TABLE}, {weights}) AS search_rank
+        FROM {SEARCH_TABLE}
+        JOIN view_entity_profiles v ON v.id = {SEARCH_TABLE}.rowid
+        """
+        params = []
+        
+        # Add category filter if specified
+        if category:
+            if isinstance(category, int) or category.isdigit():
+                sql += " JOIN entity_categories ec ON v.id = ec.entity_id AND ec.category_id = ?"
+                params.append(int(category))
+            else:
+                sql += """ JOIN entity_categories ec ON v.id = ec.entity_id
+                JOIN categories c ON ec.category_id = c.id AND c.code = ?"""
+                params.append(category)
+        
+        sql += f" WHERE {SEARCH_TABLE} MATCH ?"
+        params.append(match_query)
+        
+        # Add entity type filter if specified
+        if entity_type:
+            sql += " AND v.entity_type = ?"
+            params.append(entity_type)
+        
+        # Add order and limit
+        sql += " ORDER BY search_rank, v.relevance_score DESC, v.name LIMIT ?"
+        params.append(limit)
+        
+        return self.execute_query(sql, params)
+    
+    def _search_entities_like(self, query, entity_type=None, category=None, limit=50):
         """
-        Search for entities by name, bio, or categories.
+        Search for entities with LIKE matching (fallback when FTS5 is unavailable).
         
         Args:
             query: The search term
@@ -129,45 +367,47 @@ class DatabaseManager:
         
         return self.execute_query(sql, params)
     
-    def get_entity(self, entity_id):
-        """Get complete entity details by ID."""
-        # First get basic entity info
-        sql = "SELECT * FROM entities WHERE id = ?"
-        entity = self.execute_query(sql, (entity_id,), fetch_all=False)
-        
-        if not entity:
-            return None
+    def _select_in(self, conn, sql, ids):
+        """Run a query with an `{ids}` IN-list placeholder over chunks of IDs."""
+        rows = []
+        for start in range(0, len(ids), SQL_PARAM_CHUNK):
+            chunk = ids[start:start + SQL_PARAM_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(dict(row) for row in conn.execute(sql.format(ids=placeholders), chunk))
+        return rows
+    
+    def _hydrate_entities(self, conn, entity_ids):
+        """Load entities with subtype data and categories, keyed by ID.
+
+        Issues one query per table (per chunk of IDs) regardless of how
+        many entities are requested.
+        """
+        ids = list(dict.fromkeys(entity_ids))
+        entities = {
+            row['id']: row
+            for row in self._select_in(conn, "SELECT * FROM entities WHERE id IN ({ids})", ids)
+        }
         
         # Get entity-specific details based on type
-        if entity['entity_type'] == 'politician':
-            sql = "SELECT * FROM politicians WHERE entity_id = ?"
-            politician_data = self.execute_query(sql, (entity_id,), fetch_all=False)
-            if politician_data:
-                entity.update(politician_data)
-        
-        elif entity['entity_type'] == 'influencer':
-            sql = "SELECT * FROM influencers WHERE entity_id = ?"
-            influencer_data = self.execute_query(sql, (entity_id,), fetch_all=False)
-            if influencer_data:
-                entity.update(influencer_data)
-        
-        # Get categories
+        for entity_type, table in ENTITY_SUBTYPE_TABLES.items():
+            typed_ids = [eid for eid, entity in entities.items() if entity['entity_type'] == entity_type]
+            if typed_ids:
+                sql = f"SELECT * FROM {table} WHERE entity_id IN ({{ids}})"
+                for row in self._select_in(conn, sql, typed_ids):
+                    entities[row['entity_id']].update(row)
+        
+        # Get categories, organized by type
+        for entity in entities.values():
+            entity['categories'] = {}
         sql = """
-        SELECT c.id, c.code, c.name, c.description, ct.name as category_type, ec.confidence_score
+        SELECT ec.entity_id, c.id, c.code, c.name, c.description, ct.name as category_type, ec.confidence_score
         FROM entity_categories ec
         JOIN categories c ON ec.category_id = c.id
         JOIN category_types ct ON c.category_type_id = ct.id
-        WHERE ec.entity_id = ?
+        WHERE ec.entity_id IN ({ids})
         """
-        categories = self.execute_query(sql, (entity_id,))
-        
-        # Organize categories by type
-        categorized = {}
-        for cat in categories:
-            cat_type = cat['category_type']
-            if cat_type not in categorized:
-                categorized[cat_type] = []
-            categorized[cat_type].append({
+        for cat in self._select_in(conn, sql, list(entities)):
+            entities[cat['entity_id']]['categories'].setdefault(cat['category_type'], []).append({
                 'id': cat['id'],
                 'code': cat['code'],
                 'name': cat['name'],
@@ -175,9 +415,24 @@ class DatabaseManager:
                 'confidence': cat['confidence_score']
             })
         
-        entity['categories'] = categorized
-        
-        return entity
+        return entities
+    
+    def get_entities(self, entity_ids):
+        """Get complete entity details for many IDs at once.
+
+        Returns:
+            dict: Entity ID -> entity dict, for the IDs that exist
+        """
+        try:
+            with self.pool.connection() as conn:
+                return self._hydrate_entities(conn, list(entity_ids))
+        except sqlite3.Error as e:
+            logger.error(f"Database error loading entities: {e}")
+            return {}
+    
+    def get_entity(self, entity_id):
+        """Get complete entity details by ID."""
+        return next(iter(self.get_entities([entity_id]).values()), None)
     
     def get_entity_by_name(self, name):
         """Get entity by name (exact match)."""
@@ -280,72 +535,69 @@ class DatabaseManager:
     
     def _update_entity_category(self, entity_id, category_type, category_value):
         """Update an entity's category of the specified type."""
-        conn = None
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
+        with self.pool.connection() as conn:
+            try:
+                cursor = conn.cursor()
             
-            # Get category type ID
-            cursor.execute("SELECT id FROM category_types WHERE name = ?", (category_type,))
-            type_result = cursor.fetchone()
+                # Get category type ID
+                cursor.execute("SELECT id FROM category_types WHERE name = ?", (category_type,))
+                type_result = cursor.fetchone()
             
-            if not type_result:
-                logger.error(f"Category type '{category_type}' not found")
-                return False
+                if not type_result:
+                    logger.error(f"Category type '{category_type}' not found")
+                    return False
             
-            category_type_id = type_result['id']
+                category_type_id = type_result['id']
             
-            # Find if this type allows multiple values
-            cursor.execute("SELECT is_multiple FROM category_types WHERE id = ?", (category_type_id,))
-            is_multiple = cursor.fetchone()['is_multiple']
+                # Find if this type allows multiple values
+                cursor.execute("SELECT is_multiple FROM category_types WHERE id = ?", (category_type_id,))
+                is_multiple = cursor.fetchone()['is_multiple']
             
-            # Get category ID
-            if isinstance(category_value, int):
-                # Direct category ID
-                category_id = category_value
-                cursor.execute("SELECT id FROM categories WHERE id = ? AND category_type_id = ?", 
-                               (category_id, category_type_id))
-                if not cursor.fetchone():
-                    logger.error(f"Category ID {category_id} not found for type {category_type}")
-                    return False
-            else:
-                # Code or name lookup
-                cursor.execute("""
-                    SELECT id FROM categories 
-                    WHERE (code = ? OR name = ?) AND category_type_id = ?
-                """, (category_value, category_value, category_type_id))
-                result = cursor.fetchone()
-                if not result:
-                    logger.error(f"Category '{category_value}' not found for type {category_type}")
-                    return False
-                category_id = result['id']
+                # Get category ID
+                if isinstance(category_value, int):
+                    # Direct category ID
+                    category_id = category_value
+                    cursor.execute("SELECT id FROM categories WHERE id = ? AND category_type_id = ?", 
+                                   (category_id, category_type_id))
+                    if not cursor.fetchone():
+                        logger.error(f"Category ID {category_id} not found for type {category_type}")
+                        return False
+                else:
+                    # Code or name lookup
+                    cursor.execute("""
+                        SELECT id FROM categories 
+                        WHERE (code = ? OR name = ?) AND category_type_id = ?
+                    """, (category_value, category_value, category_type_id))
+                    result = cursor.fetchone()
+                    if not result:
+                        logger.error(f"Category '{category_value}' not found for type {category_type}")
+                        return False
+                    category_id = result['id']
             
-            # If not multiple, remove existing categories of this type
-            if not is_multiple:
-                cursor.execute("""
-                    DELETE FROM entity_categories 
-                    WHERE entity_id = ? AND category_id IN (
-                        SELECT id FROM categories WHERE category_type_id = ?
-                    )
-                """, (entity_id, category_type_id))
+                # If not multiple, remove existing categories of this type
+                if not is_multiple:
+                    cursor.execute("""
+                        DELETE FROM entity_categories 
+                        WHERE entity_id = ? AND category_id IN (
+                            SELECT id FROM categories WHERE category_type_id = ?
+                        )
+                    """, (entity_id, category_type_id))
             
-            # Add new category
-            cursor.execute("""
-                INSERT OR REPLACE INTO entity_categories (entity_id, category_id, source) 
-                VALUES (?, ?, 'api_update')
-            """, (entity_id, category_id))
+                # Add new category
+                cursor.execute("""
+                    INSERT OR REPLACE INTO entity_categories (entity_id, category_id, source) 
+                    VALUES (?, ?, 'api_update')
+                """, (entity_id, category_id))
             
-            conn.commit()
-            return True
+                self._commit(conn)
+                return True
             
-        except sqlite3.Error as e:
-            logger.error(f"Database error updating category: {e}")
-            if conn:
+            except sqlite3.Error as e:
+                logger.error(f"Database error updating category: {e}")
+                if self.pool.in_transaction():
+                    raise
                 conn.rollback()
-            return False
-        finally:
-            if conn:
-                conn.close()
+                return False
     
     # ======== Category Methods ========
     
@@ -371,38 +623,35 @@ class DatabaseManager:
     
     def add_category(self, category_type, code, name, description=None):
         """Add a new category."""
-        conn = None
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
+        with self.pool.connection() as conn:
+            try:
+                cursor = conn.cursor()
             
-            # Get category type ID
-            cursor.execute("SELECT id FROM category_types WHERE name = ?", (category_type,))
-            result = cursor.fetchone()
+                # Get category type ID
+                cursor.execute("SELECT id FROM category_types WHERE name = ?", (category_type,))
+                result = cursor.fetchone()
             
-            if not result:
-                logger.error(f"Category type '{category_type}' not found")
-                return False
+                if not result:
+                    logger.error(f"Category type '{category_type}' not found")
+                    return False
             
-            category_type_id = result['id']
+                category_type_id = result['id']
             
-            # Insert new category
-            cursor.execute("""
-                INSERT INTO categories (category_type_id, code, name, description)
-                VALUES (?, ?, ?, ?)
-            """, (category_type_id, code, name, description))
+                # Insert new category
+                cursor.execute("""
+                    INSERT INTO categories (category_type_id, code, name, description)
+                    VALUES (?, ?, ?, ?)
+                """, (category_type_id, code, name, description))
             
-            conn.commit()
-            return cursor.lastrowid
+                self._commit(conn)
+                return cursor.lastrowid
             
-        except sqlite3.Error as e:
-            logger.error(f"Database error adding category: {e}")
-            if conn:
+            except sqlite3.Error as e:
+                logger.error(f"Database error adding category: {e}")
+                if self.pool.in_transaction():
+                    raise
                 conn.rollback()
-            return False
-        finally:
-            if conn:
-                conn.close()
+                return False
     
     # ======== Related Entity Methods ========
     
@@ -430,6 +679,64 @@ class DatabaseManager:
             """
             return self.execute_query(sql, (entity_id, entity_id, limit))
     
+    # ======== Embedding Methods ========
+    
+    def _get_vector_store(self):
+        """Open the memory-mapped embedding store, rebuilding it if the table changed."""
+        # Imported here so numpy is only needed by callers that use embeddings
+        from .vector_store import VECTOR_DIR, open_vector_store
+        with self._vector_store_lock:
+            if self._vector_store is None:
+                with self.pool.connection() as conn:
+                    self._vector_store = open_vector_store(conn, VECTOR_DIR)
+            return self._vector_store
+    
+    def save_entity_embeddings(self, entity_ids, vectors, model=None):
+        """Store embeddings as float32 BLOBs and append them to an open vector store."""
+        from .vector_store import save_embeddings, embeddings_signature
+        with self.pool.connection() as conn:
+            try:
+                save_embeddings(conn, entity_ids, vectors, model)
+                self._commit(conn)
+            except sqlite3.Error as e:
+                logger.error(f"Error saving embeddings: {e}")
+                if self.pool.in_transaction():
+                    raise
+                conn.rollback()
+                return False
+            with self._vector_store_lock:
+                if self._vector_store is not None and self._vector_store.meta.get('model') == model:
+                    self._vector_store.add(entity_ids, vectors)
+                    self._vector_store.meta['signature'] = embeddings_signature(conn)
+                    self._vector_store._write_meta()
+                else:
+                    # Reopened (and rebuilt) on the next similarity query
+                    self._vector_store = None
+        return True
+    
+    def get_similar_entities(self, entity_id, limit=10):
+        """Get the entities whose embeddings are closest to this entity's (cosine similarity)."""
+        try:
+            store = self._get_vector_store()
+        except ImportError as e:
+            logger.error(f"Vector store needs numpy: {e}")
+            return []
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.error(f"Vector store unavailable: {e}")
+            return []
+        hits = store.search_ids([entity_id], k=limit)[int(entity_id)]
+        if not hits:
+            return []
+        
+        self._entity_profiles_available()
+        placeholders = ",".join("?" * len(hits))
+        rows = self.execute_query(
+            f"SELECT * FROM view_entity_profiles WHERE id IN ({placeholders})",
+            [entity for entity, _ in hits]
+        )
+        by_id = {row['id']: row for row in rows}
+        return [dict(by_id[entity], similarity=score) for entity, score in hits if entity in by_id]
+    
     def get_entities_by_category(self, category, entity_type=None, limit=50):
         """Get entities with the specified category."""
         if isinstance(category, int) or (isinstance(category, str) and category.isdigit()):
@@ -732,59 +1039,86 @@ class DatabaseManager:
     
     def get_entity_with_connections(self, entity_id, include_evidence=False):
         """Get entity with all connections, optionally including evidence."""
-        # Get basic entity data
-        entity = self.get_entity(entity_id)
-        
-        if not entity:
-            return None
-        
-        # Get connections where entity is either entity1 or entity2
-        sql = """
-        SELECT ec.*, 
-        e1.name as entity1_name, e1.entity_type as entity1_type,
-        e2.name as entity2_name, e2.entity_type as entity2_type
-        FROM entity_connections ec
-        JOIN entities e1 ON ec.entity1_id = e1.id
-        JOIN entities e2 ON ec.entity2_id = e2.id
-        WHERE ec.entity1_id = ? OR ec.entity2_id = ?
+        entities = self.get_entities_with_connections([entity_id], include_evidence)
+        return next(iter(entities.values()), None)
+    
+    def get_entities_with_connections(self, entity_ids, include_evidence=False):
+        """Get many entities with all their connections, optionally including evidence.
+
+        Everything is loaded on one connection with a fixed number of
+        set-based queries, so a whole graph neighborhood can be hydrated
+        in one call. A connection between two requested entities appears
+        on both: outgoing on entity1, incoming on entity2.
+
+        Returns:
+            dict: Entity ID -> entity dict with a 'connections' list
         """
-        connections = self.execute_query(sql, (entity_id, entity_id))
+        try:
+            with self.pool.connection() as conn:
+                entities = self._hydrate_entities(conn, list(entity_ids))
+                if not entities:
+                    return {}
+                ids = list(entities)
+                
+                # Get connections where an entity is either entity1 or entity2
+                sql = """
+                SELECT ec.*, 
+                e1.name as entity1_name, e1.entity_type as entity1_type,
+                e2.name as entity2_name, e2.entity_type as entity2_type
+                FROM entity_connections ec
+                JOIN entities e1 ON ec.entity1_id = e1.id
+                JOIN entities e2 ON ec.entity2_id = e2.id
+                WHERE ec.{side}_id IN ({{ids}})
+                """
+                connections = {}
+                for side in ('entity1', 'entity2'):
+                    for row in self._select_in(conn, sql.format(side=side), ids):
+                        connections[row['id']] = row
+                
+                evidence_by_connection = {}
+                if include_evidence and connections:
+                    sql = """
+                    SELECT * FROM connection_evidence
+                    WHERE connection_id IN ({ids})
+                    ORDER BY confidence_score DESC
+                    """
+                    # A connection's evidence all comes from one chunk, so stays in order
+                    for evidence in self._select_in(conn, sql, list(connections)):
+                        evidence_by_connection.setdefault(evidence['connection_id'], []).append(evidence)
+        except sqlite3.Error as e:
+            logger.error(f"Database error loading entity connections: {e}")
+            return {}
         
-        # Transform connections to a more useful format
-        transformed_connections = []
+        for entity in entities.values():
+            entity['connections'] = []
         
-        for conn in connections:
-            # If this entity is entity1, we want to show connection to entity2
-            if conn['entity1_id'] == entity_id:
-                connected_entity = {
-                    'id': conn['entity2_id'],
-                    'name': conn['entity2_name'],
-                    'type': conn['entity2_type'],
-                    'connection_type': conn['connection_type'],
-                    'connection_id': conn['id'],
-                    'direction': 'outgoing'
-                }
-            else:
-                # This entity is entity2, show connection to entity1
+        # Transform connections to a more useful format
+        for conn_id in sorted(connections):
+            conn = connections[conn_id]
+            # From entity1 the connection points to entity2, and vice versa
+            ends = [(conn['entity1_id'], 'entity2', 'outgoing')]
+            if conn['entity2_id'] != conn['entity1_id']:
+                ends.append((conn['entity2_id'], 'entity1', 'incoming'))
+            
+            for owner_id, other, direction in ends:
+                if owner_id not in entities:
+                    continue
                 connected_entity = {
-                    'id': conn['entity1_id'],
-                    'name': conn['entity1_name'],
-                    'type': conn['entity1_type'],
+                    'id': conn[f'{other}_id'],
+                    'name': conn[f'{other}_name'],
+                    'type': conn[f'{other}_type'],
                     'connection_type': conn['connection_type'],
-                    'connection_id': conn['id'],
-                    'direction': 'incoming'
+                    'connection_id': conn_id,
+                    'direction': direction
                 }
-            
-            # Add evidence if requested
-            if include_evidence:
-                evidence = self.get_connection_evidence(conn['id'])
-                connected_entity['evidence'] = evidence
-            
-            transformed_connections.append(connected_entity)
-        
-        entity['connections'] = transformed_connections
+                
+                # Add evidence if requested
+                if include_evidence:
+                    connected_entity['evidence'] = evidence_by_connection.get(conn_id, [])
+                
+                entities[owner_id]['connections'].append(connected_entity)
         
-        return entity
+        return entities
         
     # ======== Donation Methods ========
     
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Materialized Entity Profiles
+
+Stores one row per entity in `entity_profiles` with the party, ideology and
+Trump-stance category labels denormalized inline, so `view_entity_profiles`
+(and the politician/influencer views built on it) no longer run three
+correlated GROUP_CONCAT subqueries per entity.
+
+Triggers on `entities`, `entity_categories`, `categories` and `category_types`
+keep the table current; `--rebuild` repopulates it after bulk imports that
+bypassed them.
+
+The triggers contain BEGIN ... END blocks, so this DDL lives here rather than
+in schema.sql (initialize_db.py splits schema.sql on semicolons).
+
+Usage:
+    python scripts/db/entity_profiles.py --rebuild
+"""
+import os
+import sys
+import sqlite3
+import logging
+import argparse
+
+logger = logging.getLogger(__name__)
+
+# Project paths
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+DB_PATH = os.path.join(PROJECT_ROOT, 'maga_ops.db')
+
+PROFILE_TABLE = 'entity_profiles'
+
+# Denormalized category labels for one entity; `{entity}` is the entity id expression
+_CATEGORY_LABELS = {
+    'party': """(SELECT GROUP_CONCAT(c.name, ', ')
+     FROM entity_categories ec
+     JOIN categories c ON ec.category_id = c.id
+     JOIN category_types ct ON c.category_type_id = ct.id
+     WHERE ec.entity_id = {entity} AND ct.name = 'party')""",
+    'ideologies': """(SELECT GROUP_CONCAT(c.name, ', ')
+     FROM entity_categories ec
+     JOIN categories c ON ec.category_id = c.id
+     JOIN category_types ct ON c.category_type_id = ct.id
+     WHERE ec.entity_id = {entity} AND ct.name = 'ideology')""",
+    'trump_stance': """(SELECT c.name
+     FROM entity_categories ec
+     JOIN categories c ON ec.category_id = c.id
+     JOIN category_types ct ON c.category_type_id = ct.id
+     WHERE ec.entity_id = {entity} AND ct.name = 'trump_stance'
+     LIMIT 1)""",
+}
+
+_ENTITY_COLUMNS = ('id', 'name', 'normalized_name', 'bio', 'entity_type',
+                   'twitter_handle', 'relevance_score')
+
+PROFILE_COLUMNS = _ENTITY_COLUMNS + tuple(_CATEGORY_LABELS)
+
+
+def _profile_select(where):
+    labels = ',\n    '.join(f"{sql.format(entity='e.id')} AS {name}"
+                            for name, sql in _CATEGORY_LABELS.items())
+    columns = ', '.join(f"e.{c}" for c in _ENTITY_COLUMNS)
+    return f"SELECT {columns},\n    {labels}\nFROM entities e\nWHERE {where}"
+
+
+def _refresh_categories_sql(entity):
+    assignments = ',\n        '.join(f"{name} = {sql.format(entity=entity)}"
+                                     for name, sql in _CATEGORY_LABELS.items())
+    return f"UPDATE {PROFILE_TABLE} SET\n        {assignments}\n    WHERE id = {entity};"
+
+
+_ENTITIES_OF_CATEGORY = "SELECT entity_id FROM entity_categories WHERE category_id = {category}"
+
+_ENTITIES_OF_CATEGORY_TYPE = """SELECT ec.entity_id FROM entity_categories ec
+        JOIN categories c ON ec.category_id = c.id
+        WHERE c.category_type_id = NEW.id"""
+
+PROFILE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {PROFILE_TABLE} (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    normalized_name TEXT,
+    bio TEXT,
+    entity_type TEXT NOT NULL,
+    twitter_handle TEXT,
+    relevance_score REAL,
+    party TEXT,
+    ideologies TEXT,
+    trump_stance TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_entity_profiles_type_relevance
+    ON {PROFILE_TABLE}(entity_type, relevance_score DESC);
+CREATE INDEX IF NOT EXISTS idx_entity_profiles_party ON {PROFILE_TABLE}(party);
+CREATE INDEX IF NOT EXISTS idx_entity_profiles_trump_stance ON {PROFILE_TABLE}(trump_stance);
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_profiles_insert AFTER INSERT ON entities BEGIN
+    INSERT OR REPLACE INTO {PROFILE_TABLE} ({', '.join(PROFILE_COLUMNS)})
+    {_profile_select('e.id = NEW.id')};
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_profiles_update
+AFTER UPDATE OF name, normalized_name, bio, entity_type, twitter_handle, relevance_score ON entities BEGIN
+    UPDATE {PROFILE_TABLE} SET
+        name = NEW.name,
+        normalized_name = NEW.normalized_name,
+        bio = NEW.bio,
+        entity_type = NEW.entity_type,
+        twitter_handle = NEW.twitter_handle,
+        relevance_score = NEW.relevance_score
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_profiles_delete AFTER DELETE ON entities BEGIN
+    DELETE FROM {PROFILE_TABLE} WHERE id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_profiles_category_insert AFTER INSERT ON entity_categories BEGIN
+    {_refresh_categories_sql('NEW.entity_id')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_profiles_category_delete AFTER DELETE ON entity_categories BEGIN
+    {_refresh_categories_sql('OLD.entity_id')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_profiles_category_update AFTER UPDATE ON entity_categories BEGIN
+    {_refresh_categories_sql('OLD.entity_id')}
+    {_refresh_categories_sql('NEW.entity_id')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_profiles_category_rename
+AFTER UPDATE OF name, category_type_id ON categories BEGIN
+    INSERT OR REPLACE INTO {PROFILE_TABLE} ({', '.join(PROFILE_COLUMNS)})
+    {_profile_select('e.id IN (' + _ENTITIES_OF_CATEGORY.format(category='NEW.id') + ')')};
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_profiles_category_type_rename
+AFTER UPDATE OF name ON category_types BEGIN
+    INSERT OR REPLACE INTO {PROFILE_TABLE} ({', '.join(PROFILE_COLUMNS)})
+    {_profile_select('e.id IN (' + _ENTITIES_OF_CATEGORY_TYPE + ')')};
+END;
+
+DROP VIEW IF EXISTS view_entity_profiles;
+CREATE VIEW view_entity_profiles AS
+SELECT {', '.join(PROFILE_COLUMNS)} FROM {PROFILE_TABLE};
+"""
+
+
+def profile_table_exists(conn):
+    """Check whether the materialized profile table has been created."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (PROFILE_TABLE,)
+    ).fetchone()
+    return row is not None
+
+
+def ensure_entity_profiles(conn):
+    """Create the profile table, triggers and view if missing, populating a new table.
+
+    Returns:
+        bool: True if `view_entity_profiles` reads from the materialized table.
+    """
+    if profile_table_exists(conn):
+        return True
+    try:
+        conn.executescript(PROFILE_DDL)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Could not create materialized entity profiles: {e}")
+        return False
+    rebuild_entity_profiles(conn)
+    return True
+
+
+def rebuild_entity_profiles(conn):
+    """Repopulate the whole profile table from the entity tables (e.g. after bulk imports)."""
+    conn.execute(f"DELETE FROM {PROFILE_TABLE}")
+    conn.execute(
+        f"INSERT INTO {PROFILE_TABLE} ({', '.join(PROFILE_COLUMNS)}) " + _profile_select('1')
+    )
+    conn.commit()
+    count = conn.execute(f"SELECT COUNT(*) FROM {PROFILE_TABLE}").fetchone()[0]
+    logger.info(f"Rebuilt materialized profiles for {count} entities")
+    return count
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Manage the materialized entity profile table")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the SQLite database")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the table from scratch")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    args = parse_args()
+    conn = sqlite3.connect(args.db)
+    try:
+        if not ensure_entity_profiles(conn):
+            sys.exit(1)
+        if args.rebuild:
+            rebuild_entity_profiles(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+FEC Bulk Data Importer
+
+Loads FEC bulk download archives (https://www.fec.gov/data/browse-data/?tab=bulk-data)
+into SQLite:
+1. Streams the pipe-delimited file straight out of each zip archive (no extraction)
+2. Parses it in chunks across worker processes
+3. Bulk-inserts each file into a staging table inside one transaction, with the
+   table's indexes dropped during the load and rebuilt afterwards
+4. Links committee-to-candidate contributions (pas2) to politicians via
+   `politicians.fec_candidate_id`, creating organization entities for the
+   committees and rows in `donation_records`
+
+Supported archives: committee master (cm), candidate master (cn), individual
+contributions (indiv, itcont.txt) and committee contributions to candidates
+(pas2, itpas2.txt). Re-importing a cycle replaces that cycle's rows.
+
+Usage:
+    python scripts/db/fec_bulk_import.py cm24.zip cn24.zip pas224.zip indiv24.zip
+"""
+import io
+import os
+import re
+import sys
+import zipfile
+import sqlite3
+import logging
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Add parent directory to path to import database_manager
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.db.database_manager import configure_connection
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.path.join(PROJECT_ROOT, 'maga_ops.db')
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# FEC bulk files are not UTF-8
+FEC_ENCODING = 'latin-1'
+
+FEC_BULK_URL = "https://www.fec.gov/files/bulk-downloads/{cycle}/{kind}{yy}.zip"
+
+# pas2 transaction types that are contributions to the candidate
+# (24A/24E are independent expenditures against/for, not donations)
+DONATION_TRANSACTION_TYPES = ('24K', '24Z')
+
+_CONTRIBUTION_COLUMNS = (
+    ('cmte_id', 'TEXT'), ('amndt_ind', 'TEXT'), ('rpt_tp', 'TEXT'),
+    ('transaction_pgi', 'TEXT'), ('image_num', 'TEXT'), ('transaction_tp', 'TEXT'),
+    ('entity_tp', 'TEXT'), ('name', 'TEXT'), ('city', 'TEXT'), ('state', 'TEXT'),
+    ('zip_code', 'TEXT'), ('employer', 'TEXT'), ('occupation', 'TEXT'),
+    ('transaction_dt', 'DATE'), ('transaction_amt', 'REAL'), ('other_id', 'TEXT'),
+)
+_CONTRIBUTION_TAIL = (
+    ('tran_id', 'TEXT'), ('file_num', 'INTEGER'), ('memo_cd', 'TEXT'),
+    ('memo_text', 'TEXT'), ('sub_id', 'TEXT'),
+)
+
+# File layouts, keyed by the archive prefix FEC uses. Column order matches the
+# file; 'DATE' columns are MMDDYYYY in the file and stored as YYYY-MM-DD.
+BULK_FILES = {
+    'cm': {
+        'member': 'cm.txt',
+        'table': 'fec_committees',
+        'columns': (
+            ('cmte_id', 'TEXT'), ('cmte_nm', 'TEXT'), ('tres_nm', 'TEXT'),
+            ('cmte_st1', 'TEXT'), ('cmte_st2', 'TEXT'), ('cmte_city', 'TEXT'),
+            ('cmte_st', 'TEXT'), ('cmte_zip', 'TEXT'), ('cmte_dsgn', 'TEXT'),
+            ('cmte_tp', 'TEXT'), ('cmte_pty_affiliation', 'TEXT'),
+            ('cmte_filing_freq', 'TEXT'), ('org_tp', 'TEXT'),
+            ('connected_org_nm', 'TEXT'), ('cand_id', 'TEXT'),
+        ),
+        'indexes': (('cycle', 'cmte_id'), ('cand_id',)),
+    },
+    'cn': {
+        'member': 'cn.txt',
+        'table': 'fec_candidates',
+        'columns': (
+            ('cand_id', 'TEXT'), ('cand_name', 'TEXT'), ('cand_pty_affiliation', 'TEXT'),
+            ('cand_election_yr', 'INTEGER'), ('cand_office_st', 'TEXT'),
+            ('cand_office', 'TEXT'), ('cand_office_district', 'TEXT'),
+            ('cand_ici', 'TEXT'), ('cand_status', 'TEXT'), ('cand_pcc', 'TEXT'),
+            ('cand_st1', 'TEXT'), ('cand_st2', 'TEXT'), ('cand_city', 'TEXT'),
+            ('cand_st', 'TEXT'), ('cand_zip', 'TEXT'),
+        ),
+        'indexes': (('cycle', 'cand_id'), ('cand_pcc',)),
+    },
+    'indiv': {
+        'member': 'itcont.txt',
+        'table': 'fec_indiv_contributions',
+        'columns': _CONTRIBUTION_COLUMNS + _CONTRIBUTION_TAIL,
+        'indexes': (('cmte_id', 'transaction_dt'), ('sub_id',), ('name',)),
+    },
+    'pas2': {
+        'member': 'itpas2.txt',
+        'table': 'fec_committee_contributions',
+        'columns': _CONTRIBUTION_COLUMNS + (('cand_id', 'TEXT'),) + _CONTRIBUTION_TAIL,
+        'indexes': (('cand_id', 'cycle'), ('cmte_id',), ('sub_id',)),
+    },
+}
+
+
+def _column_type(sql_type):
+    return 'TEXT' if sql_type == 'DATE' else sql_type
+
+
+def table_ddl(kind):
+    """CREATE TABLE statement for a bulk file's staging table."""
+    spec = BULK_FILES[kind]
+    columns = ',\n    '.join(f"{name} {_column_type(sql_type)}" for name, sql_type in spec['columns'])
+    return f"CREATE TABLE IF NOT EXISTS {spec['table']} (\n    cycle INTEGER NOT NULL,\n    {columns}\n)"
+
+
+def index_ddl(kind):
+    """(name, CREATE INDEX statement) pairs for a staging table."""
+    spec = BULK_FILES[kind]
+    statements = []
+    for columns in spec['indexes']:
+        name = f"idx_{spec['table']}_{'_'.join(columns)}"
+        statements.append((name, f"CREATE INDEX IF NOT EXISTS {name} ON {spec['table']}({', '.join(columns)})"))
+    return statements
+
+
+def _parse_date(value):
+    # MMDDYYYY -> YYYY-MM-DD
+    if len(value) != 8 or not value.isdigit():
+        return None
+    return f"{value[4:]}-{value[:2]}-{value[2:4]}"
+
+
+def _parse_number(value, cast):
+    try:
+        return cast(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_chunk(kind, cycle, lines):
+    """Parse raw lines of a bulk file into row tuples (runs in worker processes)."""
+    types = [sql_type for _, sql_type in BULK_FILES[kind]['columns']]
+    width = len(types)
+    rows = []
+    for line in lines:
+        fields = line.rstrip('\r\n').split('|')
+        if len(fields) < width:
+            fields.extend([''] * (width - len(fields)))
+        row = [cycle]
+        for value, sql_type in zip(fields, types):
+            if sql_type == 'TEXT':
+                row.append(value or None)
+            elif sql_type == 'DATE':
+                row.append(_parse_date(value))
+            elif sql_type == 'REAL':
+                row.append(_parse_number(value, float))
+            else:
+                row.append(_parse_number(value, int))
+        rows.append(tuple(row))
+    return rows
+
+
+def cycle_from_filename(path):
+    """Election cycle from an archive name like indiv24.zip, or None."""
+    match = re.search(r'(\d{2})\.zip$', os.path.basename(path))
+    if not match:
+        return None
+    yy = int(match.group(1))
+    return (1900 if yy >= 76 else 2000) + yy
+
+
+def find_bulk_members(archive):
+    """Map bulk file kinds to the matching member names in an open zip.
+
+    Only exact file names match, so the by_date/ splits shipped alongside
+    itcont.txt in recent indiv archives are not imported twice.
+    """
+    found = {}
+    names = set(archive.namelist())
+    for kind, spec in BULK_FILES.items():
+        if spec['member'] in names:
+            found[kind] = spec['member']
+    return found
+
+
+def _iter_chunks(archive, member, chunk_size):
+    with archive.open(member) as raw:
+        text = io.TextIOWrapper(raw, encoding=FEC_ENCODING, newline='')
+        while True:
+            chunk = list(itertools.islice(text, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def import_member(conn, archive, member, kind, cycle, executor=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                  max_pending=8):
+    """Load one bulk file from an open zip into its staging table.
+
+    The whole file is loaded in a single transaction; the table's indexes are
+    dropped first and rebuilt once the rows are in. With an executor, at most
+    max_pending chunks are being parsed at once so memory stays flat.
+
+    Returns:
+        int: Number of rows inserted
+    """
+    spec = BULK_FILES[kind]
+    table = spec['table']
+    placeholders = ', '.join('?' * (len(spec['columns']) + 1))
+    insert_sql = f"INSERT INTO {table} VALUES ({placeholders})"
+
+    conn.execute(table_ddl(kind))
+    indexes = index_ddl(kind)
+    count = 0
+
+    with conn:
+        for name, _ in indexes:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute(f"DELETE FROM {table} WHERE cycle = ?", (cycle,))
+
+        chunks = _iter_chunks(archive, member, chunk_size)
+        if executor is None:
+            for chunk in chunks:
+                rows = parse_chunk(kind, cycle, chunk)
+                conn.executemany(insert_sql, rows)
+                count += len(rows)
+        else:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(parse_chunk, kind, cycle, chunk))
+                if len(pending) >= max_pending:
+                    rows = pending.popleft().result()
+                    conn.executemany(insert_sql, rows)
+                    count += len(rows)
+            while pending:
+                rows = pending.popleft().result()
+                conn.executemany(insert_sql, rows)
+                count += len(rows)
+
+        for _, statement in indexes:
+            conn.execute(statement)
+
+    logger.info(f"Imported {count} rows from {member} into {table} (cycle {cycle})")
+    return count
+
+
+def link_donations(conn, cycle):
+    """Turn a cycle's pas2 rows for known politicians into donation_records.
+
+    Contributing committees become organization entities (matched on
+    normalized_name). Rows previously linked for the cycle are replaced.
+
+    Returns:
+        int: Number of donation records inserted
+    """
+    source_url = FEC_BULK_URL.format(cycle=cycle, kind='pas2', yy=f"{cycle % 100:02d}")
+    types = ', '.join('?' * len(DONATION_TRANSACTION_TYPES))
+    filters = f"""
+        WHERE p.cycle = ?
+          AND p.transaction_tp IN ({types})
+          AND COALESCE(p.memo_cd, '') <> 'X'
+          AND cm.cmte_nm IS NOT NULL
+    """
+    params = (cycle,) + DONATION_TRANSACTION_TYPES
+
+    with conn:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_donation_source ON donation_records(source_url, source_id)")
+        conn.execute(f"""
+            INSERT OR IGNORE INTO entities (name, normalized_name, entity_type, last_updated)
+            SELECT DISTINCT cm.cmte_nm, LOWER(TRIM(cm.cmte_nm)), 'organization', ?
+            FROM fec_committee_contributions p
+            JOIN politicians pol ON pol.fec_candidate_id = p.cand_id
+            JOIN fec_committees cm ON cm.cycle = p.cycle AND cm.cmte_id = p.cmte_id
+            {filters}
+        """, (datetime.now().isoformat(),) + params)
+
+        conn.execute("DELETE FROM donation_records WHERE source_url = ?", (source_url,))
+        cursor = conn.execute(f"""
+            INSERT INTO donation_records
+            (donor_id, recipient_id, amount, donation_date, donation_type, source_url, source_id)
+            SELECT org.id, pol.entity_id, p.transaction_amt, p.transaction_dt, 'pac', ?, p.sub_id
+            FROM fec_committee_contributions p
+            JOIN politicians pol ON pol.fec_candidate_id = p.cand_id
+            JOIN fec_committees cm ON cm.cycle = p.cycle AND cm.cmte_id = p.cmte_id
+            JOIN entities org ON org.normalized_name = LOWER(TRIM(cm.cmte_nm))
+                             AND org.entity_type = 'organization'
+            {filters}
+        """, (source_url,) + params)
+
+    logger.info(f"Linked {cursor.rowcount} committee contributions to politicians (cycle {cycle})")
+    return cursor.rowcount
+
+
+def import_archives(db_path, paths, cycle=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, link=True):
+    """Import FEC bulk zip archives into the database.
+
+    Archives are processed in dependency order (cm and cn before
+    contributions) so pas2 rows can be linked once their cycle's committees
+    are loaded.
+
+    Args:
+        db_path: Path to the SQLite database
+        paths: Zip archive paths
+        cycle: Election cycle; taken from each archive name (e.g. pas224.zip) if omitted
+        workers: Parser processes (0 parses in this process; default CPU count)
+        chunk_size: Lines per parse chunk
+        link: Link pas2 rows into donation_records
+
+    Returns:
+        dict: Rows imported per staging table
+    """
+    order = list(BULK_FILES)
+    jobs = []
+    for path in paths:
+        archive_cycle = cycle or cycle_from_filename(path)
+        if archive_cycle is None:
+            raise ValueError(f"Cannot tell the election cycle of {path}; pass --cycle")
+        with zipfile.ZipFile(path) as archive:
+            members = find_bulk_members(archive)
+        if not members:
+            logger.warning(f"No FEC bulk files found in {path}")
+        for kind, member in members.items():
+            jobs.append((order.index(kind), path, member, kind, archive_cycle))
+    jobs.sort()
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    configure_connection(conn)
+    # The load is re-runnable, so skip fsyncs while it runs
+    conn.execute("PRAGMA synchronous = OFF")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    totals = {}
+    linked_cycles = set()
+    try:
+        for _, path, member, kind, archive_cycle in jobs:
+            with zipfile.ZipFile(path) as archive:
+                count = import_member(conn, archive, member, kind, archive_cycle, executor, chunk_size,
+                                      max_pending=2 * max(workers, 1))
+            table = BULK_FILES[kind]['table']
+            totals[table] = totals.get(table, 0) + count
+            if kind == 'pas2':
+                linked_cycles.add(archive_cycle)
+
+        if link:
+            for linked_cycle in sorted(linked_cycles):
+                if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'fec_committees'").fetchone():
+                    link_donations(conn, linked_cycle)
+                else:
+                    logger.warning(f"Skipping donation linking for {linked_cycle}: import the cm archive first")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        conn.close()
+
+    return totals
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Import FEC bulk data archives")
+    parser.add_argument("archives", nargs="+", help="FEC bulk zip files (cm, cn, indiv, pas2)")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the SQLite database")
+    parser.add_argument("--cycle", type=int, help="Election cycle (default: from archive names)")
+    parser.add_argument("--workers", type=int, help="Parser processes (0 to parse in-process)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Lines per parse chunk")
+    parser.add_argument("--no-link", action="store_true", help="Only load staging tables")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    args = parse_args()
+    totals = import_archives(args.db, args.archives, args.cycle, args.workers,
+                             args.chunk_size, link=not args.no_link)
+    for table, count in totals.items():
+        logger.info(f"{table}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ sys.path.append(PROJECT_ROOT)
 
 # Import our database manager
 from scripts.db.database_manager import DatabaseManager
+from scripts.db import voting_similarity
 
 # Setup logging
 logging.basicConfig(
@@ -45,6 +46,9 @@ load_dotenv(os.path.join(PROJECT_ROOT, '.env'))
 # API key for OpenAI
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# Entity names offered to the model per analysis (limited to avoid token issues)
+MAX_CANDIDATE_NAMES = 100
+
 # Define relationship types
 RELATIONSHIP_TYPES = [
     'mentions',        # Simply mentions the other entity
@@ -89,24 +93,28 @@ def analyze_social_posts(db, entity_id, entity_name, all_entities):
     for post in posts:
         combined_text += f"Post ID {post['id']}: {post['content']}\n\n"
     
-    # Create a list of entity names to look for
-    entity_names = [e['name'] for e in all_entities.values() if e['id'] != entity_id]
+    # Create a list of entity names to look for, nearest entities first when
+    # embeddings are available (the prompt only has room for 100 names)
+    similar = db.get_similar_entities(entity_id, limit=MAX_CANDIDATE_NAMES)
+    candidate_ids = [e['id'] for e in similar]
+    nearest = set(candidate_ids)
+    candidate_ids += [e_id for e_id in all_entities if e_id != entity_id and e_id not in nearest]
+    entity_names = [all_entities[e_id]['name'] for e_id in candidate_ids if e_id in all_entities]
     
     # Use AI to identify mentioned entities
     mentioned_entities = detect_entity_mentions(combined_text, entity_names)
     
     # Map mentioned entity names back to IDs and create relationship data
+    ids_by_name = {}
+    for e_id, e_data in all_entities.items():
+        ids_by_name.setdefault(e_data['name'].lower(), e_id)
+    
     relationships = []
     for mention in mentioned_entities:
         # Find entity ID by name
-        mentioned_entity_id = None
         relationship_type = mention['type']
         strength = mention['strength']
-        
-        for e_id, e_data in all_entities.items():
-            if e_data['name'].lower() == mention['entity_name'].lower():
-                mentioned_entity_id = e_id
-                break
+        mentioned_entity_id = ids_by_name.get(mention['entity_name'].lower())
         
         if mentioned_entity_id:
             relationships.append({
@@ -126,9 +134,9 @@ def detect_entity_mentions(text, entity_names):
         return []
     
     # Prepare entity names list for the prompt (limit to avoid token issues)
-    if len(entity_names) > 100:
-        logger.warning(f"Too many entity names ({len(entity_names)}), limiting to 100")
-        entity_names = entity_names[:100]
+    if len(entity_names) > MAX_CANDIDATE_NAMES:
+        logger.warning(f"Too many entity names ({len(entity_names)}), limiting to {MAX_CANDIDATE_NAMES}")
+        entity_names = entity_names[:MAX_CANDIDATE_NAMES]
     
     entity_names_str = "\n".join([f"- {name}" for name in entity_names])
     
@@ -290,8 +298,16 @@ def save_relationships(db, relationships):
         if conn:
             conn.close()
 
-def find_voting_relationships(db, politician_ids):
-    """Find relationships based on similar voting patterns."""
+def find_voting_relationships(db, politician_ids,
+                              collaborate_threshold=voting_similarity.DEFAULT_COLLABORATE_THRESHOLD,
+                              criticize_threshold=voting_similarity.DEFAULT_CRITICIZE_THRESHOLD,
+                              min_common_votes=voting_similarity.DEFAULT_MIN_COMMON_VOTES,
+                              block_size=voting_similarity.DEFAULT_BLOCK_SIZE):
+    """Find relationships based on similar voting patterns.
+
+    All vote positions are loaded once and compared as a matrix, instead of
+    querying the database for every pair of politicians.
+    """
     if not politician_ids:
         return []
     
@@ -300,60 +316,14 @@ def find_voting_relationships(db, politician_ids):
     relationships = []
     
     try:
-        # For each pair of politicians, calculate voting similarity
-        for i, pol1_id in enumerate(politician_ids):
-            for pol2_id in politician_ids[i+1:]:
-                # Get recent votes for both politicians
-                votes1 = db.get_voting_records(pol1_id, limit=50)
-                votes2 = db.get_voting_records(pol2_id, limit=50)
-                
-                # Skip if not enough voting data
-                if not votes1 or not votes2:
-                    continue
-                
-                # Find votes they both participated in
-                common_vote_ids = set(v['vote_id'] for v in votes1).intersection(
-                    set(v['vote_id'] for v in votes2)
-                )
-                
-                if len(common_vote_ids) < 5:
-                    # Not enough common votes for meaningful analysis
-                    continue
-                
-                # Create dictionaries for easier lookup
-                votes1_dict = {v['vote_id']: v for v in votes1}
-                votes2_dict = {v['vote_id']: v for v in votes2}
-                
-                # Count agreements and disagreements
-                agreements = 0
-                total = len(common_vote_ids)
-                
-                for vote_id in common_vote_ids:
-                    if votes1_dict[vote_id]['vote_position'] == votes2_dict[vote_id]['vote_position']:
-                        agreements += 1
-                
-                # Calculate similarity score (0 to 1)
-                similarity = agreements / total if total > 0 else 0
-                
-                # Create relationships based on voting similarity
-                if similarity > 0.8:
-                    # Strong agreement - collaborates
-                    relationships.append({
-                        'entity1_id': pol1_id,
-                        'entity2_id': pol2_id,
-                        'connection_type': 'collaborates',
-                        'strength': similarity,
-                        'source': f"Voting pattern analysis ({agreements}/{total} agreement)"
-                    })
-                elif similarity < 0.2:
-                    # Strong disagreement - criticizes
-                    relationships.append({
-                        'entity1_id': pol1_id,
-                        'entity2_id': pol2_id,
-                        'connection_type': 'criticizes',
-                        'strength': 1 - similarity,
-                        'source': f"Voting pattern analysis ({total-agreements}/{total} disagreement)"
-                    })
+        matrix = voting_similarity.load_vote_matrix(db, politician_ids)
+        relationships = voting_similarity.find_agreement_edges(
+            matrix,
+            collaborate_threshold=collaborate_threshold,
+            criticize_threshold=criticize_threshold,
+            min_common_votes=min_common_votes,
+            block_size=block_size
+        )
     except Exception as e:
         logger.error(f"Error analyzing voting relationships: {str(e)}")
     
@@ -400,6 +370,21 @@ def parse_args():
         "--force", action="store_true",
         help="Reanalyze entities that already have relationships"
     )
+    parser.add_argument(
+        "--collaborate-threshold", type=float,
+        default=voting_similarity.DEFAULT_COLLABORATE_THRESHOLD,
+        help="Voting agreement ratio above which politicians are linked as collaborators"
+    )
+    parser.add_argument(
+        "--criticize-threshold", type=float,
+        default=voting_similarity.DEFAULT_CRITICIZE_THRESHOLD,
+        help="Voting agreement ratio below which politicians are linked as critics"
+    )
+    parser.add_argument(
+        "--min-common-votes", type=int,
+        default=voting_similarity.DEFAULT_MIN_COMMON_VOTES,
+        help="Minimum shared votes before a voting relationship is considered"
+    )
     return parser.parse_args()
 
 def main():
@@ -448,7 +433,12 @@ def main():
     # If we have politicians, process voting relationships first (more efficient to do all at once)
     politician_ids = [e['id'] for e in entities if e['entity_type'] == 'politician']
     if politician_ids:
-        voting_relationships = find_voting_relationships(db, politician_ids)
+        voting_relationships = find_voting_relationships(
+            db, politician_ids,
+            collaborate_threshold=args.collaborate_threshold,
+            criticize_threshold=args.criticize_threshold,
+            min_common_votes=args.min_common_votes
+        )
         if voting_relationships:
             saved = save_relationships(db, voting_relationships)
             logger.info(f"Saved {len(voting_relationships)} voting-based relationships")
@@ -8,6 +8,9 @@ It:
 2. Normalizes input data (names, categories, etc.)
 3. Inserts entities into the database with proper categorization
 4. Handles duplicate detection and conflict resolution
+
+Duplicates are found by exact normalized name first, then by fuzzy name
+matching against an in-memory q-gram index of existing entities.
 """
 import os
 import sys
@@ -24,6 +27,11 @@ sys.path.append(PROJECT_ROOT)
 
 # Import our database manager
 from scripts.db.database_manager import DatabaseManager
+from scripts.utils.name_matching import NameIndex
+
+# Minimum name similarity for an imported entity to be treated as an existing one;
+# 1.0 matches exact names only, so fuzzy merging is opt-in via --match-threshold
+DEFAULT_MATCH_THRESHOLD = 1.0
 
 # Setup logging
 logging.basicConfig(
@@ -57,7 +65,7 @@ def validate_entity(entity, entity_type):
     
     return True, None
 
-def import_from_json(db, json_file, entity_type):
+def import_from_json(db, json_file, entity_type, match_threshold=DEFAULT_MATCH_THRESHOLD):
     """Import entities from a JSON file."""
     try:
         with open(json_file, 'r', encoding='utf-8') as f:
@@ -72,26 +80,48 @@ def import_from_json(db, json_file, entity_type):
             logger.error(f"Unrecognized JSON format in {json_file}")
             return 0, 0
         
-        return import_entities(db, entities, entity_type)
+        return import_entities(db, entities, entity_type, match_threshold)
         
     except Exception as e:
         logger.error(f"Error importing from JSON file {json_file}: {str(e)}")
         return 0, 0
 
-def import_from_csv(db, csv_file, entity_type):
+def import_from_csv(db, csv_file, entity_type, match_threshold=DEFAULT_MATCH_THRESHOLD):
     """Import entities from a CSV file."""
     try:
         with open(csv_file, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             entities = list(reader)
         
-        return import_entities(db, entities, entity_type)
+        return import_entities(db, entities, entity_type, match_threshold)
         
     except Exception as e:
         logger.error(f"Error importing from CSV file {csv_file}: {str(e)}")
         return 0, 0
 
-def import_entities(db, entities, entity_type):
+def build_name_index(db, entity_type):
+    """Index the normalized names of existing entities of a type for fuzzy lookup."""
+    rows = db.execute_query(
+        "SELECT id, normalized_name FROM entities WHERE entity_type = ?", (entity_type,)
+    ) or []
+    index = NameIndex()
+    index.add_many((row['id'], row['normalized_name']) for row in rows)
+    return index
+
+def find_existing_entity(db, name_index, normalized_name, match_threshold):
+    """Find an existing entity by exact normalized name, then by similar name."""
+    existing_entity = db.get_entity_by_name(normalized_name)
+    if existing_entity or match_threshold >= 1.0:
+        return existing_entity
+    
+    match = name_index.best_match(normalized_name, match_threshold)
+    if not match:
+        return None
+    entity_id, score = match
+    logger.info(f"Matched '{normalized_name}' to entity {entity_id} (similarity {score:.2f})")
+    return db.get_entity(entity_id)
+
+def import_entities(db, entities, entity_type, match_threshold=DEFAULT_MATCH_THRESHOLD):
     """Import a list of entities into the database."""
     successful = 0
     failed = 0
@@ -99,6 +129,9 @@ def import_entities(db, entities, entity_type):
     # Get category mappings (for category codes/names in import data)
     categories_by_type = get_categories_by_type(db)
     
+    # Existing names, for duplicate detection beyond exact matches
+    name_index = build_name_index(db, entity_type) if match_threshold < 1.0 else NameIndex()
+    
     for entity_data in entities:
         try:
             # Validate entity
@@ -113,7 +146,9 @@ def import_entities(db, entities, entity_type):
                 entity_data['normalized_name'] = normalize_name(entity_data['name'])
             
             # Check if entity already exists
-            existing_entity = db.get_entity_by_name(entity_data['normalized_name'])
+            existing_entity = find_existing_entity(
+                db, name_index, entity_data['normalized_name'], match_threshold
+            )
             
             if existing_entity:
                 logger.info(f"Entity '{entity_data['name']}' already exists, updating")
@@ -128,6 +163,7 @@ def import_entities(db, entities, entity_type):
                 # Create new entity
                 result = create_new_entity(db, entity_data, entity_type, categories_by_type)
                 if result:
+                    name_index.add(result, entity_data['normalized_name'])
                     successful += 1
                 else:
                     failed += 1
@@ -171,7 +207,7 @@ def map_category_to_id(category_value, category_type, categories_by_type):
     return None
 
 def create_new_entity(db, entity_data, entity_type, categories_by_type):
-    """Create a new entity in the database."""
+    """Create a new entity in the database, returning its ID (or False on failure)."""
     conn = None
     try:
         conn = db._get_connection()
@@ -263,7 +299,7 @@ def create_new_entity(db, entity_data, entity_type, categories_by_type):
         
         conn.commit()
         logger.info(f"Created new {entity_type}: {entity_data['name']} (ID: {entity_id})")
-        return True
+        return entity_id
         
     except Exception as e:
         logger.error(f"Error creating entity {entity_data.get('name')}: {str(e)}")
@@ -429,6 +465,12 @@ def parse_args():
         choices=["json", "csv"],
         help="Format of the input file (detected from extension if not specified)"
     )
+    parser.add_argument(
+        "--match-threshold",
+        type=float,
+        default=DEFAULT_MATCH_THRESHOLD,
+        help="Minimum name similarity (0-1) to treat an entity as already existing; 1.0 matches exact names only"
+    )
     return parser.parse_args()
 
 def main():
@@ -461,9 +503,9 @@ def main():
     logger.info(f"Importing {args.type}s from {file_format} file: {args.file}")
     
     if file_format == 'json':
-        successful, failed = import_from_json(db, args.file, args.type)
+        successful, failed = import_from_json(db, args.file, args.type, args.match_threshold)
     elif file_format == 'csv':
-        successful, failed = import_from_csv(db, args.file, args.type)
+        successful, failed = import_from_csv(db, args.file, args.type, args.match_threshold)
     
     logger.info(f"Import complete: {successful} successful, {failed} failed")
 
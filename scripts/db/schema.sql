@@ -152,7 +152,7 @@ CREATE INDEX idx_evidence_type ON connection_evidence(evidence_type);
 -- Entity embeddings for vector search
 CREATE TABLE entity_embeddings (
     entity_id INTEGER PRIMARY KEY,
-    embedding_data TEXT, -- JSON array of embedding vector
+    embedding_data BLOB, -- float32 vector (little-endian), see vector_store.py
     embedding_model TEXT, -- Model used to generate embedding
     created_at TEXT NOT NULL,
     FOREIGN KEY (entity_id) REFERENCES entities(id) ON DELETE CASCADE
@@ -283,6 +283,8 @@ CREATE INDEX idx_donation_date ON donation_records(donation_date);
 -- =============================================
 
 -- Complete entity profile view
+-- entity_profiles.py replaces this with a view over the trigger-maintained
+-- entity_profiles table, avoiding the per-row subqueries below
 CREATE VIEW view_entity_profiles AS
 SELECT 
     e.id, 
@@ -371,7 +373,9 @@ SELECT
     CASE WHEN e.known_affiliations IS NULL THEN 1 ELSE 0 END as missing_affiliations,
     CASE WHEN e.location IS NULL THEN 1 ELSE 0 END as missing_location,
     (SELECT COUNT(*) FROM entity_categories WHERE entity_id = e.id) as category_count,
-    (SELECT COUNT(*) FROM entity_connections WHERE entity1_id = e.id OR entity2_id = e.id) as connection_count,
+    -- One OR so a self-loop counts once; SQLite serves it from both column indexes
+    (SELECT COUNT(*) FROM entity_connections
+     WHERE entity1_id = e.id OR entity2_id = e.id) as connection_count,
     (SELECT COUNT(*) FROM voting_records WHERE politician_id = e.id) as vote_count
 FROM entities e;
 
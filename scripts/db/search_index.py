@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Entity Full-Text Search Index
+
+Maintains an SQLite FTS5 index (`entity_search`) over entity names, aliases
+(normalized name and handles), bios and category labels. The index row for an
+entity shares its rowid with `entities.id` and is kept in sync by triggers on
+`entities`, `entity_categories` and `categories`.
+
+The triggers contain BEGIN ... END blocks, so this DDL lives here rather than
+in schema.sql (initialize_db.py splits schema.sql on semicolons).
+
+Usage:
+    python scripts/db/search_index.py --rebuild
+"""
+import os
+import re
+import sys
+import sqlite3
+import logging
+import argparse
+
+logger = logging.getLogger(__name__)
+
+# Project paths
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+DB_PATH = os.path.join(PROJECT_ROOT, 'maga_ops.db')
+
+SEARCH_TABLE = 'entity_search'
+
+# Column weights for bm25(): name, aliases, bio, categories
+BM25_WEIGHTS = (10.0, 6.0, 1.0, 3.0)
+
+# Text indexed per entity; `{where}` selects which entities to (re)index
+_ENTITY_ROW_SQL = """
+    SELECT e.id,
+           e.name,
+           TRIM(COALESCE(e.normalized_name, '') || ' ' ||
+                COALESCE(e.twitter_handle, '') || ' ' ||
+                COALESCE(e.instagram_handle, '')),
+           COALESCE(e.bio, ''),
+           COALESCE((SELECT GROUP_CONCAT(c.name || ' ' || c.code, ' ')
+                     FROM entity_categories ec
+                     JOIN categories c ON ec.category_id = c.id
+                     WHERE ec.entity_id = e.id), '')
+    FROM entities e
+    WHERE {where}
+"""
+
+def _refresh_sql(entity_id):
+    return (f"DELETE FROM {SEARCH_TABLE} WHERE rowid = {entity_id};\n"
+            f"    INSERT INTO {SEARCH_TABLE} (rowid, name, aliases, bio, categories)"
+            + _ENTITY_ROW_SQL.format(where=f"e.id = {entity_id}") + ";")
+
+SEARCH_INDEX_DDL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    name, aliases, bio, categories,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_insert AFTER INSERT ON entities BEGIN
+    {_refresh_sql('NEW.id')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_update
+AFTER UPDATE OF name, normalized_name, bio, twitter_handle, instagram_handle ON entities BEGIN
+    DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+    {_refresh_sql('NEW.id')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_delete AFTER DELETE ON entities BEGIN
+    DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_category_insert AFTER INSERT ON entity_categories BEGIN
+    {_refresh_sql('NEW.entity_id')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_category_delete AFTER DELETE ON entity_categories BEGIN
+    {_refresh_sql('OLD.entity_id')}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_category_rename
+AFTER UPDATE OF name, code ON categories BEGIN
+    DELETE FROM {SEARCH_TABLE} WHERE rowid IN (
+        SELECT entity_id FROM entity_categories WHERE category_id = NEW.id
+    );
+    INSERT INTO {SEARCH_TABLE} (rowid, name, aliases, bio, categories)
+    {_ENTITY_ROW_SQL.format(
+        where='e.id IN (SELECT entity_id FROM entity_categories WHERE category_id = NEW.id)')};
+END;
+"""
+
+def search_index_exists(conn):
+    """Check whether the FTS table has been created."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    ).fetchone()
+    return row is not None
+
+def ensure_search_index(conn):
+    """Create the FTS table and triggers if missing, populating a new index.
+
+    Returns:
+        bool: True if the index is available, False if FTS5 is unsupported.
+    """
+    if search_index_exists(conn):
+        return True
+    try:
+        conn.executescript(SEARCH_INDEX_DDL)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Could not create FTS5 search index: {e}")
+        return False
+    rebuild_search_index(conn)
+    return True
+
+def rebuild_search_index(conn):
+    """Repopulate the whole index from the entity tables (e.g. after bulk imports)."""
+    conn.execute(f"DELETE FROM {SEARCH_TABLE}")
+    conn.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, name, aliases, bio, categories)"
+        + _ENTITY_ROW_SQL.format(where='1')
+    )
+    conn.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    conn.commit()
+    count = conn.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}").fetchone()[0]
+    logger.info(f"Rebuilt entity search index with {count} entities")
+    return count
+
+def build_match_query(query, prefix=True):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word must match; with `prefix` each word also matches longer terms,
+    which is what type-ahead search needs ("tru" -> "trump").
+
+    Returns:
+        str or None: The MATCH expression, or None if the query has no words.
+    """
+    terms = re.findall(r"\w+", query or "", flags=re.UNICODE)
+    if not terms:
+        return None
+    suffix = '*' if prefix else ''
+    return ' '.join(f'"{term}"{suffix}' for term in terms)
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Manage the entity full-text search index")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the SQLite database")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from scratch")
+    return parser.parse_args()
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    args = parse_args()
+    conn = sqlite3.connect(args.db)
+    try:
+        if not ensure_search_index(conn):
+            sys.exit(1)
+        if args.rebuild:
+            rebuild_search_index(conn)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,6 @@ import json
 import logging
 import argparse
 import sqlite3
-import shutil
 from datetime import datetime, timedelta
 from tabulate import tabulate
 from pathlib import Path
@@ -25,6 +24,7 @@ sys.path.append(PROJECT_ROOT)
 
 # Import our database manager
 from scripts.db.database_manager import DatabaseManager
+from scripts.utils.db_backup import DEFAULT_KEEP_SNAPSHOTS, SnapshotStore, online_backup
 
 # Setup logging
 logging.basicConfig(
@@ -38,19 +38,21 @@ logger = logging.getLogger(__name__)
 
 # Database path
 DB_PATH = os.path.join(PROJECT_ROOT, 'maga_ops.db')
+BACKUPS_DIR = os.path.join(PROJECT_ROOT, 'backups')
+SNAPSHOT_STORE_PATH = os.path.join(BACKUPS_DIR, 'snapshots.db')
 
-def backup_database(backup_dir=None):
-    """Create a backup of the database."""
+def backup_database(backup_dir=None, incremental=False, store_path=None):
+    """Create a backup of the database.
+
+    Full backups are standalone copies in backup_dir. Incremental backups
+    add a snapshot to the page store, which keeps only pages that changed.
+    """
     if not backup_dir:
-        backup_dir = os.path.join(PROJECT_ROOT, 'backups')
+        backup_dir = BACKUPS_DIR
     
     # Create backup directory if it doesn't exist
     os.makedirs(backup_dir, exist_ok=True)
     
-    # Generate backup filename with timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_file = os.path.join(backup_dir, f'maga_ops_{timestamp}.db')
-    
     # Check if database exists
     if not os.path.exists(DB_PATH):
         logger.error(f"Database file not found at {DB_PATH}")
@@ -58,13 +60,46 @@ def backup_database(backup_dir=None):
     
     # Create backup
     try:
-        shutil.copy2(DB_PATH, backup_file)
-        logger.info(f"Database backup created at {backup_file}")
+        if incremental:
+            snapshot = SnapshotStore(store_path or SNAPSHOT_STORE_PATH).create(DB_PATH)
+            logger.info(f"Snapshot {snapshot['id']} created: {snapshot['new_pages']} of "
+                        f"{snapshot['page_count']} pages changed ({snapshot['seconds']:.2f}s)")
+        else:
+            # Generate backup filename with timestamp
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            online_backup(DB_PATH, os.path.join(backup_dir, f'maga_ops_{timestamp}.db'))
         return True
     except Exception as e:
         logger.error(f"Error creating database backup: {str(e)}")
         return False
 
+def list_snapshots(store_path=None):
+    """Print the snapshots in the page store."""
+    snapshots = SnapshotStore(store_path or SNAPSHOT_STORE_PATH).list()
+    if not snapshots:
+        print("No snapshots found.")
+        return
+    print(tabulate(
+        [[s['id'], s['created'], s['page_count'], s['new_pages'], f"{s['new_bytes'] / (1024 * 1024):.2f}", s['label'] or '']
+         for s in snapshots],
+        headers=["ID", "Created", "Pages", "New Pages", "New MB", "Label"],
+        tablefmt="simple"
+    ))
+
+def restore_snapshot(snapshot_id, dest_path, store_path=None, overwrite=False):
+    """Rebuild a snapshot from the page store as a database file."""
+    try:
+        SnapshotStore(store_path or SNAPSHOT_STORE_PATH).restore(snapshot_id, dest_path, overwrite=overwrite)
+        return True
+    except Exception as e:
+        logger.error(f"Error restoring snapshot {snapshot_id}: {str(e)}")
+        return False
+
+def prune_snapshots(keep=DEFAULT_KEEP_SNAPSHOTS, max_age_days=None, store_path=None):
+    """Delete snapshots outside the retention policy."""
+    result = SnapshotStore(store_path or SNAPSHOT_STORE_PATH).prune(keep=keep, max_age_days=max_age_days)
+    print(f"Deleted {result['snapshots']} snapshots and {result['pages']} unused pages.")
+
 def database_stats():
     """Get database statistics."""
     db = DatabaseManager()
@@ -516,6 +551,25 @@ def parse_args():
     # Backup command
     backup_parser = subparsers.add_parser("backup", help="Create database backup")
     backup_parser.add_argument("--dir", "-d", help="Backup directory (default: PROJECT_ROOT/backups)")
+    backup_parser.add_argument("--incremental", "-i", action="store_true",
+                             help="Add a page-level snapshot to the snapshot store instead of a full copy")
+    backup_parser.add_argument("--store", help="Snapshot store (default: PROJECT_ROOT/backups/snapshots.db)")
+    
+    # Snapshot commands
+    snapshots_parser = subparsers.add_parser("snapshots", help="List incremental snapshots")
+    snapshots_parser.add_argument("--store", help="Snapshot store (default: PROJECT_ROOT/backups/snapshots.db)")
+    
+    restore_parser = subparsers.add_parser("restore", help="Rebuild a snapshot as a database file")
+    restore_parser.add_argument("id", type=int, help="Snapshot ID")
+    restore_parser.add_argument("dest", help="Path of the restored database")
+    restore_parser.add_argument("--store", help="Snapshot store (default: PROJECT_ROOT/backups/snapshots.db)")
+    restore_parser.add_argument("--force", "-f", action="store_true", help="Overwrite dest if it exists")
+    
+    prune_parser = subparsers.add_parser("prune", help="Delete old snapshots")
+    prune_parser.add_argument("--keep", "-k", type=int, default=DEFAULT_KEEP_SNAPSHOTS,
+                            help="Number of recent snapshots to keep")
+    prune_parser.add_argument("--days", type=int, help="Also delete snapshots older than this many days")
+    prune_parser.add_argument("--store", help="Snapshot store (default: PROJECT_ROOT/backups/snapshots.db)")
     
     # Vacuum command
     vacuum_parser = subparsers.add_parser("vacuum", help="Vacuum database to optimize size and performance")
@@ -562,7 +616,16 @@ def main():
         display_entity(args.id)
     
     elif args.command == "backup":
-        backup_database(backup_dir=args.dir)
+        backup_database(backup_dir=args.dir, incremental=args.incremental, store_path=args.store)
+    
+    elif args.command == "snapshots":
+        list_snapshots(store_path=args.store)
+    
+    elif args.command == "restore":
+        restore_snapshot(args.id, args.dest, store_path=args.store, overwrite=args.force)
+    
+    elif args.command == "prune":
+        prune_snapshots(keep=args.keep, max_age_days=args.days, store_path=args.store)
     
     elif args.command == "vacuum":
         vacuum_database()
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Entity Vector Store
+
+Embeddings are stored in `entity_embeddings.embedding_data` as little-endian
+float32 BLOBs (legacy JSON-array rows are still readable). For search they
+are mirrored into an on-disk matrix that is memory-mapped rather than parsed:
+
+    vectors.f32   rows x dim float32, L2-normalized, append-only
+    ids.i64       entity id of each row
+    tombstones.i64  rows deleted or superseded since the last compaction
+    meta.json     dim, model, committed row count, database signature
+
+Cosine top-k search is a batched matrix product over the mapped rows. For
+large corpora (~1M+ rows) an optional IVF index partitions rows by k-means
+centroid so a query only scores the `n_probe` closest partitions; rows
+appended after the index was built are always scored exhaustively.
+
+Usage:
+    python scripts/db/vector_store.py --rebuild [--ivf-lists 1024]
+"""
+import os
+import sys
+import json
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Project paths
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+DB_PATH = os.path.join(PROJECT_ROOT, 'maga_ops.db')
+VECTOR_DIR = os.path.join(PROJECT_ROOT, 'cache', 'vectors', 'entity_embeddings')
+
+VECTOR_DTYPE = np.dtype('<f4')
+ID_DTYPE = np.dtype('<i8')
+
+# Rows scored per matrix product in exhaustive search
+SEARCH_BLOCK_ROWS = 65536
+
+DEFAULT_N_PROBE = 8
+
+
+def pack_vector(vector):
+    """Encode a vector as a float32 BLOB for entity_embeddings.embedding_data."""
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def unpack_vector(data):
+    """Decode embedding_data, accepting float32 BLOBs and legacy JSON arrays."""
+    if isinstance(data, str):
+        return np.asarray(json.loads(data), dtype=VECTOR_DTYPE)
+    return np.frombuffer(data, dtype=VECTOR_DTYPE)
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def _last_per_id(entity_ids, vectors):
+    """Keep only the last vector given for each id."""
+    entity_ids = np.asarray(entity_ids, dtype=ID_DTYPE)
+    if len(np.unique(entity_ids)) != len(entity_ids):
+        _, last = np.unique(entity_ids[::-1], return_index=True)
+        keep = np.sort(len(entity_ids) - 1 - last)
+        entity_ids, vectors = entity_ids[keep], vectors[keep]
+    return entity_ids, vectors
+
+
+def save_embeddings(conn, entity_ids, vectors, model=None):
+    """Insert or replace embeddings in entity_embeddings (caller commits)."""
+    now = datetime.now().isoformat()
+    conn.executemany(
+        """INSERT OR REPLACE INTO entity_embeddings
+        (entity_id, embedding_data, embedding_model, created_at) VALUES (?, ?, ?, ?)""",
+        [(int(entity_id), pack_vector(vector), model, now)
+         for entity_id, vector in zip(entity_ids, vectors)]
+    )
+
+
+def load_embeddings(conn, model=None):
+    """Read all embeddings (optionally for one model) as (ids, float32 matrix)."""
+    sql = "SELECT entity_id, embedding_data FROM entity_embeddings WHERE embedding_data IS NOT NULL"
+    params = ()
+    if model:
+        sql += " AND embedding_model = ?"
+        params = (model,)
+    ids, vectors = [], []
+    for entity_id, data in conn.execute(sql, params):
+        ids.append(entity_id)
+        vectors.append(unpack_vector(data))
+    if not vectors:
+        return np.zeros(0, dtype=ID_DTYPE), np.zeros((0, 0), dtype=np.float32)
+    return np.asarray(ids, dtype=ID_DTYPE), np.vstack(vectors)
+
+
+def embeddings_signature(conn, model=None):
+    """Cheap fingerprint of entity_embeddings used to detect a stale store."""
+    sql = "SELECT COUNT(*), MAX(created_at) FROM entity_embeddings"
+    params = ()
+    if model:
+        sql += " WHERE embedding_model = ?"
+        params = (model,)
+    return list(conn.execute(sql, params).fetchone())
+
+
+class VectorStore:
+    """Append-only, memory-mapped matrix of normalized vectors keyed by entity id."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.meta = {'dim': None, 'model': None, 'rows': 0, 'signature': None}
+        self._load()
+
+    # ---- files ----
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        meta_path = self._path('meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta.update(json.load(f))
+        rows, dim = self.meta['rows'], self.meta['dim']
+
+        if rows and dim:
+            self.vectors = np.memmap(self._path('vectors.f32'), dtype=VECTOR_DTYPE, mode='r', shape=(rows, dim))
+            self.ids = np.fromfile(self._path('ids.i64'), dtype=ID_DTYPE, count=rows)
+        else:
+            self.vectors = np.zeros((0, dim or 0), dtype=np.float32)
+            self.ids = np.zeros(0, dtype=ID_DTYPE)
+
+        self.alive = np.ones(rows, dtype=bool)
+        tombstone_path = self._path('tombstones.i64')
+        if os.path.exists(tombstone_path):
+            tombstones = np.fromfile(tombstone_path, dtype=ID_DTYPE)
+            self.alive[tombstones[tombstones < rows]] = False
+
+        # Latest live row for each id
+        self.row_of = {int(i): r for r, i in enumerate(self.ids) if self.alive[r]}
+
+        self.ivf = None
+        if self.meta.get('ivf_rows') and os.path.exists(self._path('ivf.npz')):
+            with np.load(self._path('ivf.npz')) as ivf:
+                self.ivf = {k: ivf[k] for k in ('centroids', 'order', 'offsets')}
+
+    def _release(self):
+        # Windows refuses to truncate, replace or remove a memory-mapped file
+        self.vectors = None
+
+    def _write_meta(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path('meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self._path('meta.json'))
+
+    def __len__(self):
+        return len(self.row_of)
+
+    @property
+    def dim(self):
+        return self.meta['dim']
+
+    # ---- writes ----
+
+    def add(self, entity_ids, vectors):
+        """Append vectors, superseding any existing rows for the same ids."""
+        vectors = _normalize(vectors)
+        if len(entity_ids) != len(vectors):
+            raise ValueError("entity_ids and vectors must have the same length")
+        if not len(vectors):
+            return
+        entity_ids, vectors = _last_per_id(entity_ids, vectors)
+        if self.dim is None:
+            self.meta['dim'] = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+        self._tombstone_rows([self.row_of[int(i)] for i in entity_ids if int(i) in self.row_of])
+
+        os.makedirs(self.directory, exist_ok=True)
+        rows = self.meta['rows']
+        self._release()
+        try:
+            # Bytes past the committed row count are from an interrupted append
+            for name, dtype, data in (('vectors.f32', VECTOR_DTYPE, vectors.astype(VECTOR_DTYPE)),
+                                      ('ids.i64', ID_DTYPE, entity_ids)):
+                width = dtype.itemsize * (self.dim if name == 'vectors.f32' else 1)
+                with open(self._path(name), 'ab') as f:
+                    f.truncate(rows * width)
+                    f.write(data.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            self.meta['rows'] = rows + len(vectors)
+            self._write_meta()
+        finally:
+            self._load()
+
+    def delete(self, entity_ids):
+        """Tombstone the rows of the given ids."""
+        self._tombstone_rows([self.row_of[int(i)] for i in entity_ids if int(i) in self.row_of])
+        self._load()
+
+    def _tombstone_rows(self, rows):
+        if not rows:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path('tombstones.i64'), 'ab') as f:
+            f.write(np.asarray(rows, dtype=ID_DTYPE).tobytes())
+        for r in rows:
+            self.alive[r] = False
+
+    def compact(self):
+        """Rewrite the matrix without tombstoned rows (drops the IVF index)."""
+        live = np.nonzero(self.alive)[0]
+        self._replace(self.ids[live], self.vectors[live], self.dim,
+                      self.meta.get('model'), self.meta.get('signature'))
+
+    def reset(self, dim=None, model=None):
+        """Remove all rows and index files."""
+        self._replace(np.zeros(0, dtype=ID_DTYPE), np.zeros((0, dim or 0), dtype=np.float32), dim, model)
+
+    def _replace(self, entity_ids, vectors, dim, model, signature=None):
+        """Swap in a new matrix, written under temporary names first."""
+        os.makedirs(self.directory, exist_ok=True)
+        for name, data in (('vectors.f32', np.asarray(vectors, dtype=VECTOR_DTYPE)),
+                           ('ids.i64', np.asarray(entity_ids, dtype=ID_DTYPE))):
+            with open(self._path(name + '.tmp'), 'wb') as f:
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        # An interrupted swap leaves a store with no signature, which is rebuilt on open
+        self.meta = {'dim': dim, 'model': model, 'rows': 0, 'signature': None}
+        self._write_meta()
+        self._release()
+        try:
+            for name in ('vectors.f32', 'ids.i64'):
+                os.replace(self._path(name + '.tmp'), self._path(name))
+            for name in ('tombstones.i64', 'ivf.npz'):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self.meta = {'dim': dim, 'model': model, 'rows': len(entity_ids), 'signature': signature}
+            self._write_meta()
+        finally:
+            self._load()
+
+    # ---- IVF index ----
+
+    def build_ivf(self, n_lists=None, iterations=10, sample_size=100000, seed=0):
+        """Partition the current rows with spherical k-means.
+
+        Args:
+            n_lists: Number of partitions (default ~sqrt(rows))
+            iterations: k-means iterations over the training sample
+            sample_size: Rows used to train the centroids
+        """
+        rows = self.meta['rows']
+        if not rows:
+            return
+        n_lists = n_lists or max(1, int(np.sqrt(rows)))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(self.vectors[np.sort(rng.choice(rows, min(rows, sample_size), replace=False))])
+        centroids = sample[rng.choice(len(sample), min(n_lists, len(sample)), replace=False)].copy()
+
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+                else:
+                    centroids[c] = sample[rng.integers(len(sample))]
+            centroids = _normalize(centroids)
+
+        assign = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.vectors[start:start + SEARCH_BLOCK_ROWS])
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assign, kind='stable').astype(ID_DTYPE)
+        offsets = np.searchsorted(assign[order], np.arange(len(centroids) + 1)).astype(ID_DTYPE)
+        np.savez(self._path('ivf.npz'), centroids=centroids, order=order, offsets=offsets)
+        self.meta['ivf_rows'] = rows
+        self._write_meta()
+        self._load()
+        logger.info(f"Built IVF index with {len(centroids)} lists over {rows} rows")
+
+    # ---- search ----
+
+    def vector(self, entity_id):
+        """Stored (normalized) vector for an id, or None."""
+        row = self.row_of.get(int(entity_id))
+        # A copy, so callers never hold a view that keeps the file mapped
+        return None if row is None else np.array(self.vectors[row])
+
+    def search(self, queries, k=10, exclude_ids=None, n_probe=DEFAULT_N_PROBE):
+        """Top-k cosine search for a batch of query vectors.
+
+        Args:
+            queries: (Q, dim) array or a single vector
+            k: Results per query
+            exclude_ids: Optional per-query iterables of ids to leave out
+            n_probe: IVF partitions scored per query (ignored without an index)
+
+        Returns:
+            list: For each query, a list of (entity_id, score) best first
+        """
+        queries = _normalize(queries)
+        if not len(self) or not len(queries):
+            return [[] for _ in range(len(queries))]
+        exclude_ids = exclude_ids or [()] * len(queries)
+        # Over-fetch so excluded ids can be dropped afterwards
+        fetch = k + max(len(ex) for ex in exclude_ids)
+
+        if self.ivf is not None:
+            candidates = [self._ivf_candidates(q, n_probe) for q in queries]
+            hits = [self._top_rows(q[None, :], rows, fetch)[0] for q, rows in zip(queries, candidates)]
+        else:
+            hits = self._top_rows(queries, None, fetch)
+
+        results = []
+        for (rows, scores), excluded in zip(hits, exclude_ids):
+            excluded = {int(i) for i in excluded}
+            ranked = [(int(self.ids[r]), float(s)) for r, s in zip(rows, scores)
+                      if int(self.ids[r]) not in excluded]
+            results.append(ranked[:k])
+        return results
+
+    def search_ids(self, entity_ids, k=10, n_probe=DEFAULT_N_PROBE):
+        """Entities most similar to each of the given (stored) entities."""
+        present = [i for i in entity_ids if int(i) in self.row_of]
+        if not present:
+            return {int(i): [] for i in entity_ids}
+        queries = np.vstack([self.vector(i) for i in present])
+        found = self.search(queries, k, exclude_ids=[(i,) for i in present], n_probe=n_probe)
+        results = {int(i): [] for i in entity_ids}
+        results.update({int(i): hits for i, hits in zip(present, found)})
+        return results
+
+    def _ivf_candidates(self, query, n_probe):
+        centroids, order, offsets = self.ivf['centroids'], self.ivf['order'], self.ivf['offsets']
+        probe = np.argsort(centroids @ query)[::-1][:n_probe]
+        parts = [order[offsets[c]:offsets[c + 1]] for c in probe]
+        # Rows appended after the index was built are not partitioned yet
+        parts.append(np.arange(self.meta['ivf_rows'], self.meta['rows'], dtype=ID_DTYPE))
+        return np.sort(np.concatenate(parts))
+
+    def _top_rows(self, queries, rows, k):
+        """Best k live rows per query, among `rows` (None for all rows)."""
+        n_queries = len(queries)
+        best_rows = np.zeros((n_queries, 0), dtype=ID_DTYPE)
+        best_scores = np.zeros((n_queries, 0), dtype=np.float32)
+        total = self.meta['rows'] if rows is None else len(rows)
+
+        for start in range(0, total, SEARCH_BLOCK_ROWS):
+            if rows is None:
+                block_rows = np.arange(start, min(start + SEARCH_BLOCK_ROWS, total), dtype=ID_DTYPE)
+                block = np.asarray(self.vectors[start:start + SEARCH_BLOCK_ROWS])
+            else:
+                block_rows = rows[start:start + SEARCH_BLOCK_ROWS]
+                block = np.asarray(self.vectors[block_rows])
+            scores = queries @ block.T
+            scores[:, ~self.alive[block_rows]] = -np.inf
+
+            # Merge this block's candidates with the running best
+            all_rows = np.concatenate([best_rows, np.broadcast_to(block_rows, scores.shape)], axis=1)
+            all_scores = np.concatenate([best_scores, scores], axis=1)
+            keep = min(k, all_scores.shape[1])
+            top = np.argpartition(-all_scores, keep - 1, axis=1)[:, :keep]
+            best_rows = np.take_along_axis(all_rows, top, axis=1)
+            best_scores = np.take_along_axis(all_scores, top, axis=1)
+
+        results = []
+        for r, s in zip(best_rows, best_scores):
+            order = np.argsort(-s)
+            live = np.isfinite(s[order])
+            results.append((r[order][live], s[order][live]))
+        return results
+
+
+def rebuild_vector_store(conn, directory=VECTOR_DIR, model=None, ivf_lists=None):
+    """Recreate the on-disk store from entity_embeddings."""
+    signature = embeddings_signature(conn, model)
+    ids, vectors = load_embeddings(conn, model)
+    store = VectorStore(directory)
+    if len(vectors):
+        ids, vectors = _last_per_id(ids, _normalize(vectors))
+        store._replace(ids, vectors, int(vectors.shape[1]), model, signature)
+    else:
+        store._replace(ids, vectors, None, model, signature)
+    if ivf_lists:
+        store.build_ivf(ivf_lists)
+    logger.info(f"Rebuilt vector store with {len(store)} embeddings in {directory}")
+    return store
+
+
+def open_vector_store(conn, directory=VECTOR_DIR, model=None):
+    """Open the store, rebuilding it if entity_embeddings changed behind its back."""
+    store = VectorStore(directory)
+    if store.meta.get('signature') != embeddings_signature(conn, model) or store.meta.get('model') != model:
+        # The stale store's map must be closed before its files are replaced
+        store._release()
+        store = rebuild_vector_store(conn, directory, model)
+    return store
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Manage the entity embedding vector store")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the SQLite database")
+    parser.add_argument("--dir", default=VECTOR_DIR, help="Vector store directory")
+    parser.add_argument("--model", help="Only include embeddings from this model")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the store from the database")
+    parser.add_argument("--ivf-lists", type=int, help="Build an IVF index with this many partitions")
+    parser.add_argument("--compact", action="store_true", help="Drop tombstoned rows")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    args = parse_args()
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.rebuild:
+            store = rebuild_vector_store(conn, args.dir, args.model, args.ivf_lists)
+        else:
+            store = open_vector_store(conn, args.dir, args.model)
+            if args.compact:
+                store.compact()
+            if args.ivf_lists:
+                store.build_ivf(args.ivf_lists)
+        logger.info(f"{len(store)} embeddings of dimension {store.dim}")
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
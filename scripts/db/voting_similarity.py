@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Voting Similarity Engine
+
+Computes pairwise voting agreement between politicians in bulk:
+1. Loads every vote position for the requested politicians in one query
+2. Encodes them as a member x vote matrix (0 = did not vote on that roll call)
+3. Computes co-participation and agreement counts with matrix products,
+   block by block so large historical Congresses fit in memory
+4. Turns the resulting agreement ratios into 'collaborates'/'criticizes' edges
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on bound parameters is 999
+SQL_PARAM_CHUNK = 900
+
+DEFAULT_VOTES_PER_MEMBER = 50
+DEFAULT_MIN_COMMON_VOTES = 5
+DEFAULT_COLLABORATE_THRESHOLD = 0.8
+DEFAULT_CRITICIZE_THRESHOLD = 0.2
+DEFAULT_BLOCK_SIZE = 256
+
+
+class VoteMatrix:
+    """Member x vote matrix of encoded vote positions.
+
+    Attributes:
+        member_ids: Politician IDs, one per matrix row.
+        vote_ids: Vote IDs, one per matrix column.
+        positions: Position labels; code N in the matrix means positions[N - 1].
+        codes: int16 array of shape (members, votes). 0 marks a missing vote.
+    """
+
+    def __init__(self, member_ids, vote_ids, positions, codes):
+        self.member_ids = member_ids
+        self.vote_ids = vote_ids
+        self.positions = positions
+        self.codes = codes
+
+    @property
+    def mask(self):
+        """Boolean matrix that is True where the member voted."""
+        return self.codes > 0
+
+
+def load_vote_matrix(db, politician_ids, votes_per_member=DEFAULT_VOTES_PER_MEMBER):
+    """Load vote positions for the given politicians into a VoteMatrix.
+
+    Args:
+        db: DatabaseManager instance
+        politician_ids: Politician entity IDs; their order defines the matrix rows
+        votes_per_member: Only use each member's most recent N votes (None for all)
+    """
+    member_index = {pid: i for i, pid in enumerate(politician_ids)}
+    vote_index = {}
+    position_index = {}
+    rows, cols, values = [], [], []
+
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(politician_ids), SQL_PARAM_CHUNK):
+            chunk = politician_ids[start:start + SQL_PARAM_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            if votes_per_member:
+                sql = f"""
+                SELECT politician_id, vote_id, vote_position FROM (
+                    SELECT politician_id, vote_id, vote_position,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY politician_id ORDER BY vote_date DESC
+                           ) AS recency
+                    FROM voting_records
+                    WHERE politician_id IN ({placeholders})
+                )
+                WHERE recency <= ?
+                """
+                params = list(chunk) + [votes_per_member]
+            else:
+                sql = f"""
+                SELECT politician_id, vote_id, vote_position FROM voting_records
+                WHERE politician_id IN ({placeholders})
+                """
+                params = list(chunk)
+
+            for politician_id, vote_id, position in cursor.execute(sql, params):
+                if position is None:
+                    continue
+                rows.append(member_index[politician_id])
+                cols.append(vote_index.setdefault(vote_id, len(vote_index)))
+                values.append(position_index.setdefault(position, len(position_index) + 1))
+
+    codes = np.zeros((len(politician_ids), len(vote_index)), dtype=np.int16)
+    if values:
+        codes[np.array(rows), np.array(cols)] = np.array(values, dtype=np.int16)
+
+    vote_ids = [None] * len(vote_index)
+    for vote_id, col in vote_index.items():
+        vote_ids[col] = vote_id
+    positions = sorted(position_index, key=position_index.get)
+
+    logger.info(f"Loaded vote matrix: {codes.shape[0]} members x {codes.shape[1]} votes, "
+                f"{len(values)} positions")
+    return VoteMatrix(list(politician_ids), vote_ids, positions, codes)
+
+
+def iter_agreement_blocks(matrix, block_size=DEFAULT_BLOCK_SIZE):
+    """Yield (row_start, row_stop, common, agreements) for blocks of member rows.
+
+    `common[i, j]` is the number of votes both member row_start+i and member j
+    took part in; `agreements[i, j]` is how many of those they voted the same way.
+    Only one block of rows is materialised at a time, so peak memory is
+    block_size x members rather than members x members.
+    """
+    participated = matrix.mask.astype(np.float32)
+    one_hot = [(matrix.codes == code).astype(np.float32)
+               for code in range(1, len(matrix.positions) + 1)]
+
+    n_members = matrix.codes.shape[0]
+    for start in range(0, n_members, block_size):
+        stop = min(start + block_size, n_members)
+        common = participated[start:stop] @ participated.T
+        agreements = np.zeros_like(common)
+        for position_matrix in one_hot:
+            agreements += position_matrix[start:stop] @ position_matrix.T
+        yield start, stop, common.astype(np.int64), agreements.astype(np.int64)
+
+
+def find_agreement_edges(matrix,
+                         collaborate_threshold=DEFAULT_COLLABORATE_THRESHOLD,
+                         criticize_threshold=DEFAULT_CRITICIZE_THRESHOLD,
+                         min_common_votes=DEFAULT_MIN_COMMON_VOTES,
+                         block_size=DEFAULT_BLOCK_SIZE):
+    """Build 'collaborates'/'criticizes' relationships from a VoteMatrix.
+
+    A pair collaborates when their agreement ratio is above collaborate_threshold
+    and criticizes when it is below criticize_threshold, counting only pairs that
+    share at least min_common_votes votes.
+    """
+    relationships = []
+    member_ids = matrix.member_ids
+
+    for start, stop, common, agreements in iter_agreement_blocks(matrix, block_size):
+        # Keep each unordered pair once: only columns after the row's member
+        rows, cols = np.nonzero(common >= min_common_votes)
+        upper = cols > rows + start
+        rows, cols = rows[upper], cols[upper]
+
+        totals = common[rows, cols]
+        agreed = agreements[rows, cols]
+        similarity = agreed / totals
+
+        for r, c, total, agree, sim in zip(rows, cols, totals, agreed, similarity):
+            total, agree, sim = int(total), int(agree), float(sim)
+            if sim > collaborate_threshold:
+                relationships.append({
+                    'entity1_id': member_ids[start + r],
+                    'entity2_id': member_ids[c],
+                    'connection_type': 'collaborates',
+                    'strength': sim,
+                    'source': f"Voting pattern analysis ({agree}/{total} agreement)"
+                })
+            elif sim < criticize_threshold:
+                relationships.append({
+                    'entity1_id': member_ids[start + r],
+                    'entity2_id': member_ids[c],
+                    'connection_type': 'criticizes',
+                    'strength': 1 - sim,
+                    'source': f"Voting pattern analysis ({total - agree}/{total} disagreement)"
+                })
+
+    return relationships
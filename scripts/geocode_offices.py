@@ -11,60 +11,287 @@
 # scripts/cache/google_maps_api_key.txt, and that
 # this key is enabled for the Geocoding API in the
 # Google APIs Console.
+#
+# Lookups are cached in scripts/cache/geocode_cache.json, keyed by the
+# normalized address, so offices sharing a building are geocoded once.
+# Addresses the geocoder could not find are cached too, for a shorter
+# time, so they aren't retried on every run.
+#
+# options:
+#  --workers: number of concurrent geocoder requests (default: 4)
+#  --refresh: ignore cached lookups and geocode again
+#  --backend: 'google' (default) or 'census' for an offline
+#     address-range file (see AddressRangeGeocoder)
+#  --address-ranges: path to the address-range CSV for --backend=census
+#  --geocoder-url: alternate URL for the Google-compatible geocoder,
+#     e.g. a local stub server for testing
+#
+# Any other arguments are bioguide IDs to limit the run to.
+
+import csv
+import datetime
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 import utils
 
+GOOGLE_GEOCODER_URL = 'https://maps.googleapis.com/maps/api/geocode/json'
+
+GEOCODE_CACHE = 'geocode_cache.json'
+
+# How long cached lookups are trusted. Failures expire sooner since
+# addresses get fixed and geocoders learn about new ones.
+CACHE_TTL_DAYS = 365
+NEGATIVE_CACHE_TTL_DAYS = 30
+
+# Geocoder statuses that mean the address itself could not be geocoded
+# (as opposed to quota or server trouble) and are safe to cache.
+NEGATIVE_STATUSES = ('ZERO_RESULTS',)
+
+DEFAULT_WORKERS = 4
+
 class GeocodeException(Exception):
-	def __init__(self, message):
+	def __init__(self, message, status=None):
 		super(GeocodeException, self).__init__(message)
+		self.status = status
 
-def run(legislator_ids=None):
+def run(legislator_ids=None, backend=None, workers=DEFAULT_WORKERS, refresh=False):
 	legislators = utils.load_data('legislators-district-offices.yaml')
+	backend = backend or GoogleGeocoder()
+	cache = GeocodeCache(os.path.join(utils.cache_dir(), GEOCODE_CACHE))
 	try:
-		for l in legislators:
-			if legislator_ids and l['id']['bioguide'] not in legislator_ids:
-				continue
-			geocode_offices(l)
+		selected = [l for l in legislators
+			if not legislator_ids or l['id']['bioguide'] in legislator_ids]
+		geocode_batch(selected, backend, cache, workers=workers, refresh=refresh)
 	finally:
 		# Save in-progress geocodes in case of keyboard interrupt
 		print("Saving data...")
 		utils.save_data(legislators, 'legislators-district-offices.yaml')
+		cache.save()
+
+def geocode_offices(l, backend=None, cache=None):
+	geocode_batch([l], backend or GoogleGeocoder(), cache, workers=1)
+
+def _pending_offices(legislators):
+	for l in legislators:
+		for o in l.get('offices', []):
+			if o.get('latitude'):
+				continue
+			if not o.get('address') or not o.get('city') or not o.get('state'):
+				continue
+			yield l, o
+
+def geocode_batch(legislators, backend, cache=None, workers=DEFAULT_WORKERS, refresh=False):
+	# Geocode every office still missing coordinates. Offices are grouped
+	# by normalized address so each distinct building is looked up once,
+	# cached lookups are reused, and the rest are sent to the backend
+	# concurrently. Each result is checked and applied to its offices as
+	# soon as it arrives, so an interrupted run keeps what it has.
+	offices = list(_pending_offices(legislators))
+
+	queries = { }
+	for l, o in offices:
+		queries.setdefault(_cache_key(backend, o), []).append((l, o))
+
+	def apply(key, entry):
+		for l, o in queries[key]:
+			_apply_lookup(l, o, entry)
+
+	uncached = [ ]
+	for key, key_offices in queries.items():
+		entry = cache.get(key) if cache is not None and not refresh else None
+		if entry is not None:
+			apply(key, entry)
+		else:
+			uncached.append((key, key_offices[0][1]))
 
-def geocode_offices(l):
-	for o in l.get('offices', []):
-		if o.get('latitude'):
-			continue
-		if not o.get('address') or not o.get('city') or not o.get('state'):
-			continue
-		address_query = ', '.join([o['address'], o['city'], utils.states[o['state']]])
-		result = None
+	if uncached:
+		print("Geocoding %d addresses (%d offices, %d cached)..." % (
+			len(uncached), len(offices), len(queries) - len(uncached)))
+
+	def lookup(key_office):
+		key, o = key_office
 		try:
-			result = geocode(address_query)
-			_sanity_check_location(o, l['id']['bioguide'], result)
+			entry = { 'status': 'OK', 'result': backend.geocode(o['address'], o['city'], o['state']) }
 		except GeocodeException as e:
-			print('Geocoding failed for %s office %s (%s): %s. Query: "%s". Result: "%s"' % (
-				l['id']['bioguide'], o['city'], o['address'], e, address_query,
-				result['formatted_address'] if result else None))
-			continue
-
-		location = result['geometry']['location']
-		o['latitude'] = location['lat']
-		o['longitude'] = location['lng']
-		print('Success: %s office %s, query "%s" geocoded to "%s" (%s,%s)' % (
-			l['id']['bioguide'], o['city'], address_query, result['formatted_address'],
-			location['lat'], location['lng']))
+			entry = { 'status': e.status or 'ERROR', 'error': str(e) }
+		except requests.RequestException as e:
+			entry = { 'status': 'ERROR', 'error': 'Geocoder request failed: %s' % e }
+		if cache is not None and (entry['status'] == 'OK' or entry['status'] in NEGATIVE_STATUSES):
+			cache.put(key, entry)
+		return key, entry
+
+	pool = ThreadPoolExecutor(max_workers=max(1, workers))
+	try:
+		for future in as_completed([pool.submit(lookup, key_office) for key_office in uncached]):
+			apply(*future.result())
+	finally:
+		# On a keyboard interrupt, drop the queued lookups rather than waiting
+		# for them, so the caller can save what's done right away
+		pool.shutdown(wait=False, cancel_futures=True)
+
+def _apply_lookup(l, o, entry):
+	address_query = _address_query(o)
+	result = entry.get('result')
+	try:
+		if entry['status'] != 'OK':
+			raise GeocodeException(entry.get('error') or 'Non-success response from geocoder: %s' % entry['status'])
+		_sanity_check_location(o, l['id']['bioguide'], result)
+	except GeocodeException as e:
+		print('Geocoding failed for %s office %s (%s): %s. Query: "%s". Result: "%s"' % (
+			l['id']['bioguide'], o['city'], o['address'], e, address_query,
+			result['formatted_address'] if result else None))
+		return
+
+	location = result['geometry']['location']
+	o['latitude'] = location['lat']
+	o['longitude'] = location['lng']
+	print('Success: %s office %s, query "%s" geocoded to "%s" (%s,%s)' % (
+		l['id']['bioguide'], o['city'], address_query, result['formatted_address'],
+		location['lat'], location['lng']))
+
+def _address_query(o):
+	return ', '.join([o['address'], o['city'], utils.states[o['state']]])
 
 def geocode(address):
-	params = {
-		'address': address,
-		'key': _get_api_key(),
-		}
-	response = requests.get('https://maps.googleapis.com/maps/api/geocode/json', params=params)
-	js = response.json()
-	if js.get('status') != 'OK':
-		raise GeocodeException('Non-success response from geocoder: %s' % js.get('status'))
-	return js['results'][0]
+	return GoogleGeocoder().geocode_query(address)
+
+##### Backends
+#
+# A backend has a `name` (part of the cache key, so backends don't share
+# results) and a geocode(address, city, state) method returning a result in
+# the shape of the Google Geocoding API (formatted_address,
+# geometry.location, address_components) or raising GeocodeException.
+
+class GoogleGeocoder(object):
+	name = 'google'
+
+	def __init__(self, url=GOOGLE_GEOCODER_URL, api_key=None):
+		self.url = url
+		self.api_key = api_key
+		self.session = requests.Session()
+
+	def geocode(self, address, city, state):
+		return self.geocode_query(', '.join([address, city, utils.states[state]]))
+
+	def geocode_query(self, address):
+		params = {
+			'address': address,
+			'key': self.api_key or _get_api_key(),
+			}
+		response = self.session.get(self.url, params=params)
+		js = response.json()
+		if js.get('status') != 'OK':
+			raise GeocodeException('Non-success response from geocoder: %s' % js.get('status'), js.get('status'))
+		return js['results'][0]
+
+class AddressRangeGeocoder(object):
+	# Offline geocoder over a Census TIGER-style address-range file: a CSV
+	# with columns street, city, state, from_number, to_number, from_lat,
+	# from_lng, to_lat, to_lng. A house number is placed by linear
+	# interpolation along the first range on its street that contains it.
+	name = 'census'
+
+	def __init__(self, path):
+		self.ranges = { }
+		with open(path) as f:
+			for row in csv.DictReader(f):
+				key = (normalize_address(row['street']), normalize_address(row['city']), row['state'].upper())
+				self.ranges.setdefault(key, []).append((
+					int(row['from_number']), int(row['to_number']),
+					float(row['from_lat']), float(row['from_lng']),
+					float(row['to_lat']), float(row['to_lng'])))
+
+	def geocode(self, address, city, state):
+		match = re.match(r"(\d+)\s+(.+)", address.split(',')[0].strip())
+		if not match:
+			raise GeocodeException('No house number in address', 'ZERO_RESULTS')
+		number = int(match.group(1))
+		street = normalize_address(match.group(2))
+
+		for low, high, lat1, lng1, lat2, lng2 in self.ranges.get((street, normalize_address(city), state), []):
+			if min(low, high) <= number <= max(low, high):
+				t = float(number - low) / (high - low) if high != low else 0.0
+				return {
+					'formatted_address': '%d %s, %s, %s' % (number, match.group(2).strip(), city, state),
+					'geometry': { 'location': { 'lat': lat1 + t * (lat2 - lat1), 'lng': lng1 + t * (lng2 - lng1) } },
+					'address_components': [
+						{ 'long_name': city, 'short_name': city, 'types': ['locality', 'political'] },
+						{ 'long_name': utils.states[state], 'short_name': state, 'types': ['administrative_area_level_1', 'political'] },
+					],
+				}
+		raise GeocodeException('Address not in any known range', 'ZERO_RESULTS')
+
+##### Cache
+
+# Spellings folded together when normalizing addresses for cache keys.
+ADDRESS_ABBREVIATIONS = {
+	'street': 'st', 'avenue': 'ave', 'boulevard': 'blvd', 'road': 'rd', 'drive': 'dr',
+	'lane': 'ln', 'court': 'ct', 'place': 'pl', 'square': 'sq', 'parkway': 'pkwy',
+	'highway': 'hwy', 'suite': 'ste', 'room': 'rm', 'building': 'bldg', 'floor': 'fl',
+	'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+	'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+	'saint': 'st', 'mount': 'mt', 'fort': 'ft',
+	}
+
+def normalize_address(text):
+	words = re.findall(r"[a-z0-9]+", text.lower().replace("'", ""))
+	return ' '.join(ADDRESS_ABBREVIATIONS.get(w, w) for w in words)
+
+def _cache_key(backend, o):
+	return '|'.join([backend.name, normalize_address(o['address']), normalize_address(o['city']), o['state'].upper()])
+
+class GeocodeCache(object):
+	# Persistent map from normalized address to the geocoder's answer:
+	# { 'status': 'OK', 'result': ... } or a cacheable failure such as
+	# { 'status': 'ZERO_RESULTS', 'error': ... }, stamped with when it was
+	# fetched. Entries past their TTL are treated as missing.
+
+	def __init__(self, path, ttl_days=CACHE_TTL_DAYS, negative_ttl_days=NEGATIVE_CACHE_TTL_DAYS):
+		self.path = path
+		self.ttl = datetime.timedelta(days=ttl_days)
+		self.negative_ttl = datetime.timedelta(days=negative_ttl_days)
+		self.lock = threading.Lock()
+		self.dirty = False
+		self.entries = { }
+		if os.path.exists(path):
+			try:
+				with open(path) as f:
+					self.entries = json.load(f)
+			except ValueError:
+				print("Ignoring unreadable geocode cache %s" % path)
+
+	def get(self, key):
+		with self.lock:
+			entry = self.entries.get(key)
+		if entry is None:
+			return None
+		ttl = self.ttl if entry['status'] == 'OK' else self.negative_ttl
+		fetched = datetime.datetime.strptime(entry['fetched'], '%Y-%m-%dT%H:%M:%S')
+		if datetime.datetime.utcnow() - fetched > ttl:
+			return None
+		return entry
+
+	def put(self, key, entry):
+		entry = dict(entry, fetched=datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S'))
+		with self.lock:
+			self.entries[key] = entry
+			self.dirty = True
+
+	def save(self):
+		with self.lock:
+			if not self.dirty:
+				return
+			content = json.dumps(self.entries, sort_keys=True, indent=1)
+			self.dirty = False
+		# Write to a temporary file and rename so an interrupted save can't
+		# truncate the cache.
+		utils.write(content, self.path + '.tmp')
+		os.replace(self.path + '.tmp', self.path)
 
 _api_key = None
 
@@ -155,6 +382,16 @@ def _sanity_check_location(office, bioguide_id, geocode_result):
 def _do_city_names_match(name1, name2):
 	return name1.lower().replace('.', '') == name2.lower().replace('.', '')
 
+def backend_from_flags(flags):
+	if flags.get('backend', 'google') == 'census':
+		if not flags.get('address-ranges'):
+			raise SystemExit('--backend=census requires --address-ranges=FILE')
+		return AddressRangeGeocoder(flags['address-ranges'])
+	return GoogleGeocoder(url=flags.get('geocoder-url', GOOGLE_GEOCODER_URL))
+
 if __name__ == '__main__':
-	import sys
-	run(legislator_ids=sys.argv[1:])
+	flags = utils.flags()
+	run(legislator_ids=utils.args(),
+		backend=backend_from_flags(flags),
+		workers=int(flags.get('workers', DEFAULT_WORKERS)),
+		refresh=flags.get('refresh', False))
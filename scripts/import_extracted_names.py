@@ -9,6 +9,7 @@ and imports them into our AI-optimized database structure.
 """
 
 import os
+import sys
 import json
 import sqlite3
 import datetime
@@ -16,10 +17,18 @@ import re
 from pathlib import Path
 
 # Configuration
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 DB_PATH = os.path.join(DATA_DIR, "influencers_ai.db")
 NAMES_JSON = None  # Will be set to the most recent names JSON file
 
+# Minimum name similarity for an extracted name to count as an existing influencer;
+# 1.0 matches exact names only, lower it to merge spelling variants
+FUZZY_MATCH_THRESHOLD = 1.0
+
+sys.path.append(PROJECT_ROOT)
+from scripts.utils.name_matching import NameIndex
+
 # Political figures categorization data
 KNOWN_POLITICIANS = {
     "Trump": {
@@ -242,6 +251,22 @@ def get_or_create_affiliation(conn, affiliation_name):
     conn.commit()
     return cursor.lastrowid
 
+def build_name_index(conn):
+    """Index existing influencers' normalized names for fuzzy lookup."""
+    index = NameIndex()
+    index.add_many(conn.execute("SELECT id, normalized_name FROM influencers"))
+    return index
+
+def find_existing_influencer(cursor, name_index, normalized_name):
+    """Find an influencer by exact normalized name, then by similar name."""
+    cursor.execute("SELECT id FROM influencers WHERE normalized_name = ?", (normalized_name,))
+    existing = cursor.fetchone()
+    if existing or FUZZY_MATCH_THRESHOLD >= 1.0:
+        return existing[0] if existing else None
+    
+    match = name_index.best_match(normalized_name, FUZZY_MATCH_THRESHOLD)
+    return match[0] if match else None
+
 def import_names_to_database():
     """Import the extracted names into the database."""
     if not NAMES_JSON or not os.path.exists(NAMES_JSON):
@@ -257,6 +282,9 @@ def import_names_to_database():
     # Connect to the database
     conn = sqlite3.connect(DB_PATH)
     
+    # Existing names, so spelling variants don't become new influencers
+    name_index = build_name_index(conn) if FUZZY_MATCH_THRESHOLD < 1.0 else NameIndex()
+    
     # Get the current date for tracking
     current_date = datetime.datetime.now().strftime("%Y-%m-%d")
     
@@ -304,11 +332,10 @@ def import_names_to_database():
         
         # Check if the influencer already exists
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM influencers WHERE normalized_name = ?", (normalized_name,))
-        existing_id = cursor.fetchone()
+        existing_id = find_existing_influencer(cursor, name_index, normalized_name)
         
         if existing_id:
-            influencer_id = existing_id[0]
+            influencer_id = existing_id
             # Update the existing record
             cursor.execute("""
                 UPDATE influencers 
@@ -329,6 +356,7 @@ def import_names_to_database():
                 current_date, current_date, mentions / 10.0
             ))
             influencer_id = cursor.lastrowid
+            name_index.add(influencer_id, normalized_name)
             print(f"Added new influencer: {full_name}")
         
         # Add name variation if different from full name
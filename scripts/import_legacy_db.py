@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Legacy Database Importer
+
+Imports the pre-migration politicians.db and influencers.db files into
+maga_ops.db. The legacy file is ATTACHed read-only and mapped onto the
+entity tables with INSERT ... SELECT and UPDATE ... FROM statements, so
+rows never pass through Python. Name normalization and the fuzzy match
+against existing entities run inside SQLite as registered functions,
+once per distinct name.
+
+Each legacy name resolves to an existing entity of the same type (exact
+normalized name first, then the most similar name above the threshold)
+or to a new entity. When several legacy rows resolve to the same entity
+the last one wins, as it did when rows were applied one at a time. An
+entity matched by a similar name keeps its stored name, so name and
+normalized_name stay consistent.
+
+With --dry-run the import runs in a transaction that is rolled back, and
+the report shows how many entities would be added and how many values
+of each column would change.
+
+Usage:
+    python scripts/import_legacy_db.py backups/old_databases/politicians.db politicians [--dry-run]
+"""
+
+import os
+import sys
+import sqlite3
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(PROJECT_ROOT, 'maga_ops.db')
+
+sys.path.append(PROJECT_ROOT)
+from scripts.utils.name_matching import NameIndex
+
+logger = logging.getLogger("legacy_import")
+
+# Default minimum name similarity for a legacy row to match an existing entity;
+# 1.0 matches exact names only, so fuzzy matching is opt-in via --match-threshold
+DEFAULT_MATCH_THRESHOLD = 1.0
+
+# How legacy tables map onto entities and their subtype tables. Values are
+# SQL expressions over the legacy row; {column} names a legacy column and
+# becomes NULL when the legacy table doesn't have it.
+LEGACY_MAPPINGS = {
+    'politicians': {
+        'table': 'politicians',
+        'entity_type': 'politician',
+        'entity_columns': {
+            'name': '{name}',
+            'bio': '{bio}',
+            'twitter_handle': '{twitter}',
+            'known_affiliations': "CASE WHEN {party} IS NOT NULL AND {party} != '' THEN 'Party: ' || {party} END",
+        },
+        'subtype_table': 'politicians',
+        'subtype_columns': {
+            'office': '{role}',
+            'state': '{state}',
+            'district': '{district}',
+            'bioguide_id': '{bioguide_id}',
+            'fec_candidate_id': '{fec_id}',
+        },
+    },
+    'influencers': {
+        'table': 'influencers',
+        'entity_type': 'influencer',
+        'entity_columns': {
+            'name': '{name}',
+            'bio': '{bio}',
+            'twitter_handle': '{twitter}',
+        },
+        'subtype_table': 'influencers',
+        'subtype_columns': {
+            'platform': '{platform}',
+            'audience_size': '{followers}',
+            'content_focus': '{focus}',
+        },
+    },
+}
+
+# Number of sample new names included in a report
+SAMPLE_SIZE = 10
+
+# New values that depend on how the legacy name matched, over the target row
+# {t} and staged row s. Only an exact match may replace the stored name.
+MATCHED_VALUES = {
+    'name': "CASE WHEN {t}.normalized_name = s.normalized_name THEN s.name ELSE {t}.name END",
+}
+
+class _LegacyColumns(dict):
+    """Column lookup for mapping expressions; absent columns read as NULL."""
+
+    def __missing__(self, key):
+        return 'NULL'
+
+def normalize_name(name):
+    """Normalize a legacy name the way the row-by-row migration did."""
+    return name.lower() if name else ''
+
+class EntityMatcher:
+    """Resolves normalized names to entity IDs for the match_entity() SQL function.
+
+    Names that match nothing are indexed under the placeholder they were
+    given, so later similar legacy names resolve to the same new entity.
+    """
+
+    def __init__(self, conn, entity_type, threshold):
+        self.threshold = threshold
+        self.index = NameIndex()
+        self.index.add_many(conn.execute(
+            "SELECT id, normalized_name FROM main.entities WHERE entity_type = ?", (entity_type,)
+        ))
+        self.exact = self.fuzzy = self.new = 0
+
+    def __call__(self, normalized_name, placeholder):
+        match = self.index.best_match(normalized_name, self.threshold)
+        if match is None:
+            self.index.add(placeholder, normalized_name)
+            self.new += 1
+            return placeholder
+        if match[0] > 0:
+            if match[1] >= 1.0:
+                self.exact += 1
+            else:
+                self.fuzzy += 1
+        return match[0]
+
+def _new_value(column, target):
+    return MATCHED_VALUES.get(column, f"s.{column}").format(t=target)
+
+def _select_list(columns, legacy_columns):
+    return ", ".join(
+        f"{expression.format_map(legacy_columns)} AS {column}" for column, expression in columns.items()
+    )
+
+def _changed_counts(conn, table, key, columns):
+    """Count, per column, the rows of a table a staged source would change."""
+    sums = ", ".join(f"COALESCE(SUM(t.{c} IS NOT {_new_value(c, 't')}), 0)" for c in columns)
+    counts = conn.execute(
+        f"SELECT {sums} "
+        f"FROM main.{table} t JOIN temp.legacy_targets g ON t.{key} = g.entity_id "
+        f"JOIN temp.legacy_rows s ON s.legacy_rowid = g.legacy_rowid WHERE g.created = 0"
+    ).fetchone()
+    return {f"{table}.{column}": count for column, count in zip(columns, counts) if count}
+
+def import_legacy_db(legacy_path, db_type, db_path=DB_PATH, dry_run=False,
+                     threshold=DEFAULT_MATCH_THRESHOLD):
+    """Import a legacy database with set-based statements.
+
+    Args:
+        legacy_path (str): Legacy SQLite file
+        db_type (str): Key of LEGACY_MAPPINGS describing the legacy file
+        db_path (str): Database to import into
+        dry_run (bool): Report the changes without keeping them
+        threshold (float): Minimum name similarity for a fuzzy match;
+            1.0 matches exact normalized names only
+
+    Returns:
+        dict: Row counts and, per column, how many existing values change
+    """
+    mapping = LEGACY_MAPPINGS.get(db_type)
+    if mapping is None:
+        logger.info(f"No legacy mapping for {db_type}, nothing to import")
+        return {}
+
+    conn = sqlite3.connect(db_path, isolation_level=None, uri=True)
+    try:
+        conn.execute("ATTACH DATABASE ? AS legacy", (Path(legacy_path).resolve().as_uri() + "?mode=ro",))
+        table, entity_type = mapping['table'], mapping['entity_type']
+        legacy_columns = _LegacyColumns(
+            (row[1], f'l."{row[1]}"') for row in conn.execute(f'PRAGMA legacy.table_info("{table}")')
+        )
+        if not legacy_columns:
+            logger.info(f"{legacy_path} has no {table} table, nothing to import")
+            return {}
+
+        matcher = EntityMatcher(conn, entity_type, threshold)
+        conn.create_function('normalize_name', 1, normalize_name, deterministic=True)
+        conn.create_function('match_entity', 2, matcher)
+        entity_columns, subtype_columns = mapping['entity_columns'], mapping['subtype_columns']
+        subtype_table = mapping['subtype_table']
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        conn.execute("BEGIN IMMEDIATE")
+
+        # Stage the mapped legacy rows, then resolve each distinct name once,
+        # in order of first appearance
+        conn.execute(f"""
+            CREATE TEMP TABLE legacy_rows AS
+            SELECT l.rowid AS legacy_rowid, normalize_name({legacy_columns['name']}) AS normalized_name,
+                   {_select_list(entity_columns, legacy_columns)},
+                   {_select_list(subtype_columns, legacy_columns)}
+            FROM legacy."{table}" l
+            ORDER BY l.rowid
+        """)
+        conn.execute("CREATE UNIQUE INDEX temp.legacy_rows_rowid ON legacy_rows (legacy_rowid)")
+        conn.execute("CREATE INDEX temp.legacy_rows_name ON legacy_rows (normalized_name)")
+        conn.execute("CREATE TEMP TABLE legacy_names (seq INTEGER PRIMARY KEY, normalized_name TEXT UNIQUE, target INTEGER)")
+        conn.execute("""
+            INSERT INTO temp.legacy_names (normalized_name)
+            SELECT normalized_name FROM temp.legacy_rows
+            WHERE normalized_name != ''
+            GROUP BY normalized_name
+            ORDER BY MIN(legacy_rowid)
+        """)
+        conn.execute("UPDATE temp.legacy_names SET target = match_entity(normalized_name, -seq)")
+
+        # One target per entity: the last legacy row resolving to it supplies
+        # the values; new entities keep the name that created them
+        conn.execute("""
+            CREATE TEMP TABLE legacy_targets AS
+            SELECT n.target, MAX(r.legacy_rowid) AS legacy_rowid,
+                   CASE WHEN n.target > 0 THEN n.target END AS entity_id,
+                   n.target < 0 AS created
+            FROM temp.legacy_rows r JOIN temp.legacy_names n USING (normalized_name)
+            GROUP BY n.target
+        """)
+        changes = _changed_counts(conn, 'entities', 'id', list(entity_columns))
+        changes.update(_changed_counts(conn, subtype_table, 'entity_id', list(subtype_columns)))
+
+        columns = ", ".join(entity_columns)
+        added = conn.execute(f"""
+            INSERT INTO main.entities (normalized_name, {columns}, first_appearance_date, last_updated, entity_type)
+            SELECT n.normalized_name, {", ".join(f"s.{c}" for c in entity_columns)}, :today, :today, :entity_type
+            FROM temp.legacy_targets g
+            JOIN temp.legacy_names n ON n.seq = -g.target
+            JOIN temp.legacy_rows s ON s.legacy_rowid = g.legacy_rowid
+            WHERE g.created
+            ORDER BY n.seq
+            ON CONFLICT(normalized_name) DO NOTHING
+        """, {'today': today, 'entity_type': entity_type}).rowcount
+        conn.execute("""
+            UPDATE temp.legacy_targets SET entity_id = (
+                SELECT e.id FROM temp.legacy_names n JOIN main.entities e ON e.normalized_name = n.normalized_name
+                WHERE n.seq = -legacy_targets.target AND e.entity_type = :entity_type
+            )
+            WHERE created
+        """, {'entity_type': entity_type})
+        name_conflicts = conn.execute(
+            "SELECT COUNT(*) FROM temp.legacy_targets WHERE entity_id IS NULL"
+        ).fetchone()[0]
+        sample = [row[0] for row in conn.execute(f"""
+            SELECT s.name FROM temp.legacy_targets g JOIN temp.legacy_rows s USING (legacy_rowid)
+            WHERE g.created AND g.entity_id IS NOT NULL LIMIT {SAMPLE_SIZE}
+        """)]
+
+        updated = conn.execute(f"""
+            UPDATE main.entities SET {", ".join(f"{c} = {_new_value(c, 'entities')}" for c in entity_columns)}, last_updated = :today
+            FROM temp.legacy_targets g JOIN temp.legacy_rows s ON s.legacy_rowid = g.legacy_rowid
+            WHERE entities.id = g.entity_id AND NOT g.created
+        """, {'today': today}).rowcount
+        subtype_updated = conn.execute(f"""
+            UPDATE OR IGNORE main.{subtype_table} SET {", ".join(f"{c} = s.{c}" for c in subtype_columns)}
+            FROM temp.legacy_targets g JOIN temp.legacy_rows s ON s.legacy_rowid = g.legacy_rowid
+            WHERE {subtype_table}.entity_id = g.entity_id AND NOT g.created
+        """).rowcount
+        subtype_added = conn.execute(f"""
+            INSERT OR IGNORE INTO main.{subtype_table} (entity_id, {", ".join(subtype_columns)})
+            SELECT g.entity_id, {", ".join(f"s.{c}" for c in subtype_columns)}
+            FROM temp.legacy_targets g JOIN temp.legacy_rows s ON s.legacy_rowid = g.legacy_rowid
+            WHERE g.created AND g.entity_id IS NOT NULL
+        """).rowcount
+
+        report = {
+            'rows': conn.execute("SELECT COUNT(*) FROM temp.legacy_rows").fetchone()[0],
+            'unnamed': conn.execute("SELECT COUNT(*) FROM temp.legacy_rows WHERE normalized_name = ''").fetchone()[0],
+            'exact_matches': matcher.exact,
+            'fuzzy_matches': matcher.fuzzy,
+            'added': added,
+            'updated': updated,
+            f'{subtype_table}_added': subtype_added,
+            f'{subtype_table}_updated': subtype_updated,
+            'name_conflicts': name_conflicts,
+            'changes': changes,
+            'sample_added': sample,
+        }
+        conn.execute("ROLLBACK" if dry_run else "COMMIT")
+        return report
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def log_report(legacy_path, report, dry_run=False):
+    """Log an import report."""
+    verb = "Would import" if dry_run else "Imported"
+    logger.info(f"{verb} {legacy_path}: " + ", ".join(
+        f"{key}={value}" for key, value in report.items() if key not in ('changes', 'sample_added')
+    ))
+    for column, count in report.get('changes', {}).items():
+        logger.info(f"  {column:<40} {count} existing values {'would change' if dry_run else 'changed'}")
+    if report.get('sample_added'):
+        logger.info(f"  new entities include: {', '.join(report['sample_added'])}")
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Import a legacy SQLite database into maga_ops.db")
+    parser.add_argument("legacy_db", help="Path to the legacy database")
+    parser.add_argument("db_type", choices=sorted(LEGACY_MAPPINGS), help="Kind of legacy database")
+    parser.add_argument("--db", default=DB_PATH, help="Path to the target database")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without changing it")
+    parser.add_argument(
+        "--match-threshold",
+        type=float,
+        default=DEFAULT_MATCH_THRESHOLD,
+        help="Minimum name similarity to reuse an existing entity (1.0 = exact only)"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main execution function."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    try:
+        report = import_legacy_db(args.legacy_db, args.db_type, args.db, args.dry_run, args.match_threshold)
+    except Exception as e:
+        logger.error(f"Import of {args.legacy_db} failed, no changes were made: {e}")
+        sys.exit(1)
+    log_report(args.legacy_db, report, args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,6 @@ import sys
 import json
 import sqlite3
 import yaml
-import shutil
 import pickle
 from datetime import datetime
 import logging
@@ -40,6 +39,15 @@ BACKUPS_DIR = os.path.join(PROJECT_ROOT, 'backups')
 MIGRATED_FILES_DIR = os.path.join(BACKUPS_DIR, 'migrated_data_files')
 OLD_DATABASES_DIR = os.path.join(BACKUPS_DIR, 'old_databases')
 
+# Minimum name similarity for a migrated record to match an existing entity;
+# 1.0 matches exact names only, lower it to merge spelling variants
+NAME_MATCH_THRESHOLD = 1.0
+
+sys.path.append(PROJECT_ROOT)
+from scripts.utils.name_matching import NameIndex
+from scripts.utils.db_backup import online_backup
+from import_legacy_db import import_legacy_db, log_report as log_legacy_report
+
 # Migration tracking
 migrated_files = []
 failed_files = []
@@ -48,8 +56,7 @@ def backup_database():
     """Create a backup of the current database before migration."""
     try:
         if os.path.exists(DB_PATH):
-            shutil.copy2(DB_PATH, BACKUP_DB_PATH)
-            logger.info(f"Created database backup at {BACKUP_DB_PATH}")
+            online_backup(DB_PATH, BACKUP_DB_PATH)
             return True
         else:
             logger.warning(f"Database file not found at {DB_PATH}. No backup created.")
@@ -91,6 +98,27 @@ def load_json_file(file_path):
         logger.error(f"Error loading JSON file {file_path}: {e}")
         return None
 
+def build_name_index(cursor, entity_type):
+    """Index the normalized names of existing entities of a type for fuzzy lookup."""
+    cursor.execute("SELECT id, normalized_name FROM entities WHERE entity_type = ?", (entity_type,))
+    index = NameIndex()
+    index.add_many((row['id'], row['normalized_name']) for row in cursor.fetchall())
+    return index
+
+def find_entity_id(cursor, name_index, normalized_name, entity_type):
+    """Find an entity by exact normalized name, falling back to the most similar name."""
+    cursor.execute("SELECT id FROM entities WHERE normalized_name = ? AND entity_type = ?",
+                   (normalized_name, entity_type))
+    entity = cursor.fetchone()
+    if entity or NAME_MATCH_THRESHOLD >= 1.0:
+        return entity['id'] if entity else None
+    
+    match = name_index.best_match(normalized_name, NAME_MATCH_THRESHOLD)
+    if match:
+        logger.info(f"Matched '{normalized_name}' to existing {entity_type} {match[0]} (similarity {match[1]:.2f})")
+        return match[0]
+    return None
+
 def migrate_influencers_json(file_path):
     """Migrate influencers data from JSON file."""
     logger.info(f"Migrating influencers from {file_path}")
@@ -106,21 +134,21 @@ def migrate_influencers_json(file_path):
     migrated_count = 0
     
     try:
+        name_index = build_name_index(cursor, 'influencer') if NAME_MATCH_THRESHOLD < 1.0 else NameIndex()
+        
         for influencer in data:
             # Check if entity already exists
-            cursor.execute("SELECT id FROM entities WHERE normalized_name = ? AND entity_type = 'influencer'", 
-                          (influencer.get('normalized_name'),))
-            entity = cursor.fetchone()
+            entity_id = find_entity_id(cursor, name_index, influencer.get('normalized_name'), 'influencer')
             
-            if entity:
+            if entity_id:
                 # Update existing entity
-                entity_id = entity['id']
                 logger.info(f"Updating existing influencer: {influencer.get('name')} (ID: {entity_id})")
                 
-                # Update entities table
+                # Update entities table; a similar-name match keeps its stored name,
+                # so name and normalized_name never disagree
                 cursor.execute("""
                     UPDATE entities SET 
-                    name = ?,
+                    name = CASE WHEN normalized_name = ? THEN ? ELSE name END,
                     bio = ?,
                     twitter_handle = ?,
                     instagram_handle = ?,
@@ -131,6 +159,7 @@ def migrate_influencers_json(file_path):
                     relevance_score = ?
                     WHERE id = ?
                 """, (
+                    influencer.get('normalized_name'),
                     influencer.get('name'),
                     influencer.get('bio'),
                     influencer.get('twitter_handle'),
@@ -183,6 +212,7 @@ def migrate_influencers_json(file_path):
                 ))
                 
                 entity_id = cursor.lastrowid
+                name_index.add(entity_id, influencer.get('normalized_name'))
                 
                 # Insert into influencers table
                 cursor.execute("""
@@ -213,160 +243,26 @@ def migrate_influencers_json(file_path):
     finally:
         conn.close()
 
-def migrate_legislators_yaml(file_path):
-    """Migrate legislators data from YAML file."""
-    logger.info(f"Migrating legislators from {file_path}")
-    
-    data = load_yaml_file(file_path)
-    if not data:
-        logger.error(f"Failed to load legislators data from {file_path}")
-        failed_files.append(file_path)
-        return False
-    
-    conn = get_connection()
-    cursor = conn.cursor()
-    migrated_count = 0
-    
+def migrate_legislators_yaml():
+    """Migrate legislators from the current and historical YAML files."""
+    # Imported here so the engine's logging setup doesn't replace ours
+    from migrate_legislators import SOURCES, run_migration, log_report
+
+    file_paths = [
+        path for path in (SOURCES['legislators_current'], SOURCES['legislators_historical'])
+        if os.path.exists(path)
+    ]
+    logger.info(f"Migrating legislators from {', '.join(file_paths)}")
+
     try:
-        for legislator in data:
-            # Extract basic information
-            name_data = legislator.get('name', {})
-            full_name = name_data.get('official_full')
-            if not full_name:
-                # Fallback to constructing from first/last
-                first = name_data.get('first', '')
-                middle = name_data.get('middle', '')
-                last = name_data.get('last', '')
-                full_name = f"{first} {middle} {last}".strip().replace('  ', ' ')
-            
-            normalized_name = full_name.lower()
-            
-            bio_data = legislator.get('bio', {})
-            gender = bio_data.get('gender')
-            birthday = bio_data.get('birthday')
-            
-            # Get bioguide id for unique identification
-            ids = legislator.get('id', {})
-            bioguide_id = ids.get('bioguide')
-            fec_candidate_id = ids.get('fec')
-            
-            # Get most recent term
-            terms = legislator.get('terms', [])
-            current_term = terms[-1] if terms else {}
-            
-            state = current_term.get('state')
-            district = current_term.get('district')
-            party = current_term.get('party')
-            office = current_term.get('type', '').upper()  # 'sen' or 'rep'
-            if office == 'SEN':
-                office = 'Senator'
-            elif office == 'REP':
-                office = 'Representative'
-            
-            # Format known_affiliations to include party
-            known_affiliations = f"Party: {party}" if party else None
-            
-            # Check if entity already exists
-            cursor.execute("""
-                SELECT entities.id FROM entities 
-                JOIN politicians ON entities.id = politicians.entity_id
-                WHERE politicians.bioguide_id = ?
-            """, (bioguide_id,))
-            entity = cursor.fetchone()
-            
-            if entity:
-                # Update existing entity
-                entity_id = entity['id']
-                logger.info(f"Updating existing politician: {full_name} (ID: {entity_id})")
-                
-                # Update entities table
-                cursor.execute("""
-                    UPDATE entities SET 
-                    name = ?,
-                    normalized_name = ?,
-                    bio = ?,
-                    twitter_handle = ?,
-                    last_updated = ?,
-                    known_affiliations = ?
-                    WHERE id = ?
-                """, (
-                    full_name,
-                    normalized_name,
-                    f"{office} from {state}. {gender}",
-                    None,  # twitter_handle will be updated in social media migration
-                    datetime.now().strftime('%Y-%m-%d'),
-                    known_affiliations,
-                    entity_id
-                ))
-                
-                # Update politicians table
-                cursor.execute("""
-                    UPDATE politicians SET
-                    office = ?,
-                    state = ?,
-                    district = ?,
-                    bioguide_id = ?,
-                    fec_candidate_id = ?
-                    WHERE entity_id = ?
-                """, (
-                    office,
-                    state,
-                    district,
-                    bioguide_id,
-                    fec_candidate_id,
-                    entity_id
-                ))
-            else:
-                # Insert new entity
-                logger.info(f"Adding new politician: {full_name}")
-                
-                # Insert into entities table
-                cursor.execute("""
-                    INSERT INTO entities (
-                    name, normalized_name, bio, twitter_handle, 
-                    first_appearance_date, last_updated, entity_type, known_affiliations
-                    ) VALUES (?, ?, ?, ?, ?, ?, 'politician', ?)
-                """, (
-                    full_name,
-                    normalized_name,
-                    f"{office} from {state}. {gender}",
-                    None,  # twitter_handle will be updated in social media migration
-                    datetime.now().strftime('%Y-%m-%d'),
-                    datetime.now().strftime('%Y-%m-%d'),
-                    known_affiliations
-                ))
-                
-                entity_id = cursor.lastrowid
-                
-                # Insert into politicians table
-                cursor.execute("""
-                    INSERT INTO politicians (
-                    entity_id, office, state, district, bioguide_id, fec_candidate_id
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    entity_id,
-                    office,
-                    state,
-                    district,
-                    bioguide_id,
-                    fec_candidate_id
-                ))
-            
-            migrated_count += 1
-        
-        conn.commit()
-        logger.info(f"Successfully migrated {migrated_count} legislators from {file_path}")
-        migrated_files.append(file_path)
-        return True
-    
+        log_report(run_migration(DB_PATH, ['legislators']))
     except Exception as e:
-        conn.rollback()
-        logger.error(f"Error migrating legislators from {file_path}: {e}")
-        failed_files.append(file_path)
+        logger.error(f"Error migrating legislators: {e}")
+        failed_files.extend(file_paths)
         return False
-    
-    finally:
-        conn.close()
+
+    migrated_files.extend(file_paths)
+    return True
 
 def migrate_legislators_social_media(file_path):
     """Migrate social media data for legislators."""
@@ -450,238 +346,16 @@ def migrate_old_sqlite_db(db_path, db_type):
     logger.info(f"Migrating data from old SQLite database: {db_path}")
     
     try:
-        # Connect to old database
-        old_conn = sqlite3.connect(db_path)
-        old_conn.row_factory = sqlite3.Row
-        old_cursor = old_conn.cursor()
-        
-        # Connect to new database
-        new_conn = get_connection()
-        new_cursor = new_conn.cursor()
-        
-        if db_type == 'politicians':
-            # Get table structure
-            old_cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row['name'] for row in old_cursor.fetchall()]
-            
-            if 'politicians' in tables:
-                # Get politicians data
-                old_cursor.execute("SELECT * FROM politicians")
-                politicians = old_cursor.fetchall()
-                
-                migrated_count = 0
-                
-                for politician in politicians:
-                    # Convert to dict for easier handling
-                    p_dict = dict(politician)
-                    
-                    # Prepare normalized name
-                    normalized_name = p_dict.get('name', '').lower() if p_dict.get('name') else ''
-                    
-                    # Prepare party as known_affiliations
-                    party = p_dict.get('party')
-                    known_affiliations = f"Party: {party}" if party else None
-                    
-                    # Check if entity already exists
-                    new_cursor.execute("SELECT id FROM entities WHERE normalized_name = ? AND entity_type = 'politician'", 
-                                      (normalized_name,))
-                    entity = new_cursor.fetchone()
-                    
-                    if entity:
-                        # Update existing entity
-                        entity_id = entity['id']
-                        logger.info(f"Updating existing politician from old DB: {p_dict.get('name')} (ID: {entity_id})")
-                        
-                        # Update entities table
-                        new_cursor.execute("""
-                            UPDATE entities SET 
-                            name = ?,
-                            bio = ?,
-                            twitter_handle = ?,
-                            last_updated = ?,
-                            known_affiliations = ?
-                            WHERE id = ?
-                        """, (
-                            p_dict.get('name'),
-                            p_dict.get('bio'),
-                            p_dict.get('twitter'),
-                            datetime.now().strftime('%Y-%m-%d'),
-                            known_affiliations,
-                            entity_id
-                        ))
-                        
-                        # Update politicians table
-                        new_cursor.execute("""
-                            UPDATE politicians SET
-                            office = ?,
-                            state = ?,
-                            district = ?,
-                            bioguide_id = ?,
-                            fec_candidate_id = ?
-                            WHERE entity_id = ?
-                        """, (
-                            p_dict.get('role'),
-                            p_dict.get('state'),
-                            p_dict.get('district'),
-                            p_dict.get('bioguide_id'),
-                            p_dict.get('fec_id'),
-                            entity_id
-                        ))
-                    else:
-                        # Insert new entity
-                        logger.info(f"Adding new politician from old DB: {p_dict.get('name')}")
-                        
-                        # Insert into entities table
-                        new_cursor.execute("""
-                            INSERT INTO entities (
-                            name, normalized_name, bio, twitter_handle, 
-                            first_appearance_date, last_updated, entity_type, known_affiliations
-                            ) VALUES (?, ?, ?, ?, ?, ?, 'politician', ?)
-                        """, (
-                            p_dict.get('name'),
-                            normalized_name,
-                            p_dict.get('bio'),
-                            p_dict.get('twitter'),
-                            datetime.now().strftime('%Y-%m-%d'),
-                            datetime.now().strftime('%Y-%m-%d'),
-                            known_affiliations
-                        ))
-                        
-                        entity_id = new_cursor.lastrowid
-                        
-                        # Insert into politicians table
-                        new_cursor.execute("""
-                            INSERT INTO politicians (
-                            entity_id, office, state, district, bioguide_id, fec_candidate_id
-                            ) VALUES (?, ?, ?, ?, ?, ?)
-                        """, (
-                            entity_id,
-                            p_dict.get('role'),
-                            p_dict.get('state'),
-                            p_dict.get('district'),
-                            p_dict.get('bioguide_id'),
-                            p_dict.get('fec_id')
-                        ))
-                    
-                    migrated_count += 1
-                
-                new_conn.commit()
-                logger.info(f"Successfully migrated {migrated_count} politicians from old database")
-                migrated_files.append(db_path)
-                
-        elif db_type == 'influencers':
-            # Get table structure
-            old_cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row['name'] for row in old_cursor.fetchall()]
-            
-            if 'influencers' in tables:
-                # Get influencers data
-                old_cursor.execute("SELECT * FROM influencers")
-                influencers = old_cursor.fetchall()
-                
-                migrated_count = 0
-                
-                for influencer in influencers:
-                    # Convert to dict for easier handling
-                    i_dict = dict(influencer)
-                    
-                    # Prepare normalized name
-                    normalized_name = i_dict.get('name', '').lower() if i_dict.get('name') else ''
-                    
-                    # Check if entity already exists
-                    new_cursor.execute("SELECT id FROM entities WHERE normalized_name = ? AND entity_type = 'influencer'", 
-                                      (normalized_name,))
-                    entity = new_cursor.fetchone()
-                    
-                    if entity:
-                        # Update existing entity
-                        entity_id = entity['id']
-                        logger.info(f"Updating existing influencer from old DB: {i_dict.get('name')} (ID: {entity_id})")
-                        
-                        # Update entities table
-                        new_cursor.execute("""
-                            UPDATE entities SET 
-                            name = ?,
-                            bio = ?,
-                            twitter_handle = ?,
-                            last_updated = ?
-                            WHERE id = ?
-                        """, (
-                            i_dict.get('name'),
-                            i_dict.get('bio'),
-                            i_dict.get('twitter'),
-                            datetime.now().strftime('%Y-%m-%d'),
-                            entity_id
-                        ))
-                        
-                        # Update influencers table
-                        new_cursor.execute("""
-                            UPDATE influencers SET
-                            platform = ?,
-                            audience_size = ?,
-                            content_focus = ?
-                            WHERE entity_id = ?
-                        """, (
-                            i_dict.get('platform'),
-                            i_dict.get('followers'),
-                            i_dict.get('focus'),
-                            entity_id
-                        ))
-                    else:
-                        # Insert new entity
-                        logger.info(f"Adding new influencer from old DB: {i_dict.get('name')}")
-                        
-                        # Insert into entities table
-                        new_cursor.execute("""
-                            INSERT INTO entities (
-                            name, normalized_name, bio, twitter_handle, 
-                            first_appearance_date, last_updated, entity_type
-                            ) VALUES (?, ?, ?, ?, ?, ?, 'influencer')
-                        """, (
-                            i_dict.get('name'),
-                            normalized_name,
-                            i_dict.get('bio'),
-                            i_dict.get('twitter'),
-                            datetime.now().strftime('%Y-%m-%d'),
-                            datetime.now().strftime('%Y-%m-%d')
-                        ))
-                        
-                        entity_id = new_cursor.lastrowid
-                        
-                        # Insert into influencers table
-                        new_cursor.execute("""
-                            INSERT INTO influencers (
-                            entity_id, platform, audience_size, content_focus
-                            ) VALUES (?, ?, ?, ?)
-                        """, (
-                            entity_id,
-                            i_dict.get('platform'),
-                            i_dict.get('followers'),
-                            i_dict.get('focus')
-                        ))
-                    
-                    migrated_count += 1
-                
-                new_conn.commit()
-                logger.info(f"Successfully migrated {migrated_count} influencers from old database")
-                migrated_files.append(db_path)
-        
-        elif db_type == 'influencers_ai':
-            # Try to migrate AI-related data if available
-            pass
-        
-        return True
-    
+        report = import_legacy_db(db_path, db_type, DB_PATH, threshold=NAME_MATCH_THRESHOLD)
     except Exception as e:
         logger.error(f"Error migrating from old database {db_path}: {e}")
         failed_files.append(db_path)
         return False
     
-    finally:
-        if 'old_conn' in locals() and old_conn:
-            old_conn.close()
-        if 'new_conn' in locals() and new_conn:
-            new_conn.close()
+    if report:
+        log_legacy_report(db_path, report)
+        migrated_files.append(db_path)
+    return True
 
 def generate_migration_report():
     """Generate a report of the migration results."""
@@ -720,14 +394,7 @@ def main():
             return
     
     # Migrate legislators data from YAML files
-    legislators_files = [
-        os.path.join(MIGRATED_FILES_DIR, 'legislators-current.yaml'),
-        os.path.join(PROJECT_ROOT, 'legislators-historical.yaml')
-    ]
-    
-    for file_path in legislators_files:
-        if os.path.exists(file_path):
-            migrate_legislators_yaml(file_path)
+    migrate_legislators_yaml()
     
     # Migrate social media data
     social_media_file = os.path.join(MIGRATED_FILES_DIR, 'legislators-social-media.yaml')
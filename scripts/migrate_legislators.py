@@ -0,0 +1,978 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Legislator Data Migration Engine
+
+Migrates the congress-legislators YAML datasets into maga_ops.db in a
+single pass. It replaces the per-dataset migrate_* scripts (office data,
+election year, bio info, images, social media, district offices and
+committees) and migrate_all_data's legislator import, which now just
+run their stage of this engine.
+
+Each YAML source is parsed at most once per run with the libyaml loader.
+Rows are staged into temp tables, and each stage is applied with bulk
+UPDATE ... FROM / INSERT ... SELECT statements. All stages share a
+single transaction, so a failure leaves the database untouched. Per-stage
+timings and row counts are logged at the end.
+
+Usage:
+    python scripts/migrate_legislators.py [--stages bio_info,images] [--db PATH] [--backup]
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("legislator_migration_log.txt"),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger("legislator_migration")
+
+# Project paths
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(PROJECT_ROOT, 'maga_ops.db')
+BACKUPS_DIR = os.path.join(PROJECT_ROOT, 'backups')
+MIGRATED_FILES_DIR = os.path.join(BACKUPS_DIR, 'migrated_data_files')
+
+sys.path.append(PROJECT_ROOT)
+from scripts.utils.db_backup import online_backup
+
+# YAML sources, by name
+SOURCES = {
+    'legislators_current': os.path.join(MIGRATED_FILES_DIR, 'legislators-current.yaml'),
+    'legislators_historical': os.path.join(PROJECT_ROOT, 'legislators-historical.yaml'),
+    'social_media': os.path.join(MIGRATED_FILES_DIR, 'legislators-social-media.yaml'),
+    'district_offices': os.path.join(MIGRATED_FILES_DIR, 'legislators-district-offices.yaml'),
+    'committees_current': os.path.join(MIGRATED_FILES_DIR, 'committees-current.yaml'),
+    'committees_historical': os.path.join(MIGRATED_FILES_DIR, 'committees-historical.yaml'),
+    'committee_membership': os.path.join(MIGRATED_FILES_DIR, 'committee-membership-current.yaml'),
+}
+
+# Bios at least this long are considered detailed and left alone
+DETAILED_BIO_LENGTH = 100
+
+TABLE_DDL = {
+    'committees': """
+        CREATE TABLE IF NOT EXISTS committees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            committee_id TEXT UNIQUE,
+            name TEXT,
+            type TEXT,
+            jurisdiction TEXT,
+            url TEXT,
+            address TEXT,
+            phone TEXT,
+            chamber TEXT,
+            parent_id TEXT,
+            active INTEGER DEFAULT 1,
+            metadata TEXT
+        )
+    """,
+    'committee_memberships': """
+        CREATE TABLE IF NOT EXISTS committee_memberships (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            committee_id TEXT,
+            politician_id INTEGER,
+            title TEXT,
+            rank INTEGER,
+            start_date TEXT,
+            end_date TEXT,
+            FOREIGN KEY (politician_id) REFERENCES politicians (entity_id),
+            FOREIGN KEY (committee_id) REFERENCES committees (committee_id)
+        )
+    """,
+    'district_offices': """
+        CREATE TABLE IF NOT EXISTS district_offices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            politician_id INTEGER,
+            office_name TEXT,
+            address TEXT,
+            suite TEXT,
+            building TEXT,
+            city TEXT,
+            state TEXT,
+            zip TEXT,
+            phone TEXT,
+            fax TEXT,
+            latitude REAL,
+            longitude REAL,
+            is_main_office INTEGER DEFAULT 0,
+            office_type TEXT DEFAULT 'district',
+            metadata TEXT,
+            FOREIGN KEY (politician_id) REFERENCES politicians (entity_id)
+        )
+    """,
+}
+
+class MigrationRun:
+    """State shared by the stages of one migration run.
+
+    Holds the connection, parses each source on first use, remembers which
+    staging tables exist, and records per-stage timings and counts.
+    """
+
+    def __init__(self, conn, sources=SOURCES):
+        self.conn = conn
+        self.sources = sources
+        self.report = []
+        self._parsed = {}
+        self._staged = set()
+
+    def source(self, name):
+        """Parsed contents of a YAML source, or None if it is missing or unreadable."""
+        if name not in self._parsed:
+            path = self.sources[name]
+            started = time.perf_counter()
+            data = None
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        data = yaml.load(f, Loader=SafeLoader)
+                except Exception as e:
+                    logger.error(f"Error loading YAML file {path}: {e}")
+            else:
+                logger.warning(f"Source file not found: {path}")
+            self._parsed[name] = data
+            self.record(f"parse {os.path.basename(path)}", time.perf_counter() - started,
+                        {'records': len(data) if data else 0})
+        return self._parsed[name]
+
+    def record(self, name, seconds, counts):
+        self.report.append((name, seconds, counts))
+
+    def stage_once(self, name, build):
+        """Build a staging table the first time a stage needs it."""
+        if name not in self._staged:
+            started = time.perf_counter()
+            counts = build(self)
+            self._staged.add(name)
+            self.record(f"stage {name}", time.perf_counter() - started, counts)
+
+def create_staging_table(conn, name, columns, rows):
+    """(Re)create a temp table and bulk-load rows into it.
+
+    Rows conflicting on the table's key replace earlier ones, so the last
+    occurrence in the source wins.
+    """
+    conn.execute(f"DROP TABLE IF EXISTS temp.{name}")
+    conn.execute(f"CREATE TEMP TABLE {name} ({', '.join(columns)})")
+    width = sum(1 for column in columns if not column.startswith('PRIMARY KEY'))
+    placeholders = ", ".join("?" * width)
+    conn.executemany(f"INSERT OR REPLACE INTO temp.{name} VALUES ({placeholders})", rows)
+
+def load_positions(value):
+    """Parse an official_positions value; None if it holds JSON that isn't an object."""
+    if not value:
+        return {}
+    try:
+        data = json.loads(value)
+    except (TypeError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else None
+
+def dump_json(data):
+    # YAML may yield dates; store them as ISO strings
+    return json.dumps(data, default=str)
+
+# ======== Legislator staging ========
+
+def office_title(term_type):
+    """Office name for a term type ('sen' -> 'Senator', 'rep' -> 'Representative')."""
+    office_type = (term_type or '').upper()
+    if office_type == 'SEN':
+        return 'Senator'
+    if office_type == 'REP':
+        return 'Representative'
+    return office_type.capitalize()
+
+def legislator_row(legislator, is_current):
+    """Flatten one legislator record into a legislator_stage row, or None without a bioguide ID."""
+    ids = legislator.get('id', {})
+    bioguide_id = ids.get('bioguide')
+    if not bioguide_id:
+        return None
+
+    name_data = legislator.get('name', {})
+    full_name = name_data.get('official_full')
+    if not full_name:
+        # Fallback to constructing from first/last
+        first = name_data.get('first', '')
+        middle = name_data.get('middle', '')
+        last = name_data.get('last', '')
+        full_name = f"{first} {middle} {last}".strip().replace('  ', ' ')
+
+    bio_data = legislator.get('bio', {})
+    terms = legislator.get('terms', [])
+    current_term = terms[-1] if terms else {}
+
+    # Politicians hold one FEC candidate ID; the dataset lists all of them
+    fec_candidate_id = ids.get('fec')
+    if isinstance(fec_candidate_id, list):
+        fec_candidate_id = fec_candidate_id[0] if fec_candidate_id else None
+
+    # migrate_all_data's import kept the raw upper-cased type for other offices
+    term_type = current_term.get('type', '').upper()
+    import_office = {'SEN': 'Senator', 'REP': 'Representative'}.get(term_type, term_type)
+    state = current_term.get('state')
+    party = current_term.get('party')
+
+    start_date = str(current_term.get('start') or '')
+    election_year = int(start_date[:4]) if len(start_date) >= 4 and start_date[:4].isdigit() else None
+
+    return (
+        bioguide_id,
+        full_name,
+        full_name.lower(),
+        f"{import_office} from {state}. {bio_data.get('gender')}",
+        f"Party: {party}" if party else None,
+        import_office,
+        office_title(current_term.get('type')) if terms else None,
+        state,
+        current_term.get('district'),
+        fec_candidate_id,
+        election_year,
+        1 if terms else 0,
+        1 if is_current else 0,
+    )
+
+def build_legislator_stage(run):
+    """Stage one row per legislator from the current and historical datasets."""
+    rows = []
+    skipped = 0
+    total = 0
+    # Current data wins over historical for a legislator in both files
+    for name, is_current in (('legislators_historical', False), ('legislators_current', True)):
+        for legislator in run.source(name) or []:
+            total += 1
+            row = legislator_row(legislator, is_current)
+            if row is None:
+                skipped += 1
+            else:
+                rows.append(row)
+
+    create_staging_table(run.conn, 'legislator_stage', [
+        'bioguide_id TEXT PRIMARY KEY', 'full_name TEXT', 'normalized_name TEXT',
+        'import_bio TEXT', 'known_affiliations TEXT', 'import_office TEXT', 'office TEXT',
+        'state TEXT', 'district', 'fec_candidate_id TEXT', 'election_year INTEGER',
+        'has_terms INTEGER', 'is_current INTEGER', 'entity_id INTEGER', 'is_new INTEGER',
+    ], [row + (None, 0) for row in rows])
+    return {'records': total, 'staged': len(rows), 'missing_bioguide': skipped}
+
+def stage_legislators(run):
+    """Create or update entity and politician rows for every legislator."""
+    run.stage_once('legislator_stage', build_legislator_stage)
+    conn = run.conn
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    # Link staged legislators to the politicians already present
+    conn.execute("""
+        UPDATE temp.legislator_stage SET entity_id = p.entity_id
+        FROM politicians p WHERE p.bioguide_id = legislator_stage.bioguide_id
+    """)
+
+    # A rename that collides with another entity's normalized name is skipped
+    updated = conn.execute("""
+        UPDATE OR IGNORE entities SET
+            name = s.full_name,
+            normalized_name = s.normalized_name,
+            bio = s.import_bio,
+            twitter_handle = NULL,
+            last_updated = ?,
+            known_affiliations = s.known_affiliations
+        FROM temp.legislator_stage s
+        WHERE entities.id = s.entity_id
+    """, (today,)).rowcount
+    conn.execute("""
+        UPDATE politicians SET
+            office = s.import_office,
+            state = s.state,
+            district = s.district,
+            fec_candidate_id = s.fec_candidate_id
+        FROM temp.legislator_stage s
+        WHERE politicians.entity_id = s.entity_id
+    """)
+
+    # New legislators: insert entities, then link them back by normalized name
+    conn.execute("UPDATE temp.legislator_stage SET is_new = 1 WHERE entity_id IS NULL")
+    conn.execute("""
+        INSERT INTO entities (
+            name, normalized_name, bio, twitter_handle,
+            first_appearance_date, last_updated, entity_type, known_affiliations
+        )
+        SELECT full_name, normalized_name, import_bio, NULL, ?, ?, 'politician', known_affiliations
+        FROM temp.legislator_stage WHERE is_new = 1
+        ORDER BY rowid
+        ON CONFLICT DO NOTHING
+    """, (today, today))
+    conn.execute("""
+        UPDATE temp.legislator_stage SET entity_id = e.id
+        FROM entities e
+        WHERE legislator_stage.is_new = 1
+          AND e.normalized_name = legislator_stage.normalized_name
+          AND e.entity_type = 'politician'
+          AND NOT EXISTS (SELECT 1 FROM politicians p WHERE p.entity_id = e.id)
+    """)
+    # Legislators sharing a name with another politician stay unlinked
+    added = conn.execute("""
+        INSERT INTO politicians (entity_id, office, state, district, bioguide_id, fec_candidate_id)
+        SELECT entity_id, import_office, state, district, bioguide_id, fec_candidate_id
+        FROM temp.legislator_stage WHERE is_new = 1 AND entity_id IS NOT NULL
+        ORDER BY rowid
+        ON CONFLICT DO NOTHING
+    """).rowcount
+    new = conn.execute("SELECT COUNT(*) FROM temp.legislator_stage WHERE is_new = 1").fetchone()[0]
+    existing = conn.execute("SELECT COUNT(*) FROM temp.legislator_stage WHERE is_new = 0").fetchone()[0]
+
+    return {'updated': updated, 'added': added, 'name_conflicts': (existing - updated) + (new - added)}
+
+def stage_office_data(run):
+    """Set each politician's office and district from their most recent term."""
+    run.stage_once('legislator_stage', build_legislator_stage)
+    conn = run.conn
+
+    mismatched = conn.execute("""
+        SELECT COUNT(*) FROM temp.legislator_stage s
+        JOIN politicians p ON p.bioguide_id = s.bioguide_id
+        WHERE s.has_terms = 1 AND s.state IS NOT NULL AND p.state IS NOT NULL AND s.state != p.state
+    """).fetchone()[0]
+    if mismatched:
+        logger.warning(f"{mismatched} politicians have a different state in the database; updating anyway")
+
+    updated = conn.execute("""
+        UPDATE politicians SET office = s.office, district = s.district
+        FROM temp.legislator_stage s
+        WHERE politicians.bioguide_id = s.bioguide_id AND s.has_terms = 1
+    """).rowcount
+    staged = conn.execute("SELECT COUNT(*) FROM temp.legislator_stage WHERE has_terms = 1").fetchone()[0]
+    return {'updated': updated, 'missing': staged - updated, 'state_mismatches': mismatched}
+
+def stage_election_year(run):
+    """Set each politician's election year from the start of their most recent term."""
+    run.stage_once('legislator_stage', build_legislator_stage)
+    conn = run.conn
+
+    updated = conn.execute("""
+        UPDATE politicians SET election_year = s.election_year
+        FROM temp.legislator_stage s
+        WHERE politicians.bioguide_id = s.bioguide_id AND s.election_year IS NOT NULL
+    """).rowcount
+    staged = conn.execute(
+        "SELECT COUNT(*) FROM temp.legislator_stage WHERE election_year IS NOT NULL"
+    ).fetchone()[0]
+    return {'updated': updated, 'missing': staged - updated}
+
+# ======== Biographical information ========
+
+def calculate_years_in_office(terms):
+    """Calculate total years in office based on terms."""
+    total_years = 0
+    for term in terms or []:
+        if 'start' in term and 'end' in term:
+            try:
+                start_year = int(str(term['start']).split('-')[0])
+                end_year = int(str(term['end']).split('-')[0])
+                total_years += end_year - start_year
+            except (ValueError, IndexError):
+                continue
+    return total_years
+
+def extract_bio_info(legislator):
+    """Extract biographical information from legislator data."""
+    bio_info = {}
+
+    if 'bio' in legislator:
+        bio_data = legislator['bio']
+
+        if 'birthday' in bio_data:
+            bio_info['birthday'] = bio_data['birthday']
+
+            # Calculate age if birthday is available
+            try:
+                birth_year = int(str(bio_data['birthday']).split('-')[0])
+                bio_info['age'] = datetime.now().year - birth_year
+            except (ValueError, IndexError):
+                pass
+
+        if 'gender' in bio_data:
+            bio_info['gender'] = bio_data['gender']
+
+        if 'religion' in bio_data:
+            bio_info['religion'] = bio_data['religion']
+
+    terms = legislator.get('terms')
+    if terms:
+        bio_info['first_term'] = terms[0]
+        bio_info['most_recent_term'] = terms[-1]
+        bio_info['years_in_office'] = calculate_years_in_office(terms)
+
+        positions = {term['type'] for term in terms if 'type' in term}
+        if positions:
+            bio_info['positions_held'] = list(positions)
+
+    if 'name' in legislator:
+        name_data = legislator['name']
+
+        if 'official_full' in name_data:
+            bio_info['official_name'] = name_data['official_full']
+
+        for key in ['first', 'middle', 'last', 'suffix']:
+            if key in name_data:
+                bio_info[f'name_{key}'] = name_data[key]
+
+    return bio_info
+
+def format_bio_text(bio_info, name):
+    """Format biographical info into readable text."""
+    bio_parts = [f"{name} "]
+
+    if 'gender' in bio_info:
+        if bio_info['gender'] == 'M':
+            bio_parts.append("is a male ")
+        elif bio_info['gender'] == 'F':
+            bio_parts.append("is a female ")
+        else:
+            bio_parts.append("is a ")
+
+    term = bio_info.get('most_recent_term', {})
+    if 'type' in term:
+        term_type = term['type']
+        if term_type == 'sen':
+            bio_parts.append("Senator ")
+        elif term_type == 'rep':
+            bio_parts.append("Representative ")
+
+        if 'state' in term:
+            bio_parts.append(f"from {term['state']} ")
+
+            if term_type == 'rep' and 'district' in term:
+                bio_parts.append(f"district {term['district']} ")
+
+    if 'party' in term:
+        bio_parts.append(f"who is a member of the {term['party']} party. ")
+    else:
+        bio_parts.append(". ")
+
+    if 'birthday' in bio_info:
+        bio_parts.append(f"Born on {bio_info['birthday']}")
+
+        if 'age' in bio_info:
+            bio_parts.append(f", currently {bio_info['age']} years old. ")
+        else:
+            bio_parts.append(". ")
+
+    if bio_info.get('years_in_office', 0) > 0:
+        bio_parts.append(f"Has served approximately {bio_info['years_in_office']} years in office. ")
+
+    if bio_info.get('religion'):
+        bio_parts.append(f"Religion: {bio_info['religion']}. ")
+
+    return "".join(bio_parts).strip()
+
+def stage_bio_info(run):
+    """Write generated bios and biographical details for current legislators without a detailed bio."""
+    conn = run.conn
+    legislators_by_id = {
+        legislator['id']['bioguide']: legislator
+        for legislator in run.source('legislators_current') or []
+        if 'bioguide' in legislator.get('id', {})
+    }
+
+    rows = []
+    not_current = unchanged = 0
+    politicians = conn.execute("""
+        SELECT p.bioguide_id, p.entity_id, e.name, e.bio, e.official_positions
+        FROM politicians p
+        JOIN entities e ON p.entity_id = e.id
+        WHERE p.bioguide_id IS NOT NULL
+    """).fetchall()
+    for bioguide_id, entity_id, name, bio, official_positions in politicians:
+        legislator = legislators_by_id.get(bioguide_id)
+        if legislator is None:
+            not_current += 1
+            continue
+        if bio and len(bio) > DETAILED_BIO_LENGTH:
+            unchanged += 1
+            continue
+
+        bio_info = extract_bio_info(legislator)
+        positions = load_positions(official_positions)
+        if not bio_info or positions is None:
+            unchanged += 1
+            continue
+        positions.setdefault('biographical_details', {}).update(bio_info)
+        rows.append((entity_id, format_bio_text(bio_info, name), dump_json(positions)))
+
+    create_staging_table(conn, 'bio_stage', [
+        'entity_id INTEGER PRIMARY KEY', 'bio TEXT', 'official_positions TEXT',
+    ], rows)
+    updated = conn.execute("""
+        UPDATE entities SET bio = s.bio, official_positions = s.official_positions
+        FROM temp.bio_stage s WHERE entities.id = s.entity_id
+    """).rowcount
+    return {'processed': len(politicians), 'updated': updated, 'unchanged': unchanged, 'not_current': not_current}
+
+# ======== Images ========
+
+def generate_image_url(bioguide_id, name):
+    """Candidate image URLs for a politician from official sources."""
+    urls = {
+        # Congressional Pictorial Directory
+        "congress_url": f"https://bioguide.congress.gov/bioguide/photo/{bioguide_id[0]}/{bioguide_id}.jpg"
+    }
+    if "Rep" in name or "Representative" in name:
+        urls["house_url"] = f"https://clerk.house.gov/images/members/{bioguide_id}.jpg"
+    if "Sen" in name or "Senator" in name:
+        last_name = name.split()[-1].lower()
+        urls["senate_url"] = f"https://www.senate.gov/senators/images/{last_name}_{bioguide_id}.jpg"
+    return urls
+
+def stage_images(run):
+    """Give politicians without an image the pictorial directory URL, keeping alternates in official_positions."""
+    conn = run.conn
+    rows = []
+    unchanged = 0
+    politicians = conn.execute("""
+        SELECT p.bioguide_id, p.entity_id, e.name, e.image_url, e.official_positions
+        FROM politicians p
+        JOIN entities e ON p.entity_id = e.id
+        WHERE p.bioguide_id IS NOT NULL AND p.bioguide_id != ''
+    """).fetchall()
+    for bioguide_id, entity_id, name, image_url, official_positions in politicians:
+        positions = load_positions(official_positions)
+        if image_url or positions is None:
+            unchanged += 1
+            continue
+        image_urls = generate_image_url(bioguide_id, name)
+        positions.setdefault('image_urls', {}).update(image_urls)
+        rows.append((entity_id, image_urls['congress_url'], dump_json(positions)))
+
+    create_staging_table(conn, 'image_stage', [
+        'entity_id INTEGER PRIMARY KEY', 'image_url TEXT', 'official_positions TEXT',
+    ], rows)
+    updated = conn.execute("""
+        UPDATE entities SET image_url = s.image_url, official_positions = s.official_positions
+        FROM temp.image_stage s WHERE entities.id = s.entity_id
+    """).rowcount
+    return {'processed': len(politicians), 'updated': updated, 'unchanged': unchanged}
+
+# ======== Social media ========
+
+def stage_social_media(run):
+    """Copy social media handles onto politician entities, other platforms into official_positions."""
+    conn = run.conn
+    records = run.source('social_media') or []
+    politicians = {
+        row[0]: row[1:]
+        for row in conn.execute("""
+            SELECT p.bioguide_id, p.entity_id, e.twitter_handle, e.official_positions
+            FROM politicians p
+            JOIN entities e ON p.entity_id = e.id
+            WHERE p.bioguide_id IS NOT NULL
+        """)
+    }
+
+    # entity_id -> [twitter, instagram, facebook, positions dict]; None = leave as is
+    updates = {}
+    positions_by_entity = {}
+    not_current = unchanged = 0
+    for record in records:
+        bioguide_id = record.get('id', {}).get('bioguide')
+        if not bioguide_id or bioguide_id not in politicians:
+            not_current += 1
+            continue
+        entity_id, twitter_handle, official_positions = politicians[bioguide_id]
+        social = record.get('social')
+        if not social:
+            unchanged += 1
+            continue
+
+        # Skip if Twitter is already populated with the same handle
+        if twitter_handle and 'twitter' in social:
+            if twitter_handle.replace('@', '') == str(social['twitter']).replace('@', ''):
+                unchanged += 1
+                continue
+
+        update = updates.setdefault(entity_id, [None, None, None, None])
+        if 'twitter' in social:
+            twitter = social['twitter']
+            if twitter and not str(twitter).startswith('@'):
+                twitter = '@' + str(twitter)
+            update[0] = (twitter,)
+        if 'instagram' in social:
+            update[1] = (social['instagram'],)
+        if 'facebook' in social:
+            facebook = social['facebook']
+            if facebook and 'facebook.com' not in str(facebook):
+                facebook = f"https://www.facebook.com/{facebook}"
+            update[2] = (facebook,)
+
+        # YouTube and other platforms are kept in official_positions
+        other_platforms = {k: v for k, v in social.items() if k not in ('twitter', 'instagram', 'facebook')}
+        if other_platforms:
+            if entity_id not in positions_by_entity:
+                positions_by_entity[entity_id] = load_positions(official_positions)
+            positions = positions_by_entity[entity_id]
+            if positions is not None:
+                positions.setdefault('social_media', {}).update(other_platforms)
+                update[3] = positions
+
+    rows = []
+    for entity_id, (twitter, instagram, facebook, positions) in updates.items():
+        rows.append((
+            entity_id,
+            twitter is not None, twitter[0] if twitter else None,
+            instagram is not None, instagram[0] if instagram else None,
+            facebook is not None, facebook[0] if facebook else None,
+            positions is not None, dump_json(positions) if positions is not None else None,
+        ))
+
+    create_staging_table(conn, 'social_stage', [
+        'entity_id INTEGER PRIMARY KEY',
+        'set_twitter INTEGER', 'twitter_handle TEXT',
+        'set_instagram INTEGER', 'instagram_handle TEXT',
+        'set_facebook INTEGER', 'facebook_url TEXT',
+        'set_positions INTEGER', 'official_positions TEXT',
+    ], rows)
+    updated = conn.execute("""
+        UPDATE entities SET
+            twitter_handle = CASE WHEN s.set_twitter THEN s.twitter_handle ELSE entities.twitter_handle END,
+            instagram_handle = CASE WHEN s.set_instagram THEN s.instagram_handle ELSE entities.instagram_handle END,
+            facebook_url = CASE WHEN s.set_facebook THEN s.facebook_url ELSE entities.facebook_url END,
+            official_positions = CASE WHEN s.set_positions THEN s.official_positions ELSE entities.official_positions END
+        FROM temp.social_stage s
+        WHERE entities.id = s.entity_id
+          AND (s.set_twitter OR s.set_instagram OR s.set_facebook OR s.set_positions)
+    """).rowcount
+    return {'processed': len(records), 'updated': updated, 'unchanged': unchanged, 'not_current': not_current}
+
+# ======== District offices ========
+
+DISTRICT_OFFICE_COLUMNS = (
+    'politician_id', 'office_name', 'address', 'suite', 'building', 'city', 'state', 'zip',
+    'phone', 'fax', 'latitude', 'longitude', 'is_main_office', 'office_type', 'metadata',
+)
+
+def stage_district_offices(run):
+    """Upsert district offices, keyed by politician and office ID."""
+    conn = run.conn
+    conn.execute(TABLE_DDL['district_offices'])
+
+    rows = []
+    skipped = 0
+    legislators = run.source('district_offices') or []
+    for legislator in legislators:
+        bioguide_id = legislator.get('id', {}).get('bioguide', '')
+        if not bioguide_id:
+            continue
+        for office in legislator.get('offices') or []:
+            office_id = office.get('id', '')
+            if not office_id:
+                skipped += 1
+                continue
+            rows.append((
+                bioguide_id,
+                office_id,
+                office.get('address', ''),
+                office.get('suite', ''),
+                office.get('building', ''),
+                office.get('city', ''),
+                office.get('state', ''),
+                office.get('zip', ''),
+                office.get('phone', ''),
+                office.get('fax', ''),
+                office.get('latitude', 0.0),
+                office.get('longitude', 0.0),
+                1 if office_id.lower().endswith('main') else 0,
+                'district',
+                dump_json({'hours': office.get('hours', ''), 'id': office_id}),
+            ))
+
+    create_staging_table(conn, 'office_stage', [
+        'bioguide_id TEXT', 'office_name TEXT', 'address', 'suite', 'building', 'city', 'state',
+        'zip', 'phone', 'fax', 'latitude', 'longitude', 'is_main_office', 'office_type', 'metadata',
+        'PRIMARY KEY (bioguide_id, office_name)',
+    ], rows)
+
+    matched = """
+        SELECT p.entity_id AS politician_id, s.office_name, s.address, s.suite, s.building, s.city,
+               s.state, s.zip, s.phone, s.fax, s.latitude, s.longitude, s.is_main_office,
+               s.office_type, s.metadata
+        FROM temp.office_stage s
+        JOIN politicians p ON p.bioguide_id = s.bioguide_id
+    """
+    set_clause = ", ".join(f"{column} = m.{column}" for column in DISTRICT_OFFICE_COLUMNS[2:])
+    updated = conn.execute(f"""
+        UPDATE district_offices SET {set_clause}
+        FROM ({matched}) AS m
+        WHERE district_offices.office_name = m.office_name
+          AND district_offices.politician_id = m.politician_id
+    """).rowcount
+    added = conn.execute(f"""
+        INSERT INTO district_offices ({', '.join(DISTRICT_OFFICE_COLUMNS)})
+        SELECT * FROM ({matched}) AS m
+        WHERE NOT EXISTS (
+            SELECT 1 FROM district_offices d
+            WHERE d.office_name = m.office_name AND d.politician_id = m.politician_id
+        )
+    """).rowcount
+    return {
+        'processed': len(rows) + skipped,
+        'updated': updated,
+        'added': added,
+        'skipped': skipped + len(rows) - updated - added,
+    }
+
+# ======== Committees ========
+
+COMMITTEE_COLUMNS = (
+    'committee_id', 'name', 'type', 'jurisdiction', 'url', 'address', 'phone',
+    'chamber', 'parent_id', 'active', 'metadata',
+)
+
+def committee_row(committee, is_current, imported_date):
+    """Flatten one committee record into a committees row, or None without a THOMAS ID."""
+    committee_ids = committee.get('id')
+    committee_id = committee.get('thomas_id') or (
+        committee_ids.get('thomas') if isinstance(committee_ids, dict) else None
+    )
+    if not committee_id:
+        return None
+
+    metadata = {
+        'source': 'legislators-yaml',
+        'imported_date': imported_date,
+        'is_current': is_current
+    }
+    for key, value in committee.items():
+        if key not in ['name', 'type', 'url', 'address', 'phone', 'chamber', 'parent', 'thomas_id']:
+            if isinstance(value, dict) and 'thomas' in value:
+                metadata[key] = value['thomas']
+            else:
+                metadata[key] = value
+
+    parent = committee.get('parent')
+    return (
+        committee_id,
+        committee.get('name'),
+        committee.get('type'),
+        committee.get('jurisdiction'),
+        committee.get('url'),
+        committee.get('address'),
+        committee.get('phone'),
+        committee.get('chamber'),
+        parent.get('thomas') if isinstance(parent, dict) else parent,
+        1 if is_current else 0,
+        dump_json(metadata),
+    )
+
+def stage_committees(run):
+    """Upsert current and historical committees, keyed by THOMAS ID."""
+    conn = run.conn
+    conn.execute(TABLE_DDL['committees'])
+
+    rows = []
+    skipped = 0
+    imported_date = datetime.now().isoformat()
+    # The historical file also lists current committees; the current entry wins
+    for name, is_current in (('committees_historical', False), ('committees_current', True)):
+        for committee in run.source(name) or []:
+            row = committee_row(committee, is_current, imported_date)
+            if row is None:
+                skipped += 1
+            else:
+                rows.append(row)
+
+    create_staging_table(conn, 'committee_stage', [
+        'committee_id TEXT PRIMARY KEY', 'name', 'type', 'jurisdiction', 'url', 'address',
+        'phone', 'chamber', 'parent_id', 'active', 'metadata',
+    ], rows)
+    staged = conn.execute("SELECT COUNT(*) FROM temp.committee_stage").fetchone()[0]
+    added = conn.execute("""
+        SELECT COUNT(*) FROM temp.committee_stage s
+        WHERE NOT EXISTS (SELECT 1 FROM committees c WHERE c.committee_id = s.committee_id)
+    """).fetchone()[0]
+
+    set_clause = ", ".join(f"{column} = excluded.{column}" for column in COMMITTEE_COLUMNS[1:])
+    conn.execute(f"""
+        INSERT INTO committees ({', '.join(COMMITTEE_COLUMNS)})
+        SELECT {', '.join(COMMITTEE_COLUMNS)} FROM temp.committee_stage WHERE true
+        ON CONFLICT (committee_id) DO UPDATE SET {set_clause}
+    """)
+    return {'processed': len(rows) + skipped, 'added': added, 'updated': staged - added, 'skipped': skipped}
+
+def stage_committee_memberships(run):
+    """Upsert current committee memberships, keyed by committee and politician."""
+    conn = run.conn
+    conn.execute(TABLE_DDL['committees'])
+    conn.execute(TABLE_DDL['committee_memberships'])
+
+    rows = []
+    skipped = 0
+    memberships = run.source('committee_membership') or {}
+    for committee_id, members in memberships.items():
+        for member in members or []:
+            if 'bioguide' not in member:
+                skipped += 1
+                continue
+            rows.append((committee_id, member['bioguide'], member.get('title'), member.get('rank')))
+
+    create_staging_table(conn, 'membership_stage', [
+        'committee_id TEXT', 'bioguide_id TEXT', 'title TEXT', 'rank INTEGER',
+        'PRIMARY KEY (committee_id, bioguide_id)',
+    ], rows)
+
+    matched = """
+        SELECT s.committee_id, p.entity_id AS politician_id, s.title, s.rank
+        FROM temp.membership_stage s
+        JOIN committees c ON c.committee_id = s.committee_id
+        JOIN politicians p ON p.bioguide_id = s.bioguide_id
+    """
+    updated = conn.execute(f"""
+        UPDATE committee_memberships SET title = m.title, rank = m.rank, start_date = NULL, end_date = NULL
+        FROM ({matched}) AS m
+        WHERE committee_memberships.committee_id = m.committee_id
+          AND committee_memberships.politician_id = m.politician_id
+    """).rowcount
+    added = conn.execute(f"""
+        INSERT INTO committee_memberships (committee_id, politician_id, title, rank, start_date, end_date)
+        SELECT m.committee_id, m.politician_id, m.title, m.rank, NULL, NULL
+        FROM ({matched}) AS m
+        WHERE NOT EXISTS (
+            SELECT 1 FROM committee_memberships cm
+            WHERE cm.committee_id = m.committee_id AND cm.politician_id = m.politician_id
+        )
+    """).rowcount
+
+    unknown_committees = conn.execute("""
+        SELECT COUNT(DISTINCT committee_id) FROM temp.membership_stage s
+        WHERE NOT EXISTS (SELECT 1 FROM committees c WHERE c.committee_id = s.committee_id)
+    """).fetchone()[0]
+    missing_politicians = conn.execute("""
+        SELECT COUNT(*) FROM temp.membership_stage s
+        JOIN committees c ON c.committee_id = s.committee_id
+        WHERE NOT EXISTS (SELECT 1 FROM politicians p WHERE p.bioguide_id = s.bioguide_id)
+    """).fetchone()[0]
+    return {
+        'processed': len(rows) + skipped,
+        'updated': updated,
+        'added': added,
+        'missing_politicians': missing_politicians,
+        'unknown_committees': unknown_committees,
+    }
+
+# Stages in the order they run; later stages build on earlier ones
+STAGES = {
+    'legislators': stage_legislators,
+    'office_data': stage_office_data,
+    'election_year': stage_election_year,
+    'bio_info': stage_bio_info,
+    'images': stage_images,
+    'social_media': stage_social_media,
+    'district_offices': stage_district_offices,
+    'committees': stage_committees,
+    'committee_memberships': stage_committee_memberships,
+}
+
+def run_migration(db_path=DB_PATH, stages=None, sources=SOURCES):
+    """Run migration stages in one transaction.
+
+    Args:
+        db_path (str): Database to migrate
+        stages (list): Stage names to run, in any order (default: all)
+        sources (dict): YAML source paths by name
+
+    Returns:
+        list: (step, seconds, counts) for each parse, staging and migration step,
+            then the wall-clock total. Stage times include any parsing and
+            staging they triggered.
+    """
+    selected = [name for name in STAGES if stages is None or name in stages]
+    unknown = set(stages or ()) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown migration stages: {', '.join(sorted(unknown))}")
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    run = MigrationRun(conn, sources)
+    run_started = time.perf_counter()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for name in selected:
+            started = time.perf_counter()
+            counts = STAGES[name](run)
+            run.record(name, time.perf_counter() - started, counts)
+        conn.execute("COMMIT")
+        run.record('total', time.perf_counter() - run_started, {})
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return run.report
+
+def log_report(report):
+    """Log per-step timings and row counts."""
+    logger.info("=== LEGISLATOR MIGRATION SUMMARY ===")
+    for step, seconds, counts in report:
+        details = ", ".join(f"{key}={value}" for key, value in counts.items())
+        logger.info(f"{step:<40} {seconds:8.3f}s  {details}".rstrip())
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Migrate congress-legislators data into maga_ops.db")
+    parser.add_argument(
+        "--stages",
+        help=f"Comma-separated stages to run (default: all): {', '.join(STAGES)}"
+    )
+    parser.add_argument(
+        "--db",
+        default=DB_PATH,
+        help="Path to the SQLite database"
+    )
+    parser.add_argument(
+        "--backup",
+        action="store_true",
+        help="Copy the database aside before migrating"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+    stages = [stage.strip() for stage in args.stages.split(",")] if args.stages else None
+
+    if args.backup and os.path.exists(args.db):
+        backup_path = os.path.join(
+            os.path.dirname(args.db), f"maga_ops_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+        )
+        online_backup(args.db, backup_path)
+
+    logger.info(f"Starting legislator migration: {', '.join(stages or STAGES)}")
+    try:
+        report = run_migration(args.db, stages)
+    except Exception as e:
+        logger.error(f"Legislator migration failed, no changes were made: {e}")
+        sys.exit(1)
+    log_report(report)
+    logger.info("Legislator migration complete")
+
+if __name__ == "__main__":
+    main()
@@ -71,6 +71,7 @@ import re, html.entities
 import pprint
 import rtyaml
 from datetime import datetime, date
+from bisect import bisect_right
 import time
 import json
 
@@ -114,7 +115,7 @@ def legislative_year(date=None):
   else:
     return date.year
 
-def congress_start_end_dates(congress):
+def _compute_congress_start_end_dates(congress):
   # Get the start date and end date of the given Congress (i.g. 1 for the 1st Congress).
   # Sadly, the date of the end of one Congress is identical with the date of the start
   # of the next because the switchover time is at noon (at least since 1935).
@@ -145,7 +146,7 @@ def congress_start_end_dates(congress):
     # 3rds at noon.
     return (date(start_year, 1, 3), date(end_year, 1, 3))
 
-def get_congress_from_date(d, range_type=None):
+def _compute_congress_from_date(d, range_type=None):
   # This is the inverse of congress_start_end_dates.
   #
   # Return the Congress number that the date 'd' occurs in by first computing
@@ -198,6 +199,91 @@ def get_congress_from_date(d, range_type=None):
 def parse_date(date):
   return datetime.strptime(date, "%Y-%m-%d").date()
 
+##### Congress calendar
+
+# The rules above, evaluated once at import into a sorted table of Congress
+# and session start dates, so that mapping dates (e.g. every term start and
+# end in the historical file) to Congresses is a bisect instead of the
+# branching above. Dates outside the table fall back to the rules.
+#
+# Sessions are nominal: the two legislative years of each Congress, the
+# second beginning on January 3 of its even year (the 20th Amendment's
+# meeting date, also used for earlier Congresses). Actual session dates,
+# especially before 1935, varied.
+CALENDAR_LAST_CONGRESS = 250
+
+def _build_congress_calendar():
+  dates = [ ]
+  rows = [ ]
+  for congress in range(1, CALENDAR_LAST_CONGRESS + 2):
+    start_year = 1789 + (congress-1)*2
+    # The transition date get_congress_from_date uses for this Congress.
+    start = date(start_year, 3, 4) if start_year < 1935 else date(start_year, 1, 3)
+    dates.extend([start, date(start_year + 1, 1, 3)])
+    rows.extend([(congress, 1), (congress, 2)])
+  return dates, rows
+
+_CONGRESS_DATES = [_compute_congress_start_end_dates(c) for c in range(1, CALENDAR_LAST_CONGRESS + 1)]
+_SESSION_STARTS, _SESSIONS = _build_congress_calendar()
+# The same boundaries as ISO strings, so term dates can be looked up unparsed.
+_SESSION_STARTS_ISO = [d.isoformat() for d in _SESSION_STARTS]
+
+def congress_start_end_dates(congress):
+  if 1 <= congress <= CALENDAR_LAST_CONGRESS:
+    return _CONGRESS_DATES[congress - 1]
+  return _compute_congress_start_end_dates(congress)
+
+def _calendar_lookup(d, range_type):
+  # Index into _SESSIONS for date d (a date or YYYY-MM-DD string), or None if
+  # d falls outside the calendar. On a Congress transition date range_type
+  # picks the side, as in get_congress_from_date; on a session transition
+  # it only matters for 'end'.
+  if isinstance(d, str):
+    boundaries = _SESSION_STARTS_ISO
+    d = d[:10]
+  else:
+    boundaries = _SESSION_STARTS
+    if isinstance(d, datetime):
+      d = d.date()
+  i = bisect_right(boundaries, d) - 1
+  if i < 0 or i >= len(boundaries) - 2:
+    return None
+  if boundaries[i] == d:
+    if range_type == "end":
+      return i - 1 if i > 0 else None
+    if range_type != "start" and _SESSIONS[i][1] == 1:
+      raise ValueError("Date {} is ambiguous; must pass range_type='start' or 'end'.".format(d))
+  return i
+
+def get_congress_from_date(d, range_type=None):
+  # See _compute_congress_from_date for the rules.
+  i = _calendar_lookup(d, range_type)
+  if i is None:
+    return _compute_congress_from_date(parse_date(d[:10]) if isinstance(d, str) else d, range_type)
+  return _SESSIONS[i][0]
+
+def get_congresses_from_dates(dates, range_type=None):
+  # Map a sequence of dates (date objects or YYYY-MM-DD strings) to their
+  # Congress numbers in one pass.
+  return [get_congress_from_date(d, range_type) for d in dates]
+
+def get_congress_sessions_from_dates(dates, range_type=None):
+  # Map a sequence of dates to (congress, session) pairs in one pass.
+  sessions = [ ]
+  for d in dates:
+    i = _calendar_lookup(d, range_type)
+    if i is None:
+      raise ValueError("Date {} is outside the Congress calendar.".format(d))
+    sessions.append(_SESSIONS[i])
+  return sessions
+
+def get_term_congresses(terms):
+  # The first and last Congress of each term, as (start, end) pairs, using
+  # the term's start and end dates.
+  starts = get_congresses_from_dates([term["start"] for term in terms], "start")
+  ends = get_congresses_from_dates([term["end"] for term in terms], "end")
+  return list(zip(starts, ends))
+
 def log(object):
   if isinstance(object, str):
     print(object)
@@ -241,16 +327,79 @@ def load_data(path):
   return yaml_load(os.path.join(data_dir(), path))
 
 def save_data(data, path):
-  yaml_dump(data, os.path.join(data_dir(), path))
-  write(
-		json.dumps(data, default=format_datetime),
-		"../alternate_formats/%s" %path.replace(".yaml", ".json"))
+  # Only records changed since the last save are re-serialized; see yaml_dump.
+  yaml_dump(data, os.path.join(data_dir(), path),
+    json_path="../alternate_formats/%s" %path.replace(".yaml", ".json"))
+
+##### ID crosswalk
+
+# The legislator datasets that carry a full `id` block.
+LEGISLATOR_DATASETS = ("legislators-current.yaml", "legislators-historical.yaml")
+
+class IdIndex(object):
+  # Hash index from every ID in the `id` blocks of one or more datasets to
+  # the record it belongs to, so joins between datasets (e.g. legislators to
+  # social media or district offices) are dict lookups instead of scans.
+  # List-valued IDs (e.g. fec) are indexed under each of their values. If two
+  # records share an ID, the first one wins, as with a linear search.
+
+  def __init__(self, *datasets):
+    self.by_scheme = { }
+    for records in datasets:
+      self.add(records)
+
+  def add(self, records):
+    for record in records:
+      for scheme, value in record.get("id", {}).items():
+        ids = self.by_scheme.setdefault(scheme, { })
+        for v in (value if isinstance(value, list) else [value]):
+          ids.setdefault(v, record)
+
+  def get(self, scheme, value, default=None):
+    return self.by_scheme.get(scheme, { }).get(value, default)
+
+  def find(self, ids, schemes=None):
+    # Return the record matching any ID in the `ids` block, trying the
+    # schemes in the given order (default: the order of the `ids` block).
+    for scheme in (schemes or ids):
+      if scheme not in ids:
+        continue
+      for v in (ids[scheme] if isinstance(ids[scheme], list) else [ids[scheme]]):
+        match = self.get(scheme, v)
+        if match is not None:
+          return match
+    return None
+
+def legislator_id_index(datasets=LEGISLATOR_DATASETS):
+  return IdIndex(*[load_data(path) for path in datasets])
 
 ##### Downloading
 
+# Downloads go through the shared fetch layer (scripts/utils/http_fetch.py) when
+# it's available: pooled connections, per-host rate limits and one response
+# cache, revalidated with ETag/Last-Modified when a page is re-downloaded. The
+# `cache/` files written below stay the interface the scripts read.
+import requests
+
+USER_AGENT = "the @unitedstates project (https://github.com/unitedstates/congress-legislators)"
+
+# Used by download() when the fetch layer isn't available, and directly by
+# scripts relying on scrapelib's own file cache.
 import scrapelib
 scraper = scrapelib.Scraper(requests_per_minute=60, retry_attempts=3)
-scraper.user_agent = "the @unitedstates project (https://github.com/unitedstates/congress-legislators)"
+scraper.user_agent = USER_AGENT
+
+def http_fetcher():
+  # update_gh_pages.sh checks out this file without the scripts/utils/
+  # package, so the fetch layer is imported lazily and may be missing.
+  project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  if project_root not in sys.path:
+    sys.path.append(project_root)
+  try:
+    from scripts.utils.http_fetch import get_fetcher
+  except ImportError:
+    return None
+  return get_fetcher()
 
 def cache_dir():
   return "cache"
@@ -282,12 +431,22 @@ def download(url, destination=None, force=False, options=None):
         if not options.get('binary', False):
           body = body.decode("utf-8") # guessing encoding
       else:
-        response = scraper.get(url)
+        fetcher = http_fetcher()
+        if fetcher is None:
+          response = scraper.get(url)
+        else:
+          # a forced download always asks the server, but an unchanged page
+          # comes back as a 304 and is served from the response cache; a
+          # missing cache/ file skips the response cache and refetches
+          response = fetcher.fetch(url, headers={"User-Agent": USER_AGENT}, cache=force, max_age=0)
+        if not response.ok:
+          log("Error downloading %s (HTTP %d)" % (url, response.status_code))
+          return None
         if not options.get('binary', False):
           body = response.text
         else:
           body = response.content
-    except scrapelib.HTTPError:
+    except requests.RequestException: # includes scrapelib.HTTPError
       log("Error downloading %s" % url)
       return None
 
@@ -397,41 +556,347 @@ def unescape(text, encoding=None):
 ##### YAML serialization ######
 
 # Apply some common settings for loading/dumping YAML and cache the
-# data in pickled format which is a LOT faster than YAML.
+# data in a binary snapshot which is a LOT faster than YAML.
+#
+# The snapshot (<file>.yaml.snapshot) is a marshal stream, which unlike
+# pickle cannot run code when loaded. Its header records the YAML file's
+# (mtime, size, inode) so a cache hit costs one stat() instead of hashing
+# the whole YAML file; the SHA1 is only computed when the stat changes
+# (e.g. after a git checkout touched an unchanged file). Each top-level
+# record is marshalled separately so single legislators can be decoded
+# without materializing the whole file (see LazyDataset).
+#
+# The header also records where each record's YAML (and, for save_data,
+# JSON) begins and ends in the files we wrote. Saving compares each record's
+# marshal bytes against the snapshot, serializes only the records that
+# changed, and copies the rest from the existing files; the result is
+# byte-identical to dumping the whole dataset.
+
+import marshal, hashlib, struct, threading
+
+SNAPSHOT_MAGIC = b"LGSNAP2\0"
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# Format 2 has no back-references, so equal records always marshal to equal
+# bytes and can be compared without decoding.
+RECORD_MARSHAL_VERSION = 2
+
+# Snapshot bytes by absolute path, so repeated loads in one process skip the disk
+_snapshot_memo = { }
+_snapshot_memo_lock = threading.Lock()
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def _file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _strip_dates(obj, path, date_paths, containers=None):
+    # marshal has no date type, so dates are stored as ISO strings and
+    # their locations recorded to be restored on load. If given, containers
+    # collects the id() of every dict and list visited.
+    if isinstance(obj, dict):
+        if containers is not None:
+            containers.append(id(obj))
+        return { k: _strip_dates(v, path + (k,), date_paths, containers) for k, v in obj.items() }
+    if isinstance(obj, list):
+        if containers is not None:
+            containers.append(id(obj))
+        return [_strip_dates(v, path + (i,), date_paths, containers) for i, v in enumerate(obj)]
+    if isinstance(obj, datetime):
+        date_paths.append((path, "datetime"))
+        return obj.isoformat()
+    if isinstance(obj, date):
+        date_paths.append((path, "date"))
+        return obj.isoformat()
+    return obj
 
-def yaml_load(path, use_cache=True):
-    # Loading YAML is ridiculously slow, so cache the YAML data
-    # in a pickled file which loads much faster.
+def _restore_dates(obj, date_paths):
+    for path, kind in date_paths:
+        parent = obj
+        for key in path[:-1]:
+            parent = parent[key]
+        value = parent[path[-1]]
+        parent[path[-1]] = datetime.fromisoformat(value) if kind == "datetime" else date.fromisoformat(value)
+    return obj
 
-    # Check if the .pickle file exists and a hash stored inside it
-    # matches the hash of the YAML file, and if so unpickle it.
-    import pickle as pickle, os.path, hashlib
-    h = hashlib.sha1(open(path, 'rb').read()).hexdigest()
-    if use_cache and os.path.exists(path + ".pickle"):
+def _record_key(record):
+    if isinstance(record, dict) and isinstance(record.get("id"), dict):
+        return record["id"].get("bioguide")
+    return None
 
+def _record_blobs(records, containers=None):
+    # Marshal each record, or return None if one has an unsupported type.
+    blobs = []
+    for record in records:
+        paths = []
         try:
-          store = pickle.load(open(path + ".pickle", 'rb'))
-          if store["hash"] == h:
-            return store["data"]
-        except EOFError:
-          pass # bad .pickle file, pretend it doesn't exist
-
-    # No cached pickled data exists, so load the YAML file.
-    data = rtyaml.load(open(path))
-
-    # Store in a pickled file for fast access later.
-    pickle.dump({ "hash": h, "data": data }, open(path+".pickle", "wb"))
-
-    return data
-
-def yaml_dump(data, path):
-    # write file
-    rtyaml.dump(data, open(path, "w"))
+            blobs.append(marshal.dumps((_strip_dates(record, (), paths, containers), paths), RECORD_MARSHAL_VERSION))
+        except ValueError:
+            return None
+    return blobs
+
+def _write_snapshot(path, data, stat_key, sha1, blobs=None, yaml_spans=None, mirror=None):
+    # Returns the snapshot bytes, or None if the data can't be marshalled.
+    # yaml_spans and mirror locate each record in the YAML file and its
+    # JSON mirror, when known (see yaml_dump).
+    is_list = isinstance(data, list)
+    records = data if is_list else [data]
+    if blobs is None:
+        blobs = _record_blobs(records)
+        if blobs is None:
+            return None # unsupported type; fall back to parsing YAML every time
+    offsets, keys = [], { }
+    offset = 0
+    for i, (record, blob) in enumerate(zip(records, blobs)):
+        offsets.append((offset, len(blob)))
+        offset += len(blob)
+        key = _record_key(record)
+        if key is not None:
+            keys.setdefault(key, i)
+
+    header = marshal.dumps({
+        "marshal_version": marshal.version,
+        "stat": stat_key,
+        "sha1": sha1,
+        "is_list": is_list,
+        "offsets": offsets,
+        "keys": keys,
+        "yaml_spans": yaml_spans,
+        "mirror": mirror,
+    })
+    snapshot = SNAPSHOT_MAGIC + struct.pack("<Q", len(header)) + header + b"".join(blobs)
+
+    tmp = path + SNAPSHOT_SUFFIX + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(snapshot)
+    os.replace(tmp, path + SNAPSHOT_SUFFIX)
+    return snapshot
+
+def _read_snapshot_header(snapshot):
+    # Returns (header, body offset) or None if the bytes aren't a usable snapshot.
+    if not snapshot.startswith(SNAPSHOT_MAGIC):
+        return None
+    start = len(SNAPSHOT_MAGIC) + 8
+    (header_len,) = struct.unpack("<Q", snapshot[len(SNAPSHOT_MAGIC):start])
+    try:
+        header = marshal.loads(snapshot[start:start + header_len])
+    except (EOFError, ValueError, TypeError):
+        return None
+    if header.get("marshal_version") != marshal.version:
+        return None
+    return header, start + header_len
+
+def _decode_record(snapshot, body, offset_length):
+    offset, length = offset_length
+    record, date_paths = marshal.loads(snapshot[body + offset:body + offset + length])
+    return _restore_dates(record, date_paths)
+
+def _decode_snapshot(snapshot, header, body):
+    records = [_decode_record(snapshot, body, ol) for ol in header["offsets"]]
+    return records if header["is_list"] else records[0]
+
+def _snapshot_for(path):
+    # Return (snapshot bytes, header, body offset) that are current for the
+    # YAML file at path, building the snapshot from YAML if needed.
+    path = os.path.abspath(path)
+    key = _stat_key(path)
+
+    with _snapshot_memo_lock:
+        memo = _snapshot_memo.get(path)
+    if memo and memo[1]["stat"] == key:
+        return memo
+
+    snapshot = None
+    if os.path.exists(path + SNAPSHOT_SUFFIX):
+        with open(path + SNAPSHOT_SUFFIX, "rb") as f:
+            snapshot = f.read()
+        parsed = _read_snapshot_header(snapshot)
+        if parsed:
+            header, body = parsed
+            if header["stat"] != key:
+                # File metadata changed; the content may not have.
+                sha1 = _file_sha1(path)
+                if header["sha1"] == sha1:
+                    snapshot = _write_snapshot(path, _decode_snapshot(snapshot, header, body), key, sha1,
+                        yaml_spans=header["yaml_spans"], mirror=header["mirror"])
+                else:
+                    snapshot = None
+        else:
+            snapshot = None
+
+    data = None
+    if snapshot is None:
+        sha1 = _file_sha1(path)
+        with open(path) as f:
+            data = rtyaml.load(f)
+        snapshot = _write_snapshot(path, data, key, sha1)
+        if snapshot is None:
+            return None, data
+
+    memo = (snapshot,) + _read_snapshot_header(snapshot)
+    with _snapshot_memo_lock:
+        _snapshot_memo[path] = memo
+    return memo
 
-    # Store in a pickled file for fast access later.
-    import pickle as pickle, hashlib
-    h = hashlib.sha1(open(path, 'rb').read()).hexdigest()
-    pickle.dump({ "hash": h, "data": data }, open(path+".pickle", "wb"))
+def yaml_load(path, use_cache=True):
+    # Loading YAML is ridiculously slow, so cache the YAML data
+    # in a binary snapshot file which loads much faster.
+    # Every call returns a freshly decoded copy, so callers may mutate it.
+    if not use_cache:
+        with open(path) as f:
+            return rtyaml.load(f)
+
+    memo = _snapshot_for(path)
+    if memo[0] is None:
+        return memo[1] # data that couldn't be snapshotted
+    snapshot, header, body = memo
+    return _decode_snapshot(snapshot, header, body)
+
+class LazyDataset(object):
+    # Read-only view of a YAML dataset that decodes records on demand.
+    # Scripts that touch one legislator can use get(bioguide) without
+    # materializing the whole file.
+
+    def __init__(self, path):
+        memo = _snapshot_for(path)
+        if memo[0] is None:
+            raise ValueError("%s cannot be loaded lazily" % path)
+        self._snapshot, self._header, self._body = memo
+
+    def __len__(self):
+        return len(self._header["offsets"])
+
+    def __getitem__(self, index):
+        return _decode_record(self._snapshot, self._body, self._header["offsets"][index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def get(self, bioguide, default=None):
+        index = self._header["keys"].get(bioguide)
+        if index is None:
+            return default
+        return self[index]
+
+def load_data_lazy(path):
+    return LazyDataset(os.path.join(data_dir(), path))
+
+def _snapshot_blob(snapshot, header, body, index):
+    offset, length = header["offsets"][index]
+    return snapshot[body + offset:body + offset + length]
+
+def _reusable_records(old_blobs, new_blobs):
+    # Map new record index -> index of an identical old record, whose
+    # serialization can be copied wherever the record has moved to.
+    old_index = { }
+    for j, blob in enumerate(old_blobs):
+        old_index.setdefault(blob, j)
+    reuse = { }
+    for i, blob in enumerate(new_blobs):
+        j = old_index.get(blob)
+        if j is not None:
+            reuse[i] = j
+    return reuse
+
+def _splice(records, reuse, old_content, old_spans, serialize, start=b"", separator=b"", end=b""):
+    # Join the serialized records, copying reused ones out of old_content.
+    # Returns (content, spans).
+    pieces, spans = [start], []
+    offset = len(start)
+    for i, record in enumerate(records):
+        if i:
+            pieces.append(separator)
+            offset += len(separator)
+        j = reuse.get(i) if old_content is not None else None
+        if j is not None:
+            old_offset, length = old_spans[j]
+            piece = old_content[old_offset:old_offset + length]
+        else:
+            piece = serialize(record)
+        pieces.append(piece)
+        spans.append((offset, len(piece)))
+        offset += len(piece)
+    pieces.append(end)
+    return b"".join(pieces), spans
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _write_bytes(content, path):
+    mkdir_p(os.path.dirname(path) or ".")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+def _dump_yaml_record(record):
+    return rtyaml.dump([record]).encode("utf-8")
+
+def _dump_json_record(record):
+    return json.dumps(record, default=format_datetime).encode("utf-8")
+
+def yaml_dump(data, path, json_path=None):
+    # Write data to path as YAML and, if json_path is given, as JSON too.
+    #
+    # Records whose marshal bytes match the snapshot of our last save are
+    # copied from the existing files rather than serialized again. This needs
+    # the top level to be a list with no dict or list shared between places
+    # (which YAML would write as anchors); otherwise everything is dumped.
+    records = data if isinstance(data, list) else None
+    containers = []
+    blobs = _record_blobs(records if records is not None else [data], containers)
+    splice = bool(records) and blobs is not None and len(set(containers)) == len(containers)
+
+    old = None
+    if splice and os.path.exists(path + SNAPSHOT_SUFFIX):
+        memo = _snapshot_for(path)
+        if memo[0] is not None and memo[1]["is_list"] and memo[1]["yaml_spans"] is not None:
+            old = memo
+
+    yaml_spans = mirror = None
+    if splice:
+        reuse = { }
+        old_yaml = old_yaml_spans = old_json = old_json_spans = None
+        if old:
+            snapshot, header, body = old
+            old_blobs = [_snapshot_blob(snapshot, header, body, i) for i in range(len(header["offsets"]))]
+            reuse = _reusable_records(old_blobs, blobs)
+            old_yaml, old_yaml_spans = _read_bytes(path), header["yaml_spans"]
+            old_mirror = header["mirror"]
+            if (json_path and old_mirror and old_mirror["path"] == os.path.abspath(json_path)
+                    and os.path.exists(json_path) and _stat_key(json_path) == old_mirror["stat"]):
+                old_json, old_json_spans = _read_bytes(json_path), old_mirror["spans"]
+
+        content, yaml_spans = _splice(records, reuse, old_yaml, old_yaml_spans, _dump_yaml_record)
+        if json_path:
+            json_content, json_spans = _splice(records, reuse, old_json, old_json_spans,
+                _dump_json_record, b"[", b", ", b"]")
+    else:
+        content = rtyaml.dump(data).encode("utf-8")
+        if json_path:
+            json_content = json.dumps(data, default=format_datetime).encode("utf-8")
+
+    _write_bytes(content, path)
+    if json_path:
+        _write_bytes(json_content, json_path)
+        if splice:
+            mirror = { "path": os.path.abspath(json_path), "stat": _stat_key(json_path), "spans": json_spans }
+
+    # Store in a snapshot file for fast access later.
+    if blobs is None:
+        return
+    snapshot = _write_snapshot(path, data, _stat_key(path), hashlib.sha1(content).hexdigest(),
+        blobs=blobs, yaml_spans=yaml_spans, mirror=mirror)
+    with _snapshot_memo_lock:
+        _snapshot_memo[os.path.abspath(path)] = (snapshot,) + _read_snapshot_header(snapshot)
 
 # if email settings are supplied, email the text - otherwise, just print it
 def admin(body):
@@ -8,8 +8,11 @@ Import and expose utility modules for the application.
 # Import utility modules
 from scripts.utils.file_utils import *
 from scripts.utils.string_utils import *
+from scripts.utils.name_matching import *
 from scripts.utils.date_utils import *
 from scripts.utils.db_utils import *
+from scripts.utils.db_backup import *
+from scripts.utils.http_fetch import *
 from scripts.utils.config_utils import *
 from scripts.utils.logger import *
 
@@ -15,6 +15,7 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 # Import utility modules
 from scripts.utils.logger import get_logger
 from scripts.utils.config import get
+from scripts.utils.db_backup import online_backup
 
 # Initialize logger
 logger = get_logger("db")
@@ -338,24 +339,8 @@ def backup_database(backup_path: str = None) -> str:
         db_name = os.path.splitext(os.path.basename(db_path))[0]
         backup_path = os.path.join(backup_dir, f"{db_name}_backup_{timestamp}.db")
     
-    # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(backup_path), exist_ok=True)
-    
-    # Create backup connection
-    backup_conn = sqlite3.connect(backup_path)
-    
-    # Get source connection
-    source_conn = get_connection()
-    
-    # Backup database
-    source_conn.backup(backup_conn)
-    
-    # Close backup connection
-    backup_conn.close()
-    
-    logger.info(f"Database backup created: {backup_path}")
-    
-    return backup_path
+    # Copy online through the shared connection
+    return online_backup(db_path, backup_path, conn=get_connection())
 
 def vacuum() -> None:
     """Optimize the database by rebuilding it."""
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Database Backup Module.
+
+Provides consistent backups of live SQLite databases. Full backups use the
+online backup API: WAL databases are copied from one read snapshot, which
+never blocks writers, and rollback-journal databases a bounded number of
+pages per step so writers are not locked out for the whole copy.
+Incremental snapshots split such a backup into pages and keep each
+distinct page once in a content-addressed store, so a snapshot only adds
+the pages that changed since earlier ones.
+"""
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import datetime
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Import utility modules
+from scripts.utils.logger import get_logger
+
+# Initialize logger
+logger = get_logger("db_backup")
+
+# Pages copied per backup step; the source is unlocked between steps
+DEFAULT_BACKUP_PAGES = 1024
+
+# Seconds to pause between backup steps, letting writers in
+DEFAULT_BACKUP_SLEEP = 0.005
+
+# Snapshots kept by SnapshotStore.prune unless told otherwise
+DEFAULT_KEEP_SNAPSHOTS = 14
+
+# Bytes of BLAKE2b digest used as a page's address
+PAGE_DIGEST_SIZE = 16
+
+# Pages checked against the store per query (below SQLite's parameter limit)
+_PAGE_BATCH = 900
+
+# Large store pages keep compressed database pages out of overflow chains
+_STORE_PAGE_SIZE = 16384
+
+_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    hash BLOB PRIMARY KEY,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    source TEXT NOT NULL,
+    label TEXT,
+    page_size INTEGER NOT NULL,
+    page_count INTEGER NOT NULL,
+    new_pages INTEGER NOT NULL,
+    new_bytes INTEGER NOT NULL,
+    page_map BLOB NOT NULL -- zlib-compressed concatenation of page digests
+);
+"""
+
+class _BackupRestarted(Exception):
+    """Raised from a backup progress callback when a writer restarted the copy."""
+
+def _copy_database(source: sqlite3.Connection, dest: sqlite3.Connection, pages: int, sleep: float) -> None:
+    """
+    Copy a database with the online backup API without starving or blocking writers.
+
+    In WAL mode a reader never blocks writers, so the copy is one step over
+    one consistent read snapshot. Otherwise the copy holds a read lock only
+    for `pages` pages at a time; a commit from another connection between
+    steps restarts it, so the step doubles after each restart until the
+    copy fits between commits.
+    """
+    if source.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal":
+        source.backup(dest, pages=-1)
+        return
+
+    while True:
+        seen = []
+
+        def progress(status, remaining, total):
+            # Remaining pages only grow when the copy started over
+            if seen and remaining > seen[-1]:
+                raise _BackupRestarted()
+            seen.append(remaining)
+
+        try:
+            source.backup(dest, pages=pages, progress=progress, sleep=sleep)
+            return
+        except _BackupRestarted:
+            pages = -1 if pages < 0 or seen[0] <= pages * 2 else pages * 2
+            logger.debug(f"Backup restarted by a concurrent write, retrying with {pages} pages per step")
+
+def online_backup(db_path: str, backup_path: str, pages: int = DEFAULT_BACKUP_PAGES,
+                  sleep: float = DEFAULT_BACKUP_SLEEP,
+                  conn: Optional[sqlite3.Connection] = None) -> str:
+    """
+    Copy a live database with the SQLite online backup API.
+
+    The copy is a consistent snapshot even while other connections write.
+    It is written beside the destination and moved into place when
+    complete, so a failed backup never leaves a truncated file behind.
+
+    Args:
+        db_path (str): Database file path
+        backup_path (str): Backup file path
+        pages (int, optional): Pages copied per step for rollback-journal
+            databases (-1 copies all at once); WAL databases copy in one step
+        sleep (float, optional): Seconds to pause between steps
+        conn (sqlite3.Connection, optional): Open connection to back up
+            instead of opening db_path
+
+    Returns:
+        str: Backup file path
+    """
+    backup_dir = os.path.dirname(os.path.abspath(backup_path))
+    os.makedirs(backup_dir, exist_ok=True)
+    partial_path = backup_path + ".partial"
+    if os.path.exists(partial_path):
+        os.remove(partial_path)
+
+    source = conn if conn is not None else sqlite3.connect(db_path, timeout=30.0)
+    try:
+        dest = sqlite3.connect(partial_path)
+        try:
+            _copy_database(source, dest, pages, sleep)
+        finally:
+            dest.close()
+    finally:
+        if conn is None:
+            source.close()
+
+    os.replace(partial_path, backup_path)
+    logger.info(f"Database backup created: {backup_path}")
+    return backup_path
+
+def _page_size(path: str) -> int:
+    """Read the page size from a database file header."""
+    with open(path, "rb") as f:
+        header = f.read(100)
+    if len(header) < 100 or not header.startswith(b"SQLite format 3\x00"):
+        raise ValueError(f"Not a SQLite database: {path}")
+    size = int.from_bytes(header[16:18], "big")
+    return 65536 if size == 1 else size
+
+def _split_digests(page_map: bytes) -> List[bytes]:
+    digests = zlib.decompress(page_map)
+    return [digests[i:i + PAGE_DIGEST_SIZE] for i in range(0, len(digests), PAGE_DIGEST_SIZE)]
+
+class SnapshotStore:
+    """
+    Content-addressed store of incremental page-level database snapshots.
+
+    The store is itself a SQLite file. Each distinct database page is kept
+    once, compressed and keyed by its digest; a snapshot records the digest
+    of each of its pages in order. Pruning deletes snapshots outside the
+    retention policy and then any pages no remaining snapshot uses. Freed
+    space is reused by later snapshots rather than returned to the OS.
+
+    Example:
+        store = SnapshotStore("backups/snapshots.db")
+        snapshot = store.create("maga_ops.db")
+        store.restore(snapshot["id"], "restored.db")
+    """
+
+    def __init__(self, store_path: str, compress_level: int = 1):
+        """
+        Args:
+            store_path (str): Snapshot store file path
+            compress_level (int, optional): zlib level for stored pages
+        """
+        self.store_path = os.path.abspath(store_path)
+        self.compress_level = compress_level
+        os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(f"PRAGMA page_size = {_STORE_PAGE_SIZE}")
+            conn.executescript(_STORE_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open the store, committing on success and always closing."""
+        conn = sqlite3.connect(self.store_path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _store_pages(self, conn: sqlite3.Connection, batch: List[tuple]) -> tuple:
+        """Compress and insert the (digest, page) pairs the store doesn't hold yet."""
+        placeholders = ",".join("?" * len(batch))
+        stored = {row[0] for row in conn.execute(
+            f"SELECT hash FROM pages WHERE hash IN ({placeholders})", [digest for digest, _ in batch]
+        )}
+        rows = [(digest, zlib.compress(page, self.compress_level)) for digest, page in batch if digest not in stored]
+        conn.executemany("INSERT INTO pages (hash, data) VALUES (?, ?)", rows)
+        return len(rows), sum(len(data) for _, data in rows)
+
+    def create(self, db_path: str, label: Optional[str] = None,
+               pages: int = DEFAULT_BACKUP_PAGES, sleep: float = DEFAULT_BACKUP_SLEEP) -> Dict[str, Any]:
+        """
+        Take an incremental snapshot of a live database.
+
+        Args:
+            db_path (str): Database file path
+            label (str, optional): Free-form note stored with the snapshot
+            pages (int, optional): Pages copied per online backup step
+            sleep (float, optional): Seconds to pause between backup steps
+
+        Returns:
+            Dict[str, Any]: Snapshot summary, including how many pages were new
+        """
+        started = time.perf_counter()
+        scratch_path = f"{self.store_path}.scratch"
+        online_backup(db_path, scratch_path, pages=pages, sleep=sleep)
+        try:
+            page_size = _page_size(scratch_path)
+            with self._connect() as conn:
+                previous = conn.execute("SELECT page_map FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+                known = set(_split_digests(previous["page_map"])) if previous else set()
+
+                # Only pages that changed since the previous snapshot are
+                # looked up in the store, compressed and written
+                digests = []
+                candidates = []
+                added = added_bytes = 0
+                with open(scratch_path, "rb") as f:
+                    while True:
+                        page = f.read(page_size)
+                        if not page:
+                            break
+                        digest = hashlib.blake2b(page, digest_size=PAGE_DIGEST_SIZE).digest()
+                        digests.append(digest)
+                        if digest not in known:
+                            known.add(digest)
+                            candidates.append((digest, page))
+                            if len(candidates) == _PAGE_BATCH:
+                                pages_added, bytes_added = self._store_pages(conn, candidates)
+                                added, added_bytes = added + pages_added, added_bytes + bytes_added
+                                candidates = []
+                if candidates:
+                    pages_added, bytes_added = self._store_pages(conn, candidates)
+                    added, added_bytes = added + pages_added, added_bytes + bytes_added
+
+                snapshot_id = conn.execute("""
+                    INSERT INTO snapshots (created, source, label, page_size, page_count, new_pages, new_bytes, page_map)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    datetime.datetime.now().isoformat(timespec="seconds"),
+                    os.path.abspath(db_path),
+                    label,
+                    page_size,
+                    len(digests),
+                    added,
+                    added_bytes,
+                    zlib.compress(b"".join(digests)),
+                )).lastrowid
+        finally:
+            os.remove(scratch_path)
+
+        summary = {
+            "id": snapshot_id,
+            "page_size": page_size,
+            "page_count": len(digests),
+            "new_pages": added,
+            "new_bytes": added_bytes,
+            "seconds": time.perf_counter() - started,
+        }
+        logger.info(f"Snapshot {snapshot_id} of {db_path}: {len(digests)} pages, {added} new")
+        return summary
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        List snapshots, oldest first.
+
+        Returns:
+            List[Dict[str, Any]]: Snapshot metadata
+        """
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute("""
+                SELECT id, created, source, label, page_size, page_count, new_pages, new_bytes
+                FROM snapshots ORDER BY id
+            """)]
+
+    def restore(self, snapshot_id: int, dest_path: str, overwrite: bool = False) -> str:
+        """
+        Rebuild the database file captured by a snapshot.
+
+        Args:
+            snapshot_id (int): Snapshot ID
+            dest_path (str): Restored database file path
+            overwrite (bool, optional): Replace dest_path if it exists
+
+        Returns:
+            str: Restored database file path
+        """
+        if os.path.exists(dest_path) and not overwrite:
+            raise FileExistsError(f"Restore target already exists: {dest_path}")
+
+        with self._connect() as conn:
+            snapshot = conn.execute(
+                "SELECT page_size, page_count, page_map FROM snapshots WHERE id = ?", (snapshot_id,)
+            ).fetchone()
+            if snapshot is None:
+                raise KeyError(f"No snapshot with ID {snapshot_id}")
+
+            partial_path = dest_path + ".partial"
+            with open(partial_path, "wb") as f:
+                for digest in _split_digests(snapshot["page_map"]):
+                    row = conn.execute("SELECT data FROM pages WHERE hash = ?", (digest,)).fetchone()
+                    if row is None:
+                        raise ValueError(f"Snapshot {snapshot_id} is missing page {digest.hex()}")
+                    f.write(zlib.decompress(row["data"]))
+
+        check = sqlite3.connect(partial_path)
+        try:
+            result = check.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            check.close()
+        if result != "ok":
+            os.remove(partial_path)
+            raise ValueError(f"Restored snapshot {snapshot_id} failed integrity check: {result}")
+
+        os.replace(partial_path, dest_path)
+        logger.info(f"Snapshot {snapshot_id} restored to {dest_path}")
+        return dest_path
+
+    def prune(self, keep: int = DEFAULT_KEEP_SNAPSHOTS, max_age_days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Delete snapshots outside the retention policy and the pages only they used.
+
+        The newest snapshot is always kept.
+
+        Args:
+            keep (int, optional): Number of most recent snapshots to keep
+            max_age_days (int, optional): Also delete kept snapshots older than this
+
+        Returns:
+            Dict[str, int]: Number of snapshots and pages deleted
+        """
+        with self._connect() as conn:
+            ids = [row["id"] for row in conn.execute("SELECT id FROM snapshots ORDER BY id DESC")]
+            doomed = set(ids[max(keep, 1):])
+            if max_age_days is not None:
+                cutoff = (datetime.datetime.now() - datetime.timedelta(days=max_age_days)).isoformat(timespec="seconds")
+                doomed.update(row["id"] for row in conn.execute(
+                    "SELECT id FROM snapshots WHERE created < ? AND id != ?", (cutoff, ids[0] if ids else None)
+                ))
+            if not doomed:
+                return {"snapshots": 0, "pages": 0}
+
+            conn.executemany("DELETE FROM snapshots WHERE id = ?", ((snapshot_id,) for snapshot_id in doomed))
+            conn.execute("CREATE TEMP TABLE live_pages (hash BLOB PRIMARY KEY) WITHOUT ROWID")
+            for row in conn.execute("SELECT page_map FROM snapshots").fetchall():
+                conn.executemany("INSERT OR IGNORE INTO temp.live_pages VALUES (?)",
+                                 ((digest,) for digest in _split_digests(row["page_map"])))
+            deleted_pages = conn.execute(
+                "DELETE FROM pages WHERE hash NOT IN (SELECT hash FROM temp.live_pages)"
+            ).rowcount
+
+        logger.info(f"Pruned {len(doomed)} snapshots and {deleted_pages} unused pages")
+        return {"snapshots": len(doomed), "pages": deleted_pages}
@@ -13,6 +13,7 @@ from typing import Any, Dict, List, Optional, Union, Tuple, Callable
 
 # Import utility modules
 from scripts.utils.logger import get_logger
+from scripts.utils.db_backup import online_backup
 
 # Initialize logger
 logger = get_logger("db_utils")
@@ -433,20 +434,8 @@ class Database:
             backup_path = f"{base_name}_backup_{timestamp}{os.path.splitext(self.db_path)[1]}"
             backup_path = os.path.join(os.path.dirname(self.db_path), backup_path)
         
-        # Create connection to backup file
-        backup_conn = sqlite3.connect(backup_path)
-        
-        # Backup database
-        if self.conn:
-            with backup_conn:
-                self.conn.backup(backup_conn)
-        else:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.backup(backup_conn)
-        
-        backup_conn.close()
-        
-        return backup_path
+        # Copy online, through this connection if it is open
+        return online_backup(self.db_path, backup_path, conn=self.conn)
     
     def vacuum(self) -> None:
         """Vacuum database to optimize storage."""
@@ -0,0 +1,832 @@
+#!/usr/bin/env python3
+"""
+HTTP Fetch Module.
+
+Provides the one HTTP stack shared by the scrapers and data-mining tools.
+Requests go through a pooled session, so connections to a host are kept
+alive and reused across calls and threads. Each host gets a concurrency
+limit and a token bucket, shared by everything fetching from it, and
+responses land in one size-bounded SQLite cache of compressed,
+content-addressed bodies. Stale entries that carry an ETag or
+Last-Modified validator are revalidated with a conditional request, so an
+unchanged page costs a 304 instead of a body.
+
+fetch_many() fans a batch of URLs out over a thread pool. The host limits
+decide how fast it goes, so a sweep over thousands of pages runs at the
+politeness budget of each host instead of one request at a time.
+"""
+import os
+import json
+import atexit
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+import http.client
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Import utility modules
+from scripts.utils.logger import get_logger
+
+# Initialize logger
+logger = get_logger("http_fetch")
+
+# Shared response cache
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "cache", "http", "responses.db"
+)
+
+# Seconds a cached response is served without revalidation
+DEFAULT_MAX_AGE = 86400
+
+# Bound on the cache's stored (compressed) body bytes
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# zlib level for cached bodies
+DEFAULT_COMPRESS_LEVEL = 6
+
+# Per-host politeness: requests per second, burst size and parallel requests
+DEFAULT_HOST_RATE = 1.0
+DEFAULT_HOST_BURST = 1
+DEFAULT_HOST_CONCURRENCY = 4
+
+# Keep-alive connections pooled per host
+DEFAULT_POOL_SIZE = 16
+
+# Threads fetch_many() fans a batch out over
+DEFAULT_MAX_WORKERS = 16
+
+# Request timeout in seconds
+DEFAULT_TIMEOUT = 30
+
+# Retries after the first attempt, and the initial backoff between them
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_DELAY = 2.0
+
+# Statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Request headers whose values select a different response
+_KEY_HEADERS = ("authorization", "api-key", "x-api-key")
+
+# Response headers that describe the transfer rather than the stored body
+_UNSTORED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+# Bodies smaller than this aren't worth compressing
+_COMPRESS_MIN_SIZE = 256
+
+# Eviction brings the cache down to this fraction of max_bytes, so it
+# doesn't run again on the next store
+_EVICT_TO = 0.9
+
+# Entries considered per eviction query
+_EVICT_BATCH = 256
+
+# Buffered hits written per batch
+_TOUCH_BATCH = 256
+
+# Bumped when the cache layout changes; older cache files are reset
+_CACHE_VERSION = 3
+
+_CACHE_RESET = f"""
+DROP TABLE IF EXISTS responses;
+DROP TABLE IF EXISTS bodies;
+PRAGMA user_version = {_CACHE_VERSION};
+"""
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    encoding TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    content BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL,
+    method TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body_id INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS responses_body ON responses (body_id);
+CREATE INDEX IF NOT EXISTS responses_namespace ON responses (namespace);
+CREATE INDEX IF NOT EXISTS responses_fetched ON responses (fetched);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used);
+CREATE INDEX IF NOT EXISTS responses_lfu ON responses (hits, last_used);
+"""
+
+# Statements run on every lookup or store; keeping the text identical lets
+# the connection reuse their prepared form
+_SQL_GET = """
+SELECT r.url, r.status_code, r.headers, b.encoding, b.content, r.etag, r.last_modified, r.fetched
+FROM responses r JOIN bodies b ON b.id = r.body_id
+WHERE r.key = ?
+"""
+_SQL_BODY_ID = "SELECT id FROM bodies WHERE hash = ?"
+_SQL_ENTRY_BODY = "SELECT body_id FROM responses WHERE key = ?"
+_SQL_PUT_BODY = "INSERT INTO bodies (hash, encoding, size, stored_size, content) VALUES (?, ?, ?, ?, ?)"
+_SQL_PUT_RESPONSE = """
+INSERT OR REPLACE INTO responses
+(key, namespace, url, method, status_code, headers, body_id, etag, last_modified, fetched, last_used, hits)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+"""
+_SQL_REFRESH = "UPDATE responses SET headers = ?, etag = ?, last_modified = ?, fetched = ? WHERE key = ?"
+_SQL_TOUCH = "UPDATE responses SET hits = hits + ?, last_used = MAX(last_used, ?) WHERE key = ?"
+_SQL_ORPHAN = """
+SELECT id, stored_size FROM bodies
+WHERE id = ? AND NOT EXISTS (SELECT 1 FROM responses WHERE body_id = bodies.id)
+"""
+
+# Which entries go first when the cache is over its size bound
+_EVICTION_ORDER = {
+    "lru": "last_used",
+    "lfu": "hits, last_used",
+}
+_SQL_VICTIMS = {
+    policy: f"SELECT key, body_id FROM responses ORDER BY {order} LIMIT ?"
+    for policy, order in _EVICTION_ORDER.items()
+}
+
+# Counters kept by ResponseCache.metrics
+_METRICS = ("hits", "misses", "revalidated", "stores", "deduplicated", "evictions",
+            "bytes_served", "bytes_stored", "bytes_written")
+
+class HostLimit(NamedTuple):
+    """Politeness budget for a host."""
+    rate: float = DEFAULT_HOST_RATE
+    burst: int = DEFAULT_HOST_BURST
+    concurrency: int = DEFAULT_HOST_CONCURRENCY
+
+class FetchResult(NamedTuple):
+    """Outcome of one URL of a batch: a response, or the error that ended it."""
+    url: str
+    response: Optional[requests.Response]
+    error: Optional[Exception]
+
+class TokenBucket:
+    """Token bucket shared by the threads fetching from one host.
+
+    Each request reserves a token, possibly one that has not accrued yet,
+    and sleeps until it has. Reservations are taken in order, so requests
+    from any number of threads are spaced 1/rate apart once the burst is
+    spent.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """Take a token, sleeping until it is available.
+
+        Returns:
+            float: Seconds slept
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate) - 1
+            self.updated = now
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+class HostLimiter:
+    """Concurrency limit and token bucket for one host."""
+
+    def __init__(self, limit: HostLimit):
+        self.limit = limit
+        self.bucket = TokenBucket(limit.rate, limit.burst)
+        self.semaphore = threading.BoundedSemaphore(max(1, limit.concurrency))
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one of the host's connections for a paced request."""
+        with self.semaphore:
+            self.bucket.take()
+            yield
+
+class ResponseCache:
+    """SQLite response cache with compressed bodies stored once per content hash.
+
+    Entries are keyed by request (method, URL with query string, body and
+    credential headers) and the namespace of the caller that stored them,
+    so one caller can clear its entries without touching the rest. Bodies live in their own table under their
+    SHA-256, zlib-compressed unless that doesn't shrink them, so identical
+    pages fetched from different URLs are stored once. Entries keep the
+    response's ETag and Last-Modified so stale ones can be revalidated.
+
+    The cache holds one connection for its lifetime and serializes access
+    to it with a lock, so any number of threads can share an instance.
+    Once the stored bodies exceed max_bytes, the least recently used
+    entries (or the least frequently used, with policy "lfu") are evicted.
+    Recording a hit is buffered in memory and written in batches, so reads
+    don't each cost a write.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: Optional[int] = DEFAULT_CACHE_MAX_BYTES,
+                 policy: str = "lru", compress_level: int = DEFAULT_COMPRESS_LEVEL):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): SQLite file holding the cache
+            max_bytes (int, optional): Bound on the stored (compressed) body
+                bytes; None leaves the cache unbounded
+            policy (str): Eviction order, "lru" or "lfu"
+            compress_level (int): zlib level for bodies; 0 stores them as-is
+        """
+        if policy not in _EVICTION_ORDER:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.compress_level = compress_level
+        self.metrics = dict.fromkeys(_METRICS, 0)
+        self._lock = threading.RLock()
+        self._touched: Dict[str, List[float]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The cache's connection, opened on first use and again after a fork."""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False, cached_statements=64)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != _CACHE_VERSION:
+                # Cache files of an older layout are dropped, not converted
+                conn.executescript(_CACHE_RESET)
+            conn.executescript(_CACHE_SCHEMA)
+            self._stored_bytes = conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM bodies").fetchone()[0]
+            self._conn, self._pid = conn, os.getpid()
+            self._touched.clear()
+        return self._conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response, however old.
+
+        Args:
+            key (str): Request key from request_key()
+
+        Returns:
+            dict: url, status_code, headers, content, etag, last_modified
+                and fetched (epoch seconds), or None if not cached
+        """
+        with self._lock:
+            row = self._connection().execute(_SQL_GET, (key,)).fetchone()
+            if row is None:
+                self.metrics['misses'] += 1
+                return None
+            touch = self._touched.setdefault(key, [0, 0.0])
+            touch[0] += 1
+            touch[1] = time.time()
+            if len(self._touched) >= _TOUCH_BATCH:
+                self._flush_touches()
+        url, status_code, headers, encoding, stored, etag, last_modified, fetched = row
+        content = zlib.decompress(stored) if encoding == "zlib" else stored
+        with self._lock:
+            self.metrics['hits'] += 1
+            self.metrics['bytes_served'] += len(content)
+        return {
+            'url': url,
+            'status_code': status_code,
+            'headers': json.loads(headers),
+            'content': content,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched': fetched,
+        }
+
+    def put(self, key: str, method: str, response: requests.Response, namespace: str = "") -> None:
+        """
+        Store a response, replacing any earlier one for the same request.
+
+        Args:
+            key (str): Request key from request_key()
+            method (str): HTTP method of the request
+            response (requests.Response): Response with its body read
+            namespace (str): Namespace the key was made in
+        """
+        content = response.content or b""
+        body_hash = hashlib.sha256(content).hexdigest()
+        headers = json.dumps(_stored_headers(response.headers))
+        with self._lock:
+            known = self._connection().execute(_SQL_BODY_ID, (body_hash,)).fetchone()
+
+        # Compress outside the lock; zlib releases the GIL
+        encoding, stored = "identity", content
+        if known is None and self.compress_level and len(content) >= _COMPRESS_MIN_SIZE:
+            compressed = zlib.compress(content, self.compress_level)
+            if len(compressed) < len(content):
+                encoding, stored = "zlib", compressed
+
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(_SQL_BODY_ID, (body_hash,)).fetchone()
+            if row is None:
+                body_id = conn.execute(_SQL_PUT_BODY, (body_hash, encoding, len(content), len(stored), stored)).lastrowid
+                self._stored_bytes += len(stored)
+                self.metrics['bytes_stored'] += len(content)
+                self.metrics['bytes_written'] += len(stored)
+            else:
+                body_id = row[0]
+                self.metrics['deduplicated'] += 1
+            previous = conn.execute(_SQL_ENTRY_BODY, (key,)).fetchone()
+            conn.execute(_SQL_PUT_RESPONSE, (
+                key, namespace, response.url or "", method.upper(), response.status_code, headers, body_id,
+                response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now,
+            ))
+            if previous and previous[0] != body_id:
+                self._drop_orphans(conn, [previous[0]])
+            self._touched.pop(key, None)
+            self.metrics['stores'] += 1
+            if self.max_bytes is not None and self._stored_bytes > self.max_bytes:
+                self._evict(conn, int(self.max_bytes * _EVICT_TO))
+
+    def refresh(self, key: str, headers: Dict[str, str]) -> None:
+        """
+        Mark an entry fresh after the server confirmed it with a 304.
+
+        Args:
+            key (str): Request key from request_key()
+            headers (dict): Headers of the 304 response, merged into the entry
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT headers FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            merged = json.loads(row[0])
+            merged.update(_stored_headers(headers))
+            conn.execute(_SQL_REFRESH, (json.dumps(merged), merged.get('ETag'), merged.get('Last-Modified'),
+                                        time.time(), key))
+            self.metrics['revalidated'] += 1
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Evict entries until the stored bodies fit in max_bytes.
+
+        Args:
+            max_bytes (int, optional): Bound to enforce (default: the cache's)
+
+        Returns:
+            int: Number of entries evicted
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        if limit is None:
+            return 0
+        with self._transaction() as conn:
+            return self._evict(conn, limit)
+
+    def _evict(self, conn: sqlite3.Connection, target: int) -> int:
+        """Delete entries in eviction order until the stored bytes are within target."""
+        self._flush_touches()
+        evicted = 0
+        while self._stored_bytes > target:
+            victims = conn.execute(_SQL_VICTIMS[self.policy], (_EVICT_BATCH,)).fetchall()
+            if not victims:
+                break
+            for key, body_id in victims:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._drop_orphans(conn, [body_id])
+                evicted += 1
+                if self._stored_bytes <= target:
+                    break
+        self.metrics['evictions'] += evicted
+        if evicted:
+            logger.debug(f"Evicted {evicted} cached responses ({self.policy})")
+        return evicted
+
+    def _drop_orphans(self, conn: sqlite3.Connection, body_ids: Optional[List[int]] = None) -> None:
+        """Delete bodies no entry refers to (only among body_ids, if given)."""
+        if body_ids is None:
+            orphans = conn.execute(
+                "SELECT id, stored_size FROM bodies WHERE id NOT IN (SELECT body_id FROM responses)"
+            ).fetchall()
+        else:
+            orphans = [row for row in (conn.execute(_SQL_ORPHAN, (body_id,)).fetchone() for body_id in body_ids) if row]
+        conn.executemany("DELETE FROM bodies WHERE id = ?", [(body_id,) for body_id, _ in orphans])
+        self._stored_bytes -= sum(size for _, size in orphans)
+
+    def _flush_touches(self) -> None:
+        """Write buffered hit counts and access times."""
+        if not self._touched:
+            return
+        touches = [(hits, used, key) for key, (hits, used) in self._touched.items()]
+        self._touched.clear()
+        if self._connection().in_transaction:
+            self._conn.executemany(_SQL_TOUCH, touches)
+        else:
+            with self._transaction() as conn:
+                conn.executemany(_SQL_TOUCH, touches)
+
+    def delete_older_than(self, max_age: float) -> int:
+        """
+        Delete entries fetched more than max_age seconds ago.
+
+        Args:
+            max_age (float): Age in seconds
+
+        Returns:
+            int: Number of entries deleted
+        """
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM responses WHERE fetched < ?", (time.time() - max_age,)).rowcount
+            self._drop_orphans(conn)
+        return deleted
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """
+        Delete every entry, or every entry of one namespace.
+
+        Args:
+            namespace (str, optional): Namespace to clear (default: all of them)
+
+        Returns:
+            int: Number of entries deleted
+        """
+        with self._transaction() as conn:
+            if namespace is not None:
+                deleted = conn.execute("DELETE FROM responses WHERE namespace = ?", (namespace,)).rowcount
+                self._drop_orphans(conn)
+                return deleted
+            deleted = conn.execute("DELETE FROM responses").rowcount
+            conn.execute("DELETE FROM bodies")
+            self._stored_bytes = 0
+            self._touched.clear()
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache contents and the metrics counted since the cache was opened.
+
+        Returns:
+            dict: entries, bodies, raw_bytes and stored_bytes of the cache,
+                plus hits, misses, revalidated, stores, deduplicated,
+                evictions, bytes_served, bytes_stored and bytes_written
+        """
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            bodies, raw_bytes = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM bodies"
+            ).fetchone()
+            return dict(self.metrics, entries=entries, bodies=bodies, raw_bytes=raw_bytes,
+                        stored_bytes=self._stored_bytes)
+
+    def close(self) -> None:
+        """Write buffered hits and close the connection."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._flush_touches()
+                self._conn.close()
+            self._conn = None
+
+def _stored_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    return {name: value for name, value in headers.items() if name.lower() not in _UNSTORED_HEADERS}
+
+def request_key(request: requests.PreparedRequest, namespace: str = "") -> str:
+    """
+    Cache key of a prepared request.
+
+    Args:
+        request (requests.PreparedRequest): Request with its final URL and body
+        namespace (str): Namespace of the caller caching the response
+
+    Returns:
+        str: Hex SHA-256 over namespace, method, URL, body and credential headers
+    """
+    digest = hashlib.sha256(f"{namespace}|{request.method}|{request.url}".encode("utf-8"))
+    body = request.body
+    if body:
+        digest.update(b"|")
+        digest.update(body if isinstance(body, bytes) else str(body).encode("utf-8"))
+    for name in _KEY_HEADERS:
+        value = request.headers.get(name)
+        if value is not None:
+            digest.update(f"|{name}={value}".encode("utf-8"))
+    return digest.hexdigest()
+
+def _cached_response(entry: Dict[str, Any], request: requests.PreparedRequest) -> requests.Response:
+    """Rebuild a requests.Response from a cache entry."""
+    response = requests.Response()
+    response.status_code = entry['status_code']
+    response.reason = http.client.responses.get(entry['status_code'], "")
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = entry['content']
+    response.url = entry['url']
+    response.request = request
+    response.from_cache = True
+    return response
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds a throttled response asked us to wait, if it said."""
+    value = response.headers.get('Retry-After')
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+class Fetcher:
+    """Pooled HTTP client with per-host limits and a shared response cache.
+
+    One Fetcher is safe to use from many threads; get_fetcher() returns the
+    process-wide instance every adapter shares.
+    """
+
+    def __init__(self, cache_path: Optional[str] = DEFAULT_CACHE_PATH, headers: Optional[Dict[str, str]] = None,
+                 host_limits: Optional[Dict[str, HostLimit]] = None, default_limit: HostLimit = HostLimit(),
+                 cache_max_bytes: Optional[int] = DEFAULT_CACHE_MAX_BYTES, cache_policy: str = "lru",
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, retry_delay: float = DEFAULT_RETRY_DELAY):
+        """
+        Initialize the fetcher.
+
+        Args:
+            cache_path (str, optional): Response cache file; None disables caching
+            headers (dict, optional): Headers sent with every request
+            host_limits (dict, optional): Limits by host pattern; a pattern
+                applies to every host containing it, the longest match winning
+            default_limit (HostLimit): Limits of hosts no pattern matches
+            cache_max_bytes (int, optional): Size bound of the response cache
+            cache_policy (str): Response cache eviction order, "lru" or "lfu"
+            pool_size (int): Keep-alive connections pooled per host
+            timeout (float): Default request timeout in seconds
+            retries (int): Default retries after the first attempt
+            retry_delay (float): Initial backoff between retries in seconds
+        """
+        self.cache = ResponseCache(cache_path, cache_max_bytes, cache_policy) if cache_path else None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.default_limit = default_limit
+        self.host_limits = dict(host_limits or {})
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def set_host_limit(self, pattern: str, limit: HostLimit) -> None:
+        """
+        Set the limits of hosts containing pattern.
+
+        Args:
+            pattern (str): Host or host fragment, e.g. "congress.gov"
+            limit (HostLimit): Limits for matching hosts
+        """
+        with self._lock:
+            self.host_limits[pattern.lower()] = limit
+            self._limiters = {host: limiter for host, limiter in self._limiters.items() if pattern.lower() not in host}
+
+    def set_default_limit(self, limit: HostLimit) -> None:
+        """
+        Set the limits of hosts no pattern matches.
+
+        Args:
+            limit (HostLimit): Limits for unmatched hosts
+        """
+        with self._lock:
+            self.default_limit = limit
+            self._limiters = {
+                host: limiter for host, limiter in self._limiters.items()
+                if any(pattern in host for pattern in self.host_limits)
+            }
+
+    def limit_for(self, host: str) -> HostLimit:
+        """Limits that apply to a host."""
+        host = host.lower()
+        matches = [pattern for pattern in self.host_limits if pattern.lower() in host]
+        return self.host_limits[max(matches, key=len)] if matches else self.default_limit
+
+    def limiter(self, host: str) -> HostLimiter:
+        """Shared limiter of a host."""
+        host = host.lower()
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = HostLimiter(self.limit_for(host))
+            return limiter
+
+    def fetch(self, url: str, method: str = "GET", params: Optional[Dict[str, Any]] = None,
+              data: Any = None, json: Any = None, headers: Optional[Dict[str, str]] = None,
+              auth: Any = None, timeout: Optional[float] = None, verify: bool = True,
+              allow_redirects: bool = True, stream: bool = False, proxies: Optional[Dict[str, str]] = None,
+              cache: bool = True, max_age: Optional[float] = DEFAULT_MAX_AGE, rate_limit: bool = True,
+              retries: Optional[int] = None, retry_delay: Optional[float] = None,
+              namespace: str = "") -> requests.Response:
+        """
+        Make a request through the pool, the host limits and the cache.
+
+        A cached response younger than max_age is returned without a
+        request. An older one is revalidated if it has a validator, and
+        returned again if the server answers 304 Not Modified.
+
+        Args:
+            url (str): URL to request
+            method (str): HTTP method
+            params (dict, optional): Query parameters
+            data (optional): Form data or raw body
+            json (optional): JSON body
+            headers (dict, optional): Extra request headers
+            auth (optional): requests authentication
+            timeout (float, optional): Timeout in seconds
+            verify (bool): Whether to verify TLS certificates
+            allow_redirects (bool): Whether to follow redirects
+            stream (bool): Leave the body unread; streamed responses aren't cached
+            proxies (dict, optional): Proxies by scheme
+            cache (bool): Whether to read and write the response cache
+            max_age (float, optional): Seconds a cached response stays fresh;
+                None keeps it fresh forever, 0 always revalidates
+            rate_limit (bool): Whether to apply the host limits
+            retries (int, optional): Retries after the first attempt on
+                connection errors and retryable statuses
+            retry_delay (float, optional): Initial backoff between retries
+            namespace (str): Response cache namespace, so a caller's entries
+                can be cleared on their own
+
+        Returns:
+            requests.Response: Response, with from_cache set when the body
+                came from the cache
+
+        Raises:
+            requests.RequestException: If every attempt failed to get a response
+        """
+        request = self.session.prepare_request(requests.Request(
+            method=method.upper(), url=url, params=params, data=data, json=json, headers=headers, auth=auth
+        ))
+        use_cache = cache and self.cache is not None and not stream
+        key = request_key(request, namespace) if use_cache else None
+        entry = self.cache.get(key) if use_cache else None
+
+        if entry is not None:
+            if max_age is None or time.time() - entry['fetched'] < max_age:
+                logger.debug(f"Cache hit for {url}")
+                return _cached_response(entry, request)
+            if entry['etag']:
+                request.headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request.headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self._send(
+            request, timeout, verify, allow_redirects, stream, proxies, rate_limit,
+            self.retries if retries is None else retries, self.retry_delay if retry_delay is None else retry_delay
+        )
+
+        if entry is not None and response.status_code == 304:
+            logger.debug(f"Revalidated {url}")
+            self.cache.refresh(key, response.headers)
+            entry['headers'].update(_stored_headers(response.headers))
+            return _cached_response(entry, request)
+
+        response.from_cache = False
+        if use_cache and response.ok and response.status_code != 304 \
+                and 'no-store' not in response.headers.get('Cache-Control', ''):
+            self.cache.put(key, method, response, namespace)
+        return response
+
+    def _send(self, request: requests.PreparedRequest, timeout: Optional[float], verify: bool,
+              allow_redirects: bool, stream: bool, proxies: Optional[Dict[str, str]],
+              rate_limit: bool, retries: int, delay: float) -> requests.Response:
+        """Send a request, retrying connection errors and retryable statuses."""
+        settings = self.session.merge_environment_settings(request.url, proxies or {}, stream, verify, None)
+        host = urlparse(request.url).hostname or ""
+        for attempt in range(retries + 1):
+            try:
+                with self.limiter(host).slot() if rate_limit else nullcontext():
+                    response = self.session.send(
+                        request.copy(), timeout=timeout or self.timeout, allow_redirects=allow_redirects, **settings
+                    )
+            except requests.RequestException as e:
+                if attempt == retries:
+                    logger.error(f"Request failed after {retries + 1} attempts: {request.url} - {e}")
+                    raise
+                logger.warning(f"Request failed ({e.__class__.__name__}): {request.url}, retrying in {delay}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+                wait = _retry_after(response)
+                delay = delay if wait is None else wait
+                logger.warning(f"HTTP {response.status_code} from {request.url}, retrying in {delay}s")
+                response.close()
+            time.sleep(delay)
+            delay *= 2
+
+    def iter_fetch(self, urls: Iterable[str], max_workers: int = DEFAULT_MAX_WORKERS,
+                   **kwargs: Any) -> Iterator[FetchResult]:
+        """
+        Fetch URLs concurrently, yielding results as they complete.
+
+        Args:
+            urls (iterable): URLs to fetch
+            max_workers (int): Threads to fan out over; the host limits still
+                bound how many requests each host sees at once
+            **kwargs: Arguments for fetch()
+
+        Yields:
+            FetchResult: One per URL, in completion order
+        """
+        urls = list(urls)
+        if not urls:
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="fetch") as pool:
+            futures = {pool.submit(self.fetch, url, **kwargs): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    yield FetchResult(url, future.result(), None)
+                except Exception as e:
+                    yield FetchResult(url, None, e)
+
+    def fetch_many(self, urls: Iterable[str], max_workers: int = DEFAULT_MAX_WORKERS,
+                   **kwargs: Any) -> List[FetchResult]:
+        """
+        Fetch a batch of URLs concurrently.
+
+        Args:
+            urls (iterable): URLs to fetch; duplicates are fetched once
+            max_workers (int): Threads to fan out over
+            **kwargs: Arguments for fetch()
+
+        Returns:
+            list: A FetchResult per URL, in the order given
+        """
+        urls = list(urls)
+        results = {result.url: result for result in self.iter_fetch(dict.fromkeys(urls), max_workers, **kwargs)}
+        return [results[url] for url in urls]
+
+    def close(self) -> None:
+        """Close the pooled connections and the response cache."""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+_fetcher: Optional[Fetcher] = None
+_fetcher_lock = threading.Lock()
+
+def get_fetcher() -> Fetcher:
+    """
+    Get the process-wide fetcher, creating it on first use.
+
+    Returns:
+        Fetcher: Shared fetcher
+    """
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = Fetcher()
+            atexit.register(_fetcher.close)
+        return _fetcher
+
+def fetch(url: str, **kwargs: Any) -> requests.Response:
+    """Fetch a URL with the shared fetcher; see Fetcher.fetch()."""
+    return get_fetcher().fetch(url, **kwargs)
+
+def fetch_many(urls: Iterable[str], **kwargs: Any) -> List[FetchResult]:
+    """Fetch URLs concurrently with the shared fetcher; see Fetcher.fetch_many()."""
+    return get_fetcher().fetch_many(urls, **kwargs)
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Name Matching Module.
+
+Fast approximate matching of names for deduplication. Provides a
+bit-parallel Levenshtein kernel and a q-gram inverted index that generates
+candidate matches without comparing every pair of names.
+
+Similarity throughout is 1 - distance / max(len(a), len(b)), the same
+measure as `string_utils.string_similarity`.
+"""
+import re
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+__all__ = [
+    "DEFAULT_Q",
+    "levenshtein",
+    "similarity",
+    "batch_similarity",
+    "qgrams",
+    "simple_normalize",
+    "NameIndex",
+    "match_names",
+]
+
+# Default gram length; bigrams keep short names filterable
+DEFAULT_Q = 2
+
+# Padding around names so their first and last characters form full grams
+_PAD = "\x00"
+
+# Slack for float error when turning similarity thresholds into distances
+_EPSILON = 1e-9
+
+
+def _max_distance(threshold: float, length: int) -> int:
+    """Largest edit distance that keeps similarity >= threshold at this max length."""
+    return int((1.0 - threshold) * length + _EPSILON)
+
+
+def levenshtein(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """
+    Calculate Levenshtein (edit) distance with the bit-parallel algorithm of
+    Myers (1999) as formulated by Hyyrö, processing one column per character.
+
+    Args:
+        s1 (str): First string
+        s2 (str): Second string
+        max_distance (int): Optional bound; once the distance is certain to
+            exceed it, stop and return max_distance + 1
+
+    Returns:
+        int: Edit distance (or max_distance + 1 if it exceeds the bound)
+    """
+    # The shorter string becomes the bit pattern
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    m, n = len(s2), len(s1)
+    if m == 0:
+        return n if max_distance is None else min(n, max_distance + 1)
+    if max_distance is not None and n - m > max_distance:
+        return max_distance + 1
+
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(s2):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for i, c in enumerate(s1):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+        # Each remaining column can lower the score by at most one
+        if max_distance is not None and score - (n - i - 1) > max_distance:
+            return max_distance + 1
+    return score
+
+
+def similarity(s1: str, s2: str) -> float:
+    """
+    Calculate similarity as 1 - normalized Levenshtein distance.
+
+    Args:
+        s1 (str): First string
+        s2 (str): Second string
+
+    Returns:
+        float: Similarity (0-1)
+    """
+    if not s1 and not s2:
+        return 1.0
+    if not s1 or not s2:
+        return 0.0
+    return 1.0 - levenshtein(s1, s2) / max(len(s1), len(s2))
+
+
+def batch_similarity(query: str, candidates: Iterable[str], threshold: float = 0.0) -> List[float]:
+    """
+    Score one string against many, skipping exact distances below a threshold.
+
+    The query's bit pattern is only as expensive as its length, and with a
+    threshold each comparison stops as soon as it cannot reach it.
+
+    Args:
+        query (str): String to compare
+        candidates (Iterable[str]): Strings to compare against
+        threshold (float): Scores below this are reported as 0.0
+
+    Returns:
+        List[float]: Similarity of the query to each candidate, in order
+    """
+    scores = []
+    for candidate in candidates:
+        longest = max(len(query), len(candidate))
+        if longest == 0:
+            scores.append(1.0)
+            continue
+        bound = _max_distance(threshold, longest) if threshold > 0 else None
+        distance = levenshtein(query, candidate, bound)
+        if bound is not None and distance > bound:
+            scores.append(0.0)
+        else:
+            scores.append(1.0 - distance / longest)
+    return scores
+
+
+def qgrams(text: str, q: int = DEFAULT_Q) -> List[str]:
+    """
+    Get the distinct padded q-grams of a string.
+
+    Args:
+        text (str): String to split
+        q (int): Gram length
+
+    Returns:
+        List[str]: Distinct q-grams
+    """
+    padded = _PAD * (q - 1) + text + _PAD * (q - 1)
+    return list(dict.fromkeys(padded[i:i + q] for i in range(len(padded) - q + 1)))
+
+
+def simple_normalize(name: str) -> str:
+    """
+    Lowercase a name and collapse punctuation and whitespace.
+
+    Args:
+        name (str): Name to normalize
+
+    Returns:
+        str: Normalized name
+    """
+    name = re.sub(r"[^\w\s]", "", name.lower())
+    return re.sub(r"\s+", " ", name).strip()
+
+
+class NameIndex:
+    """
+    Inverted q-gram index over names for thresholded similarity search.
+
+    A name within edit distance k of the query shares all but at most k*q of
+    the query's distinct q-grams (count filtering). Only names sharing that
+    many grams, and of compatible length, are scored with the bit-parallel
+    kernel. Queries too short to filter fall back to scanning names of
+    compatible length.
+
+    Example:
+        index = NameIndex()
+        index.add_many((row['id'], row['normalized_name']) for row in rows)
+        match = index.best_match('jon smith', threshold=0.9)
+    """
+
+    def __init__(self, q: int = DEFAULT_Q, normalize: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            q (int): Gram length
+            normalize (Callable): Applied to names before indexing and querying
+        """
+        self.q = q
+        self.normalize = normalize
+        self._names: List[str] = []
+        self._keys: List[Hashable] = []
+        self._exact: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._by_length: Dict[int, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _prepare(self, name: str) -> str:
+        return self.normalize(name) if self.normalize else name
+
+    def add(self, key: Hashable, name: str) -> None:
+        """
+        Add a name to the index.
+
+        Args:
+            key (Hashable): Value returned for matches, e.g. an entity ID
+            name (str): Name to index
+        """
+        name = self._prepare(name or "")
+        if not name:
+            return
+        slot = len(self._names)
+        self._names.append(name)
+        self._keys.append(key)
+        self._exact.setdefault(name, slot)
+        for gram in qgrams(name, self.q):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("l")
+            postings.append(slot)
+        lengths = self._by_length.get(len(name))
+        if lengths is None:
+            lengths = self._by_length[len(name)] = array("l")
+        lengths.append(slot)
+
+    def add_many(self, items: Iterable[Tuple[Hashable, str]]) -> None:
+        """
+        Add (key, name) pairs to the index.
+
+        Args:
+            items (Iterable[Tuple]): Keys and names
+        """
+        for key, name in items:
+            self.add(key, name)
+
+    def _candidates(self, name: str, threshold: float) -> Iterator[int]:
+        length = len(name)
+        # Names longer than length / threshold can't reach the threshold
+        max_length = int(length / threshold + _EPSILON) if threshold > 0 else None
+        min_length = int(length * threshold - _EPSILON) + 1 if threshold > 0 else 0
+        max_distance = _max_distance(threshold, max_length or length)
+
+        grams = qgrams(name, self.q)
+        required = len(grams) - max_distance * self.q
+        if threshold <= 0 or required < 1:
+            for other_length, slots in self._by_length.items():
+                if min_length <= other_length and (max_length is None or other_length <= max_length):
+                    yield from slots
+            return
+
+        # Count shared grams across all posting lists (Counter.update on an
+        # array runs in C), then keep names sharing enough of them
+        counts: Counter = Counter()
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                counts.update(postings)
+        names = self._names
+        for slot, shared in counts.items():
+            if shared >= required and min_length <= len(names[slot]) <= max_length:
+                yield slot
+
+    def query(self, name: str, threshold: float = 0.85,
+              limit: Optional[int] = None) -> List[Tuple[Hashable, str, float]]:
+        """
+        Find indexed names at least `threshold` similar to a name.
+
+        Args:
+            name (str): Name to look up
+            threshold (float): Minimum similarity (0-1)
+            limit (int): Maximum number of matches to return
+
+        Returns:
+            List[Tuple]: (key, indexed name, similarity), best first
+        """
+        name = self._prepare(name or "")
+        if not name:
+            return []
+
+        matches = []
+        for slot in self._candidates(name, threshold):
+            other = self._names[slot]
+            longest = max(len(name), len(other))
+            bound = _max_distance(threshold, longest)
+            distance = levenshtein(name, other, bound)
+            if distance <= bound:
+                matches.append((self._keys[slot], other, 1.0 - distance / longest))
+
+        matches.sort(key=lambda match: -match[2])
+        return matches[:limit] if limit else matches
+
+    def best_match(self, name: str, threshold: float = 0.85) -> Optional[Tuple[Hashable, float]]:
+        """
+        Find the most similar indexed name, checking exact matches first.
+
+        Args:
+            name (str): Name to look up
+            threshold (float): Minimum similarity (0-1)
+
+        Returns:
+            Optional[Tuple]: (key, similarity) or None if nothing is similar enough
+        """
+        prepared = self._prepare(name or "")
+        slot = self._exact.get(prepared)
+        if slot is not None:
+            return self._keys[slot], 1.0
+        if threshold >= 1.0:
+            return None
+        matches = self.query(name, threshold, limit=1)
+        if not matches:
+            return None
+        return matches[0][0], matches[0][2]
+
+
+def match_names(queries: Sequence[str], names: Sequence[str], threshold: float = 0.85,
+                q: int = DEFAULT_Q) -> Iterator[Tuple[int, int, float]]:
+    """
+    Find all similar pairs between two lists of names without comparing every pair.
+
+    Args:
+        queries (Sequence[str]): Names to look up
+        names (Sequence[str]): Names to search
+        threshold (float): Minimum similarity (0-1)
+        q (int): Gram length
+
+    Yields:
+        Tuple[int, int, float]: (query index, name index, similarity)
+    """
+    index = NameIndex(q=q)
+    index.add_many(enumerate(names))
+    for i, query in enumerate(queries):
+        for j, _, score in index.query(query, threshold):
+            yield i, j, score
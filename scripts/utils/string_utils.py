@@ -14,6 +14,8 @@ import unicodedata
 import json
 from typing import Any, Dict, List, Optional, Union, Pattern, Match, Set, Tuple, Callable
 
+from scripts.utils.name_matching import levenshtein, similarity
+
 def slugify(text: str, separator: str = "-", lowercase: bool = True, 
            remove_accents: bool = True, allowed_chars: str = "") -> str:
     """
@@ -546,27 +548,7 @@ def levenshtein_distance(s1: str, s2: str) -> int:
     Returns:
         int: Edit distance
     """
-    # Create distance matrix
-    m, n = len(s1), len(s2)
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-    
-    # Initialize first row and column
-    for i in range(m + 1):
-        dp[i][0] = i
-    for j in range(n + 1):
-        dp[0][j] = j
-    
-    # Fill distance matrix
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            cost = 0 if s1[i-1] == s2[j-1] else 1
-            dp[i][j] = min(
-                dp[i-1][j] + 1,      # deletion
-                dp[i][j-1] + 1,      # insertion
-                dp[i-1][j-1] + cost  # substitution
-            )
-    
-    return dp[m][n]
+    return levenshtein(s1, s2)
 
 def string_similarity(s1: str, s2: str) -> float:
     """
@@ -579,19 +561,7 @@ def string_similarity(s1: str, s2: str) -> float:
     Returns:
         float: Similarity (0-1)
     """
-    # Handle empty strings
-    if not s1 and not s2:
-        return 1.0
-    if not s1 or not s2:
-        return 0.0
-    
-    # Calculate Levenshtein distance
-    distance = levenshtein_distance(s1, s2)
-    
-    # Normalize by maximum length
-    max_len = max(len(s1), len(s2))
-    
-    return 1.0 - (distance / max_len)
+    return similarity(s1, s2)
 
 def encode_entities(text: str) -> str:
     """
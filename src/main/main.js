@@ -407,10 +407,176 @@ ipcMain.on('log-message', (event, logEntry) => {
 });
 // --- END RENDERER LOG LISTENER ---
 
+// --- BEGIN PERSISTENT COORDINATOR ---
+// JSON requests on the python-bridge channel go to one long-lived
+// `coordinator.py --stdio` process, so its modules and database stay warm
+// between calls. Requests and replies are newline-delimited JSON; replies can
+// arrive out of order and are matched to their request by request_id.
+const COORDINATOR_TIMEOUT_MS = 300000; // Generation/evaluation requests can be slow
+let coordinatorProcess = null;
+let coordinatorBuffer = '';
+let nextCoordinatorRequestId = 1;
+const pendingCoordinatorRequests = new Map();
+
+function coordinatorError(message) {
+    return JSON.stringify({
+        timestamp: new Date().toISOString(),
+        success: false,
+        error: message
+    });
+}
+
+function failPendingCoordinatorRequests(message) {
+    for (const pending of pendingCoordinatorRequests.values()) {
+        clearTimeout(pending.timer);
+        pending.resolve(coordinatorError(message));
+    }
+    pendingCoordinatorRequests.clear();
+}
+
+function handleCoordinatorLine(line) {
+    let response;
+    try {
+        response = JSON.parse(line);
+    } catch (parseError) {
+        console.error(`[Coordinator] Ignoring non-JSON output: ${line}`);
+        return;
+    }
+
+    const pending = pendingCoordinatorRequests.get(response.request_id);
+    if (!pending) {
+        console.warn(`[Coordinator] Reply for unknown request_id: ${response.request_id}`);
+        return;
+    }
+    pendingCoordinatorRequests.delete(response.request_id);
+    clearTimeout(pending.timer);
+
+    // Hand back the caller's own request_id, if it sent one, instead of ours
+    delete response.request_id;
+    if (pending.callerRequestId !== undefined) {
+        response.request_id = pending.callerRequestId;
+    }
+    pending.resolve(JSON.stringify(response));
+}
+
+// Start the coordinator on first use, and again after it exits
+function getCoordinatorProcess() {
+    if (coordinatorProcess) {
+        return coordinatorProcess;
+    }
+
+    const coordinatorPath = path.join(__dirname, '..', '..', 'scripts', 'data-mining', 'coordinator.py');
+    if (!fs.existsSync(coordinatorPath)) {
+        console.error(`[Coordinator] Script not found at ${coordinatorPath}`);
+        return null;
+    }
+
+    console.log(`[Coordinator] Starting: python ${coordinatorPath} --stdio`);
+    const child = spawn('python', [coordinatorPath, '--stdio'], {
+        cwd: path.join(__dirname, '..', '..'),
+        // The pipes carry UTF-8 JSON whatever the Windows console code page is
+        env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
+    });
+    coordinatorBuffer = '';
+
+    child.stdout.setEncoding('utf8');
+    child.stdout.on('data', (chunk) => {
+        coordinatorBuffer += chunk;
+        let newline;
+        while ((newline = coordinatorBuffer.indexOf('\n')) !== -1) {
+            const line = coordinatorBuffer.slice(0, newline).trim();
+            coordinatorBuffer = coordinatorBuffer.slice(newline + 1);
+            if (line) {
+                handleCoordinatorLine(line);
+            }
+        }
+    });
+
+    child.stderr.on('data', (data) => {
+        console.error(`[Coordinator] stderr: ${data}`);
+    });
+
+    child.stdin.on('error', (error) => {
+        console.error('[Coordinator] stdin error:', error);
+    });
+
+    child.on('error', (error) => {
+        console.error('[Coordinator] Spawn error:', error);
+        if (coordinatorProcess === child) {
+            coordinatorProcess = null;
+        }
+        failPendingCoordinatorRequests(`Failed to start Python coordinator: ${error.message}`);
+    });
+
+    child.on('exit', (code, signal) => {
+        console.log(`[Coordinator] Exited with code ${code}${signal ? ` (signal ${signal})` : ''}`);
+        if (coordinatorProcess === child) {
+            coordinatorProcess = null;
+        }
+        failPendingCoordinatorRequests(`Python coordinator exited with code ${code}.`);
+    });
+
+    coordinatorProcess = child;
+    return child;
+}
+
+// Send one request to the persistent coordinator; resolves with the reply JSON string
+function sendToCoordinator(request) {
+    const child = getCoordinatorProcess();
+    if (!child) {
+        return Promise.resolve(coordinatorError('Python coordinator script not found.'));
+    }
+
+    const requestId = `electron-${nextCoordinatorRequestId++}`;
+    return new Promise((resolve) => {
+        const timer = setTimeout(() => {
+            pendingCoordinatorRequests.delete(requestId);
+            resolve(coordinatorError(`Coordinator did not respond within ${COORDINATOR_TIMEOUT_MS / 1000} seconds.`));
+        }, COORDINATOR_TIMEOUT_MS);
+        pendingCoordinatorRequests.set(requestId, {
+            resolve,
+            timer,
+            callerRequestId: request.request_id
+        });
+        child.stdin.write(JSON.stringify({ ...request, request_id: requestId }) + '\n');
+    });
+}
+
+function stopCoordinator() {
+    if (coordinatorProcess) {
+        console.log('[Coordinator] Stopping persistent coordinator...');
+        // Closing stdin ends the coordinator's request loop
+        coordinatorProcess.stdin.end();
+        coordinatorProcess = null;
+    }
+}
+
+app.on('will-quit', stopCoordinator);
+
+// Parse a python-bridge payload that is a single JSON request object
+function parseCoordinatorRequest(command, args) {
+    if (args.length !== 0 || typeof command !== 'string') {
+        return null;
+    }
+    try {
+        const request = JSON.parse(command);
+        return request && typeof request === 'object' && !Array.isArray(request) ? request : null;
+    } catch (e) {
+        return null;
+    }
+}
+// --- END PERSISTENT COORDINATOR ---
+
 // --- BEGIN NEW PYTHON BRIDGE HANDLER ---
 ipcMain.handle('python-bridge', async (event, command, ...args) => {
     console.log(`[IPC] Received python-bridge command: ${command}`, args);
     
+    // JSON requests are served by the warm coordinator process
+    const coordinatorRequest = parseCoordinatorRequest(command, args);
+    if (coordinatorRequest) {
+        return sendToCoordinator(coordinatorRequest);
+    }
+    
     // Construct the absolute path to the Python script
     const scriptPath = path.join(__dirname, '..', '..', 'scripts', 'api_bridge.py');
     